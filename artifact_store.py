@@ -0,0 +1,225 @@
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+
+from settings import get_settings
+
+# Artifact classes, each kept in its own directory under the root
+ARTIFACT_CLASSES = ('raw_audio', 'compressed_audio', 'transcripts', 'json')
+# Marks an entry that a running session still writes to; holds the owner's pid
+IN_USE_MARKER = '.in_use'
+# Bytes per second of the saved recording (mono int16)
+WAV_BYTES_PER_SAMPLE = 2
+# Room kept on top of a recording that is still to be written, whatever MIN_FREE_DISK_MB says
+SAVE_HEADROOM_BYTES = 64 * 1024 * 1024
+
+
+def default_artifact_root():
+    configured = get_settings().artifact_root
+    if configured:
+        return os.path.expanduser(configured)
+    return os.path.join(os.path.expanduser('~'), '.google_meet_bot', 'artifacts')
+
+
+def parse_retention(value):
+    """"raw_audio=7,json=90" -> {'raw_audio': 7 * 86400, 'json': 90 * 86400} (days to seconds, 0 = no age limit)"""
+    retention = {}
+    for item in (value or '').split(','):
+        if not item.strip():
+            continue
+        name, _, days = item.partition('=')
+        name = name.strip()
+        if name not in ARTIFACT_CLASSES:
+            raise ValueError(f"Unknown artifact class {name!r} in ARTIFACT_RETENTION_DAYS, "
+                             f"expected one of {', '.join(ARTIFACT_CLASSES)}")
+        retention[name] = float(days) * 86400
+    return retention
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+@dataclass
+class Artifact:
+    path: str
+    artifact_class: str
+    size: int
+    mtime: float
+    in_use: bool
+
+
+class ArtifactStore:
+    """Recordings, compressed audio, transcripts and minutes under one root, with a byte
+    budget and a retention age per class.
+
+    Every new artifact goes into <root>/<class>/. Before space is handed out, entries
+    older than their class's retention are deleted, then the least recently modified
+    ones until the store fits its budget. Entries a live session still uses (marked
+    with IN_USE_MARKER by new_dir) are never evicted, by this or any other process.
+
+    Args:
+        root: Store directory, defaults to ARTIFACT_ROOT
+        budget_bytes: Total size the store may reach (0: no limit), defaults to ARTIFACT_BUDGET_MB
+        retention: {class: seconds} (0: no age limit), defaults to ARTIFACT_RETENTION_DAYS
+        min_free_bytes: Disk space to leave free, defaults to MIN_FREE_DISK_MB
+    """
+
+    def __init__(self, root=None, budget_bytes=None, retention=None, min_free_bytes=None):
+        settings = get_settings()
+        self.root = root or default_artifact_root()
+        self.budget_bytes = settings.artifact_budget_mb * 1024 * 1024 if budget_bytes is None else budget_bytes
+        self.retention = parse_retention(settings.artifact_retention_days) if retention is None else retention
+        self.min_free_bytes = settings.min_free_disk_mb * 1024 * 1024 if min_free_bytes is None else min_free_bytes
+
+    def _class_dir(self, artifact_class):
+        if artifact_class not in ARTIFACT_CLASSES:
+            raise ValueError(f"Unknown artifact class {artifact_class!r}")
+        path = os.path.join(self.root, artifact_class)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    def _stamp():
+        return time.strftime('%Y%m%d%H%M%S')
+
+    def new_dir(self, artifact_class='raw_audio', prefix=''):
+        """A new directory for one session's files, marked in use until release()"""
+        self.enforce()
+        path = os.path.join(self._class_dir(artifact_class), f"{prefix}{self._stamp()}_{uuid.uuid4().hex[:8]}")
+        os.makedirs(path)
+        with open(os.path.join(path, IN_USE_MARKER), 'w') as f:
+            f.write(str(os.getpid()))
+        return path
+
+    def new_path(self, artifact_class, filename):
+        """A path for a new single-file artifact: `filename` with a unique suffix before its
+        extension, so meeting_data_<stamp>.json becomes meeting_data_<stamp>_<id>.json and
+        still matches meeting_data_*.json"""
+        self.enforce()
+        stem, extension = os.path.splitext(filename)
+        return os.path.join(self._class_dir(artifact_class), f"{stem}_{uuid.uuid4().hex[:8]}{extension}")
+
+    def release(self, path):
+        """The session is done with a new_dir() directory; it may be evicted from now on"""
+        try:
+            os.remove(os.path.join(path, IN_USE_MARKER))
+        except FileNotFoundError:
+            pass
+
+    def artifacts(self):
+        """Every entry of the store, oldest first"""
+        entries = []
+        for artifact_class in ARTIFACT_CLASSES:
+            class_dir = os.path.join(self.root, artifact_class)
+            if not os.path.isdir(class_dir):
+                continue
+            for entry in os.scandir(class_dir):
+                try:
+                    entries.append(self._describe(entry, artifact_class))
+                except FileNotFoundError:
+                    # Removed by another process meanwhile
+                    continue
+        return sorted(entries, key=lambda artifact: artifact.mtime)
+
+    @staticmethod
+    def _describe(entry, artifact_class):
+        if not entry.is_dir(follow_symlinks=False):
+            stat = entry.stat(follow_symlinks=False)
+            return Artifact(entry.path, artifact_class, stat.st_size, stat.st_mtime, False)
+        size, mtime, in_use = 0, entry.stat(follow_symlinks=False).st_mtime, False
+        for directory, _, files in os.walk(entry.path):
+            for name in files:
+                try:
+                    stat = os.stat(os.path.join(directory, name), follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                size += stat.st_size
+                mtime = max(mtime, stat.st_mtime)
+                if name == IN_USE_MARKER and directory == entry.path:
+                    try:
+                        with open(os.path.join(directory, name)) as f:
+                            in_use = _pid_alive(int(f.read().strip() or 0))
+                    except (OSError, ValueError):
+                        in_use = True
+        return Artifact(entry.path, artifact_class, size, mtime, in_use)
+
+    def usage(self):
+        """Bytes per artifact class"""
+        usage = dict.fromkeys(ARTIFACT_CLASSES, 0)
+        for artifact in self.artifacts():
+            usage[artifact.artifact_class] += artifact.size
+        return usage
+
+    @staticmethod
+    def _remove(artifact):
+        if os.path.isdir(artifact.path):
+            shutil.rmtree(artifact.path, ignore_errors=True)
+        else:
+            try:
+                os.remove(artifact.path)
+            except FileNotFoundError:
+                pass
+
+    def enforce(self, reserve_bytes=0):
+        """Delete expired entries, then the oldest ones until the store plus reserve_bytes
+        fits the budget and the disk keeps min_free_bytes + reserve_bytes free.
+        Returns the evicted artifacts."""
+        now = time.time()
+        evicted, kept = [], []
+        for artifact in self.artifacts():
+            max_age = self.retention.get(artifact.artifact_class)
+            if max_age and not artifact.in_use and now - artifact.mtime > max_age:
+                self._remove(artifact)
+                evicted.append(artifact)
+            else:
+                kept.append(artifact)
+        total = sum(artifact.size for artifact in kept)
+        free = self.free_bytes()
+        for artifact in kept:
+            over_budget = self.budget_bytes and total + reserve_bytes > self.budget_bytes
+            short_of_disk = free < self.min_free_bytes + reserve_bytes
+            if not (over_budget or short_of_disk):
+                break
+            if artifact.in_use:
+                continue
+            self._remove(artifact)
+            evicted.append(artifact)
+            total -= artifact.size
+            free += artifact.size
+        if evicted:
+            print(f"Artifact store: removed {len(evicted)} old item(s), "
+                  f"{sum(artifact.size for artifact in evicted) / 1024 / 1024:.0f} MB")
+        return evicted
+
+    def free_bytes(self, path=None):
+        """Free space on the disk of `path` (default: the store root)"""
+        path = path or self.root
+        os.makedirs(path, exist_ok=True)
+        return shutil.disk_usage(path).free
+
+    def ensure_space(self, needed_bytes, path=None):
+        """Make room for needed_bytes more on the disk of `path` (default: the store root),
+        evicting old artifacts if necessary, and warn early when space is getting low.
+        Returns True when the disk still keeps min_free_bytes free after needed_bytes."""
+        self.enforce(reserve_bytes=needed_bytes)
+        free = self.free_bytes(path)
+        if free < self.min_free_bytes + needed_bytes:
+            return False
+        if free < 2 * (self.min_free_bytes + needed_bytes):
+            print(f"⚠ Warning: Disk space is getting low: {free / 1024 / 1024:.0f} MB free in {path or self.root}")
+        return True
+
+
+def recording_bytes(duration, sample_rate=None):
+    """Size of the WAV file of a recording of `duration` seconds"""
+    sample_rate = sample_rate or get_settings().sample_rate
+    return int(duration * sample_rate * WAV_BYTES_PER_SAMPLE)
@@ -0,0 +1,182 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import time
+
+# Hides every video element and keeps video-only streams from being attached to
+# them, so the tab neither renders nor composites participant video. Streams with
+# audio tracks are attached as usual, so meeting audio keeps playing. Meet still
+# sees the stream it assigned when it reads srcObject back. window.__meetBotVideoOff
+# switches it; RESTORE_VIDEO_SCRIPT turns it off again.
+AUDIO_ONLY_SCRIPT = """
+(() => {
+    window.__meetBotVideoOff = true;
+    if (window.__meetBotAudioOnly) return true;
+    window.__meetBotAudioOnly = true;
+    const addStyle = () => {
+        if (!window.__meetBotVideoOff || document.getElementById('meet-bot-audio-only')) return;
+        const style = document.createElement('style');
+        style.id = 'meet-bot-audio-only';
+        style.textContent = 'video { display: none !important; }';
+        (document.head || document.documentElement).appendChild(style);
+    };
+    if (document.documentElement) addStyle();
+    document.addEventListener('DOMContentLoaded', addStyle, {once: true});
+    const descriptor = Object.getOwnPropertyDescriptor(HTMLMediaElement.prototype, 'srcObject');
+    const hasAudio = stream => !!stream && typeof stream.getAudioTracks === 'function' && stream.getAudioTracks().length > 0;
+    Object.defineProperty(HTMLVideoElement.prototype, 'srcObject', {
+        configurable: true,
+        get() { return this.__meetBotStream !== undefined ? this.__meetBotStream : descriptor.get.call(this); },
+        set(stream) {
+            this.__meetBotStream = stream;
+            descriptor.set.call(this, hasAudio(stream) || !window.__meetBotVideoOff ? stream : null);
+        },
+    });
+    document.querySelectorAll('video').forEach(video => {
+        const stream = descriptor.get.call(video);
+        if (stream && !hasAudio(stream)) {
+            video.__meetBotStream = stream;
+            descriptor.set.call(video, null);
+        }
+    });
+    return true;
+})()
+"""
+
+# Shows video again and attaches the streams AUDIO_ONLY_SCRIPT held back
+RESTORE_VIDEO_SCRIPT = """
+window.__meetBotVideoOff = false;
+const style = document.getElementById('meet-bot-audio-only');
+if (style) style.remove();
+document.querySelectorAll('video').forEach(video => {
+    if (video.__meetBotStream !== undefined) video.srcObject = video.__meetBotStream;
+});
+return true;
+"""
+
+
+def cdp_command(driver, method, params=None):
+    """Send a DevTools command through Selenium's Chrome driver or cdp_driver.CDPDriver.
+    Returns None when the driver cannot send CDP commands (e.g. the simulation driver)."""
+    if hasattr(driver, 'execute_cdp_cmd'):
+        return driver.execute_cdp_cmd(method, params or {})
+    connection = getattr(driver, 'connection', None)
+    if connection is not None:
+        return connection.call(method, params)
+    return None
+
+
+class AudioOnlyMode:
+    """Keep the bot's Meet tab from receiving and rendering participant video.
+
+    The bot only records audio, but a normal Meet tab decodes and draws every video
+    tile, which is most of each Chrome's CPU. This mode:
+
+    - installs AUDIO_ONLY_SCRIPT before Meet loads (and again on every reload) through
+      the DevTools protocol, or into the current page where that is not available;
+    - once in the call, sets Meet's "Receive resolution" to "Audio only", so Meet's
+      servers stop sending video to the bot at all.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.receive_audio_only = False
+        self._installed = False
+        self._script_id = None
+
+    def install(self):
+        """Register the script for every document the tab loads from now on. Call before navigating."""
+        try:
+            result = cdp_command(self.driver, 'Page.addScriptToEvaluateOnNewDocument', {'source': AUDIO_ONLY_SCRIPT})
+        except Exception as e:
+            print(f"  Could not register audio-only script: {str(e)}")
+            return self._installed
+        self._installed = result is not None
+        self._script_id = (result or {}).get('identifier')
+        return self._installed
+
+    def remove(self):
+        """Undo install() and apply(): unregister the script and show video in the current
+        document again. The receive resolution is left as it is."""
+        try:
+            if self._script_id:
+                cdp_command(self.driver, 'Page.removeScriptToEvaluateOnNewDocument', {'identifier': self._script_id})
+            self.driver.execute_script(RESTORE_VIDEO_SCRIPT)
+        except Exception as e:
+            print(f"  Could not turn off audio-only mode: {str(e)}")
+        self._installed = False
+        self._script_id = None
+
+    def apply(self):
+        """Apply the script to the current document (no-op where it already ran)"""
+        try:
+            return bool(self.driver.execute_script("return " + AUDIO_ONLY_SCRIPT))
+        except Exception as e:
+            print(f"  Could not apply audio-only mode: {str(e)}")
+            return False
+
+    def _click_first(self, selectors, timeout):
+        for selector_type, selector_value in selectors:
+            try:
+                element = WebDriverWait(self.driver, timeout).until(
+                    EC.element_to_be_clickable((selector_type, selector_value))
+                )
+                try:
+                    element.click()
+                except Exception:
+                    self.driver.execute_script("arguments[0].click();", element)
+                time.sleep(0.5)
+                return True
+            except (TimeoutException, NoSuchElementException):
+                continue
+            except Exception as e:
+                print(f"  Error with selector {selector_value[:50]}: {str(e)}")
+                continue
+        return False
+
+    def set_receive_audio_only(self, timeout=3):
+        """More options > Settings > Video > Receive resolution (max) > Audio only.
+        Returns True if "Audio only" was selected."""
+        steps = [
+            ('"More options"', [
+                (By.XPATH, '//button[contains(translate(@aria-label, "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "more options")]'),
+            ]),
+            ('"Settings"', [
+                (By.XPATH, '//li[@role="menuitem"][contains(., "Settings")]'),
+                (By.XPATH, '//*[@role="menuitem"][contains(., "Settings")]'),
+            ]),
+            ('the "Video" settings tab', [
+                (By.XPATH, '//*[@role="tab"][contains(., "Video")]'),
+                (By.XPATH, '//button[contains(., "Video")]'),
+            ]),
+            ('"Receive resolution"', [
+                (By.XPATH, '//*[contains(translate(@aria-label, "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "receive resolution")]'),
+                (By.XPATH, '//*[contains(text(), "Receive resolution")]/following::*[@role="combobox" or @role="listbox" or @aria-haspopup="listbox"][1]'),
+            ]),
+            ('"Audio only"', [
+                (By.XPATH, '//*[@role="option"][contains(., "Audio only")]'),
+                (By.XPATH, '//li[contains(., "Audio only")]'),
+            ]),
+        ]
+        for description, selectors in steps:
+            if not self._click_first(selectors, timeout):
+                print(f"⚠ Warning: Audio-only receive: could not find {description}, Meet keeps sending video")
+                self._close_dialog()
+                return False
+        self._close_dialog()
+        self.receive_audio_only = True
+        print("✓ Receive resolution set to audio only")
+        return True
+
+    def _close_dialog(self):
+        closed = self._click_first([
+            (By.XPATH, '//button[contains(translate(@aria-label, "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "close dialog")]'),
+            (By.XPATH, '//div[@role="dialog"]//button[contains(translate(@aria-label, "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "close")]'),
+        ], 1)
+        if not closed:
+            try:
+                self.driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
+            except Exception:
+                pass
@@ -0,0 +1,121 @@
+"""
+Bulk-insert and search latency of the SQLite FTS5 meeting archive.
+
+Fills a fresh archive with synthetic meetings (one-hour transcripts by default),
+then reports insert throughput and p50/p95 latency of typical searches: a
+common word, a rare word, a multi-word query, a prefix query, a search limited
+to one field and a date-filtered search.
+
+Usage: python benchmarks/bench_archive.py [--meetings 20000] [--words 1500] [--runs 50]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from meeting_archive import MeetingArchive
+
+VOCABULARY = (
+    "budget roadmap release customer deadline launch hiring design review metrics "
+    "migration incident backlog feature pricing contract onboarding security testing "
+    "we should will need agree decide follow up next week team plan issue the a to and "
+    "of for on in with this that it is be are was"
+).split()
+RARE_WORDS = ["kubernetes", "postmortem", "acquisition", "gdpr", "latency", "offsite"]
+PEOPLE = ["Alice", "Bob", "Carol", "Dan", "Erin", "Frank", "Grace", "Heidi"]
+
+QUERIES = [
+    ("common word", {"query": "budget"}),
+    ("rare word", {"query": "postmortem"}),
+    ("three words", {"query": "release deadline security"}),
+    ("prefix", {"query": "migrat*"}),
+    ("action items only", {"query": "follow up", "field": "action_items"}),
+    ("last 30 days", {"query": "launch", "since_days": 30}),
+]
+
+
+def zipf_vocabulary(size):
+    """Topic words plus filler words, with Zipf weights like natural language.
+    The topic words sit at mid ranks, so "common word" still hits most meetings."""
+    filler = [f"w{index}" for index in range(max(0, size - len(VOCABULARY)))]
+    words = filler[:20] + VOCABULARY + filler[20:]
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    return words, weights
+
+
+def synthetic_meetings(count, words, rng, now, vocabulary_size):
+    vocabulary, weights = zipf_vocabulary(vocabulary_size)
+    for index in range(count):
+        transcript = rng.choices(vocabulary, weights, k=words)
+        # Roughly one meeting in 50 mentions each rare word
+        for rare in RARE_WORDS:
+            if rng.random() < 0.02:
+                transcript[rng.randrange(words)] = rare
+        yield {
+            "meet_link": f"https://meet.google.com/abc-{index % 500:04d}-xyz",
+            "started_at": now - rng.uniform(0, 365 * 86400),
+            "duration": rng.uniform(900, 3600),
+            "participants": rng.sample(PEOPLE, rng.randint(2, 5)),
+            "transcript": " ".join(transcript),
+            "abstract_summary": " ".join(rng.choice(VOCABULARY) for _ in range(80)),
+            "key_points": "\n".join("- " + " ".join(rng.choice(VOCABULARY) for _ in range(10)) for _ in range(6)),
+            "action_items": "\n".join("- " + " ".join(rng.choice(VOCABULARY) for _ in range(8)) for _ in range(4)),
+            "sentiment": "Overall positive.",
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=1500, help="Transcript words per meeting")
+    parser.add_argument("--vocabulary", type=int, default=5000, help="Distinct transcript words (Zipf distributed)")
+    parser.add_argument("--batch", type=int, default=1000, help="Meetings per add_many call")
+    parser.add_argument("--runs", type=int, default=50, help="Repetitions per query")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = time.time()
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "meetings.db")
+        with MeetingArchive(path) as archive:
+            meetings = synthetic_meetings(args.meetings, args.words, rng, now, args.vocabulary)
+            insert_seconds = 0.0
+            while True:
+                batch = [meeting for _, meeting in zip(range(args.batch), meetings)]
+                if not batch:
+                    break
+                started = time.perf_counter()
+                archive.add_many(batch)
+                insert_seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            archive.optimize()
+            optimize_seconds = time.perf_counter() - started
+
+            size_mb = os.path.getsize(path) / 2**20
+            print(f"Inserted {archive.count()} meetings ({args.words} words each) in {insert_seconds:.1f} s "
+                  f"({args.meetings / insert_seconds:.0f} meetings/s), optimize {optimize_seconds:.1f} s, "
+                  f"database {size_mb:.0f} MB")
+            print(f"{'query':<20} {'hits':>6} {'p50 ms':>8} {'p95 ms':>8}")
+            for label, query in QUERIES:
+                kwargs = dict(query)
+                since_days = kwargs.pop("since_days", None)
+                if since_days:
+                    kwargs["since"] = now - since_days * 86400
+                timings = []
+                for _ in range(args.runs):
+                    started = time.perf_counter()
+                    results = archive.search(limit=20, **kwargs)
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(0.95 * len(timings)))]
+                print(f"{label:<20} {len(results):>6} {statistics.median(timings):>8.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
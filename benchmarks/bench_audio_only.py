@@ -0,0 +1,156 @@
+"""
+Renderer CPU and received bytes of a meeting tab with and without audio-only mode.
+
+Serves a local WebRTC loopback page: Chrome's fake camera and microphone are sent
+from one RTCPeerConnection to another in the same tab, and the received video is
+shown in --tiles video elements like Meet's participant grid. Each mode runs in a
+fresh headless Chrome (linux_runtime.py), driven over CDP (cdp_driver.py):
+
+- normal: everything rendered
+- audio-only: AudioOnlyMode installed before the page loads, exactly as the bot does
+- audio-only + receive off: additionally the sending side stops its video, which is
+  what Meet's servers do once the receive resolution is set to "Audio only"
+
+Reports CPU seconds of the Chrome process tree, video/audio bytes received and video
+frames decoded during the measurement window.
+
+Usage: python benchmarks/bench_audio_only.py [--tiles 9] [--seconds 20] [--warmup 5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_only import AudioOnlyMode
+from cdp_driver import CDPDriver
+from linux_runtime import LinuxRuntime, find_linux_chrome
+
+LOOPBACK_PAGE = """<!doctype html>
+<html><head><title>Loopback</title><style>video { width: 320px; height: 180px; }</style></head><body>
+<div id="grid"></div>
+<script>
+async function start(tiles) {
+    const stream = await navigator.mediaDevices.getUserMedia(
+        {audio: true, video: {width: 1280, height: 720, frameRate: 30}});
+    const sender = new RTCPeerConnection(), receiver = new RTCPeerConnection();
+    sender.onicecandidate = e => e.candidate && receiver.addIceCandidate(e.candidate);
+    receiver.onicecandidate = e => e.candidate && sender.addIceCandidate(e.candidate);
+    window.videoSenders = stream.getTracks().map(track => sender.addTrack(track, stream))
+        .filter(rtpSender => rtpSender.track.kind === 'video');
+    receiver.ontrack = event => {
+        if (event.track.kind === 'audio') {
+            const audio = document.createElement('audio');
+            audio.autoplay = true;
+            audio.srcObject = new MediaStream([event.track]);
+            document.body.appendChild(audio);
+            return;
+        }
+        for (let i = 0; i < tiles; i++) {
+            const video = document.createElement('video');
+            video.autoplay = true;
+            video.muted = true;
+            video.srcObject = new MediaStream([event.track]);
+            document.getElementById('grid').appendChild(video);
+        }
+    };
+    await sender.setLocalDescription(await sender.createOffer());
+    await receiver.setRemoteDescription(sender.localDescription);
+    await receiver.setLocalDescription(await receiver.createAnswer());
+    await sender.setRemoteDescription(receiver.localDescription);
+    window.receiver = receiver;
+    return true;
+}
+async function receiveStats() {
+    const totals = {video: 0, audio: 0, framesDecoded: 0};
+    (await window.receiver.getStats()).forEach(report => {
+        if (report.type !== 'inbound-rtp') return;
+        totals[report.kind] += report.bytesReceived || 0;
+        if (report.kind === 'video') totals.framesDecoded += report.framesDecoded || 0;
+    });
+    return totals;
+}
+async function stopSendingVideo() {
+    await Promise.all(window.videoSenders.map(rtpSender => rtpSender.replaceTrack(null)));
+    return true;
+}
+</script></body></html>"""
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = LOOPBACK_PAGE.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def measure(mode, url, port, args):
+    runtime = LinuxRuntime(os.getenv("CHROME_PATH") or find_linux_chrome(), port, headless=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        runtime.start()
+    try:
+        driver = CDPDriver(port)
+        if mode != "normal":
+            audio_only = AudioOnlyMode(driver)
+            audio_only.install()
+        driver.get(url)
+        driver.execute_script(f"return start({args.tiles});")
+        if mode == "audio-only + receive off":
+            driver.execute_script("return stopSendingVideo();")
+        time.sleep(args.warmup)
+        usage_before = runtime.resource_usage()
+        stats_before = driver.execute_script("return receiveStats();")
+        started = time.monotonic()
+        time.sleep(args.seconds)
+        window = time.monotonic() - started
+        usage_after = runtime.resource_usage()
+        stats_after = driver.execute_script("return receiveStats();")
+        driver.quit()
+    finally:
+        runtime.stop()
+    return {
+        "cpu": (usage_after["cpu_seconds"] - usage_before["cpu_seconds"]) / window * 100,
+        "video_kb": (stats_after["video"] - stats_before["video"]) / 1024 / window,
+        "audio_kb": (stats_after["audio"] - stats_before["audio"]) / 1024 / window,
+        "frames": (stats_after["framesDecoded"] - stats_before["framesDecoded"]) / window,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tiles", type=int, default=9, help="Video elements showing the received video")
+    parser.add_argument("--seconds", type=float, default=20, help="Measurement window per mode")
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--port", type=int, default=9400, help="Chrome debug port")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("localhost", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # localhost is a secure context, so getUserMedia works without TLS
+    url = f"http://localhost:{server.server_address[1]}/"
+
+    results = {}
+    for mode in ("normal", "audio-only", "audio-only + receive off"):
+        results[mode] = measure(mode, url, args.port, args)
+    server.shutdown()
+
+    print(f"{args.tiles} video tiles, {args.seconds:g}s per mode")
+    print(f"{'mode':<26} {'CPU %':>7} {'video KB/s':>11} {'audio KB/s':>11} {'frames/s':>9}")
+    for mode, result in results.items():
+        print(f"{mode:<26} {result['cpu']:>7.1f} {result['video_kb']:>11.1f} {result['audio_kb']:>11.1f} "
+              f"{result['frames']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
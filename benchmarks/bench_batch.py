@@ -0,0 +1,80 @@
+"""
+Synchronous analysis against Batch API submission, for many meetings at once.
+
+Analyses --meetings transcripts both ways against the local stub OpenAI server,
+which emulates the file and batch endpoints: one synchronous meeting_minutes per
+meeting, then one MinutesBatch for all of them. Reports HTTP requests, cost and
+wall time, and checks that both give the same minutes and that collecting the
+batch again sends no request. With --error-rate some batched requests fail and
+are retried synchronously on collect.
+
+Usage: python benchmarks/bench_batch.py [--meetings 20] [--latency 0.2] [--batch-seconds 2] [--error-rate 0.05]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minutes_batch import MinutesBatch
+from simulation import STUB_TRANSCRIPT, StubOpenAIServer
+from speech_to_text import SpeechToText
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub seconds per synchronous request")
+    parser.add_argument("--batch-seconds", type=float, default=2.0, help="Stub seconds until a batch completes")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of batched requests that fail")
+    args = parser.parse_args()
+
+    from openai import OpenAI
+
+    transcripts = [f"Meeting {number}. {STUB_TRANSCRIPT}" for number in range(args.meetings)]
+    with StubOpenAIServer(latency=args.latency, batch_seconds=args.batch_seconds) as server, \
+            tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+        client = OpenAI(api_key="benchmark", base_url=server.base_url, max_retries=0)
+
+        speech_to_text = SpeechToText(client=client)
+        started = time.perf_counter()
+        sync_minutes = [speech_to_text.meeting_minutes(transcript) for transcript in transcripts]
+        sync = (server.requests, speech_to_text.usage.totals()["cost"], time.perf_counter() - started)
+
+        server.requests = 0
+        server.error_rate = args.error_rate
+        speech_to_text = SpeechToText(client=client)
+        started = time.perf_counter()
+        batch = speech_to_text.batch_minutes()
+        batch.directory = work_dir
+        keys = [batch.add_transcript(transcript) for transcript in transcripts]
+        batch.submit()
+        server.error_rate = 0.0
+        batch.wait(poll_interval=0.2)
+        # Collect from the manifest, as a separate collector process would
+        collector = SpeechToText(client=client)
+        collected = MinutesBatch.load(collector, batch.batch_id, work_dir).collect(publish=False)
+        batched = (server.requests, collector.usage.totals()["cost"], time.perf_counter() - started)
+        retried = sum(1 for r in collector.usage.records if r.label.endswith("retry"))
+        # Collecting again only reads the manifest
+        requests = server.requests
+        again = MinutesBatch.load(SpeechToText(client=client), batch.batch_id, work_dir).collect(publish=False)
+        repeated = server.requests - requests
+
+    identical = [collected[key] for key in keys] == sync_minutes and again == collected
+    print(f"{args.meetings} meetings, 4 analyses each")
+    print(f"synchronous: {sync[0]:4d} HTTP requests, ~${sync[1]:.4f}, {sync[2]:6.1f}s")
+    print(f"batch:       {batched[0]:4d} HTTP requests, ~${batched[1]:.4f}, {batched[2]:6.1f}s "
+          f"(includes {args.batch_seconds:g}s batch turnaround), {retried} request(s) retried synchronously")
+    print(f"Collecting again: {repeated} HTTP requests")
+    print(f"Minutes identical: {identical}")
+    if not identical or repeated:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
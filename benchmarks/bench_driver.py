@@ -0,0 +1,110 @@
+"""
+Per-command latency of the Selenium (chromedriver) and direct CDP driver backends.
+
+Loads a synthetic Meet-like page (pre-join controls, participant button, N participant
+tiles) into Chrome and times the calls the monitor loop makes on every tick with each
+backend: the call-state script, the lobby-state script, get_participant_count() and a
+find_elements + get_attribute + .text pass over all tiles. Uses the Chrome on --port,
+or launches a headless one (see linux_runtime.py) when nothing listens there.
+
+Usage: python benchmarks/bench_driver.py [--port 9222] [--tiles 20] [--repeat 50] [--backends selenium,cdp]
+"""
+import argparse
+import contextlib
+import io
+import os
+import socket
+import statistics
+import sys
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium.webdriver.common.by import By
+
+from join_google_meet import JoinGoogleMeet
+
+
+def meet_page(tiles):
+    tile_html = "".join(f'<div class="tile" data-participant-id="{n}" aria-label="Participant {n}">Person {n}</div>'
+                        for n in range(tiles))
+    html = (f'<html><head><title>Meet</title></head><body>'
+            f'<button aria-label="Turn off microphone">mic</button><button aria-label="Turn off camera">cam</button>'
+            f'<button aria-label="Show everyone ({tiles} participants)">{tiles}</button>'
+            f'<button aria-label="Leave call">leave</button>{tile_html}</body></html>')
+    return "data:text/html," + urllib.parse.quote(html)
+
+
+def connect(backend, port):
+    if backend == "cdp":
+        from cdp_driver import CDPDriver
+
+        return CDPDriver(port)
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_experimental_option("debuggerAddress", f"localhost:{port}")
+    return webdriver.Chrome(options=options)
+
+
+def read_tiles(driver):
+    return [(tile.get_attribute("aria-label"), tile.text) for tile in driver.find_elements(By.CSS_SELECTOR, "div.tile")]
+
+
+def measure(function, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=9222)
+    parser.add_argument("--tiles", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--backends", default="selenium,cdp")
+    args = parser.parse_args()
+
+    runtime = None
+    with socket.socket() as sock:
+        listening = sock.connect_ex(("localhost", args.port)) == 0
+    if not listening:
+        from linux_runtime import LinuxRuntime, find_linux_chrome
+
+        runtime = LinuxRuntime(os.getenv("CHROME_PATH") or find_linux_chrome(), args.port, headless=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            runtime.start()
+
+    results = {}
+    try:
+        for backend in args.backends.split(","):
+            driver = connect(backend, args.port)
+            driver.get(meet_page(args.tiles))
+            bot = JoinGoogleMeet(driver=driver)
+            cases = {
+                "call state script": bot.get_call_state,
+                "lobby state script": bot._lobby_state,
+                "get_participant_count": bot.get_participant_count,
+                f"read {args.tiles} tiles": lambda: read_tiles(driver),
+            }
+            assert bot.get_participant_count() == args.tiles
+            results[backend] = {name: measure(function, args.repeat) for name, function in cases.items()}
+            if backend == "cdp":
+                driver.quit()
+    finally:
+        if runtime:
+            runtime.stop()
+
+    backends = list(results)
+    print(f"{'p50 ms':<24}" + "".join(f"{backend:>12}" for backend in backends))
+    for name in results[backends[0]]:
+        print(f"{name:<24}" + "".join(f"{results[backend][name]:>12.2f}" for backend in backends))
+
+
+if __name__ == "__main__":
+    main()
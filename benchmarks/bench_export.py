@@ -0,0 +1,118 @@
+"""
+Fleet-wide report from meeting_data_*.json files versus the columnar export.
+
+Writes --meetings minutes files like SpeechToText.store_in_json_file does, spread over
+--days days, then answers the same question both ways: how many meetings per day had
+a negative sentiment in the last week.
+
+- json: open and json.load every file, as the analytics scripts do today
+- export: meeting_export.py scanning the date and sentiment columns of the last
+  week's partitions only
+
+The one-off conversion (import) is timed separately.
+
+Usage: python benchmarks/bench_export.py [--meetings 5000] [--days 90] [--format parquet]
+"""
+import argparse
+import collections
+import datetime
+import glob
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from meeting_export import MeetingExporter, import_meeting_data, scan
+
+WORDS = ("launch plan release pricing customer rollout budget hiring roadmap review design "
+         "deadline metrics feedback migration security onboarding").split()
+
+
+def paragraph(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def write_minutes_files(directory, meetings, days, rng):
+    now = time.time()
+    for number in range(meetings):
+        written = now - rng.uniform(0, days * 86400)
+        # Unique names; the real files differ by their timestamp to the second
+        stamp = time.strftime('%Y%m%d%H%M%S', time.localtime(written))
+        path = os.path.join(directory, f"{number:06d}", f"meeting_data_{stamp}.json")
+        os.makedirs(os.path.dirname(path))
+        minutes = {
+            'abstract_summary': paragraph(rng, 120),
+            'key_points': '\n'.join(f"- {paragraph(rng, 15)}" for _ in range(6)),
+            'action_items': '\n'.join(f"- {paragraph(rng, 12)}" for _ in range(4)),
+            'sentiment': rng.choice(["Positive overall.", "Neutral.", "Negative: concerns about the deadline."]),
+        }
+        with open(path, 'w') as f:
+            json.dump(minutes, f)
+
+
+def report_from_json(directory, since):
+    counts = collections.Counter()
+    for path in glob.glob(os.path.join(directory, '*', 'meeting_data_*.json')):
+        stamp = os.path.basename(path)[len('meeting_data_'):-len('.json')]
+        day = datetime.datetime.strptime(stamp, '%Y%m%d%H%M%S').astimezone(datetime.timezone.utc).date()
+        with open(path) as f:
+            minutes = json.load(f)
+        if day >= since and minutes['sentiment'].lower().startswith('negative'):
+            counts[day.isoformat()] += 1
+    return counts
+
+
+def report_from_export(root, since, format):
+    data = scan('meetings', ['date', 'sentiment'], since=since.isoformat(), root=root, format=format)
+    counts = collections.Counter()
+    for day, sentiment in zip(data.column('date').to_pylist(), data.column('sentiment').to_pylist()):
+        if sentiment.lower().startswith('negative'):
+            counts[day] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--format", choices=("parquet", "arrow"), default="parquet")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="meetbot_export_")
+    minutes_dir = os.path.join(work_dir, "minutes")
+    export_dir = os.path.join(work_dir, "export")
+    try:
+        write_minutes_files(minutes_dir, args.meetings, args.days, random.Random(args.seed))
+        since = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=7)).date()
+
+        started = time.perf_counter()
+        with MeetingExporter(export_dir, args.format) as exporter:
+            import_meeting_data(sorted(glob.glob(os.path.join(minutes_dir, '*', '*.json'))), exporter)
+        import_seconds = time.perf_counter() - started
+        files = len(glob.glob(os.path.join(export_dir, 'meetings', '*', '*')))
+
+        started = time.perf_counter()
+        expected = report_from_json(minutes_dir, since)
+        json_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        counts = report_from_export(export_dir, since, args.format)
+        export_seconds = time.perf_counter() - started
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{args.meetings} meetings over {args.days} days, {args.format}: {files} files after import "
+          f"({import_seconds:.1f}s, once)")
+    print(f"Negative meetings in the last week: {sum(counts.values())} "
+          f"({'same' if counts == expected else 'DIFFERENT'} result both ways)")
+    print(f"json.load every file: {json_seconds * 1000:8.0f} ms")
+    print(f"columnar scan:        {export_seconds * 1000:8.0f} ms  ({json_seconds / export_seconds:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Coordinator and worker processes on one machine, with a worker killed before admission.
+
+Starts a coordinator (in-memory queue unless --db) and --workers local worker processes.
+The workers run simulated sessions: the FakeMeetDriver, synthetic audio and the stub
+OpenAI server from simulation.py, on a clock running --time-scale times faster. Queues
+--jobs meetings, kills the first worker with SIGKILL as soon as it is joining a meeting,
+and reports how its jobs were moved, how long that took, and how the jobs were spread.
+
+Usage: python benchmarks/bench_fleet.py [--workers 3] [--capacity 2] [--jobs 12] [--heartbeat-timeout 2]
+"""
+import argparse
+import collections
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artifact_store import ArtifactStore
+from fleet import Coordinator, JobQueue, Worker
+
+
+def simulated_session(args):
+    """Worker session runner on the simulation's fake Meet page, audio and OpenAI server"""
+    from openai import OpenAI
+
+    from join_google_meet import JoinGoogleMeet, analyze_meeting
+    from record_audio import AudioRecorder
+    from simulation import FakeMeetDriver, MeetScript, ScaledClock, SyntheticSoundDevice, patched_time
+    from speech_to_text import SpeechToText
+
+    clock = ScaledClock(args.time_scale)
+    # Kept referenced: the context manager restores the real clock when it is collected
+    args.patched_time = patched_time(clock)
+    args.patched_time.__enter__()
+    client = OpenAI(api_key="benchmark", base_url=args.openai_base_url, max_retries=2)
+
+    def recorder_factory(**kwargs):
+        recorder = AudioRecorder(audio_backend=SyntheticSoundDevice(clock), **kwargs)
+        recorder.sample_rate = 16000
+        return recorder
+
+    def run_session(job, slot, on_admitted):
+        script = MeetScript.random(random.Random(job['id']), job['duration'])
+        script.lobby_seconds, script.denials = args.lobby_seconds, 0
+        work_dir = tempfile.mkdtemp(prefix=f"meetbot_fleet_{job['id']}_")
+        try:
+            artifacts = ArtifactStore(os.path.join(work_dir, "artifacts"))
+            bot = JoinGoogleMeet(driver=FakeMeetDriver(script, clock), recorder_factory=recorder_factory,
+                                 artifact_store=artifacts)
+            bot.turnOffMicCam(job['meet_link'])
+            audio_path = os.path.join(work_dir, "output.wav")
+            recorded = bot.AskToJoin(audio_path, job['duration'], on_admitted=on_admitted)
+            if recorded:
+                speech_to_text = SpeechToText(client=client, archive_path=os.path.join(work_dir, "meetings.db"),
+                                              artifact_store=artifacts)
+                analyze_meeting(bot, audio_path, 'whisper', speech_to_text=speech_to_text)
+            return {'recorded': recorded}
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return run_session
+
+
+def worker_process(args):
+    Worker(args.coordinator, worker_id=args.worker_id, capacity=args.capacity,
+           run_session=simulated_session(args), heartbeat_interval=args.heartbeat_interval).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--capacity", type=int, default=2, help="Session slots per worker")
+    parser.add_argument("--jobs", type=int, default=12)
+    parser.add_argument("--duration", type=float, default=120, help="Max meeting length (virtual s)")
+    parser.add_argument("--lobby-seconds", type=float, default=60, help="Lobby wait per meeting (virtual s)")
+    parser.add_argument("--time-scale", type=float, default=60)
+    parser.add_argument("--heartbeat-interval", type=float, default=0.5)
+    parser.add_argument("--heartbeat-timeout", type=float, default=2)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub OpenAI seconds per request")
+    parser.add_argument("--db", default=":memory:", help="SQLite queue file")
+    parser.add_argument("--no-kill", action="store_true", help="Do not kill a worker")
+    parser.add_argument("--verbose", action="store_true", help="Show the workers' output")
+    # Used for the worker processes this script starts
+    parser.add_argument("--worker-process", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-id", help=argparse.SUPPRESS)
+    parser.add_argument("--coordinator", help=argparse.SUPPRESS)
+    parser.add_argument("--openai-base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker_process:
+        return worker_process(args)
+
+    from simulation import StubOpenAIServer
+
+    output = None if args.verbose else subprocess.DEVNULL
+    queue = JobQueue(args.db)
+    with StubOpenAIServer(latency=args.latency) as server, \
+            Coordinator(queue, port=0, heartbeat_timeout=args.heartbeat_timeout, tick=0.2) as coordinator:
+        workers = {}
+        for number in range(args.workers):
+            worker_id = f"worker-{number}"
+            workers[worker_id] = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--worker-process", "--worker-id", worker_id,
+                 "--coordinator", coordinator.url, "--openai-base-url", server.base_url,
+                 "--capacity", str(args.capacity), "--heartbeat-interval", str(args.heartbeat_interval),
+                 "--time-scale", str(args.time_scale), "--lobby-seconds", str(args.lobby_seconds)],
+                stdout=output, stderr=output)
+
+        started = time.monotonic()
+        for number in range(args.jobs):
+            queue.submit(f"https://meet.google.com/flt-{number:04d}-job", args.duration)
+
+        victim, killed_at, orphaned = "worker-0", None, []
+        requeued_at, moved_at = {}, {}
+        try:
+            while True:
+                jobs = queue.jobs()
+                if killed_at is None and not args.no_kill:
+                    orphaned = [job['id'] for job in jobs if job['worker_id'] == victim and job['state'] == 'joining']
+                    if orphaned:
+                        workers[victim].send_signal(signal.SIGKILL)
+                        killed_at = time.monotonic()
+                for job in jobs:
+                    if job['id'] not in orphaned:
+                        continue
+                    if job['id'] not in requeued_at and job['worker_id'] != victim:
+                        requeued_at[job['id']] = time.monotonic()
+                    if job['id'] not in moved_at and job['worker_id'] not in (None, victim):
+                        moved_at[job['id']] = time.monotonic()
+                if all(job['state'] in ('done', 'failed') for job in jobs):
+                    break
+                if time.monotonic() - started > 600:
+                    print("Timed out waiting for the jobs")
+                    break
+                time.sleep(0.05)
+            wall = time.monotonic() - started
+        finally:
+            for process in workers.values():
+                if process.poll() is None:
+                    process.terminate()
+                    process.wait()
+
+    jobs = queue.jobs()
+    states = collections.Counter(job['state'] for job in jobs)
+    per_worker = collections.Counter(job['worker_id'] for job in jobs if job['state'] == 'done')
+    recorded = sum(1 for job in jobs if job['result'] and job['result'].get('recorded'))
+    print(f"{args.jobs} jobs, {args.workers} workers x {args.capacity} slots, wall time {wall:.1f}s")
+    print(f"States: {dict(states)}, recorded: {recorded}")
+    print("Done per worker: " + ", ".join(f"{worker} {per_worker[worker]}" for worker in sorted(workers)))
+    if killed_at is not None:
+        print(f"Killed {victim} while joining job(s) {orphaned}")
+        for job_id in orphaned:
+            job = queue.job(job_id)
+            if job_id not in moved_at:
+                print(f"  job {job_id}: not moved, {job['state']}")
+                continue
+            print(f"  job {job_id}: queued again {requeued_at[job_id] - killed_at:.2f}s after the kill, "
+                  f"assigned to {job['worker_id']} after {moved_at[job_id] - killed_at:.2f}s "
+                  f"(when a slot was free), {job['state']} after {job['attempts']} attempts")
+    if states.get('done', 0) != args.jobs:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Microbenchmarks for the code that runs on every meeting, with regression gating.
+
+Cases, each run at several recording lengths of synthetic 44.1 kHz mono audio:
+  record_callback   AudioRecorder._record_callback for every audio block
+  stop_recording    joining the blocks, clip/cast to int16 and writing the WAV
+  resize_audio      SpeechToText.resize_audio_if_needed (skipped without ffmpeg
+                    when the file is over MAX_AUDIO_SIZE_BYTES)
+  store_json        SpeechToText.store_in_json_file
+
+Wall time is the median of --repeat runs; peak memory is measured in a separate
+run under tracemalloc (NumPy reports its buffers to tracemalloc), so tracing does
+not distort the timings. Results are compared against benchmarks/baseline.json
+and the script exits with status 1 when a case is slower than the baseline by more
+than --time-threshold or peaks higher by more than --memory-threshold.
+Timings are machine specific: regenerate the baseline with --save-baseline when
+the benchmark machine changes.
+
+Usage: python benchmarks/bench_hot_paths.py [--sizes 1m 1h] [--cases ...] [--save-baseline]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from artifact_store import ArtifactStore
+from record_audio import AudioRecorder
+from speech_to_text import SpeechToText
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SIZES = {"1m": 60, "10m": 600, "1h": 3600, "4h": 4 * 3600}
+# 4 h of float32 blocks alone is 2.5 GB, so it is opt-in
+DEFAULT_SIZES = ["1m", "1h"]
+# sounddevice hands over blocks of roughly this many frames at 44.1 kHz
+BLOCK_FRAMES = 1024
+SAMPLE_RATE = 44100
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA = 1024 * 1024
+
+
+def make_blocks(seconds):
+    """Synthetic recording as sounddevice delivers it: a list of (frames, 1) float32 blocks"""
+    rng = np.random.default_rng(0)
+    # A handful of distinct blocks, copied, keeps generation fast without sharing memory
+    patterns = [rng.uniform(-1.1, 1.1, (BLOCK_FRAMES, 1)).astype(np.float32) for _ in range(16)]
+    count = int(seconds * SAMPLE_RATE) // BLOCK_FRAMES
+    return [patterns[i % len(patterns)].copy() for i in range(count)]
+
+
+def make_recorder():
+    recorder = AudioRecorder(audio_backend=SimpleNamespace(CallbackStop=Exception))
+    recorder.sample_rate = SAMPLE_RATE
+    recorder._callback_stop = Exception
+    return recorder
+
+
+def make_minutes(seconds):
+    """Minutes payload that grows with the meeting, roughly one key point per minute"""
+    minutes = max(1, seconds // 60)
+    line = "- Follow up with the team on the release plan and the open review items"
+    return {
+        "abstract_summary": "The team discussed the roadmap, budget and next release. " * 20,
+        "key_points": "\n".join(line for _ in range(minutes)),
+        "action_items": "\n".join(line for _ in range(max(1, minutes // 4))),
+        "sentiment": "Overall positive, with some concern about the deadline.",
+    }
+
+
+class SkipCase(Exception):
+    pass
+
+
+class Case:
+    """setup(seconds) -> state; run(state) is what gets measured; teardown(state) cleans up"""
+
+    def __init__(self, name, setup, run, teardown=None):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.teardown = teardown or (lambda state: None)
+
+
+def _callback_setup(seconds):
+    return make_recorder(), make_blocks(seconds)
+
+
+def _callback_run(state):
+    recorder, blocks = state
+    recorder._recording_data = []
+    for block in blocks:
+        recorder._record_callback(block, BLOCK_FRAMES, None, None)
+    recorder._recording_data = []
+
+
+def _stop_setup(seconds):
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    return make_recorder(), make_blocks(seconds), os.path.join(workdir, "recording.wav")
+
+
+def _stop_run(state):
+    recorder, blocks, path = state
+    recorder._recording_data = list(blocks)
+    recorder._filename = path
+    recorder._is_recording = True
+    recorder.stop_recording()
+
+
+def _remove_workdir(path):
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+def _resize_setup(seconds):
+    recorder, blocks, path = _stop_setup(seconds)
+    _stop_run((recorder, blocks, path))
+    del blocks
+    stt = SpeechToText(client=object(), artifact_store=ArtifactStore(os.path.join(os.path.dirname(path), "artifacts")))
+    if os.path.getsize(path) > stt.MAX_AUDIO_SIZE_BYTES and not shutil.which("ffmpeg"):
+        _remove_workdir(path)
+        raise SkipCase("ffmpeg not installed")
+    return stt, path
+
+
+def _resize_run(state):
+    stt, path = state
+    resized = stt.resize_audio_if_needed(path)
+    if resized != path:
+        os.remove(resized)
+
+
+def _json_setup(seconds):
+    store = ArtifactStore(tempfile.mkdtemp(prefix="meetbot_bench_"))
+    return SpeechToText(client=object(), artifact_store=store), make_minutes(seconds)
+
+
+def _json_run(state):
+    stt, minutes = state
+    os.remove(stt.store_in_json_file(minutes))
+
+
+CASES = [
+    Case("record_callback", _callback_setup, _callback_run),
+    Case("stop_recording", _stop_setup, _stop_run, lambda state: _remove_workdir(state[2])),
+    Case("resize_audio", _resize_setup, _resize_run, lambda state: _remove_workdir(state[1])),
+    Case("store_json", _json_setup, _json_run, lambda state: shutil.rmtree(state[0].artifacts.root, ignore_errors=True)),
+]
+
+
+def measure(case, seconds, repeat):
+    """Return {'time_s': median wall time, 'peak_bytes': tracemalloc peak of one run}"""
+    # The code under test prints progress messages
+    with contextlib.redirect_stdout(io.StringIO()):
+        state = case.setup(seconds)
+        try:
+            times = []
+            for _ in range(repeat):
+                gc.collect()
+                start = time.perf_counter()
+                case.run(state)
+                times.append(time.perf_counter() - start)
+
+            gc.collect()
+            tracemalloc.start()
+            try:
+                case.run(state)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        finally:
+            case.teardown(state)
+    return {"time_s": statistics.median(times), "min_time_s": min(times), "peak_bytes": peak}
+
+
+def machine_id():
+    return f"{platform.node()} {platform.machine()} {platform.python_version()} numpy {np.__version__}"
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(key, result, baseline, time_threshold, memory_threshold):
+    """Return a list of regression messages for one case"""
+    reference = baseline["results"].get(key) if baseline else None
+    if not reference:
+        return []
+    problems = []
+    # Absolute floors keep sub-millisecond / sub-megabyte cases from flapping on noise
+    slower = result["time_s"] - reference["time_s"]
+    if slower > reference["time_s"] * time_threshold and slower > MIN_TIME_DELTA:
+        problems.append(f"time {result['time_s']:.4f}s vs baseline {reference['time_s']:.4f}s")
+    grown = result["peak_bytes"] - reference["peak_bytes"]
+    if grown > reference["peak_bytes"] * memory_threshold and grown > MIN_MEMORY_DELTA:
+        problems.append(f"peak memory {result['peak_bytes'] / 2**20:.1f} MB "
+                        f"vs baseline {reference['peak_bytes'] / 2**20:.1f} MB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, choices=list(SIZES))
+    parser.add_argument("--cases", nargs="+", default=[case.name for case in CASES],
+                        choices=[case.name for case in CASES])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (median is reported)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--memory-threshold", type=float, default=0.10, help="Allowed relative peak memory growth")
+    args = parser.parse_args()
+
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    if baseline and baseline.get("machine") != machine_id():
+        print(f"Note: baseline was recorded on '{baseline.get('machine')}', timings may not be comparable")
+
+    results = {}
+    regressions = []
+    print(f"{'case':<24} {'median':>10} {'min':>10} {'peak MB':>10}  status")
+    for case in CASES:
+        if case.name not in args.cases:
+            continue
+        for size in args.sizes:
+            key = f"{case.name}[{size}]"
+            try:
+                result = measure(case, SIZES[size], args.repeat)
+            except SkipCase as e:
+                print(f"{key:<24} {'':>10} {'':>10} {'':>10}  skipped ({e})")
+                continue
+            results[key] = result
+            problems = compare(key, result, baseline, args.time_threshold, args.memory_threshold)
+            if problems:
+                regressions.append((key, problems))
+            status = "REGRESSION" if problems else ("OK" if baseline and key in baseline["results"] else "new")
+            print(f"{key:<24} {result['time_s']:>9.4f}s {result['min_time_s']:>9.4f}s "
+                  f"{result['peak_bytes'] / 2**20:>10.1f}  {status}")
+
+    if args.save_baseline:
+        previous = load_baseline(args.baseline) or {"results": {}}
+        merged = dict(previous["results"]) if previous.get("machine") == machine_id() else {}
+        merged.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": machine_id(), "results": merged}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    for key, problems in regressions:
+        print(f"REGRESSION {key}: {'; '.join(problems)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Import-time budget check for the CLI entry point and the light-weight modules.
+
+Runs each target in a fresh interpreter with `python -X importtime`, reports the
+cumulative import time of the slowest top-level imports, and exits with status 1
+if a target exceeds its budget or pulls in one of the heavy dependencies.
+
+Usage: python benchmarks/bench_import_time.py [--budget-ms 100] [--runs 5]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Nothing on the --help / argument parsing path may import these
+HEAVY_MODULES = ["selenium", "sounddevice", "scipy", "numpy", "openai"]
+
+TARGETS = [
+    # (label, code run with -X importtime, extra sys.path entry)
+    ("google_meet_bot (package)", "import google_meet_bot", os.path.join(ROOT, "src")),
+    ("google_meet_bot.cli", "import google_meet_bot.cli", os.path.join(ROOT, "src")),
+    ("record_audio + speech_to_text", "import record_audio, speech_to_text", ROOT),
+]
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(code, path):
+    """Return (total import microseconds of the target's imports, {module: cumulative us})"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = path + os.pathsep + env.get("PYTHONPATH", "")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            env=env, stderr=subprocess.PIPE, text=True, check=True)
+    modules = {}
+    baseline = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"],
+                              stderr=subprocess.PIPE, text=True, check=True).stderr
+    startup_modules = {match.group(4) for match in LINE.finditer(baseline)}
+    total = 0
+    for match in LINE.finditer(result.stderr):
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        # Only count imports that the interpreter does not load at startup anyway
+        if name in startup_modules:
+            continue
+        modules[name] = cumulative
+        if indent == 1:
+            total += cumulative
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=100, help="Budget per target (median of runs)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for label, code, path in TARGETS:
+        totals = []
+        modules = {}
+        for _ in range(args.runs):
+            total, modules = measure(code, path)
+            totals.append(total)
+        median_ms = statistics.median(totals) / 1000
+        heavy = sorted(name for name in modules if name.split(".")[0] in HEAVY_MODULES)
+        status = "OK"
+        if median_ms > args.budget_ms:
+            status = "OVER BUDGET"
+            failed = True
+        if heavy:
+            status = "HEAVY IMPORTS"
+            failed = True
+        print(f"{label:<32} {median_ms:>8.1f} ms (budget {args.budget_ms:g} ms)  {status}")
+        if heavy:
+            print(f"  imports: {', '.join(sorted({name.split('.')[0] for name in heavy}))}")
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]
+        for name, cumulative in slowest:
+            print(f"    {cumulative / 1000:>7.1f} ms  {name}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compare prompt size of incremental live minutes against re-summarizing the full
+transcript at every update, over synthetic transcripts of increasing length.
+
+Usage: python benchmarks/bench_incremental_minutes.py [--interval 5] [--hours 1 2 4 8]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speech_to_text import SpeechToText, IncrementalMinutes
+
+WORDS_PER_MINUTE = 150
+# Rough English average, good enough to compare growth rates
+CHARS_PER_TOKEN = 4
+
+VOCABULARY = (
+    "budget roadmap release customer deadline launch hiring design review metrics "
+    "migration incident backlog feature pricing contract onboarding security testing "
+    "we should will need agree decide follow up next week team plan issue"
+).split()
+
+
+class StubCompletions:
+    """Answers like the model would, with a bounded state, and counts prompt tokens"""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.calls = 0
+
+    def create(self, model, temperature, messages, max_tokens=None):
+        self.calls += 1
+        self.prompt_tokens += sum(len(m["content"]) for m in messages) // CHARS_PER_TOKEN
+        state = {
+            "abstract_summary": " ".join(random.choices(VOCABULARY, k=120)),
+            "key_points": [" ".join(random.choices(VOCABULARY, k=10)) for _ in range(8)],
+            "action_items": [" ".join(random.choices(VOCABULARY, k=8)) for _ in range(min(4 + self.calls, 25))],
+            "sentiment": "neutral",
+        }
+        message = SimpleNamespace(content=json.dumps(state))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_speech_to_text():
+    stt = SpeechToText(client=SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions())))
+    stt.GPT_MODEL = "stub"
+    return stt
+
+
+def synthetic_transcript(hours):
+    """One caption line per 10 seconds, timestamped from 0"""
+    lines = []
+    for second in range(0, int(hours * 3600), 10):
+        speaker = random.choice(["Alice", "Bob", "Carol", "Dan"])
+        text = " ".join(random.choices(VOCABULARY, k=WORDS_PER_MINUTE // 6))
+        lines.append((f"{speaker}: {text}", float(second)))
+    return lines
+
+
+def run_incremental(lines, interval_minutes):
+    stt = make_speech_to_text()
+    minutes = IncrementalMinutes(stt, interval_minutes)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for text, timestamp in lines:
+            minutes.add_transcript(text, timestamp)
+            minutes.update_if_due()
+        started = time.perf_counter()
+        minutes.finalize()
+        finalize_seconds = time.perf_counter() - started
+    completions = stt.client.chat.completions
+    return completions.prompt_tokens, completions.calls, finalize_seconds
+
+
+def run_full_resummarize(lines, interval_minutes):
+    """Baseline: send the whole transcript so far at every update"""
+    interval = interval_minutes * 60
+    prompt_tokens = 0
+    calls = 0
+    transcript_chars = 0
+    next_update = interval
+    for text, timestamp in lines:
+        transcript_chars += len(text) + 1
+        if timestamp >= next_update:
+            prompt_tokens += transcript_chars // CHARS_PER_TOKEN
+            calls += 1
+            next_update += interval
+    prompt_tokens += transcript_chars // CHARS_PER_TOKEN
+    return prompt_tokens, calls + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--interval", type=float, default=5, help="Update interval in minutes")
+    parser.add_argument("--hours", type=float, nargs="+", default=[0.5, 1, 2, 4, 8])
+    args = parser.parse_args()
+    random.seed(0)
+
+    print(f"{'hours':>6} {'incr calls':>10} {'incr tokens':>12} {'tokens/h':>10} "
+          f"{'full calls':>10} {'full tokens':>12} {'ratio':>7}")
+    for hours in args.hours:
+        lines = synthetic_transcript(hours)
+        incr_tokens, incr_calls, _ = run_incremental(lines, args.interval)
+        full_tokens, full_calls = run_full_resummarize(lines, args.interval)
+        print(f"{hours:>6g} {incr_calls:>10} {incr_tokens:>12} {incr_tokens / hours:>10.0f} "
+              f"{full_calls:>10} {full_tokens:>12} {full_tokens / incr_tokens:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Meeting minutes on the CPU with a local GGUF model (MINUTES_BACKEND=llama-cpp).
+
+Runs the four analyses of a synthetic caption transcript of --minutes minutes three ways:
+
+- per task: each analysis as its own chat, system prompt first, like the OpenAI
+  backend sends them; every call reads the whole transcript again
+- shared prefix: LocalLLM.analyze, transcript first and instruction last, so the
+  transcript is evaluated once and stays in the KV cache for the other three
+- end to end: SpeechToText.meeting_minutes with the local backend (token budget,
+  chunking when the transcript does not fit --context, shared prefix per part)
+
+and reports prompt tokens evaluated and reused, prompt and generation speed in
+tokens/s, time to the first token and the total time of each.
+
+Needs llama-cpp-python and a GGUF model file, e.g. a Q4_K_M quantized 3-8B instruct model.
+
+Usage: python benchmarks/bench_local_llm.py --model model.gguf [--minutes 10] [--context 8192] [--threads 8]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS_PER_MINUTE = 150
+VOCABULARY = (
+    "budget roadmap release customer deadline launch hiring design review metrics "
+    "migration incident backlog feature pricing contract onboarding security testing "
+    "we should will need agree decide follow up next week team plan issue"
+).split()
+
+
+def synthetic_transcript(minutes, rng):
+    """One caption line per 10 seconds"""
+    lines = []
+    for _ in range(int(minutes * 6)):
+        speaker = rng.choice(["Alice", "Bob", "Carol", "Dan"])
+        lines.append(f"{speaker}: {' '.join(rng.choices(VOCABULARY, k=WORDS_PER_MINUTE // 6))}")
+    return "\n".join(lines)
+
+
+def print_answers(name, answers, seconds):
+    evaluated = sum(a.usage.prompt_tokens - a.reused_tokens for a in answers)
+    reused = sum(a.reused_tokens for a in answers)
+    generated = sum(a.usage.completion_tokens for a in answers)
+    print(f"{name}: {seconds:.1f}s total, {evaluated} prompt tokens evaluated, {reused} reused from the KV cache, "
+          f"{generated} generated")
+    for number, answer in enumerate(answers, 1):
+        print(f"  analysis {number}: ttft {answer.first_token_seconds or 0:6.2f}s  "
+              f"prompt {answer.prompt_tokens_per_second:7.1f} tok/s  "
+              f"generation {answer.output_tokens_per_second:5.1f} tok/s  {answer.seconds:6.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=os.getenv("LOCAL_MODEL_PATH"), help="GGUF model file")
+    parser.add_argument("--minutes", type=float, default=10, help="Length of the meeting")
+    parser.add_argument("--context", type=int, default=8192)
+    parser.add_argument("--threads", type=int, default=0, help="0: llama.cpp's choice")
+    parser.add_argument("--max-tokens", type=int, default=256, help="Longest answer")
+    args = parser.parse_args()
+    if not args.model:
+        parser.error("--model (or LOCAL_MODEL_PATH) is required")
+
+    # Before the settings are first read, so SpeechToText loads the same model
+    os.environ.update(MINUTES_BACKEND='llama-cpp', LOCAL_MODEL_PATH=args.model,
+                      LOCAL_MODEL_CONTEXT=str(args.context), LOCAL_MODEL_THREADS=str(args.threads),
+                      MAX_OUTPUT_TOKENS=str(args.max_tokens), STREAM_MINUTES='false')
+    from artifact_store import ArtifactStore
+    from local_llm import get_local_llm
+    from speech_to_text import SpeechToText
+
+    started = time.perf_counter()
+    llm = get_local_llm()
+    print(f"Model {llm.model} loaded in {time.perf_counter() - started:.1f}s, context {llm.context}, "
+          f"{os.cpu_count()} CPUs")
+    transcript = synthetic_transcript(args.minutes, random.Random(0))
+    prompts = [prompt for _, _, prompt in SpeechToText.ANALYSES]
+    transcript_tokens = len(llm.llm.tokenize(transcript.encode()))
+    print(f"Transcript: {args.minutes:g} minutes, {transcript_tokens} tokens")
+    if transcript_tokens + args.max_tokens + 200 > args.context:
+        print("  (longer than the context: the first two runs are skipped, see the end-to-end run)")
+    else:
+        llm.llm.reset()
+        started = time.perf_counter()
+        answers = [llm.chat(prompt, transcript) for prompt in prompts]
+        print_answers("Per task", answers, time.perf_counter() - started)
+
+        llm.llm.reset()
+        started = time.perf_counter()
+        answers = llm.analyze(transcript, prompts)
+        print_answers("Shared prefix", answers, time.perf_counter() - started)
+
+    work_dir = tempfile.mkdtemp(prefix="meetbot_local_llm_")
+    try:
+        llm.llm.reset()
+        speech_to_text = SpeechToText(artifact_store=ArtifactStore(work_dir))
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            speech_to_text.meeting_minutes(transcript)
+        seconds = time.perf_counter() - started
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(f"End to end (SpeechToText.meeting_minutes): {seconds:.1f}s, "
+          f"{len(speech_to_text.usage.records)} model calls")
+    print(speech_to_text.usage.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Latency and cost of routing each minutes analysis to a model tier, against GPT_MODEL for all four.
+
+Runs the minutes of synthetic transcripts of --lengths minutes against the local stub
+OpenAI server, which answers each model at its own speed (--model-speeds): by default
+GPT_MODEL is slow, gpt-4o faster and gpt-4o-mini fastest but with empty answers at
+--bad-answer-rate, which validation catches and analyses again on the next tier.
+Reports the wall time, cost and fallbacks of each meeting length both ways, then the
+per-route stats table of the routed runs (as `python model_routing.py stats` shows).
+
+Usage: python benchmarks/bench_routing.py [--lengths 5,30,90] [--runs 2] [--routes JSON] [--model-speeds JSON]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artifact_store import ArtifactStore
+from model_routing import ModelRouter, format_summary, parse_routes, summarize
+from settings import get_settings
+from simulation import StubOpenAIServer
+from speech_to_text import SpeechToText
+
+DEFAULT_ROUTES = json.dumps({
+    "sentiment": ["gpt-4o-mini"],
+    "abstract_summary": [["gpt-4o-mini", 3000], "gpt-4o"],
+    "key_points": [["gpt-4o-mini", 3000], "gpt-4o"],
+    "action_items": ["gpt-4o"],
+})
+WORDS_PER_MINUTE = 150
+VOCABULARY = (
+    "budget roadmap release customer deadline launch hiring design review metrics "
+    "migration incident backlog feature pricing contract onboarding security testing "
+    "we should will need agree decide follow up next week team plan issue"
+).split()
+
+
+def synthetic_transcript(minutes, rng):
+    """One caption line per 10 seconds"""
+    lines = []
+    for _ in range(int(minutes * 6)):
+        speaker = rng.choice(["Alice", "Bob", "Carol", "Dan"])
+        lines.append(f"{speaker}: {' '.join(rng.choices(VOCABULARY, k=WORDS_PER_MINUTE // 6))}")
+    return "\n".join(lines)
+
+
+def run(client, router, transcript, store):
+    """Return (seconds, cost) of one meeting's minutes"""
+    speech_to_text = SpeechToText(client=client, artifact_store=store, router=router)
+    speech_to_text.stream_minutes = False
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        speech_to_text.meeting_minutes(transcript)
+    return time.perf_counter() - started, sum(record.cost for record in speech_to_text.usage.records)
+
+
+def main():
+    gpt_model = get_settings().gpt_model
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lengths", default="5,30,90", help="Comma separated meeting lengths in minutes")
+    parser.add_argument("--runs", type=int, default=2, help="Meetings of each length and mode")
+    parser.add_argument("--routes", default=DEFAULT_ROUTES, help="Routing table, as MODEL_ROUTES")
+    parser.add_argument("--bad-answer-rate", type=float, default=0.2,
+                        help="Fraction of empty gpt-4o-mini answers (with the default --model-speeds)")
+    parser.add_argument("--model-speeds", help="Per model stub speeds, as simulation.py --model-speeds")
+    args = parser.parse_args()
+
+    lengths = [float(length) for length in args.lengths.split(",")]
+    speeds = json.loads(args.model_speeds) if args.model_speeds else {
+        gpt_model: {"latency": 0.6, "token_interval": 0.01},
+        "gpt-4o": {"latency": 0.3, "token_interval": 0.004},
+        "gpt-4o-mini": {"latency": 0.1, "token_interval": 0.002, "bad_answer_rate": args.bad_answer_rate},
+    }
+    single = ModelRouter(routes={}, default_model=gpt_model, stats_path=False)
+    routed = ModelRouter(routes=parse_routes(args.routes), default_model=gpt_model, stats_path=False)
+
+    from openai import OpenAI
+
+    rng = random.Random(0)
+    results = []
+    with StubOpenAIServer(latency=0.3, models=speeds) as server, \
+            tempfile.TemporaryDirectory(prefix="meetbot_routing_") as work_dir:
+        client = OpenAI(api_key="benchmark", base_url=server.base_url, max_retries=0)
+        store = ArtifactStore(work_dir)
+        for minutes in lengths:
+            transcripts = [synthetic_transcript(minutes, rng) for _ in range(args.runs)]
+            for name, router in (("single model", single), ("routed", routed)):
+                before = len(router.calls)
+                timings = [run(client, router, transcript, store) for transcript in transcripts]
+                fallbacks = sum(call["fallback"] for call in router.calls[before:])
+                results.append((minutes, name, timings, fallbacks))
+
+    print(f"Routing table:\n{routed.describe()}\n")
+    print(f"{'minutes':>7}  {'mode':<13} {'p50 s':>7} {'max s':>7} {'$/meeting':>10} {'fallbacks':>9}")
+    for minutes, name, timings, fallbacks in results:
+        seconds = [timing[0] for timing in timings]
+        cost = statistics.mean(timing[1] for timing in timings)
+        print(f"{minutes:>7g}  {name:<13} {statistics.median(seconds):>7.2f} {max(seconds):>7.2f} "
+              f"{cost:>10.4f} {fallbacks:>9}")
+    print(f"\nRoutes:\n{format_summary(summarize(routed.calls))}")
+    print(f"Chat requests per model: "
+          f"{', '.join(f'{model} {count}' for model, count in sorted(server.model_requests.items()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Slide deduplication of SlideCapture on a synthetic one-hour presentation.
+
+Renders a deck of --slides slides (text lines, charts and bullet blocks on a light
+background) and plays it like a shared screen polled every --interval seconds: slides
+stay up for a random time, transitions blend two slides, every frame gets video
+compression noise and brightness jitter, a cursor moves around, and some slides are
+shown again later. Each frame is downscaled to the 32x32 thumbnail the page script
+produces and fed to SlideCapture through a fake driver.
+
+Reports the images stored against the slides actually shown, slides missed or stored
+twice, and the hashing time per frame.
+
+Usage: python benchmarks/bench_slides.py [--slides 30] [--minutes 60] [--interval 5] [--threshold 6]
+"""
+import argparse
+import base64
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slide_capture import HASH_IMAGE_SIZE, SlideCapture, perceptual_hash
+
+WIDTH, HEIGHT = 1280, 720
+
+
+def render_slide(rng):
+    """A light slide with a title bar, text lines and a chart or picture block"""
+    image = np.full((HEIGHT, WIDTH), rng.uniform(225, 250))
+    image[40:110, 80:80 + rng.randint(300, 1000)] = rng.uniform(30, 90)
+    y = 160
+    while y < HEIGHT - 80:
+        indent = 80 + 40 * rng.randint(0, 2)
+        image[y:y + 22, indent:indent + rng.randint(200, 700)] = rng.uniform(40, 110)
+        y += rng.randint(40, 70)
+    if rng.random() < 0.6:
+        x, y = rng.randint(700, 900), rng.randint(180, 380)
+        bars = rng.randint(3, 7)
+        for bar in range(bars):
+            top = rng.randint(0, 250)
+            image[y + top:y + 300, x + bar * 45:x + bar * 45 + 30] = rng.uniform(60, 180)
+    return image
+
+
+def thumbnail(frame):
+    """Area-average downscale, like the canvas drawImage in the page script"""
+    rows = np.array_split(np.arange(HEIGHT), HASH_IMAGE_SIZE)
+    cols = np.array_split(np.arange(WIDTH), HASH_IMAGE_SIZE)
+    row_means = np.stack([frame[r].mean(axis=0) for r in rows])
+    return np.stack([row_means[:, c].mean(axis=1) for c in cols], axis=1)
+
+
+class ScreenShareDriver:
+    """Answers SlideCapture's two page scripts from the current synthetic frame"""
+
+    def __init__(self):
+        self.frame = None
+        self.slide_id = None
+        self.stored_ids = []
+
+    def execute_script(self, script, full, *args):
+        if full:
+            self.stored_ids.append(self.slide_id)
+            return "data:image/png;base64," + base64.b64encode(b"frame").decode()
+        gray = np.clip(thumbnail(self.frame), 0, 255).astype(int)
+        return {"gray": gray.reshape(-1).tolist(), "width": WIDTH, "height": HEIGHT}
+
+
+def presentation(rng, slides, seconds, interval):
+    """[(slide id, blend partner or None)] per poll: mostly forward, sometimes back"""
+    polls = int(seconds / interval)
+    schedule, current = [], 0
+    while len(schedule) < polls:
+        stay = max(1, int(rng.expovariate(1 / (seconds / slides / interval))))
+        schedule.extend([(current, None)] * stay)
+        if rng.random() < 0.1 and current > 2:
+            following = rng.randint(0, current - 1)
+        else:
+            following = min(current + 1, slides - 1)
+        if following != current:
+            schedule.append((current, following))
+        current = following
+    return schedule[:polls]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, default=30)
+    parser.add_argument("--minutes", type=float, default=60)
+    parser.add_argument("--interval", type=float, default=5, help="Seconds between polls")
+    parser.add_argument("--threshold", type=int, default=6, help="Hash bits that may differ within one slide")
+    parser.add_argument("--noise", type=float, default=4, help="Std of the per-pixel compression noise")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    noise_rng = np.random.default_rng(args.seed)
+    deck = [render_slide(rng) for _ in range(args.slides)]
+    schedule = presentation(rng, args.slides, args.minutes * 60, args.interval)
+
+    output_dir = tempfile.mkdtemp(prefix="meetbot_slides_")
+    driver = ScreenShareDriver()
+    capture = SlideCapture(driver, output_dir, interval=args.interval, threshold=args.threshold)
+    hash_seconds = 0.0
+    try:
+        for slide_id, partner in schedule:
+            frame = deck[slide_id].copy()
+            if partner is not None:
+                frame = 0.5 * frame + 0.5 * deck[partner]
+            frame += noise_rng.normal(0, args.noise, frame.shape) + rng.uniform(-6, 6)
+            x, y = rng.randint(0, WIDTH - 20), rng.randint(0, HEIGHT - 30)
+            frame[y:y + 30, x:x + 20] = 0
+            driver.frame, driver.slide_id = frame, slide_id if partner is None else None
+            gray = thumbnail(frame)
+            started = time.perf_counter()
+            perceptual_hash(gray)
+            hash_seconds += time.perf_counter() - started
+            capture.poll()
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    shown = {slide_id for slide_id, partner in schedule if partner is None}
+    # Slides that stayed up for at least two polls can be stored (one poll to settle)
+    settled = {schedule[i][0] for i in range(1, len(schedule))
+               if schedule[i][1] is None and schedule[i - 1] == schedule[i]}
+    stored = driver.stored_ids
+    print(f"{len(schedule)} frames ({args.minutes:g} min every {args.interval:g}s), "
+          f"{len(shown)} distinct slides shown, {len(settled)} for two polls or more")
+    print(f"Images stored: {len(stored)}")
+    print(f"  missed slides: {len(settled - set(stored))}, stored twice: {len(stored) - len(set(stored))}, "
+          f"transition frames stored: {stored.count(None)}")
+    revisits = sum(len(slide['shown_at']) - 1 for slide in capture.slides)
+    print(f"  returns to an earlier slide recognised: {revisits}")
+    print(f"Hash time: {hash_seconds / len(schedule) * 1e6:.0f} us per frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Time to first output of the meeting minutes, streamed against non-streamed GPT calls.
+
+Runs the four analyses against the local stub OpenAI server, which generates the
+answers at --token-interval seconds per word after --latency seconds. Without
+streaming nothing is visible until the minutes JSON is written; with streaming the
+first words reach the NDJSON stream after the first-token latency. Also checks that
+both runs, and the document rebuilt from the stream file, are identical.
+
+Usage: python benchmarks/bench_streaming.py [--latency 0.5] [--token-interval 0.02] [--runs 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minutes_stream import read_minutes_stream
+from simulation import STUB_TRANSCRIPT, StubOpenAIServer
+from speech_to_text import SpeechToText
+
+
+def run(client, stream_path=None):
+    """Return (seconds to first output, total seconds, minutes)"""
+    first = []
+    started = time.perf_counter()
+
+    def on_event(event):
+        if event["type"] == "delta" and not first:
+            first.append(time.perf_counter() - started)
+
+    speech_to_text = SpeechToText(client=client, on_event=on_event if stream_path else None)
+    speech_to_text.stream_minutes = bool(stream_path)
+    speech_to_text.minutes_stream_path = stream_path
+    with contextlib.redirect_stdout(io.StringIO()):
+        minutes = speech_to_text.meeting_minutes(STUB_TRANSCRIPT)
+    total = time.perf_counter() - started
+    return (first[0] if first else total), total, minutes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds to the first token")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="Seconds per generated word")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    from openai import OpenAI
+
+    with StubOpenAIServer(latency=args.latency, token_interval=args.token_interval) as server, \
+            tempfile.TemporaryDirectory() as work_dir:
+        client = OpenAI(api_key="benchmark", base_url=server.base_url, max_retries=0)
+        results = {"non-streamed": [], "streamed": []}
+        reference = None
+        for number in range(args.runs):
+            first, total, minutes = run(client)
+            results["non-streamed"].append((first, total))
+            reference = reference or minutes
+            assert minutes == reference, "non-streamed minutes differ between runs"
+
+            path = os.path.join(work_dir, f"stream_{number}.ndjson")
+            first, total, minutes = run(client, path)
+            results["streamed"].append((first, total))
+            assert minutes == reference, "streamed minutes differ from the non-streamed ones"
+            assert read_minutes_stream(path) == reference, "stream file does not rebuild the minutes"
+
+    print(f"Stub: {args.latency:.2f}s to first token, {args.token_interval * 1000:.0f} ms per word, {args.runs} runs")
+    for mode, timings in results.items():
+        print(f"{mode:<13} first output p50 {statistics.median(t[0] for t in timings):6.2f}s, "
+              f"total p50 {statistics.median(t[1] for t in timings):6.2f}s")
+    print("Streamed, non-streamed and stream-file minutes are identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Pre-flight token budget: what each TOKEN_POLICY would do with meetings of growing
+length, and an end-to-end run against the local stub OpenAI server that compares
+the pre-flight estimates with the usage the API reports.
+
+Nothing is sent to OpenAI. Token counts are exact when tiktoken is installed and
+~4 characters per token otherwise.
+
+Usage: python benchmarks/bench_token_budget.py [--model gpt-4] [--minutes 15 60 120 240]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speech_to_text import SpeechToText
+from token_budget import POLICIES, TokenBudget, TokenBudgetError, _encoding
+
+WORDS_PER_MINUTE = 150
+VOCABULARY = (
+    "budget roadmap release customer deadline launch hiring design review metrics "
+    "migration incident backlog feature pricing contract onboarding security testing "
+    "we should will need agree decide follow up next week team plan issue"
+).split()
+
+
+def synthetic_transcript(minutes, rng):
+    """Whisper-style transcript: one long paragraph"""
+    return " ".join(rng.choices(VOCABULARY, k=int(minutes * WORDS_PER_MINUTE)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="gpt-4")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[15, 60, 120, 240])
+    parser.add_argument("--max-cost", type=float, default=0, help="MAX_COST_PER_MEETING for the policy table")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    print(f"Tokenizer: {'tiktoken' if _encoding(args.model) else '~4 chars/token estimate'}, model {args.model}")
+    prompts = [SpeechToText.SUMMARY_PROMPT, SpeechToText.KEY_POINTS_PROMPT,
+               SpeechToText.ACTION_ITEMS_PROMPT, SpeechToText.SENTIMENT_PROMPT]
+    print(f"{'minutes':>7} {'policy':<9} {'model':<12} {'action':<9} {'calls':>5} {'prompt tok':>10} "
+          f"{'est. cost $':>11} {'est. s':>7}")
+    for minutes in args.minutes:
+        transcript = synthetic_transcript(minutes, rng)
+        for policy in POLICIES:
+            budget = TokenBudget(policy=policy, max_cost=args.max_cost)
+            plans = [budget.plan(prompt, transcript, args.model) for prompt in prompts]
+            try:
+                plans = budget.enforce(plans, prompts, transcript)
+            except TokenBudgetError:
+                print(f"{minutes:>7g} {policy:<9} {'-':<12} {'refused':<9} {0:>5} {'':>10} {'':>11} {'':>7}")
+                continue
+            calls = sum(len(plan.contents) + plan.merge_calls for plan in plans)
+            print(f"{minutes:>7g} {policy:<9} {plans[0].model:<12} {plans[0].action:<9} {calls:>5} "
+                  f"{sum(p.prompt_tokens for p in plans):>10} {sum(p.cost for p in plans):>11.3f} "
+                  f"{sum(p.seconds for p in plans) :>7.0f}")
+
+    # End to end through the stub server: estimated vs reported usage
+    from openai import OpenAI
+    from simulation import StubOpenAIServer
+
+    with StubOpenAIServer(latency=0.0) as server:
+        stt = SpeechToText(client=OpenAI(api_key="benchmark", base_url=server.base_url))
+        stt.GPT_MODEL = args.model
+        with contextlib.redirect_stdout(io.StringIO()):
+            stt.meeting_minutes(synthetic_transcript(max(args.minutes), rng))
+    totals = stt.usage.totals()
+    estimated = sum(record.estimated_prompt_tokens or 0 for record in stt.usage.records)
+    print(f"\nStub run, {max(args.minutes):g} minutes with TOKEN_POLICY={stt.budget.policy}: "
+          f"{totals['calls']} calls, estimated {estimated} prompt tokens, reported {totals['prompt_tokens']} "
+          f"({(estimated - totals['prompt_tokens']) / totals['prompt_tokens']:+.1%}; the stub counts ~4 chars/token)")
+
+
+if __name__ == "__main__":
+    main()
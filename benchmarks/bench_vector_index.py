@@ -0,0 +1,119 @@
+"""
+Incremental build, query latency and recall of the meeting vector index.
+
+Adds synthetic meetings one at a time (as the bot does after every call), then
+compares IVF search against exact search: latency, recall@k, and the size of the
+GPT prompt (top-k chunks) against sending every matching transcript.
+With --embedder openai the embeddings come from the local stub OpenAI server.
+
+Usage: python benchmarks/bench_vector_index.py [--meetings 2000] [--words 1500] [-k 8] [--embedder hashing]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from meeting_index import HashingEmbedder, MeetingIndex, OpenAIEmbedder
+
+TOPICS = {
+    "pricing": "pricing discount enterprise tier annual contract renewal margin",
+    "hiring": "hiring candidate interview offer recruiter headcount onboarding",
+    "incident": "incident outage postmortem pager rollback latency alert",
+    "launch": "launch release beta marketing announcement date checklist",
+    "security": "security audit vulnerability penetration compliance encryption",
+    "roadmap": "roadmap quarter priority milestone planning scope estimate",
+}
+FILLER = ("we should will need agree decide follow up next week team plan issue the a to and of for on in with "
+          "this that it is be are was okay right so yeah think maybe").split()
+# Chars per token, rough English average
+CHARS_PER_TOKEN = 4
+
+
+def synthetic_transcript(rng, words):
+    """Filler speech with two topics mixed in, one speaker turn per line"""
+    topics = rng.sample(sorted(TOPICS), 2)
+    lines = []
+    total = 0
+    while total < words:
+        topic = TOPICS[rng.choice(topics)].split() if rng.random() < 0.3 else []
+        turn = [rng.choice(FILLER) for _ in range(rng.randint(8, 30))] + rng.sample(topic, min(3, len(topic)))
+        rng.shuffle(turn)
+        lines.append(f"{rng.choice(['Alice', 'Bob', 'Carol', 'Dan'])}: {' '.join(turn)}")
+        total += len(turn)
+    return "\n".join(lines), topics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=1500, help="Transcript words per meeting")
+    parser.add_argument("-k", type=int, default=8)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--embedder", choices=["hashing", "openai"], default="hashing")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    server = None
+    if args.embedder == "openai":
+        from openai import OpenAI
+        from simulation import StubOpenAIServer
+
+        server = StubOpenAIServer(latency=0.0).start()
+        embedder = OpenAIEmbedder(OpenAI(api_key="benchmark", base_url=server.base_url), dim=512)
+    else:
+        embedder = HashingEmbedder()
+
+    topic_chars = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        with MeetingIndex(work_dir, embedder=embedder, nprobe=args.nprobe) as index:
+            add_times = []
+            now = time.time()
+            for meeting_id in range(1, args.meetings + 1):
+                transcript, topics = synthetic_transcript(rng, args.words)
+                for topic in topics:
+                    topic_chars[topic] = topic_chars.get(topic, 0) + len(transcript)
+                started = time.perf_counter()
+                index.add_meeting(meeting_id, transcript, now - (args.meetings - meeting_id) * 3600)
+                add_times.append(time.perf_counter() - started)
+            size_mb = os.path.getsize(os.path.join(work_dir, "vectors.f16")) / 2**20
+            print(f"Indexed {args.meetings} meetings, {index.count} chunks, dim {index.dim}, "
+                  f"{len(index.centroids) if index.centroids is not None else 0} partitions, vectors {size_mb:.1f} MB")
+            print(f"Add meeting: p50 {statistics.median(add_times) * 1000:.1f} ms, "
+                  f"max {max(add_times) * 1000:.0f} ms (includes one-off training)")
+
+            query_topics = [rng.choice(sorted(TOPICS)) for _ in range(args.queries)]
+            ivf_times, exact_times, recalls, prompt_chars, on_topic = [], [], [], [], []
+            for query_topic in query_topics:
+                query = f"what did we decide about {' '.join(rng.sample(TOPICS[query_topic].split(), 3))}"
+                started = time.perf_counter()
+                approximate = index.search(query, k=args.k)
+                ivf_times.append(time.perf_counter() - started)
+                started = time.perf_counter()
+                exact = index.search(query, k=args.k, exact=True)
+                exact_times.append(time.perf_counter() - started)
+                exact_rows = {(c["meeting_id"], c["chunk_no"]) for c in exact}
+                recalls.append(len(exact_rows & {(c["meeting_id"], c["chunk_no"]) for c in approximate}) / len(exact))
+                prompt_chars.append(sum(len(c["text"]) for c in approximate))
+                # Share of retrieved chunks that actually talk about the asked topic
+                topic = TOPICS[query_topic].split()
+                on_topic.append(statistics.mean(any(word in c["text"].split() for word in topic) for c in approximate))
+
+    if server:
+        server.stop()
+    print(f"Search p50: IVF {statistics.median(ivf_times) * 1000:.1f} ms, exact {statistics.median(exact_times) * 1000:.1f} ms, "
+          f"recall@{args.k} vs exact {statistics.mean(recalls):.2f}, on-topic chunks {statistics.mean(on_topic):.2f}")
+    # Without retrieval, answering means sending every meeting that covered the topic
+    full_tokens = statistics.mean(topic_chars.values()) / CHARS_PER_TOKEN
+    print(f"GPT context per question: ~{statistics.mean(prompt_chars) / CHARS_PER_TOKEN:.0f} tokens with top-{args.k} "
+          f"chunks vs ~{full_tokens:,.0f} tokens for all transcripts on the topic")
+
+
+if __name__ == "__main__":
+    main()
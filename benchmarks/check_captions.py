@@ -0,0 +1,135 @@
+"""
+Check the live caption observer against an offline copy of Meet's caption DOM.
+
+Loads benchmarks/fixtures/captions.html into Chrome and drives caption updates the
+way Meet makes them: a line growing word by word between two polls, a revised line,
+blocks removed from the DOM before they were read, and a reload that restarts the
+page-side block ids (a tab reopened after a hang). After each step LiveCaptions.poll()
+runs and the transcript is compared with the expected segments. Also checks that
+LiveCaptions.enable() leaves captions that are already on alone, even when no caption
+region selector matches, and turns them on through the toggle's aria-pressed state
+otherwise. Uses the Chrome on --port, or launches a headless one (see linux_runtime.py)
+when nothing listens there. Exits with status 1 when a check fails.
+
+Usage: python benchmarks/check_captions.py [--port 9222] [--backend cdp]
+"""
+import argparse
+import contextlib
+import io
+import os
+import socket
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from live_captions import LiveCaptions
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "captions.html")
+
+
+def connect(backend, port):
+    if backend == "cdp":
+        from cdp_driver import CDPDriver
+
+        return CDPDriver(port)
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_experimental_option("debuggerAddress", f"localhost:{port}")
+    return webdriver.Chrome(options=options)
+
+
+def check_observer(driver):
+    """Yield (check, passed) for each step of the caption updates"""
+    url = "file://" + FIXTURE
+    driver.get(url)
+    captions = LiveCaptions(driver)
+    yield "observer attaches to the caption region", captions.start()
+
+    alice = driver.execute_script("return addBlock('Alice', 'Good');")
+    for text in ("Good morning", "Good morning every", "Good morning everyone"):
+        driver.execute_script("setText(arguments[0], arguments[1]);", alice, text)
+    pending = driver.execute_script("return window.__meetBotCaptions.pending.size;")
+    yield "updates of one line between polls collapse into one entry", pending == 1
+    captions.poll()
+    yield "grown line is one segment", [s["text"] for s in captions.transcript.segments] == ["Good morning everyone"]
+
+    driver.execute_script("setText(arguments[0], arguments[1]);", alice, "Good morning everyone, welcome")
+    captions.poll()
+    yield "revised line updates its segment", [s["text"] for s in captions.transcript.segments] == [
+        "Good morning everyone, welcome"]
+
+    bob = driver.execute_script("return addBlock('Bob', 'Thanks');")
+    driver.execute_script("setText(arguments[0], arguments[1]);", bob, "Thanks, the release is on track")
+    driver.execute_script("removeBlock(arguments[0]); removeBlock(arguments[1]);", alice, bob)
+    captions.poll()
+    yield "block removed before the poll is kept", [s["speaker"] for s in captions.transcript.segments] == [
+        "Alice", "Bob"]
+
+    # A reopened tab: the page state, and with it the block ids, start again from 1
+    driver.get(url)
+    captions.start()
+    driver.execute_script("addBlock('Carol', 'I will update the pricing page');")
+    captions.poll()
+    segments = [(s["speaker"], s["text"]) for s in captions.transcript.segments]
+    yield "block ids of a new page do not overwrite earlier segments", segments == [
+        ("Alice", "Good morning everyone, welcome"), ("Bob", "Thanks, the release is on track"),
+        ("Carol", "I will update the pricing page")]
+    captions.stop()
+
+
+def check_enable(driver):
+    """Yield (check, passed) for turning captions on without toggling them off"""
+    driver.get("file://" + FIXTURE)
+    driver.execute_script("hideRegion();")
+    with contextlib.redirect_stdout(io.StringIO()):
+        enabled = LiveCaptions(driver).enable()
+    state = driver.execute_script(
+        "return [document.getElementById('captions-toggle').getAttribute('aria-pressed'), window.keyPresses];")
+    yield "captions already on (region not found) stay on", enabled and state == ["true", []]
+
+    # Off, with a label that does not say "turn on": only aria-pressed tells
+    driver.execute_script("const toggle = document.getElementById('captions-toggle'); "
+                          "toggle.setAttribute('aria-pressed', 'false'); toggle.setAttribute('aria-label', 'Captions');")
+    with contextlib.redirect_stdout(io.StringIO()):
+        enabled = LiveCaptions(driver).enable()
+    state = driver.execute_script(
+        "return [document.getElementById('captions-toggle').getAttribute('aria-pressed'), window.keyPresses];")
+    yield "captions that are off are turned on", enabled and state == ["true", []]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=9222)
+    parser.add_argument("--backend", default="selenium", choices=["selenium", "cdp"])
+    args = parser.parse_args()
+
+    runtime = None
+    with socket.socket() as sock:
+        listening = sock.connect_ex(("localhost", args.port)) == 0
+    if not listening:
+        from linux_runtime import LinuxRuntime, find_linux_chrome
+
+        runtime = LinuxRuntime(os.getenv("CHROME_PATH") or find_linux_chrome(), args.port, headless=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            runtime.start()
+
+    failed = 0
+    try:
+        driver = connect(args.backend, args.port)
+        for check, passed in [*check_observer(driver), *check_enable(driver)]:
+            print(f"{'✓' if passed else '✗'} {check}")
+            failed += not passed
+        if args.backend == "cdp":
+            driver.quit()
+    finally:
+        if runtime:
+            runtime.stop()
+    if failed:
+        print(f"{failed} check(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measure RSS and CPU per concurrent bot session with the Linux headless runtime profile.
+
+Starts N Chrome sessions (each with its own PulseAudio null sink), opens URL in each,
+then samples the Chrome process trees for a while.
+
+Usage: python benchmarks/measure_runtime.py --sessions 4 --url https://meet.google.com/xxx-xxxx-xxx
+"""
+import argparse
+import os
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linux_runtime import LinuxRuntime, find_linux_chrome
+
+
+def open_tab(port, url):
+    request = urllib.request.Request(
+        f"http://localhost:{port}/json/new?{urllib.parse.quote(url, safe='')}", method="PUT")
+    urllib.request.urlopen(request, timeout=10).read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2)
+    parser.add_argument("--url", default="about:blank", help="Page to open in every session")
+    parser.add_argument("--base-port", type=int, default=9300)
+    parser.add_argument("--warmup", type=float, default=15, help="Seconds before sampling starts")
+    parser.add_argument("--seconds", type=float, default=30, help="Sampling window")
+    args = parser.parse_args()
+
+    chrome_path = os.getenv("CHROME_PATH") or find_linux_chrome()
+    runtimes = []
+    try:
+        for index in range(args.sessions):
+            runtime = LinuxRuntime(chrome_path, args.base_port + index)
+            runtime.start()
+            open_tab(runtime.debug_port, args.url)
+            runtimes.append(runtime)
+
+        time.sleep(args.warmup)
+        before = [runtime.resource_usage() for runtime in runtimes]
+        started = time.monotonic()
+        peak_rss = [usage["rss_bytes"] for usage in before]
+        while time.monotonic() - started < args.seconds:
+            time.sleep(1)
+            for index, runtime in enumerate(runtimes):
+                peak_rss[index] = max(peak_rss[index], runtime.resource_usage()["rss_bytes"])
+        window = time.monotonic() - started
+        after = [runtime.resource_usage() for runtime in runtimes]
+
+        print(f"{'session':<10} {'processes':>9} {'rss MB':>8} {'peak MB':>8} {'cpu %':>7}")
+        total_rss = total_cpu = 0.0
+        for runtime, start_usage, end_usage, peak in zip(runtimes, before, after, peak_rss):
+            cpu_percent = 100 * (end_usage["cpu_seconds"] - start_usage["cpu_seconds"]) / window
+            total_rss += end_usage["rss_bytes"]
+            total_cpu += cpu_percent
+            print(f"{runtime.session_id:<10} {end_usage['processes']:>9} {end_usage['rss_bytes'] / 2**20:>8.0f} "
+                  f"{peak / 2**20:>8.0f} {cpu_percent:>7.1f}")
+        print(f"{'mean':<10} {'':>9} {total_rss / len(runtimes) / 2**20:>8.0f} {'':>8} {total_cpu / len(runtimes):>7.1f}")
+        print("Note: RSS is summed per process, so pages shared between Chrome processes are counted more than once.")
+    finally:
+        for runtime in runtimes:
+            runtime.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Simulate the AskToJoin participant monitor against a scripted fake Meet page on a
+virtual clock and report how many seconds are recorded after the meeting is over.
+
+Usage: python benchmarks/simulate_monitor.py [--duration 3600] [--command-latency 0.05]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import join_google_meet
+from artifact_store import ArtifactStore
+from join_google_meet import JoinGoogleMeet
+
+
+class VirtualClock:
+    """Stands in for the time module inside join_google_meet"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return 1_700_000_000 + self.now
+
+
+class FakeElement:
+    def __init__(self, aria_label="", text=""):
+        self.aria_label = aria_label
+        self.text = text
+
+    def get_attribute(self, name):
+        return self.aria_label if name == "aria-label" else None
+
+
+class ScriptedMeetDriver:
+    """Replays a timeline of (start_second, participant_count, page_text) states.
+    A participant count of None means the count cannot be read from the DOM."""
+
+    def __init__(self, clock, timeline, command_latency):
+        self.clock = clock
+        self.timeline = timeline
+        self.command_latency = command_latency
+        self.commands = 0
+
+    def _state(self):
+        current = self.timeline[0]
+        for state in self.timeline:
+            if state[0] <= self.clock.now:
+                current = state
+        return current
+
+    def _command(self):
+        self.commands += 1
+        self.clock.sleep(self.command_latency)
+
+    def execute_script(self, script, *args):
+        self._command()
+        page_text = self._state()[2]
+        if "inCall" in script:
+            # The call controls are on the page until an end screen replaces it
+            return {"inCall": not page_text, "text": page_text}
+        return page_text
+
+    def find_elements(self, by, value):
+        self._command()
+        _, count, page_text = self._state()
+        if count is None or page_text:
+            return []
+        if "participant" in value:
+            return [FakeElement(aria_label=f"Show everyone ({count} participants)")]
+        return []
+
+
+class FakeRecorder:
+    def __init__(self):
+        # Never set: the scenarios are about the page, not the audio
+        self.silence = threading.Event()
+
+    def is_recording(self):
+        return True
+
+
+class LegacyMonitor(JoinGoogleMeet):
+    """Fixed 10 s polling without end-of-call screen detection, like the old loop"""
+
+    def get_call_state(self):
+        return None
+
+
+SCENARIOS = {
+    # name: (timeline, second at which the meeting content is over)
+    "others leave": ([(0, 5, ""), (600, 3, ""), (640, 2, ""), (700, 1, "")], 700),
+    "host ends meeting": ([(0, 6, ""), (900, None, "The meeting has ended\nReturn to home screen")], 900),
+    "bot removed": ([(0, 4, ""), (300, None, "You've been removed from the meeting")], 300),
+    "count unreadable, call ends": ([(0, None, ""), (1200, None, "This call has ended")], 1200),
+}
+
+
+def run(monitor_class, timeline, duration, command_latency, min_interval, max_interval):
+    clock = VirtualClock()
+    join_google_meet.time = clock
+    driver = ScriptedMeetDriver(clock, timeline, command_latency)
+    with tempfile.TemporaryDirectory(prefix="meetbot_monitor_") as work_dir, \
+            contextlib.redirect_stdout(io.StringIO()):
+        # Through __init__, so every attribute the monitor reads is set as in a real session
+        bot = monitor_class(driver=driver, artifact_store=ArtifactStore(work_dir))
+        bot.monitor_min_interval = min_interval
+        bot.monitor_max_interval = max_interval
+        reason = bot._monitor_meeting(FakeRecorder(), duration, monitor_participants=True)
+    return reason, clock.now, driver.commands
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3600, help="Maximum recording duration (s)")
+    parser.add_argument("--command-latency", type=float, default=0.05, help="Virtual seconds per driver command")
+    parser.add_argument("--min-interval", type=float, default=2)
+    parser.add_argument("--max-interval", type=float, default=30)
+    args = parser.parse_args()
+
+    real_time = join_google_meet.time
+    policies = [
+        ("adaptive", JoinGoogleMeet, args.min_interval, args.max_interval),
+        ("legacy fixed 10s", LegacyMonitor, 10, 10),
+    ]
+    print(f"{'scenario':<30} {'policy':<18} {'exit':<8} {'stopped at':>10} {'wasted s':>9} {'commands':>9}")
+    try:
+        for name, (timeline, content_end) in SCENARIOS.items():
+            for policy, monitor_class, min_interval, max_interval in policies:
+                reason, stopped_at, commands = run(monitor_class, timeline, args.duration,
+                                                   args.command_latency, min_interval, max_interval)
+                wasted = max(0.0, stopped_at - content_end)
+                print(f"{name:<30} {policy:<18} {str(reason):<8} {stopped_at:>10.1f} {wasted:>9.1f} {commands:>9}")
+    finally:
+        join_google_meet.time = real_time
+
+
+if __name__ == "__main__":
+    main()
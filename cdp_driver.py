@@ -0,0 +1,457 @@
+"""
+WebDriver-compatible browser backend that talks the Chrome DevTools Protocol directly.
+
+With Selenium every find_element, get_attribute, .text and execute_script is an HTTP
+request to chromedriver, which turns it into one or more CDP commands to Chrome.
+CDPDriver connects to the page's DevTools websocket on CHROME_DEBUG_PORT itself:
+
+- no chromedriver process, one websocket round trip per command;
+- commands that do not depend on each other are pipelined (sent together, answers
+  collected afterwards), e.g. the mouse press and release of a click;
+- page events are subscribed to instead of polled: the current URL is tracked from
+  navigation events (reading driver.current_url costs nothing), get() waits for the
+  load event, and beforeunload dialogs are accepted as they open.
+
+It implements the part of the WebDriver API that JoinGoogleMeet and LiveCaptions use
+(get, current_url, title, find_element(s), execute_script, implicitly_wait, quit and
+the element's click, text, get_attribute, is_displayed, is_enabled and send_keys) and
+raises Selenium's exceptions, so WebDriverWait, expected_conditions and the existing
+join/leave/monitor logic work unchanged. Select it with DRIVER_BACKEND=cdp.
+"""
+import itertools
+import json
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException, JavascriptException, NoSuchElementException,
+    StaleElementReferenceException, TimeoutException, WebDriverException,
+)
+from selenium.webdriver.common.by import By
+
+# Found elements are kept in a page-side registry of weak references and addressed
+# by number, so finding elements and reading them is one round trip each and no
+# remote objects have to be released. The registry disappears with the document,
+# which makes old elements stale exactly like in WebDriver.
+_PAGE_HELPERS = """
+(() => {
+    if (!window.__meetBotNodes) {
+        const refs = new Map();
+        const cleanup = new FinalizationRegistry(id => refs.delete(id));
+        let next = 1;
+        window.__meetBotNodes = {
+            add(node) {
+                const id = next++;
+                refs.set(id, new WeakRef(node));
+                cleanup.register(node, id);
+                return id;
+            },
+            get(id) {
+                const ref = refs.get(id);
+                const node = ref && ref.deref();
+                if (!node || !node.isConnected) throw new Error('stale element reference');
+                return node;
+            },
+            resolve(value) {
+                if (Array.isArray(value)) return value.map(item => window.__meetBotNodes.resolve(item));
+                if (value && typeof value === 'object' && '__meetBotNode' in value) return window.__meetBotNodes.get(value.__meetBotNode);
+                return value;
+            },
+            wrap(value) {
+                if (value instanceof Element) return {__meetBotNode: window.__meetBotNodes.add(value)};
+                if (Array.isArray(value) || value instanceof NodeList || value instanceof HTMLCollection) {
+                    return Array.from(value, item => window.__meetBotNodes.wrap(item));
+                }
+                return value;
+            },
+        };
+    }
+    return window.__meetBotNodes;
+})()"""
+
+_FIND_FUNCTION = """function(strategy, value, multiple, root) {
+    const scope = root === null ? document : window.__meetBotNodes.get(root);
+    let nodes = [];
+    if (strategy === 'xpath') {
+        const result = document.evaluate(value, scope, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < result.snapshotLength && (multiple || !nodes.length); i++) {
+            if (result.snapshotItem(i).nodeType === 1) nodes.push(result.snapshotItem(i));
+        }
+    } else if (multiple) {
+        nodes = Array.from(scope.querySelectorAll(value));
+    } else {
+        const node = scope.querySelector(value);
+        nodes = node ? [node] : [];
+    }
+    return nodes.map(node => window.__meetBotNodes.add(node));
+}"""
+
+_CLICK_POINT_FUNCTION = """function(element) {
+    element.scrollIntoView({block: 'center', inline: 'center'});
+    const rect = element.getBoundingClientRect();
+    const x = rect.left + rect.width / 2, y = rect.top + rect.height / 2;
+    const hit = document.elementFromPoint(x, y);
+    return {x: x, y: y, width: rect.width, height: rect.height,
+            clickable: !!hit && (hit === element || element.contains(hit))};
+}"""
+
+# Selenium Keys used with send_keys: code point -> (key, keyCode, text)
+_SPECIAL_KEYS = {
+    '\ue003': ('Backspace', 8, ''),
+    '\ue004': ('Tab', 9, ''),
+    '\ue006': ('Enter', 13, '\r'),
+    '\ue007': ('Enter', 13, '\r'),
+    '\ue00c': ('Escape', 27, ''),
+}
+
+
+def _selector(by, value):
+    """Translate a Selenium locator into ('css' | 'xpath', selector)"""
+    if by == By.XPATH:
+        return 'xpath', value
+    if by == By.CSS_SELECTOR or by == By.TAG_NAME:
+        return 'css', value
+    if by == By.ID:
+        return 'css', f'[id={json.dumps(value)}]'
+    if by == By.NAME:
+        return 'css', f'[name={json.dumps(value)}]'
+    if by == By.CLASS_NAME:
+        return 'css', f'.{value}'
+    if by == By.LINK_TEXT:
+        return 'xpath', f'//a[normalize-space(.)={json.dumps(value)}]'
+    if by == By.PARTIAL_LINK_TEXT:
+        return 'xpath', f'//a[contains(., {json.dumps(value)})]'
+    raise WebDriverException(f"Unsupported locator strategy: {by}")
+
+
+class _PendingCommand:
+    def __init__(self, method):
+        self.method = method
+        self.done = threading.Event()
+        self.response = None
+
+    def result(self, timeout):
+        if not self.done.wait(timeout):
+            raise TimeoutException(f"No answer to {self.method} within {timeout} seconds")
+        if 'error' in self.response:
+            raise WebDriverException(f"{self.method}: {self.response['error'].get('message')}")
+        return self.response.get('result', {})
+
+
+class CDPConnection:
+    """One DevTools websocket: numbered commands, answered out of order, plus events.
+
+    A reader thread matches answers to commands by id, so any number of commands can
+    be in flight at once (see pipeline). Event listeners run on the reader thread and
+    must not wait for command answers themselves; they may send commands.
+    """
+
+    def __init__(self, websocket_url, timeout=30):
+        import websocket
+
+        self.timeout = timeout
+        self.commands = 0
+        # suppress_origin: Chrome 111+ rejects websocket clients that send an Origin header
+        self._socket = websocket.create_connection(websocket_url, timeout=timeout, suppress_origin=True,
+                                                   enable_multithread=True)
+        self._socket.settimeout(None)
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = defaultdict(list)
+        self._lock = threading.Lock()
+        self._closed = None
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def send(self, method, params=None):
+        """Send a command without waiting; returns an object whose result(timeout) waits for the answer"""
+        if self._closed:
+            raise WebDriverException(f"DevTools connection closed: {self._closed}")
+        pending = _PendingCommand(method)
+        with self._lock:
+            command_id = next(self._ids)
+            self._pending[command_id] = pending
+            self.commands += 1
+        self._socket.send(json.dumps({'id': command_id, 'method': method, 'params': params or {}}))
+        return pending
+
+    def call(self, method, params=None, timeout=None):
+        return self.send(method, params).result(timeout or self.timeout)
+
+    def pipeline(self, commands, timeout=None):
+        """Send all (method, params) commands at once, then wait for all answers (in order)"""
+        pending = [self.send(method, params) for method, params in commands]
+        return [command.result(timeout or self.timeout) for command in pending]
+
+    def on(self, event, callback):
+        """Call callback(params) for every event named event, e.g. "Page.loadEventFired" """
+        self._listeners[event].append(callback)
+
+    def _read_loop(self):
+        try:
+            while True:
+                message = json.loads(self._socket.recv())
+                if 'id' in message:
+                    with self._lock:
+                        pending = self._pending.pop(message['id'], None)
+                    if pending:
+                        pending.response = message
+                        pending.done.set()
+                    continue
+                for callback in list(self._listeners.get(message.get('method'), ())):
+                    try:
+                        callback(message.get('params', {}))
+                    except Exception as e:
+                        print(f"  Error in DevTools event handler for {message.get('method')}: {str(e)}")
+        except Exception as e:
+            self._closed = str(e) or type(e).__name__
+        finally:
+            self._closed = self._closed or 'closed'
+            with self._lock:
+                pending, self._pending = list(self._pending.values()), {}
+            for command in pending:
+                command.response = {'error': {'message': f"DevTools connection closed: {self._closed}"}}
+                command.done.set()
+
+    def close(self):
+        self._closed = self._closed or 'closed'
+        try:
+            self._socket.close()
+        except Exception:
+            pass
+
+
+class CDPElement:
+    """A found element, addressed through the page-side registry of CDPDriver"""
+
+    def __init__(self, driver, node_id):
+        self._driver = driver
+        self.id = node_id
+
+    def __eq__(self, other):
+        return isinstance(other, CDPElement) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def _call(self, function, *args):
+        return self._driver._call_function(function, self, *args)
+
+    @property
+    def text(self):
+        return self._call("function(el) { return el.innerText; }") or ''
+
+    @property
+    def tag_name(self):
+        return self._call("function(el) { return el.tagName.toLowerCase(); }")
+
+    def get_attribute(self, name):
+        return self._call("""function(el, name) {
+            const value = el.getAttribute(name);
+            if (value === null && name in el && el[name] !== null && typeof el[name] !== 'object' && typeof el[name] !== 'function') {
+                return String(el[name]);
+            }
+            return value;
+        }""", name)
+
+    def get_property(self, name):
+        return self._call("function(el, name) { return el[name]; }", name)
+
+    def is_displayed(self):
+        return bool(self._call("""function(el) {
+            const style = getComputedStyle(el);
+            return style.visibility !== 'hidden' && style.display !== 'none' &&
+                !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+        }"""))
+
+    def is_enabled(self):
+        return bool(self._call("function(el) { return !el.disabled; }"))
+
+    def click(self):
+        """Real mouse click in the element's centre; the press and release are pipelined"""
+        point = self._call(_CLICK_POINT_FUNCTION)
+        if not point['width'] and not point['height']:
+            raise ElementClickInterceptedException("Element has no size and cannot be clicked")
+        if not point['clickable']:
+            raise ElementClickInterceptedException("Element is covered by another element at its centre")
+        mouse = {'x': point['x'], 'y': point['y'], 'button': 'left', 'clickCount': 1}
+        self._driver.connection.pipeline([
+            ('Input.dispatchMouseEvent', dict(mouse, type='mouseMoved', button='none')),
+            ('Input.dispatchMouseEvent', dict(mouse, type='mousePressed')),
+            ('Input.dispatchMouseEvent', dict(mouse, type='mouseReleased')),
+        ])
+
+    def send_keys(self, *value):
+        """Focus the element and type; all key events are pipelined"""
+        self._call("function(el) { el.focus(); }")
+        events = []
+        for char in ''.join(str(part) for part in value):
+            key, code, text = _SPECIAL_KEYS.get(char, (char, ord(char.upper()) if char.isalnum() else 0, char))
+            down = {'type': 'keyDown', 'key': key, 'windowsVirtualKeyCode': code}
+            if text:
+                down['text'] = text
+            events.append(('Input.dispatchKeyEvent', down))
+            events.append(('Input.dispatchKeyEvent', {'type': 'keyUp', 'key': key, 'windowsVirtualKeyCode': code}))
+        if events:
+            self._driver.connection.pipeline(events)
+
+    def find_element(self, by=By.ID, value=None):
+        return self._driver._find(by, value, False, self)[0]
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._driver._find(by, value, True, self)
+
+
+class CDPDriver:
+    """Drive the first page of a Chrome started with --remote-debugging-port over CDP.
+
+    Args:
+        port: DevTools port (defaults to CHROME_DEBUG_PORT)
+        host: Host Chrome listens on
+        timeout: Seconds to wait for a command answer
+        page_load_timeout: Seconds get() waits for the load event
+    """
+
+    def __init__(self, port=None, host='localhost', timeout=30, page_load_timeout=60):
+        if port is None:
+            from settings import get_settings
+
+            port = get_settings().chrome_debug_port
+        self.address = f"{host}:{port}"
+        self.timeout = timeout
+        self.page_load_timeout = page_load_timeout
+        self._implicit_wait = 0
+        self._url = 'about:blank'
+        self._main_frame = None
+        self._loaded = threading.Event()
+        self.connection = CDPConnection(self._page_websocket_url(), timeout)
+        self.connection.on('Page.frameNavigated', self._on_frame_navigated)
+        self.connection.on('Page.navigatedWithinDocument', self._on_navigated_within_document)
+        self.connection.on('Page.loadEventFired', lambda params: self._loaded.set())
+        self.connection.on('Page.javascriptDialogOpening', self._on_dialog)
+        _, tree = self.connection.pipeline([('Page.enable', None), ('Page.getFrameTree', None)])
+        frame = tree['frameTree']['frame']
+        self._main_frame = frame['id']
+        self._url = frame.get('url', self._url) + frame.get('urlFragment', '')
+
+    def _page_websocket_url(self):
+        with urllib.request.urlopen(f"http://{self.address}/json/list", timeout=self.timeout) as response:
+            targets = json.load(response)
+        pages = [target for target in targets if target.get('type') == 'page'
+                 and not target.get('url', '').startswith(('devtools://', 'chrome-extension://'))]
+        if not pages:
+            request = urllib.request.Request(f"http://{self.address}/json/new?about:blank", method='PUT')
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                pages = [json.load(response)]
+        return pages[0]['webSocketDebuggerUrl']
+
+    # Events
+
+    def _on_frame_navigated(self, params):
+        frame = params['frame']
+        if 'parentId' not in frame:
+            self._main_frame = frame['id']
+            self._url = frame['url'] + frame.get('urlFragment', '')
+
+    def _on_navigated_within_document(self, params):
+        if params.get('frameId') == self._main_frame:
+            self._url = params['url']
+
+    def _on_dialog(self, params):
+        # A "leave site?" prompt would block every later command; other dialogs are left to the page
+        if params.get('type') == 'beforeunload':
+            self.connection.send('Page.handleJavaScriptDialog', {'accept': True})
+
+    def on(self, event, callback):
+        """Subscribe to a CDP event of the page (domains other than Page must be enabled first)"""
+        self.connection.on(event, callback)
+
+    # WebDriver API
+
+    @property
+    def commands(self):
+        return self.connection.commands
+
+    @property
+    def current_url(self):
+        return self._url
+
+    @property
+    def title(self):
+        return self._evaluate("document.title")
+
+    def get(self, url):
+        self._loaded.clear()
+        result = self.connection.call('Page.navigate', {'url': url})
+        if result.get('errorText'):
+            raise WebDriverException(f"Navigation to {url} failed: {result['errorText']}")
+        # Same-document navigations (only the fragment changes) have no loader and no load event
+        if result.get('loaderId') and not self._loaded.wait(self.page_load_timeout):
+            raise TimeoutException(f"Page {url} did not load within {self.page_load_timeout} seconds")
+
+    def implicitly_wait(self, time_to_wait):
+        self._implicit_wait = time_to_wait
+
+    def execute_script(self, script, *args):
+        arguments = json.dumps([self._marshal(arg) for arg in args])
+        expression = (f"(() => {{ const nodes = {_PAGE_HELPERS}; "
+                      f"return nodes.wrap((function() {{ {script} \n}}).apply(window, nodes.resolve({arguments}))); }})()")
+        return self._unmarshal(self._evaluate(expression))
+
+    def find_element(self, by=By.ID, value=None):
+        return self._find(by, value, False)[0]
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._find(by, value, True)
+
+    def quit(self):
+        self.connection.close()
+
+    def close(self):
+        self.quit()
+
+    # Internals
+
+    def _evaluate(self, expression):
+        result = self.connection.call('Runtime.evaluate', {'expression': expression, 'returnByValue': True,
+                                                           'awaitPromise': True})
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            message = (details.get('exception') or {}).get('description') or details.get('text', '')
+            if 'stale element reference' in message:
+                raise StaleElementReferenceException(message.splitlines()[0])
+            raise JavascriptException(message)
+        return result.get('result', {}).get('value')
+
+    def _call_function(self, function, *args):
+        arguments = json.dumps([self._marshal(arg) for arg in args])
+        return self._unmarshal(self._evaluate(
+            f"(() => {{ const nodes = {_PAGE_HELPERS}; return nodes.wrap(({function}).apply(window, nodes.resolve({arguments}))); }})()"))
+
+    def _marshal(self, value):
+        if isinstance(value, CDPElement):
+            return {'__meetBotNode': value.id}
+        if isinstance(value, (list, tuple)):
+            return [self._marshal(item) for item in value]
+        return value
+
+    def _unmarshal(self, value):
+        if isinstance(value, dict) and set(value) == {'__meetBotNode'}:
+            return CDPElement(self, value['__meetBotNode'])
+        if isinstance(value, list):
+            return [self._unmarshal(item) for item in value]
+        return value
+
+    def _find(self, by, value, multiple, root=None):
+        strategy, selector = _selector(by, value)
+        deadline = time.monotonic() + self._implicit_wait
+        while True:
+            node_ids = self._call_function(_FIND_FUNCTION, strategy, selector, multiple, root.id if root else None)
+            if node_ids or time.monotonic() >= deadline:
+                break
+            time.sleep(0.25)
+        if not node_ids and not multiple:
+            raise NoSuchElementException(f"Unable to locate element: {{\"method\":\"{by}\",\"selector\":{json.dumps(value)}}}")
+        return [CDPElement(self, node_id) for node_id in node_ids]
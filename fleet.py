@@ -0,0 +1,609 @@
+"""
+Coordinator and workers for running the bot on several hosts.
+
+The coordinator keeps meeting jobs and worker hosts in a SQLite queue and serves
+them over HTTP. Workers register by sending heartbeats with their load (live
+sessions, CPU, free memory); every heartbeat is answered with the jobs assigned
+to that worker. Jobs go to the least-loaded worker with a free session slot.
+When a worker stops sending heartbeats, its jobs that were not yet admitted to
+their meeting are queued again for another worker.
+
+Usage:
+    FLEET_TOKEN=<secret> python fleet.py coordinator --host 0.0.0.0 --port 8700
+    python fleet.py worker --coordinator http://coordinator:8700 --capacity 4
+    python fleet.py submit "https://meet.google.com/abc-defg-hij" --duration 3600
+    python fleet.py status
+"""
+import functools
+import ipaddress
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from artifact_store import ArtifactStore
+from meeting_lock import meeting_code
+from settings import get_settings
+
+ACTIVE_STATES = ('queued', 'assigned', 'joining', 'admitted')
+FINAL_STATES = ('done', 'failed')
+# Until admission a job can start over on another worker; after it, the recording is on the lost one
+MOVABLE_STATES = ('assigned', 'joining')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT,
+    capacity INTEGER NOT NULL,
+    cpu_percent REAL,
+    free_memory INTEGER,
+    alive INTEGER NOT NULL DEFAULT 1,
+    registered_at REAL NOT NULL,
+    last_heartbeat REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    meet_link TEXT NOT NULL,
+    meeting_code TEXT NOT NULL,
+    duration REAL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    worker_id TEXT,
+    previous_workers TEXT NOT NULL DEFAULT '[]',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+CREATE INDEX IF NOT EXISTS jobs_meeting_code ON jobs (meeting_code);
+"""
+
+
+def default_fleet_db_path():
+    configured = get_settings().fleet_db_path
+    if configured:
+        return os.path.expanduser(configured)
+    return os.path.join(os.path.expanduser('~'), '.google_meet_bot', 'fleet.db')
+
+
+def host_load():
+    """CPU use (1 minute load average per core, in percent) and available memory in bytes
+    of this host; None where the platform does not report them"""
+    cpu_percent = None
+    if hasattr(os, 'getloadavg'):
+        cpu_percent = min(100.0, os.getloadavg()[0] / (os.cpu_count() or 1) * 100)
+    free_memory = None
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    free_memory = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    return cpu_percent, free_memory
+
+
+def _is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _job_dict(row):
+    job = dict(row)
+    job['previous_workers'] = json.loads(job['previous_workers'])
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+
+class JobQueue:
+    """Meeting jobs and worker hosts in SQLite. Use a file to keep the queue across
+    coordinator restarts, or ":memory:" for a throwaway one."""
+
+    def __init__(self, path=':memory:', max_attempts=None, min_free_memory=None):
+        settings = get_settings()
+        self.max_attempts = max_attempts if max_attempts is not None else settings.fleet_max_attempts
+        # Bytes a host needs free per new session (a Chrome tab in a meeting)
+        if min_free_memory is None:
+            min_free_memory = settings.fleet_min_free_memory_mb * 2**20
+        self.min_free_memory = min_free_memory
+        if path != ':memory:':
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.connection
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def submit(self, meet_link, duration=None):
+        """Queue a meeting. A meeting that already has an unfinished job is not queued twice."""
+        code = meeting_code(meet_link)
+        now = time.time()
+        with self._transaction() as connection:
+            placeholders = ', '.join('?' for _ in ACTIVE_STATES)
+            row = connection.execute(
+                f"SELECT * FROM jobs WHERE meeting_code = ? AND state IN ({placeholders})",
+                (code, *ACTIVE_STATES)).fetchone()
+            if row:
+                return _job_dict(row)
+            job_id = connection.execute(
+                "INSERT INTO jobs (meet_link, meeting_code, duration, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (meet_link, code, duration, now, now)).lastrowid
+            return _job_dict(connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def job(self, job_id):
+        with self._lock:
+            row = self.connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+
+    def jobs(self, state=None):
+        with self._lock:
+            if state:
+                rows = self.connection.execute("SELECT * FROM jobs WHERE state = ? ORDER BY id", (state,)).fetchall()
+            else:
+                rows = self.connection.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        return [_job_dict(row) for row in rows]
+
+    def workers(self):
+        """Workers with the number of jobs they currently run"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT workers.*, (SELECT COUNT(*) FROM jobs WHERE jobs.worker_id = workers.id "
+                "AND jobs.state IN ('assigned', 'joining', 'admitted')) AS sessions FROM workers ORDER BY id").fetchall()
+        return [dict(row) for row in rows]
+
+    def heartbeat(self, worker_id, host=None, capacity=1, cpu_percent=None, free_memory=None):
+        """Register or refresh a worker; returns the unfinished jobs assigned to it"""
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO workers (id, host, capacity, cpu_percent, free_memory, alive, registered_at, last_heartbeat) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?, ?) ON CONFLICT (id) DO UPDATE SET host = excluded.host, "
+                "capacity = excluded.capacity, cpu_percent = excluded.cpu_percent, "
+                "free_memory = excluded.free_memory, alive = 1, last_heartbeat = excluded.last_heartbeat",
+                (worker_id, host, capacity, cpu_percent, free_memory, now, now))
+        # Hand out queued work right away instead of on the next coordinator tick
+        self.assign()
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT * FROM jobs WHERE worker_id = ? AND state IN ('assigned', 'joining', 'admitted') ORDER BY id",
+                (worker_id,)).fetchall()
+        return [_job_dict(row) for row in rows]
+
+    def _requeue_or_fail(self, connection, job, error, now):
+        previous = json.loads(job['previous_workers']) + [job['worker_id']]
+        if job['attempts'] >= self.max_attempts:
+            connection.execute(
+                "UPDATE jobs SET state = 'failed', error = ?, previous_workers = ?, updated_at = ? WHERE id = ?",
+                (f"{error} (gave up after {job['attempts']} attempts)", json.dumps(previous), now, job['id']))
+            return 'failed'
+        connection.execute(
+            "UPDATE jobs SET state = 'queued', worker_id = NULL, error = ?, previous_workers = ?, updated_at = ? "
+            "WHERE id = ?", (error, json.dumps(previous), now, job['id']))
+        return 'queued'
+
+    def update(self, job_id, worker_id, state, error=None, result=None):
+        """State change reported by the worker running a job. Returns False if the job is
+        no longer that worker's (it was moved after the worker was declared dead)."""
+        now = time.time()
+        with self._transaction() as connection:
+            job = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not job or job['worker_id'] != worker_id or job['state'] in FINAL_STATES:
+                return False
+            if state == 'failed' and job['state'] in MOVABLE_STATES:
+                # Failed before admission (e.g. Chrome crashed): another host may succeed
+                self._requeue_or_fail(connection, job, error, now)
+                return True
+            connection.execute(
+                "UPDATE jobs SET state = ?, error = ?, result = ?, updated_at = ? WHERE id = ?",
+                (state, error, json.dumps(result) if result is not None else None, now, job_id))
+            return True
+
+    def reap(self, timeout):
+        """Declare workers without a heartbeat for `timeout` seconds dead. Their jobs that
+        were not admitted yet are queued again; admitted ones fail. Returns the moved job ids."""
+        now = time.time()
+        moved = []
+        with self._transaction() as connection:
+            dead = [row['id'] for row in connection.execute(
+                "SELECT id FROM workers WHERE alive = 1 AND last_heartbeat < ?", (now - timeout,))]
+            for worker_id in dead:
+                connection.execute("UPDATE workers SET alive = 0 WHERE id = ?", (worker_id,))
+                for job in connection.execute(
+                        "SELECT * FROM jobs WHERE worker_id = ? AND state IN ('assigned', 'joining', 'admitted')",
+                        (worker_id,)).fetchall():
+                    if job['state'] == 'admitted':
+                        connection.execute(
+                            "UPDATE jobs SET state = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                            (f"worker {worker_id} stopped responding during the meeting", now, job['id']))
+                    elif self._requeue_or_fail(
+                            connection, job, f"worker {worker_id} stopped responding before admission", now) == 'queued':
+                        moved.append(job['id'])
+        for job_id in moved:
+            print(f"Job {job_id} queued again: its worker stopped responding before admission")
+        return moved
+
+    def _load_score(self, worker, sessions):
+        score = sessions / worker['capacity']
+        if worker['cpu_percent'] is not None:
+            score = max(score, worker['cpu_percent'] / 100)
+        return score
+
+    def assign(self):
+        """Give queued jobs, oldest first, to the least-loaded live workers with a free
+        session slot and enough free memory. Returns (job id, worker id) pairs."""
+        assigned = []
+        now = time.time()
+        with self._transaction() as connection:
+            queued = connection.execute("SELECT * FROM jobs WHERE state = 'queued' ORDER BY id").fetchall()
+            if not queued:
+                return assigned
+            workers = {row['id']: dict(row) for row in connection.execute(
+                "SELECT workers.*, (SELECT COUNT(*) FROM jobs WHERE jobs.worker_id = workers.id "
+                "AND jobs.state IN ('assigned', 'joining', 'admitted')) AS sessions "
+                "FROM workers WHERE alive = 1")}
+            added = {worker_id: 0 for worker_id in workers}
+            for job in queued:
+                candidates = [
+                    worker for worker in workers.values()
+                    if worker['sessions'] < worker['capacity']
+                    and (worker['free_memory'] is None
+                         or worker['free_memory'] >= self.min_free_memory * (added[worker['id']] + 1))
+                ]
+                if not candidates:
+                    break
+                worker = min(candidates, key=lambda w: (self._load_score(w, w['sessions']), w['id']))
+                connection.execute(
+                    "UPDATE jobs SET state = 'assigned', worker_id = ?, attempts = attempts + 1, updated_at = ? "
+                    "WHERE id = ?", (worker['id'], now, job['id']))
+                worker['sessions'] += 1
+                added[worker['id']] += 1
+                assigned.append((job['id'], worker['id']))
+        return assigned
+
+
+class Coordinator:
+    """Serves a JobQueue over HTTP and periodically reaps dead workers and assigns jobs.
+
+    POST /jobs {"meet_link", "duration"}            queue a meeting
+    GET  /jobs, GET /jobs/<id>, GET /workers         inspect
+    POST /workers/<id>/heartbeat {"host", "capacity", "cpu_percent", "free_memory"}
+                                                     -> {"jobs": [...]} assigned to the worker
+    POST /jobs/<id>/state {"worker_id", "state", "error", "result"}
+    """
+
+    def __init__(self, queue=None, host='127.0.0.1', port=8700, heartbeat_timeout=None, tick=1.0, token=None):
+        settings = get_settings()
+        self.queue = queue if queue is not None else JobQueue(default_fleet_db_path())
+        self.heartbeat_timeout = heartbeat_timeout if heartbeat_timeout is not None else settings.fleet_heartbeat_timeout
+        self.tick = tick
+        self.token = token if token is not None else settings.fleet_token
+        if not self.token and not _is_loopback(host):
+            # Anyone who can reach it could send the bots into any meeting
+            raise ValueError(f"Set FLEET_TOKEN to serve the job queue on {host!r}; without a token "
+                             f"the coordinator only listens on a loopback address")
+        self._stop = threading.Event()
+        self._thread = None
+        coordinator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def _dispatch(self, method):
+                if coordinator.token and self.headers.get('Authorization') != f'Bearer {coordinator.token}':
+                    return self._respond(401, {'error': 'unauthorized'})
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                try:
+                    status, payload = coordinator.handle(method, self.path, json.loads(body) if body else {})
+                except (KeyError, TypeError, ValueError) as e:
+                    status, payload = 400, {'error': str(e)}
+                self._respond(status, payload)
+
+            def _respond(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{'localhost' if host in ('0.0.0.0', '') else host}:{port}"
+
+    def handle(self, method, path, body):
+        parts = [part for part in path.split('?')[0].split('/') if part]
+        queue = self.queue
+        if parts == ['jobs']:
+            if method == 'POST':
+                return 200, queue.submit(body['meet_link'], body.get('duration'))
+            return 200, queue.jobs(body.get('state'))
+        if len(parts) == 2 and parts[0] == 'jobs' and method == 'GET':
+            job = queue.job(int(parts[1]))
+            return (200, job) if job else (404, {'error': 'no such job'})
+        if len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'state' and method == 'POST':
+            ok = queue.update(int(parts[1]), body['worker_id'], body['state'], body.get('error'), body.get('result'))
+            return (200 if ok else 409), {'ok': ok}
+        if parts == ['workers']:
+            return 200, queue.workers()
+        if len(parts) == 3 and parts[0] == 'workers' and parts[2] == 'heartbeat' and method == 'POST':
+            jobs = queue.heartbeat(parts[1], body.get('host'), int(body.get('capacity', 1)),
+                                   body.get('cpu_percent'), body.get('free_memory'))
+            return 200, {'jobs': jobs}
+        return 404, {'error': 'not found'}
+
+    def _loop(self):
+        while not self._stop.wait(self.tick):
+            try:
+                self.queue.reap(self.heartbeat_timeout)
+                for job_id, worker_id in self.queue.assign():
+                    print(f"Job {job_id} assigned to {worker_id}")
+            except Exception as e:
+                print(f"  Error in coordinator loop: {str(e)}")
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        print(f"Coordinator listening on {self.url}")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def fleet_request(url, method='GET', payload=None, token=None, timeout=10):
+    """JSON request to the coordinator; returns (status, payload)"""
+    token = token if token is not None else get_settings().fleet_token
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={'Content-Type': 'application/json'})
+    if token:
+        request.add_header('Authorization', f'Bearer {token}')
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'null')
+
+
+def run_meeting_session(job, slot, on_admitted, concurrent=True):
+    """Default worker session: the same join, record and analyse steps as join_google_meet.main(),
+    with the linux-headless runtime. Each slot launches its own Chrome on CHROME_DEBUG_PORT + slot,
+    with its own profile (CHROME_USER_DATA_DIR/slot<n>, else a temporary one) and its own
+    PulseAudio null sink, so concurrent sessions share neither a browser nor a recording.
+
+    With `concurrent` (a worker with more than one slot), a session that would record the
+    default input device (a Chrome already listening on the port, or no pactl) is refused,
+    since it would also record the other meetings of the host.
+    """
+    from join_google_meet import JoinGoogleMeet, analyze_meeting
+
+    settings = get_settings()
+    artifacts = ArtifactStore()
+    session_dir = artifacts.new_dir('raw_audio', prefix=f"job{job['id']}_")
+    audio_path = os.path.join(session_dir, "output.wav")
+    user_data_dir = os.path.join(settings.chrome_user_data_dir, f'slot{slot}') if settings.chrome_user_data_dir else None
+    try:
+        bot = JoinGoogleMeet(debug_port=str(int(settings.chrome_debug_port) + slot), artifact_store=artifacts,
+                             runtime_profile='linux-headless', user_data_dir=user_data_dir)
+    except BaseException:
+        artifacts.release(session_dir)
+        raise
+    try:
+        if concurrent and not (bot.runtime and bot.runtime.audio_source):
+            raise RuntimeError(f"Slot {slot} has no PulseAudio sink of its own and would record the other "
+                               f"meetings of this host; install pactl, or run the worker with --capacity 1")
+        bot.Glogin()
+        bot.turnOffMicCam(job['meet_link'])
+        recorded = bot.AskToJoin(audio_path, job['duration'] or settings.recording_duration,
+                                 on_admitted=on_admitted)
+        if recorded:
+            analyze_meeting(bot, audio_path, settings.transcript_source)
+        return {'recorded': recorded, 'audio_path': audio_path}
+    finally:
+        bot.close()
+        artifacts.release(session_dir)
+
+
+class Worker:
+    """Runs the jobs the coordinator assigns to this host, up to `capacity` at a time,
+    each in its own thread with its own session slot (Chrome debug port).
+
+    run_session(job, slot, on_admitted) runs one meeting and returns its result,
+    run_meeting_session by default."""
+
+    def __init__(self, coordinator_url=None, worker_id=None, capacity=None, run_session=None,
+                 heartbeat_interval=None):
+        settings = get_settings()
+        self.coordinator_url = (coordinator_url or settings.fleet_coordinator_url).rstrip('/')
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+        self.capacity = capacity or settings.worker_capacity
+        self.run_session = run_session or functools.partial(run_meeting_session, concurrent=self.capacity > 1)
+        self.heartbeat_interval = heartbeat_interval or settings.fleet_heartbeat_interval
+        self.sessions = {}
+        # job id -> (state, fields) of finished jobs whose final report the coordinator has not
+        # acknowledged yet; they are reported again and never started again
+        self._unreported = {}
+        self._free_slots = list(range(self.capacity))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def heartbeat(self):
+        cpu_percent, free_memory = host_load()
+        status, response = fleet_request(
+            f"{self.coordinator_url}/workers/{self.worker_id}/heartbeat", 'POST',
+            {'host': socket.gethostname(), 'capacity': self.capacity,
+             'cpu_percent': cpu_percent, 'free_memory': free_memory})
+        if status != 200:
+            raise ConnectionError(f"Coordinator answered {status}: {response}")
+        with self._lock:
+            unreported = dict(self._unreported)
+        for job_id, (state, fields) in unreported.items():
+            self._report_final(job_id, state, **fields)
+        for job in response['jobs']:
+            with self._lock:
+                # The jobs listed were read before the reports above reached the coordinator
+                finished = job['id'] in unreported or job['id'] in self._unreported
+                if job['id'] in self.sessions or finished or not self._free_slots:
+                    continue
+                slot = self._free_slots.pop(0)
+                thread = threading.Thread(target=self._run_job, args=(job, slot), name=f"job-{job['id']}", daemon=True)
+                self.sessions[job['id']] = thread
+            thread.start()
+
+    def _report(self, job_id, state, **fields):
+        """Send a job state to the coordinator. Returns the status it answered (409 when the
+        job was moved to another worker), None when it could not be reached."""
+        try:
+            status, _ = fleet_request(f"{self.coordinator_url}/jobs/{job_id}/state", 'POST',
+                                      {'worker_id': self.worker_id, 'state': state, **fields})
+        except (OSError, ValueError) as e:
+            print(f"  Could not report job {job_id} as {state}: {str(e)}")
+            return None
+        if status == 409:
+            print(f"⚠ Warning: Job {job_id} was moved to another worker")
+        elif status >= 500:
+            print(f"  Could not report job {job_id} as {state}: coordinator answered {status}")
+            return None
+        return status
+
+    def _report_admitted(self, job_id):
+        """on_admitted of a session: a job moved to another worker (this one missed its
+        heartbeats) is joined there too, so this session stops before it records"""
+        if self._report(job_id, 'admitted') == 409:
+            raise RuntimeError(f"Job {job_id} was moved to another worker before admission")
+
+    def _report_final(self, job_id, state, **fields):
+        """Report "done" or "failed"; until the coordinator acknowledges it, every heartbeat
+        sends it again and the job, still assigned to this worker, is not run twice"""
+        with self._lock:
+            self._unreported[job_id] = (state, fields)
+        if self._report(job_id, state, **fields) is not None:
+            with self._lock:
+                self._unreported.pop(job_id, None)
+
+    def _run_job(self, job, slot):
+        print(f"Job {job['id']}: joining {job['meet_link']} (slot {slot})")
+        self._report(job['id'], 'joining')
+        try:
+            result = self.run_session(job, slot, lambda: self._report_admitted(job['id']))
+            self._report_final(job['id'], 'done', result=result)
+            print(f"✓ Job {job['id']} done")
+        except Exception as e:
+            print(f"✗ Job {job['id']} failed: {str(e)}")
+            self._report_final(job['id'], 'failed', error=f"{type(e).__name__}: {e}")
+        finally:
+            with self._lock:
+                del self.sessions[job['id']]
+                self._free_slots.append(slot)
+
+    def run(self):
+        """Send heartbeats and start assigned jobs until stop() (or Ctrl+C)"""
+        print(f"Worker {self.worker_id} ({self.capacity} session slots) serving {self.coordinator_url}")
+        while not self._stop.is_set():
+            try:
+                self.heartbeat()
+            except (OSError, ValueError) as e:
+                print(f"  Heartbeat failed: {str(e)}")
+            self._stop.wait(self.heartbeat_interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+def main(argv=None):
+    import argparse
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run the bot on several hosts: a coordinator and workers.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    coordinator = commands.add_parser("coordinator", help="Serve the job queue to workers")
+    coordinator.add_argument("--host", default="127.0.0.1",
+                             help="Address to listen on (0.0.0.0 for other hosts, with FLEET_TOKEN set)")
+    coordinator.add_argument("--port", type=int, default=8700)
+    coordinator.add_argument("--db", default=None, help="SQLite queue file (default: FLEET_DB_PATH), or :memory:")
+    worker = commands.add_parser("worker", help="Run assigned meetings on this host")
+    worker.add_argument("--capacity", type=int, default=settings.worker_capacity, help="Concurrent meetings")
+    submit = commands.add_parser("submit", help="Queue a meeting")
+    submit.add_argument("meet_link")
+    submit.add_argument("--duration", type=float, help="Max recording seconds (default: RECORDING_DURATION)")
+    commands.add_parser("status", help="Show workers and jobs")
+    for command in (worker, submit, commands.choices["status"]):
+        command.add_argument("--coordinator", default=settings.fleet_coordinator_url)
+    args = parser.parse_args(argv)
+
+    if args.command == "coordinator":
+        try:
+            coordinator = Coordinator(JobQueue(args.db or default_fleet_db_path()), args.host, args.port)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        with coordinator:
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+    elif args.command == "worker":
+        try:
+            Worker(args.coordinator, capacity=args.capacity).run()
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "submit":
+        status, job = fleet_request(f"{args.coordinator.rstrip('/')}/jobs", 'POST',
+                                    {'meet_link': args.meet_link, 'duration': args.duration})
+        print(f"Job {job['id']}: {job['state']}" if status == 200 else f"✗ {status}: {job}")
+    else:
+        _, workers = fleet_request(f"{args.coordinator.rstrip('/')}/workers")
+        _, jobs = fleet_request(f"{args.coordinator.rstrip('/')}/jobs")
+        for worker in workers:
+            cpu = f"{worker['cpu_percent']:.0f}%" if worker['cpu_percent'] is not None else "-"
+            print(f"{worker['id']:<30} {'alive' if worker['alive'] else 'dead ':<6} "
+                  f"{worker['sessions']}/{worker['capacity']} sessions  CPU {cpu}")
+        for job in jobs:
+            print(f"{job['id']:>5}  {job['state']:<9} {job['worker_id'] or '-':<30} {job['meet_link']}"
+                  + (f"  ({job['error']})" if job['error'] else ""))
+
+
+if __name__ == "__main__":
+    main()
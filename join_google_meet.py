@@ -10,28 +10,121 @@ import re
 import threading
 from record_audio import AudioRecorder
 from speech_to_text import SpeechToText
+from live_captions import CAPTION_REGION_SELECTORS, LiveCaptions
+from slide_capture import SlideCapture
+from audio_only import AudioOnlyMode
+from meeting_lock import MeetingLease
+from session_watchdog import GuardedDriver, reopen_meeting_tab
+from profiling import start_profiling
+from artifact_store import SAVE_HEADROOM_BYTES, ArtifactStore, recording_bytes
+from linux_runtime import LinuxRuntime, find_linux_chrome
 import os
-import tempfile
+import sys
 import socket
-from dotenv import load_dotenv
+from settings import get_settings
 
-load_dotenv()
+# Text shown by Meet once we are out of the call, checked in this order
+CALL_END_PHRASES = [
+    ('removed', ["you've been removed from the meeting", "you have been removed from the meeting",
+                 "someone has removed you from the meeting"]),
+    ('ended', ["the meeting has ended", "meeting ended", "this call has ended", "the call has ended",
+               "the video call ended"]),
+    ('left', ["you left the meeting", "you've left the meeting", "you've left the call",
+              "you left the call"]),
+]
+# Text shown when the host denies (or ignores) the request to join
+LOBBY_DENIED_PHRASES = [
+    "someone in the call denied your request", "your request to join was denied",
+    "you can't join this call", "no one responded to your request",
+]
+# Regions whose text is what people say, not Meet's own screens: a participant saying
+# "the meeting ended early" in a caption or chat message must not end the recording
+CHAT_SELECTORS = [
+    'div[role="list"][aria-label*="chat" i]',
+    'div[aria-label*="in-call messages" i]',
+    'div[data-message-text]',
+]
+SPOKEN_TEXT_SELECTORS = CAPTION_REGION_SELECTORS + CHAT_SELECTORS
+# In-call controls only exist once we have been admitted, and are gone on the screens
+# shown after the call; only then is the page text (without captions and chat) read
+CALL_STATE_SCRIPT = """
+const inCall = !!document.querySelector(
+    'button[aria-label*="leave call" i], button[aria-label*="end call" i], button[data-tooltip*="leave call" i]');
+if (inCall || !document.body) return {inCall: inCall, text: ''};
+let text = document.body.innerText;
+for (const sel of arguments[0]) {
+    for (const el of document.querySelectorAll(sel)) {
+        const spoken = el.innerText;
+        if (spoken) text = text.split(spoken).join('\\n');
+    }
+}
+return {inCall: false, text: text.slice(0, 5000)};
+"""
+# Growth factor of the participant poll interval while the count is stable
+MONITOR_BACKOFF = 1.5
 
 class JoinGoogleMeet:
-    def __init__(self):
+    def __init__(self, driver=None, recorder_factory=AudioRecorder, debug_port=None, driver_factory=None,
+                 artifact_store=None, runtime_profile=None, user_data_dir=None):
+        """
+        Args:
+            driver: Already connected WebDriver-compatible object (e.g. simulation.FakeMeetDriver);
+                by default connects to Chrome on the debug port
+            recorder_factory: Callable returning the AudioRecorder used by AskToJoin
+            debug_port: Chrome remote debugging port (default: CHROME_DEBUG_PORT). Concurrent
+                sessions on one host (see fleet.py) each use their own
+            driver_factory: Optional callable returning a new driver when a hung session is
+                recovered (by default a new tab, or a restarted Chrome, on the debug port)
+            artifact_store: artifact_store.ArtifactStore that makes room for the recordings,
+                defaults to one under ARTIFACT_ROOT
+            runtime_profile: "desktop" or "linux-headless" (default: RUNTIME_PROFILE)
+            user_data_dir: Chrome profile directory (default: CHROME_USER_DATA_DIR). A Chrome
+                launched for linux-headless without one gets a temporary profile
+        """
         # Email and password are now optional - only needed if not already logged in
-        self.mail_address = os.getenv('EMAIL_ID')
-        self.password = os.getenv('EMAIL_PASSWORD')
+        self.settings = get_settings()
+        self.mail_address = self.settings.email_id
+        self.password = self.settings.email_password
+        # Participant monitor poll interval bounds (seconds)
+        self.monitor_min_interval = self.settings.monitor_min_interval
+        self.monitor_max_interval = self.settings.monitor_max_interval
+        self.debug_port = debug_port or self.settings.chrome_debug_port
+        self.runtime_profile = runtime_profile or self.settings.runtime_profile
+        self.user_data_dir = user_data_dir or self.settings.chrome_user_data_dir
+        self.meet_link = None
+        self.runtime = None
+        self.recorder_factory = recorder_factory
+        self.audio_only = None
+        self.lease = None
+        self.driver_factory = driver_factory
+        # One entry per hung-session recovery: {'seconds': hang to recovery, 'result': ...}
+        self.recoveries = []
+        # Set by AskToJoin when slides are captured (see slide_capture.py)
+        self.slide_capture = None
+        # Why the last recording ended (see _monitor_meeting), None after the full duration
+        self.exit_reason = None
+        self.artifacts = artifact_store or ArtifactStore()
+        self._recording_dir = None
+        self._low_disk_warned = False
+        self.driver = self._guard(driver if driver is not None else self._connect_to_chrome())
+    
+    def _connect_to_chrome(self):
+        """Attach to Chrome's remote debugging port, launching Chrome first for the linux-headless profile"""
         # connect to existing chrome instance
         opt = Options()
         opt.add_argument('--disable-blink-features=AutomationControlled')
         # Connect to existing Chrome instance via remote debugging
         # Default port is 9222, can be overridden via CHROME_DEBUG_PORT env variable
-        debug_port = os.getenv('CHROME_DEBUG_PORT', '9222')
+        debug_port = self.debug_port
         
         # Get Chrome user data directory (default location for Windows)
         user_data_dir = self._get_chrome_user_data_dir()
         
+        # Server deployments launch their own headless Chrome instead of attaching to a desktop one
+        if self.runtime_profile == 'linux-headless' and not self._check_debug_port(debug_port):
+            self.runtime = LinuxRuntime(self._get_chrome_path(), debug_port, user_data_dir=self.user_data_dir)
+            self.runtime.start()
+        
         # Check if Chrome is listening on the debug port
         if not self._check_debug_port(debug_port):
             chrome_path = self._get_chrome_path()
@@ -41,10 +134,16 @@ class JoinGoogleMeet:
                 f'"{chrome_path}" --remote-debugging-port={debug_port} --user-data-dir="{user_data_dir}"'
             )
         
+        if self.settings.driver_backend == 'cdp':
+            return self._connect_cdp(debug_port)
+        if self.settings.driver_backend != 'selenium':
+            raise ValueError(f"Unknown DRIVER_BACKEND {self.settings.driver_backend!r}, expected selenium or cdp")
+        
         opt.add_experimental_option("debuggerAddress", f"localhost:{debug_port}")
         try:
-            self.driver = webdriver.Chrome(options=opt)
+            driver = webdriver.Chrome(options=opt)
             print(f"Successfully connected to existing Chrome instance on port {debug_port}")
+            return driver
         except WebDriverException as e:
             raise ConnectionError(
                 f"Failed to connect to Chrome on port {debug_port}. "
@@ -53,13 +152,121 @@ class JoinGoogleMeet:
                 f"Error: {str(e)}"
             )
     
+    def _connect_cdp(self, debug_port):
+        """Drive the page over the DevTools protocol directly, without chromedriver"""
+        from cdp_driver import CDPDriver
+        
+        try:
+            driver = CDPDriver(debug_port)
+            print(f"Successfully connected to Chrome over DevTools protocol on port {debug_port}")
+            return driver
+        except Exception as e:
+            raise ConnectionError(
+                f"Failed to open a DevTools connection to Chrome on port {debug_port}. "
+                f"Error: {str(e)}"
+            )
+    
+    def _guard(self, driver):
+        """Put a deadline on every browser command (WATCHDOG_COMMAND_TIMEOUT, 0 to disable)"""
+        timeout = self.settings.watchdog_command_timeout
+        if timeout <= 0 or isinstance(driver, GuardedDriver):
+            return driver
+        return GuardedDriver(driver, timeout, self.settings.watchdog_navigation_timeout)
+    
+    def _audio_only_default(self, audio_only=None, capture_slides=None):
+        """audio_only (default AUDIO_ONLY), unless slides are captured (default SLIDE_CAPTURE):
+        a shared screen arrives as video"""
+        if audio_only is None:
+            audio_only = self.settings.audio_only
+        if capture_slides is None:
+            capture_slides = self.settings.slide_capture
+        if audio_only and capture_slides:
+            print("⚠ Warning: Audio-only mode is ignored while slides are captured")
+            return False
+        return audio_only
+    
+    def _driver_hung(self):
+        return getattr(self.driver, 'hung', False) is True
+    
+    def _reconnect(self):
+        """A new driver for a recovered session: from driver_factory, from a restarted Chrome
+        (when this bot launched its own) or attached to a fresh tab of the same Chrome"""
+        if self.driver_factory:
+            return self.driver_factory()
+        if self.runtime:
+            self.runtime.restart_chrome()
+        else:
+            reopen_meeting_tab(self.debug_port)
+        return self._connect_to_chrome()
+    
+    def _recover_session(self):
+        """Bring back a browser session whose tab stopped answering commands.
+        
+        First gives the tab a few seconds to answer again (e.g. a renderer busy with a
+        long task). Otherwise attaches a new driver to a fresh tab, or to a restarted
+        Chrome, and opens the meeting again. The recorder is never touched, so the
+        recording continues without a gap throughout.
+        
+        Returns "responsive", "reopened" (the caller has to wait for admission again),
+        or None when the session could not be recovered.
+        """
+        guard = self.driver
+        if len(self.recoveries) >= self.settings.watchdog_max_recoveries:
+            print(f"✗ Browser is not responding, giving up after {len(self.recoveries)} recoveries")
+            return None
+        print(f"⚠ Warning: Browser did not answer {guard.hung_command} in time, recovering the session...")
+        if guard.probe():
+            print("✓ Browser is responding again")
+            return 'responsive'
+        try:
+            driver = self._reconnect()
+        except Exception as e:
+            print(f"✗ Could not reattach to the browser: {str(e)}")
+            return None
+        guard.abandon()
+        self.driver = self._guard(driver)
+        try:
+            self.turnOffMicCam(self.meet_link, audio_only=self.audio_only is not None)
+            self._click_join_button()
+        except Exception as e:
+            print(f"✗ Could not reopen the meeting: {str(e)}")
+            return None
+        print("✓ Meeting reopened in a new browser session")
+        return 'reopened'
+    
+    def _recover_in_call(self, captions=None):
+        """Recover a hung session during the recording and get back into the call.
+        Returns True once the bot is in the call again."""
+        hung_since = self.driver.hung_since
+        result = self._recover_session()
+        if result == 'reopened':
+            if self.wait_for_admission():
+                if self.audio_only:
+                    self.audio_only.apply()
+                    self.audio_only.set_receive_audio_only()
+                if self.slide_capture:
+                    self.slide_capture.driver = self.driver
+                if captions:
+                    captions.driver = self.driver
+                    captions.enable()
+                    captions.start()
+            else:
+                result = None
+        self.recoveries.append({'seconds': time.monotonic() - hung_since, 'result': result or 'failed'})
+        return result is not None
+    
     def _get_chrome_user_data_dir(self):
         """Get the default Chrome user data directory path"""
         # Check if user specified a custom path
-        custom_dir = os.getenv('CHROME_USER_DATA_DIR')
+        custom_dir = self.user_data_dir
         if custom_dir:
             return custom_dir
         
+        if sys.platform.startswith('linux'):
+            return os.path.join(os.path.expanduser('~'), '.config', 'google-chrome')
+        if sys.platform == 'darwin':
+            return os.path.join(os.path.expanduser('~'), 'Library', 'Application Support', 'Google', 'Chrome')
+        
         # Default Chrome profile location for Windows
         default_dir = os.path.join(
             os.path.expanduser('~'),
@@ -69,11 +276,19 @@ class JoinGoogleMeet:
     
     def _get_chrome_path(self):
         """Get the Chrome executable path"""
+        custom_path = get_settings().chrome_path
+        if custom_path and os.path.exists(custom_path):
+            return custom_path
+        
+        if sys.platform.startswith('linux'):
+            return find_linux_chrome()
+        if sys.platform == 'darwin':
+            return '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
+        
         # Common Chrome installation paths on Windows
         possible_paths = [
             r"C:\Program Files\Google\Chrome\Application\chrome.exe",
             r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-            os.getenv('CHROME_PATH', '')
         ]
         
         for path in possible_paths:
@@ -193,20 +408,24 @@ class JoinGoogleMeet:
         self.driver.get(
             'https://accounts.google.com/ServiceLogin?hl=en&passive=true&continue=https://www.google.com/&ec=GAZAAQ')
     
+        # Explicit waits per step: an implicit wait would also slow down every later
+        # lookup that is expected to find nothing (participant counts, end screens)
+        wait = WebDriverWait(self.driver, 30)
+    
         # input Gmail
-        self.driver.find_element(By.ID, "identifierId").send_keys(self.mail_address)
+        wait.until(EC.element_to_be_clickable((By.ID, "identifierId"))).send_keys(self.mail_address)
         self.driver.find_element(By.ID, "identifierNext").click()
-        self.driver.implicitly_wait(10)
     
         # input Password
-        self.driver.find_element(By.XPATH,
-            '//*[@id="password"]/div[1]/div/div[1]/input').send_keys(self.password)
-        self.driver.implicitly_wait(10)
-        self.driver.find_element(By.ID, "passwordNext").click()
-        self.driver.implicitly_wait(10)    
+        wait.until(EC.element_to_be_clickable(
+            (By.XPATH, '//*[@id="password"]/div[1]/div/div[1]/input'))).send_keys(self.password)
+        wait.until(EC.element_to_be_clickable((By.ID, "passwordNext"))).click()
+        try:
+            wait.until(lambda driver: "accounts.google.com" not in driver.current_url)
+        except TimeoutException:
+            print("⚠ Warning: Still on the sign-in page (verification step?), continuing")
         # go to google home page
         self.driver.get('https://google.com/')
-        self.driver.implicitly_wait(100)
         print("Gmail login activity: Done")
  
     def _dismiss_permission_prompts(self):
@@ -232,8 +451,19 @@ class JoinGoogleMeet:
             # Ignore errors - permissions might already be granted
             pass
 
-    def turnOffMicCam(self, meet_link):
+    def turnOffMicCam(self, meet_link, audio_only=None):
+        """Open the meeting's pre-join page and turn off microphone and camera.
+        
+        With audio_only (default AUDIO_ONLY) participant video is hidden and not
+        rendered from the moment Meet loads; see audio_only.AudioOnlyMode.
+        """
+        audio_only = self._audio_only_default(audio_only)
+        if audio_only and (self.audio_only is None or self.audio_only.driver is not self.driver):
+            # Once per tab: the script stays registered when the page is loaded again
+            self.audio_only = AudioOnlyMode(self.driver)
+            self.audio_only.install()
         # Navigate to Google Meet URL
+        self.meet_link = meet_link
         print(f"Navigating to Google Meet: {meet_link}")
         self.driver.get(meet_link)
         
@@ -251,6 +481,10 @@ class JoinGoogleMeet:
         except TimeoutException:
             print("Warning: Page took too long to load")
         
+        if self.audio_only:
+            self.audio_only.apply()
+            print("Audio-only mode: participant video is not rendered")
+        
         # Handle any permission prompts
         self._dismiss_permission_prompts()
         
@@ -496,21 +730,78 @@ class JoinGoogleMeet:
         print("⚠ Warning: Could not find leave button. You may need to leave manually.")
         return False
     
-    def AskToJoin(self, audio_path, duration, monitor_participants=True):
-        """Click the join/ask to join button, start recording, and monitor for early exit conditions.
+    def _lobby_state(self):
+        """One script call that tells whether we are in the call, still waiting, denied, or whether the meeting is over"""
+        state = self.driver.execute_script(CALL_STATE_SCRIPT, SPOKEN_TEXT_SELECTORS) or {}
+        if state.get('inCall'):
+            return 'admitted'
+        page_text = (state.get('text') or '').lower().replace("\u2019", "'")
+        if any(phrase in page_text for phrase in LOBBY_DENIED_PHRASES):
+            return 'denied'
+        # Rejoining after a recovery can land on a meeting that ended in the meantime
+        for state, phrases in CALL_END_PHRASES:
+            if state != 'left' and any(phrase in page_text for phrase in phrases):
+                return 'ended'
+        return 'waiting'
+
+    def wait_for_admission(self, timeout=None, max_retries=None):
+        """Wait in the lobby until in-call controls appear.
         
-        Args:
-            audio_path: Path to save the audio recording
-            duration: Maximum recording duration in seconds
-            monitor_participants: If True, monitor participant count and leave early if everyone else leaves
+        If the request to join is denied, "Ask to join" is retried up to max_retries times.
+        Returns True once admitted, False on timeout or when all retries were denied.
         """
-        print("\n" + "="*60)
-        print("Attempting to join the meeting...")
-        print("="*60)
-        
-        # Wait for join button to appear
-        time.sleep(3)
+        if timeout is None:
+            timeout = self.settings.lobby_timeout
+        if max_retries is None:
+            max_retries = self.settings.lobby_max_retries
         
+        print(f"Waiting to be admitted (timeout: {timeout:.0f} seconds)...")
+        start_time = time.monotonic()
+        retries = 0
+        last_log = 0
+        while True:
+            elapsed_time = time.monotonic() - start_time
+            if self._driver_hung():
+                hung_since = self.driver.hung_since
+                result = self._recover_session()
+                self.recoveries.append({'seconds': time.monotonic() - hung_since, 'result': result or 'failed'})
+                if result is None:
+                    return False
+                continue
+            try:
+                state = self._lobby_state()
+            except Exception as e:
+                print(f"  Error checking lobby state: {str(e)}")
+                state = 'waiting'
+            
+            if state == 'admitted':
+                print(f"✓ Admitted to the meeting after {elapsed_time:.0f} seconds")
+                return True
+            if state == 'ended':
+                print("✗ The meeting has ended")
+                return False
+            if state == 'denied':
+                if retries >= max_retries:
+                    print("✗ Request to join was denied")
+                    return False
+                retries += 1
+                print(f"  Request to join was denied, asking again ({retries}/{max_retries})...")
+                if self.meet_link:
+                    # The denied screen has no join button; reload the pre-join page, which
+                    # comes back with the microphone and camera on
+                    self.turnOffMicCam(self.meet_link, audio_only=self.audio_only is not None)
+                self._click_join_button()
+            elif elapsed_time >= timeout:
+                print(f"✗ Not admitted within {timeout:.0f} seconds")
+                return False
+            elif elapsed_time - last_log >= 30:
+                last_log = elapsed_time
+                print(f"  [{elapsed_time:.0f}s] Waiting in the lobby for the host to admit us...")
+            
+            time.sleep(self.monitor_min_interval)
+
+    def _click_join_button(self):
+        """Click the "Join now" / "Ask to join" button. Returns True if a button was clicked."""
         # Multiple selectors for join button - Google Meet has different button texts
         join_button_selectors = [
             # Modern selectors - look for buttons with "Join" or "Ask to join" text
@@ -557,14 +848,83 @@ class JoinGoogleMeet:
                 print(f"  Error with selector: {str(e)}")
                 continue
         
-        if not join_button_found:
+        return join_button_found
+
+    def AskToJoin(self, audio_path, duration, monitor_participants=True, transcript_source=None,
+                  live_minutes=None, audio_only=None, lease=None, on_admitted=None, capture_slides=None):
+        """Click the join/ask to join button, wait to be admitted, then start recording and
+        monitor for early exit conditions.
+        
+        Args:
+            audio_path: Path to save the audio recording
+            duration: Maximum recording duration in seconds, counted from admission
+            monitor_participants: If True, monitor participant count and leave early if everyone else leaves
+            transcript_source: "whisper" (default) or "captions". With "captions", Meet's live
+                captions are collected into self.caption_transcript while recording
+            live_minutes: Optional speech_to_text.IncrementalMinutes fed with caption
+                segments while recording (requires transcript_source="captions")
+            audio_only: Once admitted, set Meet's receive resolution to "Audio only" so no
+                video is sent to the bot (default: AUDIO_ONLY, or whether turnOffMicCam used it)
+            lease: Optional meeting_lock.MeetingLease held for this meeting. It is renewed in
+                the background from here on, unless the caller already started that; if another instance takes it over, the bot does
+                not start (or stops) recording
+            on_admitted: Optional callable, called once admitted and before recording starts. If it
+                raises, the bot leaves the call and the exception propagates
+            capture_slides: Save the distinct slides of a shared screen to a "slides" folder
+                next to audio_path, into self.slide_capture (default: SLIDE_CAPTURE)
+        
+        Returns:
+            True if the bot was admitted and recorded, False if it never got into the call
+        """
+        if transcript_source is None:
+            transcript_source = self.settings.transcript_source
+        if capture_slides is None:
+            capture_slides = self.settings.slide_capture
+        if audio_only is None and self.audio_only is not None:
+            audio_only = True
+        audio_only = self._audio_only_default(audio_only, capture_slides)
+        if not audio_only and self.audio_only is not None:
+            # Installed by turnOffMicCam, but the slides need the video
+            self.audio_only.remove()
+            self.audio_only = None
+        self.slide_capture = None
+        self.caption_transcript = None
+        self.meeting_info = None
+        self._live_minutes = live_minutes if transcript_source == 'captions' else None
+        self._fed_segments = 0
+        self.lease = lease
+        if lease:
+            lease.start_renewal()
+        print("\n" + "="*60)
+        print("Attempting to join the meeting...")
+        print("="*60)
+        
+        # Wait for join button to appear
+        time.sleep(3)
+        
+        if not self._click_join_button():
             print("⚠ Warning: Could not find join button automatically.")
             print("  Please check the browser window and manually join if needed.")
-            print("  The script will wait 10 seconds before starting recording...")
-            time.sleep(10)
-        else:
-            # Wait a bit for the meeting to join
-            time.sleep(3)
+        
+        # Only record once we are actually in the call, not while waiting in the lobby
+        if not self.wait_for_admission():
+            print("\n✗ Not admitted to the meeting. Nothing was recorded.")
+            return False
+        if lease and lease.lost:
+            print("\n✗ Another instance took over this meeting. Nothing was recorded.")
+            return False
+        if on_admitted:
+            try:
+                on_admitted()
+            except Exception:
+                # Not recording this meeting after all
+                self.leave_call()
+                raise
+        
+        if audio_only:
+            if self.audio_only is None:
+                self.audio_only = AudioOnlyMode(self.driver)
+            self.audio_only.apply()
         
         print("\n" + "="*60)
         print(f"Starting audio recording (max duration: {duration} seconds)...")
@@ -573,79 +933,319 @@ class JoinGoogleMeet:
         print("="*60)
         
         # Initialize recorder
-        recorder = AudioRecorder()
+        recorder = self.recorder_factory(pulse_source=self.runtime.audio_source if self.runtime else None)
+        duration = self._recordable_duration(audio_path, duration, recorder)
+        if not duration:
+            self.leave_call()
+            return False
         recorder.start_recording(audio_path)
+        recording_started = time.monotonic()
+        self.meeting_info = {'meet_link': self.meet_link, 'started_at': time.time(),
+                             'duration': None, 'participants': []}
+        if audio_only:
+            # After the recorder started, so the menu clicks do not delay the recording
+            self.audio_only.set_receive_audio_only()
+        
+        captions = None
+        if transcript_source == 'captions':
+            captions = LiveCaptions(self.driver)
+            captions.enable()
+            captions.start()
+        if capture_slides:
+            # Timestamps count from the start of the recording, like the audio
+            self.slide_capture = SlideCapture(self.driver, os.path.join(os.path.dirname(audio_path), 'slides'),
+                                              started_at=recording_started)
         
         try:
-            # Monitor the meeting while recording
-            check_interval = 10  # Check every 10 seconds
-            elapsed_time = 0
-            early_exit = False
-            
-            while elapsed_time < duration and recorder.is_recording():
-                # Wait for check interval or remaining time, whichever is shorter
-                wait_time = min(check_interval, duration - elapsed_time)
-                time.sleep(wait_time)
-                elapsed_time += wait_time
-                
-                # Check participant count if monitoring is enabled
-                if monitor_participants:
-                    try:
-                        participant_count = self.get_participant_count()
-                        if participant_count is not None:
-                            print(f"  [{elapsed_time:.0f}s] Participants detected: {participant_count}")
-                            
-                            # Check if we're the only participant (others have left)
-                            if participant_count <= 1:
-                                print(f"  [{elapsed_time:.0f}s] Only participant detected (others may have left)")
-                                # Double-check by waiting a bit more
-                                time.sleep(5)
-                                participant_count = self.get_participant_count()
-                                if participant_count is not None and participant_count <= 1:
-                                    print(f"  [{elapsed_time:.0f}s] Confirmed: Only participant in meeting")
-                                    print("  All other participants have left. Ending recording and leaving call...")
-                                    early_exit = True
-                                    break
-                        else:
-                            # Couldn't determine participant count - continue recording
-                            if elapsed_time % 30 == 0:  # Log every 30 seconds if we can't detect
-                                print(f"  [{elapsed_time:.0f}s] Recording in progress... (unable to detect participant count)")
-                    except Exception as e:
-                        # If participant detection fails, continue recording
-                        if elapsed_time % 30 == 0:
-                            print(f"  [{elapsed_time:.0f}s] Recording in progress... (error checking participants: {str(e)})")
-                else:
-                    # Not monitoring - just show progress
-                    if elapsed_time % 30 == 0:
-                        print(f"  [{elapsed_time:.0f}s] Recording in progress... ({elapsed_time}/{duration} seconds)")
+            # Monitor the meeting while recording; setup since the recorder started counts toward duration
+            remaining = max(0, duration - (time.monotonic() - recording_started))
+            exit_reason = self._monitor_meeting(recorder, remaining, monitor_participants, captions)
+            self.exit_reason = exit_reason
             
             # Stop recording
             recorder.stop_recording()
+            self._finish_captions(captions, audio_path)
+            self._finish_slides()
+            self._finish_meeting_info()
             
-            if early_exit:
+            if exit_reason == 'lease_lost':
+                print("\n✓ Recording stopped - another instance took over this meeting")
+                self.leave_call()
+            elif exit_reason == 'alone':
                 print("\n✓ Recording stopped early - all other participants left")
                 # Leave the call
                 self.leave_call()
+            elif exit_reason == 'silence':
+                print(f"\n✓ Recording stopped early - no audio for {recorder.silence_timeout:.0f} seconds")
+                self.leave_call()
+            elif exit_reason == 'hung':
+                print("\n✗ Recording stopped early - the browser session could not be recovered")
+            elif exit_reason == 'disk_full':
+                print("\n✗ Recording stopped early - the disk is almost full")
+                self.leave_call()
+            elif exit_reason:
+                print(f"\n✓ Recording stopped early - call state: {exit_reason}")
             else:
                 print(f"\n✓ Recording completed - full duration ({duration} seconds)")
+            return True
                 
         except KeyboardInterrupt:
             print("\n\nRecording interrupted by user")
             recorder.stop_recording()
+            self._finish_captions(captions, audio_path)
+            self._finish_slides()
+            self._finish_meeting_info()
             self.leave_call()
             raise
         except Exception as e:
             print(f"\n✗ Error during recording: {str(e)}")
             recorder.stop_recording()
+            self._finish_captions(captions, audio_path)
+            self._finish_slides()
+            self._finish_meeting_info()
             raise
 
+    def _recordable_duration(self, audio_path, duration, recorder):
+        """The recording is kept in memory and written when it stops, so make room for all
+        of it before it starts: evict old artifacts, and shorten the recording when the disk
+        still cannot take `duration` seconds. Returns 0 when there is no room at all."""
+        self._recording_dir = os.path.dirname(os.path.abspath(audio_path))
+        self._low_disk_warned = False
+        if self.artifacts.ensure_space(recording_bytes(duration, recorder.sample_rate), self._recording_dir):
+            return duration
+        free = self.artifacts.free_bytes(self._recording_dir) - self.artifacts.min_free_bytes
+        recordable = int(free / recording_bytes(1, recorder.sample_rate))
+        if recordable <= 0:
+            print(f"\n✗ Not enough disk space to record: "
+                  f"{self.artifacts.free_bytes(self._recording_dir) / 1024 / 1024:.0f} MB free in {self._recording_dir}")
+            return 0
+        print(f"⚠ Warning: Not enough disk space for {duration} seconds, recording at most {recordable} seconds")
+        return recordable
+
+    def _disk_full(self, recorder, recorded_seconds):
+        """True once the disk could barely take the recording so far; warns when free space
+        drops under MIN_FREE_DISK_MB (other processes may fill the disk while recording)"""
+        needed = recording_bytes(recorded_seconds, recorder.sample_rate)
+        free = self.artifacts.free_bytes(self._recording_dir)
+        if free < needed + self.artifacts.min_free_bytes and not self._low_disk_warned:
+            self._low_disk_warned = True
+            print(f"⚠ Warning: Disk space is getting low: {free / 1024 / 1024:.0f} MB free in {self._recording_dir}")
+        return free < needed + SAVE_HEADROOM_BYTES
+
+    def get_call_state(self):
+        """Detect the screens Meet shows once we are no longer in the call.
+        Returns "removed", "ended" or "left", or None while still in the call.
+        Uses a single script call so it is cheap enough to run on every monitor tick:
+        while the in-call controls are on the page nothing else is read, and captions
+        and chat never count."""
+        try:
+            state = self.driver.execute_script(CALL_STATE_SCRIPT, SPOKEN_TEXT_SELECTORS) or {}
+        except Exception:
+            return None
+        if state.get('inCall'):
+            return None
+        page_text = (state.get('text') or '').lower().replace("\u2019", "'")
+        for state, phrases in CALL_END_PHRASES:
+            if any(phrase in page_text for phrase in phrases):
+                return state
+        return None
+
+    def _next_poll_interval(self, interval, previous_count, count):
+        """Back off while the participant count is stable, poll fast as it drops toward 1"""
+        if count is None:
+            return min(interval * MONITOR_BACKOFF, self.monitor_max_interval)
+        if count <= 2 or (previous_count is not None and count < previous_count):
+            return self.monitor_min_interval
+        if count == previous_count:
+            return min(interval * MONITOR_BACKOFF, self.monitor_max_interval)
+        return interval
+
+    def _monitor_meeting(self, recorder, duration, monitor_participants, captions=None):
+        """Watch the meeting until duration is reached or an exit condition is met.
+        
+        The call state is checked every monitor_min_interval seconds so end-of-call
+        screens stop the recording right away; the (expensive) participant count is
+        polled on an adaptive interval between monitor_min_interval and monitor_max_interval.
+        
+        Returns None when the full duration was recorded, "alone" when everyone else
+        left, "lease_lost" when another instance took over the meeting lease, "silence"
+        when the audio was silent for SILENCE_TIMEOUT seconds, "disk_full" when the disk
+        could no longer take the recording, "hung"
+        when the browser stopped answering and could not be recovered, or the call state ("removed", "ended", "left") that ended the meeting.
+        """
+        start_time = time.monotonic()
+        elapsed_time = 0
+        interval = self.monitor_min_interval
+        next_poll = interval
+        previous_count = None
+        last_progress_log = 0
+        
+        while elapsed_time < duration and recorder.is_recording():
+            # Sleep until the next tick or the end of the recording, whichever is sooner
+            time.sleep(max(0, min(self.monitor_min_interval, duration - elapsed_time)))
+            elapsed_time = time.monotonic() - start_time
+            
+            if self._driver_hung():
+                if not self._recover_in_call(captions):
+                    print(f"  [{elapsed_time:.0f}s] Browser session lost. Ending recording...")
+                    return 'hung'
+                elapsed_time = time.monotonic() - start_time
+                continue
+            
+            call_state = self.get_call_state()
+            if call_state:
+                print(f"  [{elapsed_time:.0f}s] Call is over ({call_state}). Ending recording...")
+                return call_state
+            
+            if self.lease and self.lease.lost:
+                print(f"  [{elapsed_time:.0f}s] Meeting lease lost. Ending recording...")
+                return 'lease_lost'
+            
+            # Independent of the page, for when Meet's DOM changed and nothing above works
+            if recorder.silence.is_set():
+                print(f"  [{elapsed_time:.0f}s] No audio for {recorder.silent_seconds:.0f} seconds. Ending recording...")
+                return 'silence'
+            
+            if self._recording_dir and self._disk_full(recorder, elapsed_time):
+                print(f"  [{elapsed_time:.0f}s] Disk almost full. Ending recording...")
+                return 'disk_full'
+            
+            # On its own interval, independent of the participant poll backoff
+            if self.slide_capture:
+                self.slide_capture.poll_if_due()
+            
+            if elapsed_time < next_poll and elapsed_time < duration:
+                continue
+            
+            if captions:
+                captions.poll()
+                self._feed_live_minutes(captions.transcript, final=False)
+            
+            if elapsed_time - last_progress_log >= 30:
+                last_progress_log = elapsed_time
+                log_progress = True
+            else:
+                log_progress = False
+            
+            # Check participant count if monitoring is enabled
+            participant_count = None
+            if monitor_participants:
+                try:
+                    participant_count = self.get_participant_count()
+                    if participant_count is not None:
+                        print(f"  [{elapsed_time:.0f}s] Participants detected: {participant_count}")
+                        
+                        # Check if we're the only participant (others have left)
+                        if participant_count <= 1:
+                            print(f"  [{elapsed_time:.0f}s] Only participant detected (others may have left)")
+                            # Double-check after a short wait
+                            time.sleep(self.monitor_min_interval)
+                            call_state = self.get_call_state()
+                            if call_state:
+                                return call_state
+                            participant_count = self.get_participant_count()
+                            if participant_count is not None and participant_count <= 1:
+                                print(f"  [{elapsed_time:.0f}s] Confirmed: Only participant in meeting")
+                                print("  All other participants have left. Ending recording and leaving call...")
+                                return 'alone'
+                    elif log_progress:
+                        # Couldn't determine participant count - continue recording
+                        print(f"  [{elapsed_time:.0f}s] Recording in progress... (unable to detect participant count)")
+                except Exception as e:
+                    # If participant detection fails, continue recording
+                    if log_progress:
+                        print(f"  [{elapsed_time:.0f}s] Recording in progress... (error checking participants: {str(e)})")
+            elif log_progress:
+                # Not monitoring - just show progress
+                print(f"  [{elapsed_time:.0f}s] Recording in progress... ({elapsed_time:.0f}/{duration} seconds)")
+            
+            interval = self._next_poll_interval(interval, previous_count, participant_count)
+            previous_count = participant_count
+            elapsed_time = time.monotonic() - start_time
+            next_poll = elapsed_time + interval
+        
+        return None
+
+    def close(self):
+        """Shut down the browser session if this bot launched its own Chrome"""
+        if self.runtime:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.runtime.stop()
+            self.runtime = None
+
+    def _feed_live_minutes(self, transcript, final):
+        """Pass finished caption segments to the live minutes (the last one may still grow)"""
+        if not self._live_minutes:
+            return
+        end = len(transcript.segments) if final else len(transcript.segments) - 1
+        if end > self._fed_segments:
+            self._live_minutes.add_segments(transcript.segments[self._fed_segments:end])
+            self._fed_segments = end
+        if not final:
+            try:
+                self._live_minutes.update_if_due()
+            except Exception as e:
+                print(f"  Error updating live minutes: {str(e)}")
+
+    def _finish_captions(self, captions, audio_path):
+        """Stop caption collection and save the transcript next to the recording"""
+        if not captions:
+            return
+        self.caption_transcript = captions.stop()
+        self._feed_live_minutes(self.caption_transcript, final=True)
+        captions_path = os.path.splitext(audio_path)[0] + '_captions.json'
+        self.caption_transcript.save(captions_path)
+
+    def _finish_slides(self):
+        """Save the slide manifest and list the slides in the meeting info"""
+        if not self.slide_capture:
+            return
+        self.slide_capture.save()
+        if self.meeting_info is not None:
+            self.meeting_info['slides'] = self.slide_capture.manifest()
+    
+    def _finish_meeting_info(self):
+        """Fill in duration and (from captions) speaker names for the meeting archive"""
+        if not self.meeting_info:
+            return
+        self.meeting_info['duration'] = time.time() - self.meeting_info['started_at']
+        if self.caption_transcript:
+            speakers = {segment['speaker'] for segment in self.caption_transcript.segments}
+            self.meeting_info['participants'] = sorted(speakers - {'Unknown'})
+            # Timestamped lines for the columnar export
+            self.meeting_info['segments'] = self.caption_transcript.segments
+
+def analyze_meeting(bot, audio_path, transcript_source, live_minutes=None, speech_to_text=None):
+    """Produce the minutes of a recorded session: from the live minutes or the caption
+    transcript when there is one, otherwise by transcribing the recording with Whisper"""
+    speech_to_text = speech_to_text or SpeechToText()
+    caption_text = bot.caption_transcript.to_text() if bot.caption_transcript else ''
+    if live_minutes and caption_text:
+        print("\nFinalizing live meeting minutes...")
+        live_minutes.speech_to_text.publish_minutes(live_minutes.finalize(), caption_text, bot.meeting_info)
+    elif transcript_source == 'captions' and caption_text:
+        print("\nStarting analysis of live caption transcript...")
+        speech_to_text.analyze_transcript(caption_text, bot.meeting_info)
+    else:
+        if transcript_source == 'captions':
+            print("No captions were collected, falling back to Whisper transcription")
+        print("\nStarting speech-to-text analysis...")
+        speech_to_text.transcribe(audio_path, bot.meeting_info)
+
 def main():
     DO_ANALYSIS = True
-    temp_dir = tempfile.mkdtemp()
-    audio_path = os.path.join(temp_dir, "output.wav")
+    artifacts = ArtifactStore()
+    session_dir = artifacts.new_dir('raw_audio')
+    audio_path = os.path.join(session_dir, "output.wav")
     # Get configuration from environment variables
-    meet_link = os.getenv('MEET_LINK')
-    duration = int(os.getenv('RECORDING_DURATION', 60))
+    settings = get_settings()
+    meet_link = settings.meet_link
+    duration = settings.recording_duration
+    transcript_source = settings.transcript_source
+    live_minutes_enabled = settings.live_minutes
     
     if not meet_link:
         raise ValueError("MEET_LINK environment variable is required. Please set it in your .env file.")
@@ -656,21 +1256,41 @@ def main():
     print(f"Meet Link: {meet_link}")
     print(f"Recording Duration: {duration} seconds")
     print(f"Audio Output: {audio_path}")
+    print(f"Transcript Source: {transcript_source}")
     print("="*60 + "\n")
     
+    # Claim the meeting before attaching to Chrome, so a duplicate calendar entry costs nothing
+    lease = MeetingLease.for_link(meet_link)
+    if lease and not lease.acquire(wait=settings.meeting_lock_wait):
+        print("Another bot instance is handling this meeting, exiting")
+        return
+    if lease:
+        # Chrome, login and the pre-join page can take longer than MEETING_LOCK_TTL
+        lease.start_renewal()
+    
+    # Captures are written next to the recording
+    profiler, profiling_server = start_profiling(session_dir)
+    
+    obj = None
+    recorded = False
     try:
-        obj = JoinGoogleMeet()
+        obj = JoinGoogleMeet(artifact_store=artifacts)
         obj.Glogin()
         obj.turnOffMicCam(meet_link)
-        obj.AskToJoin(audio_path, duration)
+        live_minutes = None
+        if DO_ANALYSIS and live_minutes_enabled and transcript_source == 'captions':
+            live_minutes = SpeechToText().incremental_minutes()
+        recorded = obj.AskToJoin(audio_path, duration, transcript_source=transcript_source,
+                                 live_minutes=live_minutes, lease=lease)
         
         print("\n" + "="*60)
         print("Recording Phase Complete")
         print("="*60)
         
-        if DO_ANALYSIS:
-            print("\nStarting speech-to-text analysis...")
-            SpeechToText().transcribe(audio_path)
+        if not recorded:
+            print("Nothing was recorded, skipping analysis")
+        elif DO_ANALYSIS:
+            analyze_meeting(obj, audio_path, transcript_source, live_minutes)
         else:
             print("Analysis skipped (DO_ANALYSIS = False)")
             
@@ -681,6 +1301,15 @@ def main():
         import traceback
         traceback.print_exc()
         raise
+    finally:
+        if obj:
+            obj.close()
+        if lease:
+            # Unless this session recorded the meeting, let a standby instance take over
+            lease.release(handled=recorded)
+        if profiling_server:
+            profiling_server.stop()
+        artifacts.release(session_dir)
 
 #call the main function
 if __name__ == "__main__":
@@ -0,0 +1,255 @@
+import os
+import select
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import uuid
+
+from settings import get_settings
+
+
+# Flags for a low-footprint, unattended Chrome. The backgrounding switches keep the
+# meeting tab at full priority even though nobody is looking at it: without them a
+# headless/occluded renderer throttles timers, which delays Meet's audio and our DOM checks.
+CHROME_FLAGS = [
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--disable-gpu',
+    '--disable-software-rasterizer',
+    '--disable-dev-shm-usage',
+    '--disable-extensions',
+    '--disable-component-extensions-with-background-pages',
+    '--disable-background-networking',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication,BackForwardCache',
+    '--renderer-process-limit=2',
+    '--js-flags=--max-old-space-size=512',
+    '--disable-background-timer-throttling',
+    '--disable-renderer-backgrounding',
+    '--disable-backgrounding-occluded-windows',
+    '--autoplay-policy=no-user-gesture-required',
+    # Auto-accept the media permission prompt and use fake mic/camera devices
+    '--use-fake-ui-for-media-stream',
+    '--use-fake-device-for-media-stream',
+    '--window-size=1280,720',
+]
+
+
+def find_linux_chrome():
+    """Chrome/Chromium executable on PATH, or the usual install location"""
+    for name in ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser'):
+        path = shutil.which(name)
+        if path:
+            return path
+    return '/usr/bin/google-chrome'
+
+
+def _pactl(*args):
+    result = subprocess.run(['pactl', *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"pactl {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def _child_pids(pid):
+    """All descendants of pid (Chrome runs browser, GPU, utility and renderer processes)"""
+    children = []
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            direct = [int(child) for child in f.read().split()]
+    except OSError:
+        return children
+    for child in direct:
+        children.append(child)
+        children.extend(_child_pids(child))
+    return children
+
+
+def process_tree_usage(pid):
+    """Sum RSS (bytes) and CPU time (seconds) over pid and its descendants, from /proc"""
+    ticks = os.sysconf('SC_CLK_TCK')
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    rss_bytes = 0
+    cpu_seconds = 0.0
+    processes = 0
+    for process_id in [pid] + _child_pids(pid):
+        try:
+            with open(f'/proc/{process_id}/stat') as f:
+                # Fields after the "(comm)" part; comm may contain spaces
+                fields = f.read().rsplit(')', 1)[1].split()
+            with open(f'/proc/{process_id}/statm') as f:
+                resident_pages = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        cpu_seconds += (int(fields[11]) + int(fields[12])) / ticks
+        rss_bytes += resident_pages * page_size
+        processes += 1
+    return {'rss_bytes': rss_bytes, 'cpu_seconds': cpu_seconds, 'processes': processes}
+
+
+class LinuxRuntime:
+    """Headless Chrome for server deployments, with a per-session PulseAudio null sink.
+
+    Chrome plays the meeting audio into its own null sink, and AudioRecorder records
+    the sink's monitor source, so several bots on one host never hear each other and
+    no sound card is needed. Optionally Chrome runs headful under its own Xvfb display.
+    """
+
+    def __init__(self, chrome_path, debug_port, user_data_dir=None, session_id=None,
+                 headless=None, use_xvfb=None, extra_flags=None):
+        self.chrome_path = chrome_path
+        self.debug_port = int(debug_port)
+        self.session_id = session_id or uuid.uuid4().hex[:8]
+        # A profile made here is a throwaway one, removed again by stop()
+        self._own_profile = not user_data_dir
+        self.user_data_dir = user_data_dir or tempfile.mkdtemp(prefix=f'meetbot_{self.session_id}_')
+        settings = get_settings()
+        if headless is None:
+            headless = settings.chrome_headless
+        if use_xvfb is None:
+            use_xvfb = settings.use_xvfb
+        self.headless = headless
+        self.use_xvfb = use_xvfb and not headless
+        if extra_flags is None:
+            extra_flags = settings.chrome_extra_flags.split()
+        self.extra_flags = extra_flags
+        self.sink_name = f'meetbot_{self.session_id}'
+        self.chrome_process = None
+        self.xvfb_process = None
+        self.display = None
+        self._sink_module = None
+
+    @property
+    def audio_source(self):
+        """PulseAudio source to record from (None when no sink could be created)"""
+        return f'{self.sink_name}.monitor' if self._sink_module else None
+
+    def chrome_args(self):
+        args = [self.chrome_path] + CHROME_FLAGS + [
+            f'--remote-debugging-port={self.debug_port}',
+            f'--user-data-dir={self.user_data_dir}',
+        ]
+        if self.headless:
+            args.append('--headless=new')
+        return args + list(self.extra_flags)
+
+    def _start_xvfb(self, timeout=10):
+        if not shutil.which('Xvfb'):
+            raise RuntimeError("USE_XVFB is enabled but Xvfb is not installed")
+        # With -displayfd Xvfb takes the first free display itself and writes its number
+        # to the pipe once it accepts connections, so bots starting together cannot race
+        # for the same display
+        read_fd, write_fd = os.pipe()
+        try:
+            self.xvfb_process = subprocess.Popen(
+                ['Xvfb', '-displayfd', str(write_fd), '-screen', '0', '1280x720x24', '-nolisten', 'tcp'],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, pass_fds=(write_fd,))
+            os.close(write_fd)
+            write_fd = None
+            output = b''
+            deadline = time.monotonic() + timeout
+            while not output.endswith(b'\n'):
+                ready, _, _ = select.select([read_fd], [], [], max(0, deadline - time.monotonic()))
+                chunk = os.read(read_fd, 16) if ready else b''
+                if not chunk:
+                    break
+                output += chunk
+        finally:
+            os.close(read_fd)
+            if write_fd is not None:
+                os.close(write_fd)
+        if not output.strip().isdigit():
+            try:
+                code = self.xvfb_process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                code = None
+                self.xvfb_process.kill()
+                self.xvfb_process.wait()
+            self.xvfb_process = None
+            if code is not None:
+                raise RuntimeError(f"Xvfb exited with code {code}")
+            raise RuntimeError(f"Xvfb did not report a display within {timeout} seconds")
+        self.display = f':{int(output)}'
+        print(f"Xvfb started on display {self.display}")
+
+    def _create_sink(self):
+        if not shutil.which('pactl'):
+            print("⚠ Warning: pactl not found, meeting audio goes to the default PulseAudio sink")
+            return
+        try:
+            self._sink_module = _pactl(
+                'load-module', 'module-null-sink', f'sink_name={self.sink_name}',
+                f'sink_properties=device.description={self.sink_name}')
+            print(f"PulseAudio null sink created: {self.sink_name}")
+        except RuntimeError as e:
+            print(f"⚠ Warning: Could not create PulseAudio sink: {str(e)}")
+
+    def _wait_for_debug_port(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.chrome_process.poll() is not None:
+                raise RuntimeError(f"Chrome exited with code {self.chrome_process.returncode}")
+            try:
+                with socket.create_connection(('localhost', self.debug_port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise TimeoutError(f"Chrome did not open debug port {self.debug_port} within {timeout} seconds")
+
+    def start(self, timeout=30):
+        """Start Xvfb (optional), the null sink and Chrome; returns when the debug port is open"""
+        if self.use_xvfb:
+            self._start_xvfb()
+        self._create_sink()
+        self._start_chrome(timeout)
+
+    def _start_chrome(self, timeout):
+        env = dict(os.environ)
+        if self.display:
+            env['DISPLAY'] = self.display
+        if self._sink_module:
+            env['PULSE_SINK'] = self.sink_name
+        self.chrome_process = subprocess.Popen(
+            self.chrome_args(), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self._wait_for_debug_port(timeout)
+        mode = 'headless' if self.headless else f'headful on {self.display or "current display"}'
+        print(f"Chrome started ({mode}) on debug port {self.debug_port}, session {self.session_id}")
+
+    def restart_chrome(self, timeout=30):
+        """Replace a hung or crashed Chrome with a new one on the same debug port, display
+        and null sink. The sink's monitor (what AudioRecorder records) stays, so the
+        recording continues through the restart."""
+        if self.chrome_process and self.chrome_process.poll() is None:
+            self.chrome_process.kill()
+            self.chrome_process.wait(timeout=10)
+        self._start_chrome(timeout)
+
+    def resource_usage(self):
+        """RSS and CPU time of the Chrome process tree"""
+        if not self.chrome_process:
+            return {'rss_bytes': 0, 'cpu_seconds': 0.0, 'processes': 0}
+        return process_tree_usage(self.chrome_process.pid)
+
+    def stop(self):
+        """Stop Chrome and Xvfb, remove the null sink and the profile made by __init__"""
+        for process in (self.chrome_process, self.xvfb_process):
+            if process and process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        self.chrome_process = None
+        self.xvfb_process = None
+        if self._sink_module:
+            try:
+                _pactl('unload-module', self._sink_module)
+            except RuntimeError as e:
+                print(f"⚠ Warning: Could not remove PulseAudio sink: {str(e)}")
+            self._sink_module = None
+        if self._own_profile:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self._own_profile = False
@@ -0,0 +1,267 @@
+import json
+import os
+import time
+
+from selenium.webdriver.common.by import By
+
+
+# Google Meet renders captions inside a region whose class names change often,
+# so every lookup goes through an ordered list of selectors (most reliable first).
+CAPTION_REGION_SELECTORS = [
+    'div[role="region"][aria-label*="aption"]',
+    'div[jsname="dsyhDe"]',
+    'div.a4cQT',
+]
+CAPTION_SPEAKER_SELECTORS = [
+    '.NWpY1d',
+    '.zs7s8d',
+    '.KcIKyf',
+]
+CAPTION_TEXT_SELECTORS = [
+    '.ygicle',
+    '.bh44bd',
+    '.iTTPOb',
+]
+# The captions on/off button, whatever its current label ("Turn on captions (c)", "Captions")
+CAPTION_TOGGLE_XPATH = ('//button[@aria-pressed and contains(translate(@aria-label, '
+                        '"ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "caption")]')
+
+# Injected once per page. Each caption block gets a stable id; the pending map keeps
+# only the latest text per block, so repeated DOM updates between two polls collapse
+# into a single entry and blocks that Meet removes from the DOM are not lost. Ids
+# restart at 1 on a new page (a tab reopened after a hang), so every entry also
+# carries the page's random epoch.
+_OBSERVER_SCRIPT = """
+const cfg = arguments[0];
+let state = window.__meetBotCaptions;
+if (!state) {
+    state = window.__meetBotCaptions = {
+        pending: new Map(), ids: new WeakMap(), nextId: 1, observer: null, region: null,
+        epoch: Date.now().toString(36) + Math.random().toString(36).slice(2)
+    };
+}
+function findRegion() {
+    for (const sel of cfg.region) {
+        const el = document.querySelector(sel);
+        if (el) return el;
+    }
+    return null;
+}
+function firstText(block, selectors) {
+    for (const sel of selectors) {
+        const el = block.querySelector(sel);
+        if (el && el.textContent.trim()) return el.textContent.trim();
+    }
+    return '';
+}
+function blockId(block) {
+    let id = state.ids.get(block);
+    if (!id) {
+        id = state.nextId++;
+        state.ids.set(block, id);
+    }
+    return id;
+}
+function readBlock(block) {
+    const speaker = firstText(block, cfg.speaker);
+    let text = firstText(block, cfg.text);
+    if (!text) {
+        text = (block.innerText || '').trim();
+        if (speaker && text.startsWith(speaker)) text = text.slice(speaker.length).trim();
+    }
+    if (!text) return;
+    const id = blockId(block);
+    state.pending.set(id, {block: id, epoch: state.epoch, speaker: speaker, text: text, ts: Date.now() / 1000});
+}
+function scan() {
+    for (const block of state.region.children) readBlock(block);
+}
+if (!state.region || !state.region.isConnected) {
+    if (state.observer) state.observer.disconnect();
+    state.observer = null;
+    state.region = findRegion();
+    if (state.region) {
+        state.observer = new MutationObserver(scan);
+        state.observer.observe(state.region, {childList: true, subtree: true, characterData: true});
+        scan();
+    }
+}
+return state.region !== null;
+"""
+
+_DRAIN_SCRIPT = """
+const state = window.__meetBotCaptions;
+if (!state) return [];
+const entries = Array.from(state.pending.values());
+state.pending.clear();
+return entries;
+"""
+
+_DISCONNECT_SCRIPT = """
+const state = window.__meetBotCaptions;
+if (state && state.observer) state.observer.disconnect();
+if (state) { state.observer = null; state.region = null; }
+"""
+
+
+class CaptionTranscript:
+    """Speaker-labelled transcript built from incrementally updated caption lines."""
+
+    def __init__(self):
+        self.segments = []
+        self._by_block = {}
+
+    @staticmethod
+    def _is_same_line(old_text, new_text):
+        """Meet grows (and sometimes revises) the current caption line in place"""
+        if new_text.startswith(old_text) or old_text.startswith(new_text):
+            return True
+        shared = len(os.path.commonprefix([old_text, new_text]))
+        return shared >= 0.6 * min(len(old_text), len(new_text))
+
+    def add(self, speaker, text, timestamp, block=None):
+        """Add a caption update. Returns True if it produced a new segment."""
+        text = (text or '').strip()
+        if not text:
+            return False
+        speaker = (speaker or '').strip() or 'Unknown'
+
+        segment = self._by_block.get(block) if block is not None else None
+        if segment is None and block is None:
+            # No block identity: only the latest line of the same speaker can be an update
+            for candidate in reversed(self.segments[-3:]):
+                if candidate['speaker'] == speaker:
+                    if self._is_same_line(candidate['text'], text):
+                        segment = candidate
+                    break
+
+        if segment is not None:
+            if segment['text'] != text:
+                segment['text'] = text
+                segment['end'] = timestamp
+            return False
+
+        segment = {'speaker': speaker, 'text': text, 'start': timestamp, 'end': timestamp}
+        self.segments.append(segment)
+        if block is not None:
+            self._by_block[block] = segment
+        return True
+
+    def to_text(self):
+        """Render as 'Speaker: text' lines, merging consecutive lines of one speaker"""
+        lines = []
+        for segment in self.segments:
+            if lines and lines[-1][0] == segment['speaker']:
+                lines[-1][1].append(segment['text'])
+            else:
+                lines.append((segment['speaker'], [segment['text']]))
+        return "\n".join(f"{speaker}: {' '.join(texts)}" for speaker, texts in lines)
+
+    def save(self, file_path):
+        with open(file_path, 'w') as f:
+            json.dump(self.segments, f)
+        print(f"Caption transcript saved as {file_path} ({len(self.segments)} segments)")
+
+
+class LiveCaptions:
+    """Turn on Google Meet live captions and collect them through a MutationObserver."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.transcript = CaptionTranscript()
+        self._attached = False
+
+    def enable(self):
+        """Turn captions on. Only clicks a 'turn on' control, or a captions toggle whose
+        aria-pressed says it is off, so captions are never toggled off."""
+        caption_selectors = [
+            (By.XPATH, '//button[contains(translate(@aria-label, "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "turn on captions")]'),
+            (By.XPATH, '//button[contains(translate(@data-tooltip, "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "turn on captions")]'),
+        ]
+        for selector_type, selector_value in caption_selectors:
+            try:
+                buttons = self.driver.find_elements(selector_type, selector_value)
+                for button in buttons:
+                    if button.is_displayed():
+                        try:
+                            button.click()
+                        except Exception:
+                            self.driver.execute_script("arguments[0].click();", button)
+                        print("✓ Live captions turned on")
+                        return True
+            except Exception:
+                continue
+
+        if self.start():
+            return True
+        # The captions toggle reports its state in aria-pressed; the caption region may
+        # exist under a selector we do not know, so only a toggle that is off is pressed
+        try:
+            toggles = self.driver.find_elements(By.XPATH, CAPTION_TOGGLE_XPATH)
+        except Exception:
+            toggles = []
+        pressed = [toggle.get_attribute('aria-pressed') for toggle in toggles]
+        if 'true' in pressed:
+            print("✓ Live captions are already on")
+            return True
+        if 'false' not in pressed:
+            print("⚠ Warning: Could not turn on live captions: no captions button found")
+            return False
+        toggle = toggles[pressed.index('false')]
+        try:
+            toggle.click()
+            print("✓ Live captions turned on")
+            return True
+        except Exception:
+            pass
+        try:
+            # Meet toggles captions with the "c" keyboard shortcut; they are known to be off
+            self.driver.find_element(By.TAG_NAME, 'body').send_keys('c')
+            print("✓ Live captions turned on with keyboard shortcut")
+            return True
+        except Exception as e:
+            print(f"⚠ Warning: Could not turn on live captions: {str(e)}")
+            return False
+
+    def start(self):
+        """Attach the caption observer (retried on every poll until the caption region exists)"""
+        try:
+            self._attached = bool(self.driver.execute_script(_OBSERVER_SCRIPT, {
+                'region': CAPTION_REGION_SELECTORS,
+                'speaker': CAPTION_SPEAKER_SELECTORS,
+                'text': CAPTION_TEXT_SELECTORS,
+            }))
+        except Exception as e:
+            print(f"  Error attaching caption observer: {str(e)}")
+            self._attached = False
+        return self._attached
+
+    def poll(self):
+        """Move buffered caption updates from the page into the transcript.
+        Returns the number of new segments."""
+        # Re-attach if Meet re-rendered the caption region
+        self.start()
+        try:
+            entries = self.driver.execute_script(_DRAIN_SCRIPT) or []
+        except Exception as e:
+            print(f"  Error reading captions: {str(e)}")
+            return 0
+
+        new_segments = 0
+        for entry in sorted(entries, key=lambda e: e.get('ts', 0)):
+            # Block ids are only unique within one page
+            block = (entry.get('epoch'), entry['block']) if entry.get('block') is not None else None
+            if self.transcript.add(entry.get('speaker'), entry.get('text'),
+                                   entry.get('ts', time.time()), block):
+                new_segments += 1
+        return new_segments
+
+    def stop(self):
+        """Collect the remaining captions and disconnect the observer"""
+        self.poll()
+        try:
+            self.driver.execute_script(_DISCONNECT_SCRIPT)
+        except Exception:
+            pass
+        self._attached = False
+        return self.transcript
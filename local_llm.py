@@ -0,0 +1,146 @@
+"""
+Meeting minutes from a quantized model on the CPU, with llama.cpp (llama-cpp-python),
+for meetings whose transcripts must not leave the host (MINUTES_BACKEND=llama-cpp).
+
+Prompt processing dominates on a CPU: a one-hour transcript is ~10k tokens, read at a
+few hundred tokens per second, while each answer is a few hundred tokens. The four
+analyses of a meeting therefore run as one batch over a shared prompt prefix: the
+transcript comes first and the instruction last, so llama.cpp keeps the evaluated
+transcript in its KV cache and every further instruction only reads its own few tokens.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Optional
+
+from settings import get_settings
+from token_budget import MODELS, ModelInfo
+
+# System prompt of the shared-prefix layout; the task itself follows the transcript
+ANALYST_PROMPT = ("You are a highly skilled assistant that analyses meeting transcripts. The transcript comes "
+                  "first, then the instruction to follow.")
+# The token budget counts with tiktoken, not the model's own tokenizer; keep a margin
+CONTEXT_MARGIN = 0.85
+# Rough CPU speeds of a 7-8B Q4 model on 8 cores, for the pre-flight time estimate only
+CPU_MODEL_INFO = dict(input_price=0.0, output_price=0.0, output_tokens_per_second=8,
+                      prompt_tokens_per_second=150, first_token_seconds=0.1)
+
+
+@dataclass
+class LocalAnswer:
+    text: str
+    # prompt_tokens and completion_tokens, like the usage of an OpenAI response
+    usage: SimpleNamespace
+    seconds: float
+    first_token_seconds: Optional[float]
+    # Leading prompt tokens that were already in the KV cache and not evaluated again
+    reused_tokens: int
+
+    @property
+    def prompt_tokens_per_second(self):
+        evaluated = self.usage.prompt_tokens - self.reused_tokens
+        return evaluated / self.first_token_seconds if self.first_token_seconds else 0.0
+
+    @property
+    def output_tokens_per_second(self):
+        generating = self.seconds - (self.first_token_seconds or 0)
+        return (self.usage.completion_tokens - 1) / generating if generating > 0 else 0.0
+
+
+def _common_prefix(a, b):
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+class LocalLLM:
+    """A GGUF model run on the CPU with llama.cpp (llama-cpp-python, optional dependency).
+
+    Calls are serialized: a llama.cpp context holds one KV cache and is not thread safe.
+
+    Args:
+        model_path: GGUF model file, defaults to LOCAL_MODEL_PATH
+        context: Context size in tokens, defaults to LOCAL_MODEL_CONTEXT
+        threads: CPU threads, defaults to LOCAL_MODEL_THREADS (0: llama.cpp's choice)
+        max_tokens: Longest answer in tokens, defaults to MAX_OUTPUT_TOKENS
+    """
+
+    def __init__(self, model_path=None, context=None, threads=None, max_tokens=None):
+        settings = get_settings()
+        self.model_path = model_path or settings.local_model_path
+        if not self.model_path:
+            raise ValueError("MINUTES_BACKEND=llama-cpp requires LOCAL_MODEL_PATH (a GGUF model file)")
+        try:
+            from llama_cpp import Llama
+        except ImportError:
+            raise ImportError("MINUTES_BACKEND=llama-cpp requires 'pip install llama-cpp-python'")
+        self.context = context or settings.local_model_context
+        self.max_tokens = max_tokens or settings.max_output_tokens
+        threads = settings.local_model_threads if threads is None else threads
+        self.llm = Llama(model_path=self.model_path, n_ctx=self.context, n_threads=threads or None,
+                         n_gpu_layers=0, verbose=False)
+        self.model = f"local/{os.path.basename(self.model_path)}"
+        # So the token budget plans (and chunks) for this model's context, at no cost
+        MODELS[self.model] = ModelInfo(int(self.context * CONTEXT_MARGIN), **CPU_MODEL_INFO)
+        self._lock = threading.Lock()
+
+    def _complete(self, messages, on_text=None):
+        started = time.perf_counter()
+        cached = self.llm.input_ids[:self.llm.n_tokens].tolist()
+        first_token_seconds = None
+        pieces = []
+        for chunk in self.llm.create_chat_completion(messages=messages, temperature=0,
+                                                     max_tokens=self.max_tokens, stream=True):
+            text = chunk['choices'][0]['delta'].get('content')
+            if not text:
+                continue
+            if first_token_seconds is None:
+                first_token_seconds = time.perf_counter() - started
+            pieces.append(text)
+            if on_text:
+                on_text(text)
+        seconds = time.perf_counter() - started
+        # One streamed piece per sampled token; everything else in the context is the prompt
+        completion_tokens = len(pieces)
+        prompt_tokens = max(0, self.llm.n_tokens - max(0, completion_tokens - 1))
+        reused = min(_common_prefix(cached, self.llm.input_ids[:prompt_tokens].tolist()), max(0, prompt_tokens - 1))
+        return LocalAnswer(''.join(pieces), SimpleNamespace(prompt_tokens=prompt_tokens,
+                                                            completion_tokens=completion_tokens),
+                           seconds, first_token_seconds, reused)
+
+    def chat(self, system_prompt, content, on_text=None):
+        """One answer to a system prompt and user content; on_text gets each piece as generated"""
+        messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": content}]
+        with self._lock:
+            return self._complete(messages, on_text)
+
+    def analyze(self, content, instructions, on_text=None):
+        """Answer every instruction about the same content, as one batch.
+
+        The content is the shared prefix of all prompts, evaluated once: llama.cpp reuses
+        the longest prefix of the previous prompt still in its KV cache, and the lock keeps
+        other calls from replacing it in between. on_text(index, text) gets each piece of
+        the answer to instructions[index]. Returns one LocalAnswer per instruction.
+        """
+        answers = []
+        with self._lock:
+            for index, instruction in enumerate(instructions):
+                messages = [
+                    {"role": "system", "content": ANALYST_PROMPT},
+                    {"role": "user", "content": f"Transcript:\n{content}\n\nInstruction: {instruction}"},
+                ]
+                callback = (lambda text, index=index: on_text(index, text)) if on_text else None
+                answers.append(self._complete(messages, callback))
+        return answers
+
+
+@lru_cache(maxsize=None)
+def get_local_llm():
+    """The shared LocalLLM of this process; the model is loaded once"""
+    return LocalLLM()
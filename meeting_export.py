@@ -0,0 +1,373 @@
+"""
+Columnar export of analysed meetings for bulk analytics.
+
+Every meeting becomes one row of the `meetings` table (metadata and minutes) and,
+when caption timestamps exist, rows of the `segments` table (one per caption line).
+Both are written as Parquet (or Arrow IPC) files with a fixed schema, partitioned
+by meeting date:
+
+    <EXPORT_DIR>/meetings/date=2024-05-14/part-<id>.parquet
+    <EXPORT_DIR>/segments/date=2024-05-14/part-<id>.parquet
+
+Readers scan only the columns and dates they ask for (pyarrow.dataset), instead of
+opening every meeting_data_*.json. Requires pyarrow (pip install pyarrow).
+
+Usage:
+    python meeting_export.py import ~/meetings/meeting_data_*.json   # existing minutes files
+    python meeting_export.py import-archive                            # the SQLite meeting archive
+    python meeting_export.py scan --columns started_at,meet_link,duration --since 2024-05-01
+    python meeting_export.py compact                                   # merge small files per date
+"""
+import datetime
+import glob
+import json
+import os
+import re
+import uuid
+
+from meeting_lock import meeting_code
+from settings import get_settings
+
+SCHEMA_VERSION = '1'
+ANALYSIS_FIELDS = ('abstract_summary', 'key_points', 'action_items', 'sentiment')
+TABLES = ('meetings', 'segments')
+FORMATS = {'parquet': 'parquet', 'arrow': 'ipc'}
+# ArtifactStore.new_path adds a unique suffix to the name
+_MEETING_DATA_NAME = re.compile(r'meeting_data_(\d{14})(?:_[0-9a-f]{8})?\.json$')
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("The columnar export requires pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def schemas():
+    """The fixed schema of each table; columns are only ever added at the end"""
+    pa = _pyarrow()
+    timestamp = pa.timestamp('ms', tz='UTC')
+    metadata = {'google_meet_bot_schema': SCHEMA_VERSION}
+    meetings = pa.schema([
+        ('meeting_id', pa.string()),
+        ('meet_link', pa.string()),
+        ('meeting_code', pa.string()),
+        ('started_at', timestamp),
+        ('duration', pa.float64()),
+        ('participants', pa.list_(pa.string())),
+        ('transcript', pa.large_string()),
+        ('abstract_summary', pa.string()),
+        ('key_points', pa.string()),
+        ('action_items', pa.string()),
+        ('sentiment', pa.string()),
+        ('slides', pa.int32()),
+        ('exported_at', timestamp),
+    ], metadata=metadata)
+    segments = pa.schema([
+        ('meeting_id', pa.string()),
+        ('start', timestamp),
+        ('end', timestamp),
+        ('offset', pa.float64()),
+        ('speaker', pa.string()),
+        ('text', pa.string()),
+    ], metadata=metadata)
+    return {'meetings': meetings, 'segments': segments}
+
+
+def default_export_dir():
+    configured = get_settings().export_dir
+    return os.path.expanduser(configured) if configured else None
+
+
+def _as_text(value):
+    """Analysis fields may be strings or lists (incremental minutes)"""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return "\n".join(str(item) for item in value)
+    return str(value)
+
+
+def _to_datetime(epoch):
+    if epoch is None:
+        return None
+    return datetime.datetime.fromtimestamp(epoch, tz=datetime.timezone.utc)
+
+
+class MeetingExporter:
+    """Buffers meetings and writes them as one file per table and date on flush().
+
+    Args:
+        root: Export directory (default EXPORT_DIR)
+        format: "parquet" or "arrow" (Arrow IPC), default EXPORT_FORMAT
+        batch_size: Meetings buffered before an automatic flush, default EXPORT_BATCH_SIZE
+    """
+
+    def __init__(self, root=None, format=None, batch_size=None):
+        settings = get_settings()
+        self.root = root or default_export_dir()
+        if not self.root:
+            raise ValueError("No export directory: set EXPORT_DIR or pass root")
+        self.format = format or settings.export_format
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown export format {self.format!r}, expected one of {', '.join(FORMATS)}")
+        self.batch_size = batch_size or settings.export_batch_size
+        self.schemas = schemas()
+        self._rows = {table: [] for table in TABLES}
+        self._meetings = 0
+        self.files_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def add(self, summary, transcript=None, metadata=None):
+        """Buffer one meeting. Returns its meeting_id.
+
+        Args:
+            summary: Dict with the analysis fields
+            transcript: Transcript text
+            metadata: Optional dict with meet_link, started_at, duration, participants,
+                slides and segments (caption lines with epoch 'start'/'end')
+        """
+        metadata = metadata or {}
+        meeting_id = metadata.get('meeting_id') or uuid.uuid4().hex
+        started_at = metadata.get('started_at')
+        link = metadata.get('meet_link')
+        self._rows['meetings'].append({
+            'meeting_id': meeting_id,
+            'meet_link': link,
+            'meeting_code': meeting_code(link) if link else None,
+            'started_at': _to_datetime(started_at),
+            'duration': metadata.get('duration'),
+            'participants': list(metadata.get('participants') or []),
+            'transcript': _as_text(transcript),
+            **{field: _as_text(summary.get(field)) for field in ANALYSIS_FIELDS},
+            'slides': len(metadata['slides']) if metadata.get('slides') else None,
+            'exported_at': datetime.datetime.now(datetime.timezone.utc),
+        })
+        for segment in metadata.get('segments') or []:
+            self._rows['segments'].append({
+                'meeting_id': meeting_id,
+                'start': _to_datetime(segment.get('start')),
+                'end': _to_datetime(segment.get('end')),
+                'offset': segment['start'] - started_at if started_at and segment.get('start') else None,
+                'speaker': segment.get('speaker'),
+                'text': segment.get('text'),
+                # Segments are filed under the date of their meeting
+                '_started_at': started_at,
+            })
+        self._meetings += 1
+        if self._meetings >= self.batch_size:
+            self.flush()
+        return meeting_id
+
+    @staticmethod
+    def _partition(started_at):
+        if started_at is None:
+            return 'date=unknown'
+        if isinstance(started_at, datetime.datetime):
+            return f"date={started_at.date().isoformat()}"
+        return f"date={_to_datetime(started_at).date().isoformat()}"
+
+    def flush(self):
+        """Write the buffered meetings. Files appear atomically (written under a dot name,
+        which dataset scans skip, then renamed)."""
+        pa = _pyarrow()
+        for table, rows in self._rows.items():
+            by_partition = {}
+            for row in rows:
+                key = row.pop('_started_at', None) if table == 'segments' else row['started_at']
+                by_partition.setdefault(self._partition(key), []).append(row)
+            for partition, partition_rows in by_partition.items():
+                data = pa.Table.from_pylist(partition_rows, schema=self.schemas[table])
+                self._write(data, os.path.join(self.root, table, partition))
+            rows.clear()
+        self._meetings = 0
+
+    def _write(self, data, directory):
+        os.makedirs(directory, exist_ok=True)
+        extension = 'parquet' if self.format == 'parquet' else 'arrow'
+        name = f"part-{uuid.uuid4().hex}.{extension}"
+        temp_path = os.path.join(directory, f".{name}.tmp")
+        write_table(data, temp_path, self.format)
+        os.replace(temp_path, os.path.join(directory, name))
+        self.files_written += 1
+
+
+def write_table(data, path, format='parquet'):
+    pa = _pyarrow()
+    if format == 'parquet':
+        # Text compresses well; zstd decodes about as fast as snappy at a far better ratio
+        pa.parquet.write_table(data, path, compression='zstd')
+    else:
+        with pa.ipc.new_file(path, data.schema) as writer:
+            writer.write_table(data)
+
+
+def export_meeting(summary, transcript=None, metadata=None, root=None):
+    """Export one analysed meeting right away. Returns its meeting_id."""
+    with MeetingExporter(root, batch_size=1) as exporter:
+        return exporter.add(summary, transcript, metadata)
+
+
+def _dataset(root, table, format=None):
+    pa = _pyarrow()
+    path = os.path.join(root or default_export_dir() or '', table)
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"No exported {table} in {path}")
+    return pa.dataset.dataset(path, format=FORMATS[format or get_settings().export_format],
+                              partitioning='hive', schema=_with_date(schemas()[table]))
+
+
+def _with_date(schema):
+    # The partition column is part of every scan, so dates can be pruned before any file is opened
+    return schema.append(_pyarrow().field('date', _pyarrow().string()))
+
+
+def scan(table='meetings', columns=None, since=None, until=None, meet_link=None, root=None, format=None):
+    """Read exported rows as a pyarrow Table, touching only the requested columns.
+
+    Args:
+        table: "meetings" or "segments"
+        columns: Column names to read (default: all)
+        since, until: Only meetings started on or after / before these dates (datetime.date
+            or "YYYY-MM-DD"); whole date partitions outside the range are skipped
+        meet_link: Only this meeting link (meetings table)
+    """
+    pa = _pyarrow()
+    ds = pa.dataset
+    dataset = _dataset(root, table, format)
+    condition = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    if since is not None:
+        condition = both(condition, ds.field('date') >= str(since))
+    if until is not None:
+        condition = both(condition, ds.field('date') < str(until))
+    if meet_link is not None:
+        condition = both(condition, ds.field('meeting_code') == meeting_code(meet_link))
+    return dataset.to_table(columns=columns, filter=condition)
+
+
+def compact(root=None, table=None, format=None):
+    """Merge the files of each date partition into one. Returns the number of files merged."""
+    pa = _pyarrow()
+    root = root or default_export_dir()
+    format = format or get_settings().export_format
+    extension = 'parquet' if format == 'parquet' else 'arrow'
+    merged = 0
+    for name in ([table] if table else TABLES):
+        for directory in sorted(glob.glob(os.path.join(root, name, 'date=*'))):
+            parts = sorted(glob.glob(os.path.join(directory, f'part-*.{extension}')))
+            if len(parts) < 2:
+                continue
+            data = pa.dataset.dataset(parts, format=FORMATS[format], schema=schemas()[name]).to_table()
+            temp_path = os.path.join(directory, f".compact-{uuid.uuid4().hex}.tmp")
+            write_table(data, temp_path, format)
+            os.replace(temp_path, os.path.join(directory, f"part-{uuid.uuid4().hex}.{extension}"))
+            for part in parts:
+                os.remove(part)
+            merged += len(parts)
+    return merged
+
+
+def _meeting_data_started_at(path):
+    """meeting_data_<YYYYmmddHHMMSS>[_<id>].json is named after the local time it was written"""
+    match = _MEETING_DATA_NAME.search(os.path.basename(path))
+    if match:
+        return datetime.datetime.strptime(match.group(1), '%Y%m%d%H%M%S').timestamp()
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        # Reported as unreadable when it is opened
+        return 0.0
+
+
+def import_meeting_data(paths, exporter):
+    """Export existing meeting_data_*.json minutes files. Returns the number imported."""
+    imported = 0
+    # In time order, so each flushed batch covers few dates and writes few files
+    for path in sorted(paths, key=_meeting_data_started_at):
+        try:
+            with open(path) as f:
+                summary = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Warning: Skipping {path}: {str(e)}")
+            continue
+        metadata = {'started_at': _meeting_data_started_at(path), 'slides': summary.get('slides')}
+        exporter.add(summary, metadata=metadata)
+        imported += 1
+    return imported
+
+
+def import_archive(exporter, archive_path=None):
+    """Export every meeting of the SQLite archive (meeting_archive.py). Returns the count."""
+    from meeting_archive import MeetingArchive
+
+    imported = 0
+    with MeetingArchive(archive_path) as archive:
+        for row in archive.conn.execute('SELECT * FROM meetings ORDER BY id'):
+            meeting = MeetingArchive._to_dict(row)
+            meeting['meeting_id'] = f"archive-{meeting['id']}"
+            exporter.add(meeting, meeting.get('transcript'), meeting)
+            imported += 1
+    return imported
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Columnar (Parquet / Arrow) export of analysed meetings.")
+    parser.add_argument("--dir", help="Export directory (default: EXPORT_DIR)")
+    parser.add_argument("--format", choices=FORMATS, help="File format (default: EXPORT_FORMAT)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="Export meeting_data_*.json minutes files")
+    importer.add_argument("paths", nargs="+", help="Files or glob patterns")
+    archive = commands.add_parser("import-archive", help="Export the meetings of the SQLite archive")
+    archive.add_argument("--db", help="Archive database (default: ARCHIVE_PATH)")
+    reader = commands.add_parser("scan", help="Read exported rows")
+    reader.add_argument("--table", choices=TABLES, default="meetings")
+    reader.add_argument("--columns", help="Comma-separated columns (default: all)")
+    reader.add_argument("--since", help="YYYY-MM-DD")
+    reader.add_argument("--until", help="YYYY-MM-DD")
+    reader.add_argument("--link", dest="meet_link")
+    reader.add_argument("--limit", type=int, default=20, help="Rows to print")
+    commands.add_parser("compact", help="Merge the small files of each date into one")
+    args = parser.parse_args(argv)
+
+    root = args.dir or default_export_dir()
+    if not root:
+        raise SystemExit("Set EXPORT_DIR or pass --dir")
+    started = time.perf_counter()
+    if args.command in ("import", "import-archive"):
+        with MeetingExporter(root, args.format) as exporter:
+            if args.command == "import":
+                paths = [path for pattern in args.paths for path in (sorted(glob.glob(os.path.expanduser(pattern))) or [pattern])]
+                count = import_meeting_data(paths, exporter)
+            else:
+                count = import_archive(exporter, args.db)
+        print(f"✓ Exported {count} meeting(s) to {root} in {time.perf_counter() - started:.1f}s")
+    elif args.command == "scan":
+        columns = args.columns.split(',') if args.columns else None
+        try:
+            data = scan(args.table, columns, args.since, args.until, args.meet_link, root, args.format)
+        except FileNotFoundError as e:
+            raise SystemExit(str(e))
+        for row in data.slice(0, args.limit).to_pylist():
+            print(json.dumps(row, default=str))
+        print(f"{data.num_rows} row(s) in {(time.perf_counter() - started) * 1000:.0f} ms")
+    elif args.command == "compact":
+        print(f"✓ Merged {compact(root, format=args.format)} file(s)")
+
+
+if __name__ == "__main__":
+    main()
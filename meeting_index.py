@@ -0,0 +1,443 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+import zlib
+
+import numpy as np
+
+from settings import get_settings
+
+
+# ---------------------------------------------------------------------------
+# Chunking
+# ---------------------------------------------------------------------------
+
+def chunk_transcript(text, max_words=200, overlap_words=40):
+    """Split a transcript into overlapping chunks of about max_words words.
+
+    Lines (one speaker turn each for caption transcripts) are kept whole where they
+    fit, so a chunk rarely starts in the middle of a sentence; longer lines are split.
+    """
+    words_per_line = []
+    for line in (text or '').splitlines():
+        words = line.split()
+        while len(words) > max_words:
+            words_per_line.append(words[:max_words])
+            words = words[max_words - overlap_words:]
+        if words:
+            words_per_line.append(words)
+
+    chunks = []
+    current = []
+    for words in words_per_line:
+        if current and sum(len(line) for line in current) + len(words) > max_words:
+            chunks.append("\n".join(' '.join(line) for line in current))
+            # Carry the last lines over so an answer spanning the boundary is not lost
+            carried = []
+            while current and sum(len(line) for line in carried) + len(current[-1]) <= overlap_words:
+                carried.insert(0, current.pop())
+            current = carried
+        current.append(words)
+    if current:
+        chunks.append("\n".join(' '.join(line) for line in current))
+    return chunks
+
+
+# ---------------------------------------------------------------------------
+# Embedders: .name, .dim and .embed(texts) -> L2-normalised float32 (n, dim)
+# ---------------------------------------------------------------------------
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+# Words that carry no topic; left in, they dominate hashed vectors of conversational speech
+_STOPWORDS = frozenset("""
+a about all also am an and any are as at be because been but by can could did do does doing for from
+get got had has have he her him his how i if in into is it its just know let like me maybe more my no
+not now of oh ok okay on one or our out really right say see she so some that the their them then there
+these they think this those to too uh um up us very was we well were what when where which who why will
+with would yeah yes you your
+""".split())
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (vectors / norms).astype(np.float32)
+
+
+class HashingEmbedder:
+    """Dependency-free CPU embedder: signed feature hashing of words and word pairs,
+    ignoring stopwords.
+
+    Lexical rather than semantic, but instant and free; good enough to find the
+    passages that talk about a topic, which GPT then reads.
+    """
+
+    def __init__(self, dim=512):
+        self.dim = dim
+        self.name = f'hashing-{dim}'
+
+    def _features(self, text):
+        tokens = [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+        return tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for feature in self._features(text):
+                counts[feature] = counts.get(feature, 0) + 1
+            for feature, count in counts.items():
+                # crc32 is stable across processes, unlike hash()
+                digest = zlib.crc32(feature.encode('utf-8'))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dim] += sign * (1 + math.log(count))
+        return _normalize(vectors)
+
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI API (or any compatible endpoint via OPENAI_BASE_URL)"""
+
+    def __init__(self, client=None, model=None, dim=None, batch_size=256):
+        settings = get_settings()
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+        self.client = client
+        self.model = model or settings.embedding_model or 'text-embedding-3-small'
+        self.dim = dim
+        self.batch_size = batch_size
+        self.name = f'openai-{self.model}'
+
+    def embed(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = list(texts[start:start + self.batch_size])
+            kwargs = {'dimensions': self.dim} if self.dim else {}
+            response = self.client.embeddings.create(model=self.model, input=batch, **kwargs)
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        result = _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1))
+        self.dim = result.shape[1]
+        return result
+
+
+class SentenceTransformerEmbedder:
+    """Local semantic embeddings with sentence-transformers (optional dependency)"""
+
+    def __init__(self, model=None):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("EMBEDDER=sentence-transformers requires 'pip install sentence-transformers'")
+        self.model_name = model or get_settings().embedding_model or 'all-MiniLM-L6-v2'
+        self.model = SentenceTransformer(self.model_name, device='cpu')
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f'st-{self.model_name}'
+
+    def embed(self, texts):
+        return _normalize(np.asarray(self.model.encode(list(texts), batch_size=32), dtype=np.float32))
+
+
+def make_embedder(kind=None, client=None):
+    """Embedder selected by EMBEDDER: hashing (default), openai or sentence-transformers"""
+    kind = kind or get_settings().embedder
+    if kind == 'hashing':
+        return HashingEmbedder()
+    if kind == 'openai':
+        return OpenAIEmbedder(client)
+    if kind == 'sentence-transformers':
+        return SentenceTransformerEmbedder()
+    raise ValueError(f"Unknown EMBEDDER {kind!r}, expected hashing, openai or sentence-transformers")
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+def _kmeans(vectors, clusters, iterations=10, seed=0):
+    """Spherical k-means (cosine) on normalised vectors; returns normalised centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty clusters with random points
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS chunks (
+    row INTEGER PRIMARY KEY,
+    meeting_id INTEGER,
+    chunk_no INTEGER NOT NULL,
+    started_at REAL,
+    meet_link TEXT,
+    text TEXT NOT NULL,
+    list_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS chunks_list ON chunks (list_id);
+CREATE INDEX IF NOT EXISTS chunks_meeting ON chunks (meeting_id);
+CREATE INDEX IF NOT EXISTS chunks_started_at ON chunks (started_at);
+"""
+
+
+class MeetingIndex:
+    """Chunk embeddings of all meetings, for "what did we say about X" questions.
+
+    Vectors live in a memory-mapped float16 matrix (vectors.f16) that grows by
+    doubling, so adding a meeting appends rows instead of rewriting the file and the
+    OS only pages in what a query touches. Chunk text and metadata are in SQLite.
+
+    Search is exact until train_at chunks exist. Then an inverted-file (IVF) index is
+    trained once: k-means centroids partition the vectors, every new chunk is filed
+    under its nearest centroid as it is added, and a query only scores the chunks of
+    the nprobe closest partitions.
+    """
+
+    def __init__(self, path=None, embedder=None, train_at=2048, nprobe=8):
+        settings = get_settings()
+        self.path = os.path.expanduser(path or settings.vector_index_dir or
+                                       os.path.join('~', '.google_meet_bot', 'vectors'))
+        os.makedirs(self.path, exist_ok=True)
+        self.embedder = embedder or make_embedder()
+        self.train_at = train_at
+        self.nprobe = nprobe
+        self.conn = sqlite3.connect(os.path.join(self.path, 'index.db'))
+        self.conn.executescript(_SCHEMA)
+        self._vectors_path = os.path.join(self.path, 'vectors.f16')
+        self._centroids_path = os.path.join(self.path, 'centroids.npy')
+        self.dim = self._meta('dim', int)
+        name = self._meta('embedder')
+        if name and name != self.embedder.name:
+            raise ValueError(f"Index at {self.path} was built with embedder {name}, not {self.embedder.name}")
+        self.count = self.conn.execute('SELECT COUNT(*) FROM chunks').fetchone()[0]
+        self.capacity = self._meta('capacity', int) or 0
+        self.centroids = np.load(self._centroids_path) if os.path.exists(self._centroids_path) else None
+        self._vectors = None
+        if self.dim and self.capacity:
+            self._map(self.capacity)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        self.conn.close()
+
+    def _meta(self, key, convert=str):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return convert(row[0]) if row else None
+
+    def _set_meta(self, **values):
+        self.conn.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                              [(key, str(value)) for key, value in values.items()])
+
+    def _map(self, capacity):
+        """(Re)open the vector file with room for capacity rows"""
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        size = capacity * self.dim * 2
+        mode = 'r+b' if os.path.exists(self._vectors_path) else 'w+b'
+        with open(self._vectors_path, mode) as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float16, mode='r+', shape=(capacity, self.dim))
+        self.capacity = capacity
+
+    def _ensure_capacity(self, rows):
+        if rows <= self.capacity:
+            return
+        capacity = max(1024, self.capacity)
+        while capacity < rows:
+            capacity *= 2
+        self._map(capacity)
+
+    def _assign(self, vectors):
+        if self.centroids is None:
+            return [None] * len(vectors)
+        return np.argmax(vectors @ self.centroids.T, axis=1).tolist()
+
+    def has_meeting(self, meeting_id):
+        return self.conn.execute('SELECT 1 FROM chunks WHERE meeting_id = ? LIMIT 1', (meeting_id,)).fetchone() is not None
+
+    def last_meeting_id(self):
+        return self.conn.execute('SELECT MAX(meeting_id) FROM chunks').fetchone()[0] or 0
+
+    def add_meeting(self, meeting_id, transcript, started_at=None, meet_link=None):
+        """Chunk, embed and append one meeting. Returns the number of chunks added."""
+        chunks = chunk_transcript(transcript)
+        if not chunks:
+            return 0
+        vectors = self.embedder.embed(chunks)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._set_meta(dim=self.dim, embedder=self.embedder.name)
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding size {vectors.shape[1]} does not match the index ({self.dim})")
+
+        first = self.count
+        self._ensure_capacity(first + len(chunks))
+        self._vectors[first:first + len(chunks)] = vectors
+        self._vectors.flush()
+        lists = self._assign(vectors)
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO chunks (row, meeting_id, chunk_no, started_at, meet_link, text, list_id) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(first + number, meeting_id, number, started_at, meet_link, text, list_id)
+                 for number, (text, list_id) in enumerate(zip(chunks, lists))])
+            self._set_meta(capacity=self.capacity)
+        self.count += len(chunks)
+
+        if self.centroids is None and self.count >= self.train_at:
+            self.train()
+        return len(chunks)
+
+    def train(self, sample_size=20000):
+        """Build the IVF partitions from the current vectors (done once, automatically)"""
+        rows = np.arange(self.count)
+        if self.count > sample_size:
+            rows = np.sort(np.random.default_rng(0).choice(self.count, sample_size, replace=False))
+        sample = self._vectors[rows].astype(np.float32)
+        clusters = int(min(4096, max(8, math.sqrt(self.count))))
+        self.centroids = _kmeans(sample, min(clusters, len(sample)))
+        np.save(self._centroids_path, self.centroids)
+        assignments = []
+        for start in range(0, self.count, 65536):
+            block = self._vectors[start:min(self.count, start + 65536)].astype(np.float32)
+            assignments.extend(self._assign(block))
+        with self.conn:
+            self.conn.executemany('UPDATE chunks SET list_id = ? WHERE row = ?',
+                                  [(list_id, row) for row, list_id in enumerate(assignments)])
+        print(f"Vector index trained: {len(self.centroids)} partitions over {self.count} chunks")
+
+    def search(self, query, k=8, since=None, until=None, meet_link=None, exact=False):
+        """Top-k chunks most similar to query, as dicts with score, text and meeting metadata"""
+        if not self.count:
+            return []
+        vector = self.embedder.embed([query])[0]
+        clauses, params = [], []
+        if self.centroids is not None and not exact:
+            probes = np.argsort(-(self.centroids @ vector))[:self.nprobe]
+            clauses.append(f"list_id IN ({', '.join('?' for _ in probes)})")
+            params.extend(int(probe) for probe in probes)
+        if since is not None:
+            clauses.append('started_at >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('started_at < ?')
+            params.append(until)
+        if meet_link:
+            clauses.append('meet_link = ?')
+            params.append(meet_link)
+
+        if clauses:
+            where = ' AND '.join(clauses)
+            rows = np.array([row for (row,) in self.conn.execute(f'SELECT row FROM chunks WHERE {where}', params)],
+                            dtype=np.int64)
+            if not len(rows):
+                return []
+            rows.sort()
+            scores = self._vectors[rows].astype(np.float32) @ vector
+        else:
+            rows = np.arange(self.count)
+            scores = np.empty(self.count, dtype=np.float32)
+            for start in range(0, self.count, 65536):
+                end = min(self.count, start + 65536)
+                scores[start:end] = self._vectors[start:end].astype(np.float32) @ vector
+
+        top = np.argsort(-scores)[:k] if len(scores) <= k else np.argpartition(-scores, k)[:k]
+        top = top[np.argsort(-scores[top])]
+        results = []
+        for position in top:
+            row = int(rows[position])
+            meeting_id, chunk_no, started_at, link, text = self.conn.execute(
+                'SELECT meeting_id, chunk_no, started_at, meet_link, text FROM chunks WHERE row = ?',
+                (row,)).fetchone()
+            results.append({'score': float(scores[position]), 'meeting_id': meeting_id, 'chunk_no': chunk_no,
+                            'started_at': started_at, 'meet_link': link, 'text': text})
+        return results
+
+    def index_archive(self, archive):
+        """Add archived meetings that are not indexed yet (meeting_archive.MeetingArchive)"""
+        last = self.last_meeting_id()
+        added = 0
+        for row in archive.conn.execute(
+                'SELECT id, transcript, started_at, meet_link FROM meetings WHERE id > ? ORDER BY id', (last,)):
+            self.add_meeting(row[0], row[1], row[2], row[3])
+            added += 1
+        return added
+
+
+def format_context(chunks):
+    """Render retrieved chunks for the GPT prompt, oldest meeting first"""
+    import datetime
+
+    parts = []
+    for chunk in sorted(chunks, key=lambda c: (c['started_at'] or 0, c['meeting_id'] or 0, c['chunk_no'])):
+        when = (datetime.datetime.fromtimestamp(chunk['started_at']).strftime('%Y-%m-%d')
+                if chunk['started_at'] else 'unknown date')
+        parts.append(f"[Meeting {chunk['meeting_id']}, {when}]\n{chunk['text']}")
+    return "\n\n".join(parts)
+
+
+def index_meeting(meeting_id, transcript, metadata=None, path=None):
+    """Add one meeting to the vector index configured in settings"""
+    metadata = metadata or {}
+    with MeetingIndex(path) as index:
+        return index.add_meeting(meeting_id, transcript, metadata.get('started_at'), metadata.get('meet_link'))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ask questions across archived meetings.")
+    parser.add_argument("question", nargs="*", help="Question to answer from the most relevant transcript passages")
+    parser.add_argument("-k", type=int, default=8, help="Passages sent to GPT")
+    parser.add_argument("--days", type=float, help="Only meetings of the last N days")
+    parser.add_argument("--passages", action="store_true", help="Print the retrieved passages instead of asking GPT")
+    parser.add_argument("--sync", action="store_true", help="Index archived meetings that are not indexed yet")
+    parser.add_argument("--index", help="Index directory (default: VECTOR_INDEX_DIR or ~/.google_meet_bot/vectors)")
+    parser.add_argument("--db", help="Archive database for --sync (default: ARCHIVE_PATH)")
+    args = parser.parse_args(argv)
+
+    with MeetingIndex(args.index) as index:
+        if args.sync:
+            from meeting_archive import MeetingArchive
+
+            with MeetingArchive(args.db) as archive:
+                print(f"Indexed {index.index_archive(archive)} meeting(s), {index.count} chunks in total")
+        if not args.question:
+            return
+        question = ' '.join(args.question)
+        since = time.time() - args.days * 86400 if args.days else None
+        chunks = index.search(question, k=args.k, since=since)
+
+    if args.passages:
+        print(json.dumps(chunks, indent=2))
+        return
+    if not chunks:
+        print("No indexed meetings match.")
+        return
+    from speech_to_text import SpeechToText
+
+    print(SpeechToText().answer_question(question, format_context(chunks)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+import json
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from settings import get_settings
+
+# Standard Meet codes: three groups of letters, the dashes are optional in links
+MEET_CODE = re.compile(r'^([a-z]{3})-?([a-z]{4})-?([a-z]{3})$')
+LEASE_BACKENDS = ('none', 'file', 'sqlite', 'redis')
+
+
+def meeting_code(meet_link):
+    """Normalized Meet code of a link, the same for every way of writing it:
+    "https://meet.google.com/ABC-DEFG-HIJ?authuser=1", "meet.google.com/abcdefghij"
+    and "abc-defg-hij" all give "abc-defg-hij". Nickname links keep their
+    "lookup/<name>" path."""
+    link = meet_link.strip()
+    if '://' not in link:
+        link = '//' + link if '.' in link.split('/')[0] else '///' + link
+    segments = [segment.lower() for segment in urlparse(link).path.split('/') if segment]
+    if not segments:
+        raise ValueError(f"No meeting code in {meet_link!r}")
+    if segments[0] == 'lookup' and len(segments) > 1:
+        return f'lookup/{segments[1]}'
+    match = MEET_CODE.match(segments[0])
+    if match:
+        return '-'.join(match.groups())
+    return segments[0]
+
+
+def default_holder():
+    """Identifies this bot instance in a lease: host, process and a random suffix"""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+@dataclass
+class Lease:
+    holder: str
+    expires_at: float
+    released: bool = False
+
+    @property
+    def expired(self):
+        return self.expires_at <= time.time()
+
+    def available(self, holder, reclaim_released=True):
+        """Whether `holder` may take this lease: it already holds it, or the lease
+        expired (its holder died) or was released (unless reclaim_released is False)"""
+        if self.holder == holder and not self.released:
+            return True
+        if self.released:
+            return reclaim_released
+        return self.expired
+
+
+class FileLeaseBackend:
+    """One JSON file per meeting code in a directory, updated under an OS file lock.
+    For bots on one host (or a shared filesystem with working locks)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, code):
+        return os.path.join(self.directory, code.replace('/', '_') + '.json')
+
+    @contextmanager
+    def _locked(self, code):
+        with open(self._path(code) + '.lock', 'a+b') as lock_file:
+            if os.name == 'nt':
+                import msvcrt
+
+                lock_file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+                try:
+                    yield
+                finally:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read(self, code):
+        try:
+            with open(self._path(code), encoding='utf-8') as f:
+                return Lease(**json.load(f))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+
+    def _write(self, code, lease):
+        path = self._path(code)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(lease.__dict__, f)
+        os.replace(temp_path, path)
+
+    def get(self, code):
+        return self._read(code)
+
+    def acquire(self, code, holder, ttl, reclaim_released=True):
+        with self._locked(code):
+            current = self._read(code)
+            if current and not current.available(holder, reclaim_released):
+                return False, current
+            self._write(code, Lease(holder, time.time() + ttl))
+            return True, current
+
+    def renew(self, code, holder, ttl):
+        with self._locked(code):
+            current = self._read(code)
+            if not current or current.holder != holder or current.released:
+                return False
+            self._write(code, Lease(holder, time.time() + ttl))
+            return True
+
+    def release(self, code, holder, handled=True):
+        with self._locked(code):
+            current = self._read(code)
+            if not current or current.holder != holder:
+                return False
+            self._write(code, Lease(holder, time.time(), released=handled))
+            return True
+
+
+class SQLiteLeaseBackend:
+    """Leases in a SQLite table, changed inside BEGIN IMMEDIATE transactions"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS leases (code TEXT PRIMARY KEY, holder TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, released INTEGER NOT NULL DEFAULT 0)")
+
+    @contextmanager
+    def _transaction(self):
+        # A connection per call, so the renewal thread never shares one with the caller
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _read(connection, code):
+        row = connection.execute("SELECT holder, expires_at, released FROM leases WHERE code = ?", (code,)).fetchone()
+        return Lease(row[0], row[1], bool(row[2])) if row else None
+
+    @staticmethod
+    def _write(connection, code, lease):
+        connection.execute("INSERT OR REPLACE INTO leases (code, holder, expires_at, released) VALUES (?, ?, ?, ?)",
+                           (code, lease.holder, lease.expires_at, int(lease.released)))
+
+    def get(self, code):
+        with self._transaction() as connection:
+            return self._read(connection, code)
+
+    def acquire(self, code, holder, ttl, reclaim_released=True):
+        with self._transaction() as connection:
+            current = self._read(connection, code)
+            if current and not current.available(holder, reclaim_released):
+                return False, current
+            self._write(connection, code, Lease(holder, time.time() + ttl))
+            return True, current
+
+    def renew(self, code, holder, ttl):
+        with self._transaction() as connection:
+            current = self._read(connection, code)
+            if not current or current.holder != holder or current.released:
+                return False
+            self._write(connection, code, Lease(holder, time.time() + ttl))
+            return True
+
+    def release(self, code, holder, handled=True):
+        with self._transaction() as connection:
+            current = self._read(connection, code)
+            if not current or current.holder != holder:
+                return False
+            self._write(connection, code, Lease(holder, time.time(), released=handled))
+            return True
+
+
+# Lua scripts keep each check-and-set atomic on the server. A lease is a hash
+# (holder, released) whose key TTL is the lease: when a holder dies the key expires.
+_REDIS_ACQUIRE = """
+local current = redis.call('HMGET', KEYS[1], 'holder', 'released')
+if current[1] and current[1] ~= ARGV[1] and (current[2] ~= '1' or ARGV[3] ~= '1') then
+    return {0, current[1], current[2], redis.call('PTTL', KEYS[1])}
+end
+redis.call('HSET', KEYS[1], 'holder', ARGV[1], 'released', '0')
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return {1, current[1] or '', current[2] or '0', 0}
+"""
+_REDIS_RENEW = """
+local current = redis.call('HMGET', KEYS[1], 'holder', 'released')
+if current[1] ~= ARGV[1] or current[2] == '1' then return 0 end
+return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+"""
+_REDIS_RELEASE = """
+if redis.call('HGET', KEYS[1], 'holder') ~= ARGV[1] then return 0 end
+if ARGV[3] ~= '1' then return redis.call('DEL', KEYS[1]) end
+redis.call('HSET', KEYS[1], 'released', '1')
+return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+"""
+
+
+class RedisLeaseBackend:
+    """Leases on a Redis-compatible server (Redis, Valkey, KeyDB, ...), shared by a fleet
+    of bots on several hosts. Requires `pip install redis`."""
+
+    def __init__(self, url, prefix='google_meet_bot:lease:', released_ttl=3600):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("MEETING_LOCK=redis requires the redis package: pip install redis")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        # Released leases are kept this long, so standby instances see the meeting was handled
+        self.released_ttl = released_ttl
+        self._acquire = self.client.register_script(_REDIS_ACQUIRE)
+        self._renew = self.client.register_script(_REDIS_RENEW)
+        self._release = self.client.register_script(_REDIS_RELEASE)
+
+    def get(self, code):
+        key = self.prefix + code
+        holder, released = self.client.hmget(key, 'holder', 'released')
+        if holder is None:
+            return None
+        return Lease(holder, time.time() + max(0, self.client.pttl(key)) / 1000, released == '1')
+
+    def acquire(self, code, holder, ttl, reclaim_released=True):
+        acquired, previous, released, pttl = self._acquire(
+            keys=[self.prefix + code], args=[holder, int(ttl * 1000), '1' if reclaim_released else '0'])
+        current = Lease(previous, time.time() + max(0, pttl) / 1000, released == '1') if previous else None
+        return bool(acquired), current
+
+    def renew(self, code, holder, ttl):
+        return bool(self._renew(keys=[self.prefix + code], args=[holder, int(ttl * 1000)]))
+
+    def release(self, code, holder, handled=True):
+        return bool(self._release(keys=[self.prefix + code],
+                                  args=[holder, int(self.released_ttl * 1000), '1' if handled else '0']))
+
+
+def default_lock_path(backend):
+    configured = get_settings().meeting_lock_path
+    if configured:
+        return os.path.expanduser(configured)
+    name = 'locks.db' if backend == 'sqlite' else 'locks'
+    return os.path.join(os.path.expanduser('~'), '.google_meet_bot', name)
+
+
+def open_lease_backend(backend=None):
+    """The lease backend configured by MEETING_LOCK, or None when locking is off"""
+    settings = get_settings()
+    backend = backend or settings.meeting_lock
+    if backend not in LEASE_BACKENDS:
+        raise ValueError(f"Unknown MEETING_LOCK {backend!r}, expected one of {', '.join(LEASE_BACKENDS)}")
+    if backend == 'file':
+        return FileLeaseBackend(default_lock_path(backend))
+    if backend == 'sqlite':
+        return SQLiteLeaseBackend(default_lock_path(backend))
+    if backend == 'redis':
+        return RedisLeaseBackend(settings.meeting_lock_url)
+    return None
+
+
+class MeetingLease:
+    """Exclusive, expiring claim on one meeting, so a meeting that is on several
+    calendars is joined, recorded and analysed by only one bot instance.
+
+    The holder renews the lease every ttl/3 seconds from a background thread
+    (start_renewal). If it dies, the lease expires after `ttl` seconds and an
+    instance standing by in acquire(wait=...) takes over, as it does when the holder
+    gives up without recording (release(handled=False)). A released lease means the
+    meeting was handled, so instances standing by give up instead.
+    """
+
+    def __init__(self, backend, code, ttl=None, holder=None):
+        self.backend = backend
+        self.code = code
+        self.ttl = ttl if ttl is not None else get_settings().meeting_lock_ttl
+        self.holder = holder or default_holder()
+        self.held = False
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def for_link(cls, meet_link, backend=None, **kwargs):
+        """Lease for a Meet link with the configured backend, or None when MEETING_LOCK is off"""
+        backend = backend or open_lease_backend()
+        if backend is None:
+            return None
+        return cls(backend, meeting_code(meet_link), **kwargs)
+
+    def acquire(self, wait=0):
+        """Try to take the lease. If another instance holds it, stand by for up to `wait`
+        seconds and take over if that instance stops renewing. Returns True when held."""
+        acquired, current = self.backend.acquire(self.code, self.holder, self.ttl)
+        if not acquired:
+            print(f"Meeting {self.code} is already being handled by {current.holder}")
+            deadline = time.monotonic() + wait
+            while time.monotonic() < deadline:
+                time.sleep(max(0, min(self.ttl / 3, deadline - time.monotonic())))
+                acquired, current = self.backend.acquire(self.code, self.holder, self.ttl, reclaim_released=False)
+                if acquired:
+                    break
+                if current and current.released:
+                    print(f"Meeting {self.code} was handled by {current.holder}")
+                    return False
+            else:
+                return False
+        if current and not current.released and current.holder != self.holder:
+            print(f"✓ Took over meeting {self.code} from {current.holder} (lease expired)")
+        self.held = True
+        self.lost = False
+        return True
+
+    def renew(self):
+        if not self.held:
+            return False
+        try:
+            renewed = self.backend.renew(self.code, self.holder, self.ttl)
+        except Exception as e:
+            # A backend outage is not a lost lease; keep trying until it expires
+            print(f"  Error renewing meeting lease: {str(e)}")
+            return True
+        if not renewed:
+            self.lost = True
+            print(f"⚠ Warning: Lease on meeting {self.code} was lost to another instance")
+        return renewed
+
+    def _renew_loop(self):
+        next_renewal = time.monotonic() + self.ttl / 3
+        while not self._stop.is_set():
+            # Short sleeps so release() does not wait a whole renewal interval
+            time.sleep(max(0, min(1, next_renewal - time.monotonic())))
+            if self._stop.is_set() or time.monotonic() < next_renewal:
+                continue
+            if not self.renew():
+                return
+            next_renewal = time.monotonic() + self.ttl / 3
+
+    def start_renewal(self):
+        """Renew the lease in a background thread until release() (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._renew_loop, name=f'lease-{self.code}', daemon=True)
+        self._thread.start()
+
+    def release(self, handled=True):
+        """Stop renewing. With handled=True the meeting is marked as handled and instances
+        standing by give up; otherwise (nothing was recorded) the lease just expires now,
+        so one of them takes over."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.held:
+            self.held = False
+            try:
+                self.backend.release(self.code, self.holder, handled)
+            except Exception as e:
+                print(f"  Error releasing meeting lease: {str(e)}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
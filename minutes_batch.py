@@ -0,0 +1,333 @@
+import datetime
+import json
+import os
+import time
+from types import SimpleNamespace
+
+from model_routing import validate_answer
+from settings import get_settings
+from token_budget import BATCH_PRICE_FACTOR
+
+BATCH_ENDPOINT = '/v1/chat/completions'
+# Statuses after which a batch no longer changes
+FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+def default_batch_dir():
+    configured = get_settings().batch_dir
+    if configured:
+        return os.path.expanduser(configured)
+    return os.path.join(os.path.expanduser('~'), '.google_meet_bot', 'batches')
+
+
+class MinutesBatch:
+    """Meeting minutes for many meetings through the OpenAI Batch API.
+
+    For meetings where nobody is waiting for the minutes: the analysis requests of
+    all added meetings go into one JSONL file that is submitted as a single batch
+    (half the price of synchronous calls, and outside the per-minute rate limits).
+    Once the batch has finished, collect() fans the answers back out and stores
+    and archives every meeting's minutes exactly like SpeechToText.analyze_transcript.
+
+    Audio cannot be batched, so recordings are still transcribed with Whisper when
+    they are added. Transcripts longer than the model's context are split as planned
+    by the token budget; their parts are batched and only the short merge calls run
+    synchronously on collect. Requests the batch did not answer are retried
+    synchronously as well, so every meeting gets complete minutes.
+
+    The state of a submission is kept in a manifest (BATCH_DIR/<batch id>.json),
+    so the process that collects can be a different one from the one that submitted.
+    It holds the submitted request contents, for retries independent of the current
+    settings, and each meeting's minutes once collected: collecting again returns
+    them without publishing any meeting twice.
+    """
+
+    def __init__(self, speech_to_text, directory=None):
+        self.speech_to_text = speech_to_text
+        self.directory = directory or default_batch_dir()
+        self.batch_id = None
+        self.input_file_id = None
+        self.submitted_at = None
+        self.collected = False
+        # key -> {'transcription', 'metadata', 'contents': [str], 'analyses': {field: {'model', 'parts',
+        # 'merge', 'contents': [index into the meeting's contents]}}, and once collected 'minutes', 'published'}
+        self.meetings = {}
+        self._requests = []
+
+    @classmethod
+    def load(cls, speech_to_text, batch_id, directory=None):
+        batch = cls(speech_to_text, directory)
+        with open(batch.manifest_path(batch_id)) as f:
+            manifest = json.load(f)
+        batch.batch_id = manifest['batch_id']
+        batch.input_file_id = manifest['input_file_id']
+        batch.submitted_at = manifest['submitted_at']
+        batch.collected = manifest['collected']
+        batch.meetings = manifest['meetings']
+        return batch
+
+    def manifest_path(self, batch_id=None):
+        return os.path.join(self.directory, f"{batch_id or self.batch_id}.json")
+
+    def _save(self):
+        manifest = {
+            'batch_id': self.batch_id,
+            'input_file_id': self.input_file_id,
+            'submitted_at': self.submitted_at,
+            'collected': self.collected,
+            'meetings': self.meetings,
+        }
+        temp_path = self.manifest_path() + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, self.manifest_path())
+
+    def add_recording(self, audio_file_path, metadata=None, key=None):
+        """Transcribe a recording now and queue its analyses for the batch"""
+        speech_to_text = self.speech_to_text
+        transcription = speech_to_text.transcribe_audio(speech_to_text.resize_audio_if_needed(audio_file_path))
+        return self.add_transcript(transcription, metadata, key or os.path.basename(audio_file_path))
+
+    def add_transcript(self, transcription, metadata=None, key=None):
+        """Queue the four analyses of a transcript for the batch. Returns the meeting key.
+        Raises token_budget.TokenBudgetError when the meeting is over budget."""
+        if self.batch_id:
+            raise RuntimeError(f"Batch {self.batch_id} was already submitted")
+        key = base = key or "meeting"
+        number = len(self.meetings) + 1
+        if key == "meeting" or key in self.meetings:
+            key = f"{base}-{number}"
+        # A numbered key can be taken as well (e.g. "a-2" added before a second "a")
+        while key in self.meetings:
+            number += 1
+            key = f"{base}-{number}"
+        plans = self.speech_to_text.plan_minutes(transcription)
+        analyses = {}
+        # The analyses mostly share their parts; each distinct one is kept once
+        contents = []
+        for (field, _, prompt), plan in zip(self.speech_to_text.ANALYSES, plans):
+            indexes = []
+            # Like SpeechToText, only the answers that are merged again are capped
+            max_tokens = self.speech_to_text.budget.output_tokens if plan.merge else None
+            for number, content in enumerate(plan.contents):
+                if content not in contents:
+                    contents.append(content)
+                indexes.append(contents.index(content))
+                self._requests.append(self._request_line(f"{key}/{field}/{number}", prompt, content, plan.model,
+                                                         max_tokens))
+            analyses[field] = {'model': plan.model, 'parts': len(plan.contents), 'merge': plan.merge,
+                               'contents': indexes}
+        self.meetings[key] = {'transcription': transcription, 'metadata': metadata, 'contents': contents,
+                              'analyses': analyses}
+        return key
+
+    @staticmethod
+    def _request_line(custom_id, system_prompt, content, model, max_tokens=None):
+        line = {
+            'custom_id': custom_id,
+            'method': 'POST',
+            'url': BATCH_ENDPOINT,
+            'body': {
+                'model': model,
+                'temperature': 0,
+                'messages': [
+                    {'role': 'system', 'content': system_prompt},
+                    {'role': 'user', 'content': content},
+                ],
+            },
+        }
+        if max_tokens:
+            line['body']['max_tokens'] = max_tokens
+        return line
+
+    def submit(self, completion_window=None):
+        """Upload the queued requests as one JSONL file and create the batch. Returns the batch id."""
+        if not self._requests:
+            raise RuntimeError("No meetings were added to the batch")
+        client = self.speech_to_text.client
+        os.makedirs(self.directory, exist_ok=True)
+        input_path = os.path.join(self.directory, f'batch_input_{datetime.datetime.now().strftime("%Y%m%d%H%M%S%f")}.jsonl')
+        with open(input_path, 'w') as f:
+            for request in self._requests:
+                f.write(json.dumps(request) + "\n")
+        with open(input_path, 'rb') as f:
+            input_file = client.files.create(file=f, purpose='batch')
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=completion_window or get_settings().batch_completion_window,
+            metadata={'source': 'google-meet-bot', 'meetings': str(len(self.meetings))}
+        )
+        os.remove(input_path)
+        self.batch_id = batch.id
+        self.input_file_id = input_file.id
+        self.submitted_at = time.time()
+        self._save()
+        print(f"Batch {batch.id} submitted: {len(self.meetings)} meeting(s), {len(self._requests)} request(s)")
+        return batch.id
+
+    def status(self):
+        return self.speech_to_text.client.batches.retrieve(self.batch_id)
+
+    def wait(self, poll_interval=None, timeout=None):
+        """Poll until the batch is finished (completed, failed, expired or cancelled)"""
+        poll_interval = poll_interval or get_settings().batch_poll_interval
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            batch = self.status()
+            counts = batch.request_counts
+            if counts:
+                print(f"Batch {batch.id}: {batch.status}, {counts.completed}/{counts.total} done, {counts.failed} failed")
+            if batch.status in FINAL_STATUSES:
+                return batch
+            if deadline and time.monotonic() > deadline:
+                raise TimeoutError(f"Batch {batch.id} still {batch.status} after {timeout}s")
+            time.sleep(poll_interval)
+
+    def _read_results(self, file_id):
+        """custom_id -> chat completion body for every answered request of a result file"""
+        if not file_id:
+            return {}
+        results = {}
+        for line in self.speech_to_text.client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get('response') or {}
+            if response.get('status_code') == 200:
+                results[result['custom_id']] = response['body']
+        return results
+
+    def collect(self, publish=True):
+        """Fan the batch's answers back out into per-meeting minutes.
+
+        Merges of chunked transcripts and requests the batch did not answer are run
+        synchronously. With publish, every meeting is stored as JSON and archived
+        like a synchronously analysed one. Each meeting's minutes are saved in the
+        manifest as soon as they are done, so collecting again (or after a crash)
+        neither repeats its requests nor publishes it twice. Returns {meeting key: minutes}.
+        """
+        pending = [key for key, meeting in self.meetings.items() if 'minutes' not in meeting]
+        results = {}
+        if pending:
+            batch = self.status()
+            if batch.status not in FINAL_STATUSES:
+                raise RuntimeError(f"Batch {self.batch_id} is still {batch.status}")
+            results = self._read_results(batch.output_file_id)
+        speech_to_text = self.speech_to_text
+        all_minutes = {}
+        retried = 0
+        for key, meeting in self.meetings.items():
+            if 'minutes' in meeting:
+                minutes = meeting['minutes']
+            else:
+                minutes, meeting_retried = self._collect_meeting(key, meeting, results)
+                retried += meeting_retried
+                meeting['minutes'] = minutes
+                meeting['published'] = False
+                self._save()
+            all_minutes[key] = minutes
+            if publish and not meeting['published']:
+                print(f"Meeting {key}:")
+                speech_to_text.publish_minutes(minutes, meeting['transcription'], meeting['metadata'])
+                meeting['published'] = True
+                self._save()
+        if not pending:
+            print(f"Batch {self.batch_id} was already collected")
+            return all_minutes
+        self.collected = True
+        self._save()
+        print(f"Batch {self.batch_id} collected: {len(pending)} meeting(s), {retried} request(s) retried synchronously")
+        print("Token usage:\n" + speech_to_text.usage.report())
+        return all_minutes
+
+    def _collect_meeting(self, key, meeting, results):
+        """One meeting's minutes from the batch results. Returns (minutes, requests retried)"""
+        speech_to_text = self.speech_to_text
+        minutes = {}
+        retried = 0
+        for field, label, prompt in speech_to_text.ANALYSES:
+            analysis = meeting['analyses'][field]
+            model = analysis['model']
+            answers = []
+            for number in range(analysis['parts']):
+                body = results.get(f"{key}/{field}/{number}")
+                if body is not None:
+                    speech_to_text.usage.record(f"{label} (batch)", model,
+                                                SimpleNamespace(usage=SimpleNamespace(**body['usage'])),
+                                                time.perf_counter(), price_factor=BATCH_PRICE_FACTOR)
+                    answers.append(body['choices'][0]['message']['content'])
+                    continue
+                # The part exactly as submitted; the settings may have changed since
+                retried += 1
+                content = meeting['contents'][analysis['contents'][number]]
+                answers.append(speech_to_text._chat(prompt, content, f"{label} retry", model))
+            if analysis['merge']:
+                minutes[field] = speech_to_text._merge_parts(prompt, answers, label, model)
+            else:
+                minutes[field] = answers[0]
+            if speech_to_text.router and validate_answer(field, minutes[field]):
+                # A routed model gave an unusable answer: move up its route, synchronously
+                plan = speech_to_text.budget.plan(prompt, meeting['transcription'], model)
+                minutes[field] = speech_to_text._analyze_routed(prompt, meeting['transcription'], label, plan,
+                                                                field, answer=minutes[field])
+        return minutes, retried
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyse many recordings through the OpenAI Batch API.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="Transcribe recordings (or read .txt transcripts) and submit their analyses")
+    submit.add_argument("files", nargs="+", help="Audio files, or .txt transcripts")
+    submit.add_argument("--wait", action="store_true", help="Wait for the batch and collect the minutes")
+    status = commands.add_parser("status", help="Show the status of a batch")
+    status.add_argument("batch_id")
+    collect = commands.add_parser("collect", help="Store the minutes of a finished batch")
+    collect.add_argument("batch_id")
+    collect.add_argument("--wait", action="store_true", help="Wait until the batch is finished")
+    commands.add_parser("list", help="List submitted batches")
+    for command in (submit, collect):
+        command.add_argument("--poll-interval", type=float, help="Seconds between status checks (default: BATCH_POLL_INTERVAL)")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        directory = default_batch_dir()
+        names = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+        for name in names:
+            if name.endswith('.json'):
+                with open(os.path.join(directory, name)) as f:
+                    manifest = json.load(f)
+                submitted = datetime.datetime.fromtimestamp(manifest['submitted_at']).strftime('%Y-%m-%d %H:%M')
+                print(f"{manifest['batch_id']}  {submitted}  {len(manifest['meetings'])} meeting(s)  "
+                      f"{'collected' if manifest['collected'] else 'pending'}")
+        return
+
+    from speech_to_text import SpeechToText
+
+    speech_to_text = SpeechToText()
+    try:
+        batch = speech_to_text.batch_minutes(None if args.command == "submit" else args.batch_id)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if args.command == "submit":
+        for path in args.files:
+            if path.endswith('.txt'):
+                with open(path) as f:
+                    batch.add_transcript(f.read(), key=os.path.basename(path))
+            else:
+                batch.add_recording(path)
+        batch.submit()
+        if not args.wait:
+            return
+    if args.command == "status":
+        print(batch.status())
+        return
+    if args.wait:
+        batch.wait(args.poll_interval)
+    batch.collect()
+
+
+if __name__ == "__main__":
+    main()
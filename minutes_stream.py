@@ -0,0 +1,70 @@
+import json
+import time
+import uuid
+
+
+class MinutesStream:
+    """Append-only NDJSON log of meeting-minutes generation, plus an optional callback.
+
+    One JSON object per line, written and flushed as soon as it happens, so a
+    dashboard can tail the file (or receive the callback) and show the summary
+    while the model is still writing it. Events, all with "run" and "ts":
+      {"type": "start", "field": ...}           analysis of a field begins
+      {"type": "part", "field", "part", "of"}   a part of a chunked transcript was analysed
+      {"type": "delta", "field", "text"}        next piece of the field's text
+      {"type": "done", "field", "text"}         the field's complete text
+      {"type": "minutes", "data": {...}}        the final document, as stored in the JSON file
+    """
+
+    def __init__(self, path=None, callback=None, run_id=None):
+        self.path = path
+        self.callback = callback
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        # Line buffered, so every event reaches the file immediately
+        self._file = open(path, 'a', buffering=1) if path else None
+
+    def emit(self, event_type, **fields):
+        event = {'type': event_type, 'run': self.run_id, 'ts': time.time()}
+        event.update(fields)
+        if self._file:
+            self._file.write(json.dumps(event) + "\n")
+        if self.callback:
+            self.callback(event)
+        return event
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_minutes_stream(path, run_id=None):
+    """Rebuild the text of every field from an NDJSON stream file (of one run, or the last one)"""
+    events = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                events.append(json.loads(line))
+    if run_id is None and events:
+        run_id = events[-1]['run']
+    fields = {}
+    for event in events:
+        if event['run'] != run_id:
+            continue
+        if event['type'] == 'minutes':
+            return dict(event['data'])
+        if event['type'] == 'start':
+            # Again after an answer failed validation (see model_routing.py)
+            fields[event['field']] = ''
+        elif event['type'] == 'delta':
+            fields[event['field']] = fields.get(event['field'], '') + event['text']
+        elif event['type'] == 'done':
+            fields[event['field']] = event['text']
+    return fields
@@ -0,0 +1,267 @@
+"""
+Model routing per analysis task: small, fast models where they do (sentiment, short
+meetings), GPT_MODEL or bigger ones where they are needed.
+
+MODEL_ROUTES is JSON mapping each analysis of the minutes to its tiers of models, in
+order from the smallest. A tier is a model name, or [model, max_tokens] to use it only
+for transcripts of up to max_tokens tokens; the first tier that fits is used. Analyses
+that are not listed, and transcripts longer than every tier allows, use GPT_MODEL:
+
+    {"sentiment": ["gpt-4o-mini"],
+     "abstract_summary": [["gpt-4o-mini", 3000], "gpt-4o"],
+     "key_points": [["gpt-4o-mini", 3000], "gpt-4o"],
+     "action_items": ["gpt-4o"]}
+
+Every answer is validated (see validate_answer). One that fails is analysed again on
+the next tier, and finally on GPT_MODEL. Each call is recorded with its latency, cost
+and validation result in ROUTING_STATS_PATH, so the table can be tuned from data:
+
+    python model_routing.py stats [--days 30]
+    python model_routing.py show
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from settings import get_settings
+
+TASKS = ('abstract_summary', 'key_points', 'action_items', 'sentiment')
+# Transcript token buckets of the stats report, to place the tier thresholds
+LENGTH_BUCKETS = (1000, 4000, 16000, 64000)
+# A summary shorter than this is a non-answer ("The meeting was about a plan.")
+MIN_SUMMARY_WORDS = 15
+_REFUSAL = re.compile(r"^\s*(i'm sorry|i am sorry|sorry,|i cannot|i can't|i'm unable|i am unable|as an ai)", re.I)
+_SENTIMENT = re.compile(r"\b(positive|negative|neutral|mixed)\b", re.I)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS route_calls (
+    id INTEGER PRIMARY KEY,
+    at REAL NOT NULL,
+    task TEXT NOT NULL,
+    model TEXT NOT NULL,
+    transcript_tokens INTEGER,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cost REAL,
+    seconds REAL,
+    valid INTEGER NOT NULL,
+    reason TEXT,
+    fallback INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS route_calls_at ON route_calls (at);
+"""
+
+
+@dataclass(frozen=True)
+class Tier:
+    model: str
+    # Longest transcript (tokens) this tier is used for; None: any length
+    max_tokens: Optional[int] = None
+
+
+def parse_routes(value):
+    """MODEL_ROUTES JSON -> {task: [Tier, ...]}"""
+    if not value:
+        return {}
+    routes = {}
+    for task, tiers in json.loads(value).items():
+        if task not in TASKS:
+            raise ValueError(f"Unknown task {task!r} in MODEL_ROUTES, expected one of {', '.join(TASKS)}")
+        routes[task] = [Tier(tier) if isinstance(tier, str) else Tier(tier[0], int(tier[1])) for tier in tiers]
+    return routes
+
+
+def validate_answer(task, answer):
+    """Why an analysis answer is unusable, or None when it passes"""
+    text = (answer or '').strip()
+    if not text:
+        return 'empty answer'
+    if _REFUSAL.match(text):
+        return 'refusal'
+    if task == 'sentiment' and not _SENTIMENT.search(text):
+        return 'no positive/negative/neutral verdict'
+    if task == 'abstract_summary' and len(text.split()) < MIN_SUMMARY_WORDS:
+        return 'summary too short'
+    return None
+
+
+def default_stats_path():
+    configured = get_settings().routing_stats_path
+    if configured:
+        return os.path.expanduser(configured)
+    return os.path.join(os.path.expanduser('~'), '.google_meet_bot', 'routing.db')
+
+
+def _length_bucket(tokens):
+    """(sort order, label) of the stats bucket of a transcript length"""
+    for index, limit in enumerate(LENGTH_BUCKETS):
+        if tokens <= limit:
+            return index, f"<={limit}"
+    return len(LENGTH_BUCKETS), f">{LENGTH_BUCKETS[-1]}"
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class ModelRouter:
+    """Picks the model of each analysis from MODEL_ROUTES and records how each route does.
+
+    Thread safe: concurrent sessions (fleet.py, the simulation) may share one router.
+
+    Args:
+        routes: {task: [Tier]}, defaults to MODEL_ROUTES
+        default_model: Model of unrouted analyses and the last fallback, defaults to GPT_MODEL
+        stats_path: SQLite file the calls are recorded in, defaults to ROUTING_STATS_PATH;
+            False keeps them in memory only (self.calls)
+    """
+
+    def __init__(self, routes=None, default_model=None, stats_path=None):
+        settings = get_settings()
+        self.routes = parse_routes(settings.model_routes) if routes is None else routes
+        self.default_model = default_model or settings.gpt_model
+        self.stats_path = default_stats_path() if stats_path is None else stats_path
+        self.calls = []
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def route(self, task, transcript_tokens):
+        """Model for one analysis of a transcript of transcript_tokens tokens"""
+        for tier in self.routes.get(task, ()):
+            if tier.max_tokens is None or transcript_tokens <= tier.max_tokens:
+                return tier.model
+        return self.default_model
+
+    def fallback(self, task, model):
+        """The next bigger model after `model` for this task, or None after the last one"""
+        chain = []
+        for name in [tier.model for tier in self.routes.get(task, ())] + [self.default_model]:
+            if name not in chain:
+                chain.append(name)
+        if model not in chain:
+            return None if model == self.default_model else self.default_model
+        index = chain.index(model)
+        return chain[index + 1] if index + 1 < len(chain) else None
+
+    def record(self, task, model, transcript_tokens, usage_records, seconds, reason=None, fallback=False):
+        """Note one routed analysis: its token_budget.UsageRecord entries (parts and merge), wall time and
+        validation result"""
+        call = {
+            'at': time.time(), 'task': task, 'model': model, 'transcript_tokens': transcript_tokens,
+            'prompt_tokens': sum(r.prompt_tokens or 0 for r in usage_records),
+            'completion_tokens': sum(r.completion_tokens or 0 for r in usage_records),
+            'cost': sum(r.cost for r in usage_records), 'seconds': seconds,
+            'valid': int(reason is None), 'reason': reason, 'fallback': int(fallback),
+        }
+        with self._lock:
+            self.calls.append(call)
+            if not self.stats_path:
+                return
+            try:
+                if self._conn is None:
+                    self._conn = _connect(self.stats_path)
+                columns = ', '.join(call)
+                self._conn.execute(f"INSERT INTO route_calls ({columns}) VALUES ({', '.join('?' for _ in call)})",
+                                   tuple(call.values()))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠ Warning: Could not record routing stats: {str(e)}")
+
+    def describe(self):
+        lines = []
+        for task in TASKS:
+            tiers = [f"{tier.model} (<= {tier.max_tokens} tokens)" if tier.max_tokens else tier.model
+                     for tier in self.routes.get(task, ())]
+            if not tiers or self.routes[task][-1].max_tokens is not None:
+                tiers.append(self.default_model)
+            lines.append(f"{task:<17} {' -> '.join(tiers)}")
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _connect(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    # Several bots on one host write to the same file
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA busy_timeout=5000')
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def summarize(calls):
+    """Per route (task, model, transcript length bucket): calls, failed validations,
+    fallback calls, latency percentiles and cost"""
+    groups = {}
+    for call in calls:
+        key = (TASKS.index(call['task']), call['model'], _length_bucket(call['transcript_tokens'] or 0))
+        groups.setdefault(key, []).append(call)
+    rows = []
+    for (task_index, model, (_, bucket)), group in sorted(groups.items()):
+        task = TASKS[task_index]
+        seconds = [call['seconds'] for call in group]
+        rows.append({
+            'task': task, 'model': model, 'tokens': bucket, 'calls': len(group),
+            'invalid': sum(1 for call in group if not call['valid']),
+            'fallbacks': sum(call['fallback'] for call in group),
+            'p50_seconds': statistics.median(seconds), 'p95_seconds': _percentile(seconds, 0.95),
+            'cost': sum(call['cost'] for call in group),
+        })
+    return rows
+
+
+def format_summary(rows):
+    lines = [f"{'task':<17} {'model':<14} {'tokens':>8} {'calls':>6} {'invalid':>8} {'fallback':>9} "
+             f"{'p50 s':>7} {'p95 s':>7} {'cost $':>9} {'$/call':>8}"]
+    for row in rows:
+        lines.append(f"{row['task']:<17} {row['model']:<14} {row['tokens']:>8} {row['calls']:>6} "
+                     f"{row['invalid']:>8} {row['fallbacks']:>9} {row['p50_seconds']:>7.2f} "
+                     f"{row['p95_seconds']:>7.2f} {row['cost']:>9.4f} {row['cost'] / row['calls']:>8.4f}")
+    return "\n".join(lines)
+
+
+def load_calls(path=None, since=None):
+    conn = _connect(path or default_stats_path())
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute("SELECT * FROM route_calls WHERE at >= ? ORDER BY at", (since or 0,)).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Model routing of the minutes analyses and its recorded stats.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    stats = subparsers.add_parser("stats", help="Latency, cost and validation failures per route")
+    stats.add_argument("--days", type=float, help="Only calls of the last N days")
+    stats.add_argument("--db", help="Stats database (default: ROUTING_STATS_PATH or ~/.google_meet_bot/routing.db)")
+    subparsers.add_parser("show", help="The routing table in effect (MODEL_ROUTES)")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        print(ModelRouter(stats_path=False).describe())
+        return
+    since = time.time() - args.days * 86400 if args.days else None
+    calls = load_calls(args.db, since)
+    if not calls:
+        print("No routed calls recorded.")
+        return
+    print(format_summary(summarize(calls)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+On-demand profiling of a running bot, without restarting it.
+
+Nothing is measured until a capture is requested, either by a signal or over a
+local HTTP port (PROFILING_PORT):
+
+    kill -USR1 <pid>          thread stacks, then a CPU profile of all threads
+    kill -USR2 <pid>          memory snapshot, compared with the previous one
+    curl localhost:8790/stacks
+    curl localhost:8790/profile?seconds=10
+    curl localhost:8790/memory            (?stop=1 turns allocation tracing off again)
+
+Captures are written to the output directory (next to the recording) as
+profile_<time>_<kind> files. The CPU profile samples the stacks of every thread from a
+separate thread (cProfile only sees the thread it runs in), so the audio callback,
+the monitor loop and the recorder thread show up as they are, and none of them is
+stopped or instrumented. The samples are saved in the collapsed format that
+flamegraph.pl and speedscope read, plus a summary of the busiest functions.
+"""
+import collections
+import datetime
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from settings import get_settings
+
+# Frames kept per allocation once memory tracing is on
+TRACEMALLOC_FRAMES = 10
+TOP_ENTRIES = 30
+CAPTURE_NAMES = {'stacks': 'Thread stacks', 'cpu': 'CPU profile', 'memory': 'Memory snapshot'}
+
+
+class Profiler:
+    """Stack dumps, sampled CPU profiles and tracemalloc diffs of the current process.
+
+    Args:
+        output_dir: Where the captures are written (created if needed)
+        interval: Seconds between two samples of the CPU profile
+    """
+
+    def __init__(self, output_dir, interval=0.005):
+        self.output_dir = output_dir
+        self.interval = interval
+        self._busy = threading.Lock()
+        self._snapshot = None
+
+    def _path(self, kind, extension='txt'):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
+        return os.path.join(self.output_dir, f"profile_{stamp}_{kind}.{extension}")
+
+    @staticmethod
+    def _thread_names():
+        return {thread.ident: thread.name for thread in threading.enumerate()}
+
+    @staticmethod
+    def _thread_cpu_seconds():
+        """CPU seconds used so far by each thread, by name (Linux only, else empty)"""
+        ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+        usage = {}
+        for thread in threading.enumerate():
+            try:
+                with open(f"/proc/self/task/{thread.native_id}/stat") as f:
+                    # utime and stime follow the parenthesised command name
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except (OSError, IndexError, AttributeError):
+                continue
+            usage[thread.name] = (int(fields[11]) + int(fields[12])) / ticks
+        return usage
+
+    def dump_stacks(self):
+        """Write the current stack of every thread. Returns (path, text)."""
+        names = self._thread_names()
+        lines = []
+        for ident, frame in sys._current_frames().items():
+            if ident == threading.get_ident():
+                continue
+            lines.append(f"Thread {names.get(ident, '?')} ({ident}):")
+            lines.extend(line.rstrip('\n') for line in traceback.format_stack(frame))
+            lines.append('')
+        text = '\n'.join(lines)
+        path = self._path('stacks')
+        with open(path, 'w') as f:
+            f.write(text)
+        return path, text
+
+    def sample(self, seconds):
+        """Sample the stacks of all threads for `seconds`.
+        Writes the collapsed stacks and a summary; returns (summary path, summary text)."""
+        own = threading.get_ident()
+        stacks = collections.Counter()
+        ticks = 0
+        cpu_before = self._thread_cpu_seconds()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = self._thread_names()
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                calls = []
+                while frame is not None:
+                    code = frame.f_code
+                    calls.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                calls.append(names.get(ident, str(ident)))
+                stacks[';'.join(reversed(calls))] += 1
+            ticks += 1
+            time.sleep(self.interval)
+        cpu_after = self._thread_cpu_seconds()
+
+        with open(self._path('cpu', 'folded'), 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        per_thread, own_time, total_time = collections.Counter(), collections.Counter(), collections.Counter()
+        for stack, count in stacks.items():
+            thread, *calls = stack.split(';')
+            per_thread[thread] += count
+            if calls:
+                # Line numbers dropped, so a function counts once however many lines were sampled
+                functions = [call.rsplit(':', 1)[0] for call in calls]
+                own_time[functions[-1]] += count
+                for function in set(functions):
+                    total_time[function] += count
+        # Samples are wall-clock: a thread waiting in sleep() or a lock is sampled as often
+        # as a busy one, hence the CPU time per thread next to its samples
+        lines = [f"{ticks} samples over {seconds:g}s ({self.interval * 1000:g} ms interval)", '',
+                 'Samples per thread (and CPU % of one core, where the OS reports it):']
+        for thread, count in per_thread.most_common():
+            cpu = ''
+            if thread in cpu_before and thread in cpu_after:
+                cpu = f"  {(cpu_after[thread] - cpu_before[thread]) / seconds * 100:5.1f}% CPU"
+            lines.append(f"  {count:>7}{cpu}  {thread}")
+        lines += ['', 'Top functions by own samples (running, or waiting in C code):']
+        lines += [f"  {count:>7}  {function}" for function, count in own_time.most_common(TOP_ENTRIES)]
+        lines += ['', 'Top functions including callees:']
+        lines += [f"  {count:>7}  {function}" for function, count in total_time.most_common(TOP_ENTRIES)]
+        text = '\n'.join(lines) + '\n'
+        path = self._path('cpu')
+        with open(path, 'w') as f:
+            f.write(text)
+        return path, text
+
+    def memory_snapshot(self, stop=False):
+        """Take a tracemalloc snapshot and compare it with the previous one.
+
+        The first call only starts tracing (which costs memory and some speed from then
+        on), so the growth shows up from the second call. stop=True turns tracing off
+        after this snapshot. Returns (path, text).
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._snapshot = None
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"Traced memory: {current / 1024 / 1024:.1f} MB, peak {peak / 1024 / 1024:.1f} MB", '']
+        if self._snapshot is None:
+            lines.append('Allocation tracing started; the next memory capture shows what grew since now.')
+        else:
+            lines.append('Growth since the previous memory capture:')
+            for stat in snapshot.compare_to(self._snapshot, 'traceback')[:TOP_ENTRIES]:
+                lines.append(f"  {stat.size_diff / 1024:+10.1f} KB  {stat.count_diff:+8} blocks  "
+                             f"now {stat.size / 1024:.1f} KB")
+                lines.extend(f"      {line.strip()}" for line in stat.traceback.format(limit=4) if line.strip())
+        self._snapshot = snapshot
+        if stop:
+            tracemalloc.stop()
+            self._snapshot = None
+            lines += ['', 'Allocation tracing stopped.']
+        text = '\n'.join(lines) + '\n'
+        path = self._path('memory')
+        with open(path, 'w') as f:
+            f.write(text)
+        return path, text
+
+    def capture(self, kind, seconds=None, stop=False):
+        """Run one capture ("stacks", "cpu" or "memory"). "cpu" dumps the stacks first.
+        Returns (path, text), or None when another capture is still running."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            if kind == 'stacks':
+                return self.dump_stacks()
+            if kind == 'cpu':
+                self.dump_stacks()
+                return self.sample(seconds if seconds is not None else get_settings().profiling_seconds)
+            if kind == 'memory':
+                return self.memory_snapshot(stop=stop)
+            raise ValueError(f"Unknown capture: {kind}")
+        finally:
+            self._busy.release()
+
+    def capture_in_background(self, kind, **kwargs):
+        """Run a capture on its own thread and print where it was written"""
+        def _run():
+            try:
+                result = self.capture(kind, **kwargs)
+            except Exception as e:
+                print(f"  Error capturing {kind} profile: {str(e)}")
+                return
+            if result is None:
+                print(f"⚠ Warning: A profile capture is already running, {kind} capture skipped")
+            else:
+                print(f"✓ {CAPTURE_NAMES[kind]} written to {result[0]}")
+
+        threading.Thread(target=_run, name=f'profile-{kind}', daemon=True).start()
+
+    def install_signal_handlers(self):
+        """SIGUSR1: stacks and CPU profile, SIGUSR2: memory snapshot.
+        The handlers only start a capture thread, so they return at once."""
+        if not hasattr(signal, 'SIGUSR1') or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.capture_in_background('cpu'))
+        signal.signal(signal.SIGUSR2, lambda signum, frame: self.capture_in_background('memory'))
+        return True
+
+
+class ProfilingServer:
+    """Local HTTP trigger for a Profiler; each capture is answered with its text.
+
+    GET /stacks, GET /profile?seconds=10, GET /memory[?stop=1]
+    """
+
+    def __init__(self, profiler, host='127.0.0.1', port=8790):
+        self.profiler = profiler
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                kinds = {'/stacks': 'stacks', '/profile': 'cpu', '/memory': 'memory'}
+                if url.path not in kinds:
+                    return self._respond(404, "Not found: use /stacks, /profile?seconds=N or /memory\n")
+                kwargs = {}
+                try:
+                    if 'seconds' in query:
+                        kwargs['seconds'] = float(query['seconds'][0])
+                    if url.path == '/memory':
+                        kwargs['stop'] = query.get('stop', ['0'])[0] in ('1', 'true', 'yes')
+                    result = profiler.capture(kinds[url.path], **kwargs)
+                except ValueError as e:
+                    return self._respond(400, f"{str(e)}\n")
+                if result is None:
+                    return self._respond(409, "Another capture is still running\n")
+                path, text = result
+                self._respond(200, f"# {path}\n{text}")
+
+            def _respond(self, status, text):
+                data = text.encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name='profiling-server', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def start_profiling(output_dir):
+    """Set up the profiling triggers enabled in the settings.
+    Returns (profiler, server), both None when profiling is off; server is None without PROFILING_PORT."""
+    settings = get_settings()
+    if not settings.profiling:
+        return None, None
+    profiler = Profiler(output_dir, interval=settings.profiling_interval)
+    triggers = []
+    if profiler.install_signal_handlers():
+        triggers.append(f"kill -USR1/-USR2 {os.getpid()}")
+    server = None
+    if settings.profiling_port:
+        try:
+            server = ProfilingServer(profiler, port=settings.profiling_port).start()
+            triggers.append(server.url)
+        except OSError as e:
+            print(f"⚠ Warning: Profiling port {settings.profiling_port} unavailable: {str(e)}")
+    print(f"Profiling on demand ({', '.join(triggers) or 'no trigger available'}), "
+          f"captures go to {output_dir}")
+    return profiler, server
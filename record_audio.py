@@ -1,25 +1,71 @@
-import sounddevice as sd
-from scipy.io.wavfile import write
-import numpy as np
 import os
 import threading
 import time
-from dotenv import load_dotenv
+from settings import get_settings
 
-load_dotenv()
+# sounddevice (which initializes PortAudio), scipy and numpy are imported where they
+# are used, so importing this module stays cheap
+
+# PULSE_SOURCE is read from the environment when a PulseAudio stream is opened, so
+# streams for different sessions must not open at the same time
+_pulse_env_lock = threading.Lock()
 
 class AudioRecorder:
-    def __init__(self):
-        self.sample_rate = int(os.getenv('SAMPLE_RATE', 44100))
+    def __init__(self, device=None, pulse_source=None, audio_backend=None, silence_timeout=None,
+                 silence_threshold_db=None, on_silence=None):
+        """
+        Args:
+            device: sounddevice input device (name or index), defaults to AUDIO_INPUT_DEVICE or the system default
+            pulse_source: PulseAudio source to record from, e.g. a per-session null sink monitor
+            audio_backend: Module-like object with sounddevice's InputStream/CallbackStop
+                (e.g. simulation.SyntheticSoundDevice); defaults to sounddevice
+            silence_timeout: Seconds of input below silence_threshold_db after which the
+                `silence` event is set and on_silence is called; 0 turns detection off.
+                Defaults to SILENCE_TIMEOUT
+            silence_threshold_db: RMS level in dBFS under which a block counts as silent,
+                defaults to SILENCE_THRESHOLD_DB
+            on_silence: Called with the silent seconds once per silent stretch (on the
+                recording thread, never in the audio callback)
+        """
+        settings = get_settings()
+        self.sample_rate = settings.sample_rate
+        self.device = device or settings.audio_input_device
+        self.pulse_source = pulse_source
+        self.audio_backend = audio_backend
+        if self.pulse_source and not self.device:
+            self.device = 'pulse'
+        self.silence_timeout = settings.silence_timeout if silence_timeout is None else silence_timeout
+        if silence_threshold_db is None:
+            silence_threshold_db = settings.silence_threshold_db
+        # Compared with the mean square of each block, so no square root per block
+        self._silence_mean_square = (10 ** (silence_threshold_db / 20)) ** 2
+        self.on_silence = on_silence
+        # Set while the input has been silent for silence_timeout seconds
+        self.silence = threading.Event()
+        # Levels of the latest block seen by the recording thread (linear, 1.0 = full scale)
+        self.rms = 0.0
+        self.peak = 0.0
+        self._silent_samples = 0
+        # Recorded blocks whose level the recording thread has already measured
+        self._measured_blocks = 0
         self._stop_event = threading.Event()
         self._recording_data = []
         self._recording_thread = None
         self._is_recording = False
 
+    def _sounddevice(self):
+        if self.audio_backend is not None:
+            return self.audio_backend
+        import sounddevice
+        return sounddevice
+
     def get_audio(self, filename, duration):
         """Legacy method: Record for a fixed duration (blocks until complete)"""
+        sd = self._sounddevice()
+        from scipy.io.wavfile import write
+
         print("Recording...")
-        recording = sd.rec(int(duration * self.sample_rate), samplerate=self.sample_rate, channels=1, dtype='int16')
+        recording = sd.rec(int(duration * self.sample_rate), samplerate=self.sample_rate, device=self.device, channels=1, dtype='int16')
         sd.wait()  # Wait until the recording is finished
         write(filename, self.sample_rate, recording)
         print(f"Recording finished. Saved as {filename}.")
@@ -28,29 +74,24 @@ class AudioRecorder:
         """Start recording in a background thread. Can be stopped early with stop_recording()."""
         if self._is_recording:
             raise RuntimeError("Recording is already in progress")
+        sd = self._sounddevice()
         
         self._stop_event.clear()
         self._recording_data = []
+        self._silent_samples = 0
+        self._measured_blocks = 0
+        self.silence.clear()
         self._is_recording = True
         self._filename = filename
-        
-        def _record_callback(indata, frames, time_info, status):
-            if status:
-                print(f"Recording status: {status}")
-            if self._stop_event.is_set():
-                raise sd.CallbackStop()
-            # Copy the input data to avoid overwriting issues
-            self._recording_data.append(indata.copy())
+        self._callback_stop = sd.CallbackStop
         
         def _record_thread():
             try:
                 # Use float32 internally for better quality, convert to int16 when saving
-                with sd.InputStream(samplerate=self.sample_rate, 
-                                  channels=1,
-                                  dtype='float32',
-                                  callback=_record_callback):
+                with self._open_stream(self._record_callback):
                     while not self._stop_event.is_set():
                         time.sleep(0.1)
+                        self._check_silence()
             except sd.CallbackStop:
                 pass
             except Exception as e:
@@ -62,6 +103,78 @@ class AudioRecorder:
         self._recording_thread.start()
         print("Recording started (can be stopped early)...")
 
+    def _record_callback(self, indata, frames, time_info, status):
+        """sounddevice callback; runs on the audio thread for every block, so keep it minimal"""
+        if status:
+            print(f"Recording status: {status}")
+        if self._stop_event.is_set():
+            raise self._callback_stop()
+        # Copy the input data to avoid overwriting issues; levels are measured on the
+        # recording thread (_measure_levels)
+        self._recording_data.append(indata.copy())
+
+    @property
+    def silent_seconds(self):
+        """How long the input has been silent without interruption"""
+        return self._silent_samples / self.sample_rate
+
+    def _measure_levels(self):
+        """Count the silent samples of the blocks recorded since the last call (one dot
+        product each, no temporary arrays) and set rms and peak of the latest one"""
+        blocks = self._recording_data
+        end = len(blocks)
+        for index in range(self._measured_blocks, end):
+            flat = blocks[index].reshape(-1)
+            mean_square = float(flat.dot(flat)) / flat.size
+            if mean_square < self._silence_mean_square:
+                self._silent_samples += len(blocks[index])
+            else:
+                self._silent_samples = 0
+        if end > self._measured_blocks:
+            self.rms = mean_square ** 0.5
+            self.peak = max(float(flat.max()), -float(flat.min()))
+        self._measured_blocks = end
+
+    def _check_silence(self):
+        """Measure the new blocks and turn the silence counter into the `silence` event"""
+        if not self.silence_timeout:
+            return
+        self._measure_levels()
+        silent_seconds = self.silent_seconds
+        if silent_seconds < self.silence_timeout:
+            self.silence.clear()
+        elif not self.silence.is_set():
+            self.silence.set()
+            if self.on_silence:
+                try:
+                    self.on_silence(silent_seconds)
+                except Exception as e:
+                    print(f"Error in on_silence handler: {str(e)}")
+
+    def _open_stream(self, callback):
+        """Open the input stream, routed to pulse_source if one is set"""
+        sd = self._sounddevice()
+
+        def _stream():
+            return sd.InputStream(samplerate=self.sample_rate,
+                                  device=self.device,
+                                  channels=1,
+                                  dtype='float32',
+                                  callback=callback)
+
+        if not self.pulse_source:
+            return _stream()
+        with _pulse_env_lock:
+            previous = os.environ.get('PULSE_SOURCE')
+            os.environ['PULSE_SOURCE'] = self.pulse_source
+            try:
+                return _stream()
+            finally:
+                if previous is None:
+                    os.environ.pop('PULSE_SOURCE', None)
+                else:
+                    os.environ['PULSE_SOURCE'] = previous
+
     def stop_recording(self):
         """Stop the current recording and save the file."""
         if not self._is_recording and not self._recording_data:
@@ -77,20 +190,10 @@ class AudioRecorder:
         
         # Concatenate all recorded chunks
         if self._recording_data:
+            from scipy.io.wavfile import write
+
             try:
-                recording = np.concatenate(self._recording_data, axis=0)
-                
-                # Ensure data is in the right shape (flatten if needed for mono)
-                if len(recording.shape) > 1:
-                    recording = recording.flatten()
-                
-                # Convert to int16 if needed (sounddevice might return float32)
-                if recording.dtype == np.float32 or recording.dtype == np.float64:
-                    # Normalize to -1.0 to 1.0 range, then convert to int16
-                    recording = np.clip(recording, -1.0, 1.0)
-                    recording = (recording * 32767).astype(np.int16)
-                elif recording.dtype != np.int16:
-                    recording = recording.astype(np.int16)
+                recording = self._to_int16(self._recording_data)
                 
                 # Save the recording
                 write(self._filename, self.sample_rate, recording)
@@ -106,6 +209,38 @@ class AudioRecorder:
         
         self._is_recording = False
 
+    @staticmethod
+    def _to_int16(chunks, batch_samples=1 << 20):
+        """Join recorded blocks into one flat int16 array.
+        
+        Blocks are converted in batches of about batch_samples straight into the
+        preallocated output, so peak memory is the recorded blocks plus the int16
+        result instead of several full-length float copies (gigabytes for
+        multi-hour recordings).
+        """
+        import numpy as np
+        
+        total = sum(chunk.size for chunk in chunks)
+        recording = np.empty(total, dtype=np.int16)
+        position = 0
+        index = 0
+        while index < len(chunks):
+            batch = []
+            size = 0
+            while index < len(chunks) and size < batch_samples:
+                batch.append(chunks[index])
+                size += chunks[index].size
+                index += 1
+            # Flatten (mono) blocks; multi-channel blocks stay interleaved
+            flat = np.concatenate([chunk.reshape(-1) for chunk in batch])
+            if flat.dtype.kind == 'f':
+                # Normalize to -1.0 to 1.0 range, then convert to int16 (truncating, like astype)
+                np.clip(flat, -1.0, 1.0, out=flat)
+                flat *= 32767
+            recording[position:position + size] = flat
+            position += size
+        return recording
+
     def is_recording(self):
         """Check if recording is currently in progress."""
         return self._is_recording
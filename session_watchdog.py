@@ -0,0 +1,177 @@
+import json
+import queue
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from selenium.common.exceptions import TimeoutException
+
+# Commands that load a page get the (longer) navigation deadline
+NAVIGATION_COMMANDS = ('get', 'refresh', 'back', 'forward')
+# Seconds between deadline checks while a command runs; a finished command returns at once
+_POLL_SLICE = 0.05
+
+
+class CommandTimeout(TimeoutException):
+    """A browser command did not finish within its deadline; the tab is probably hung"""
+
+
+class _CommandThread(threading.Thread):
+    """Runs driver commands one at a time. A command that never returns only blocks
+    this thread, which GuardedDriver then abandons for a new one."""
+
+    def __init__(self):
+        super().__init__(name='webdriver-commands', daemon=True)
+        self.commands = queue.Queue()
+        self.start()
+
+    def run(self):
+        while True:
+            item = self.commands.get()
+            if item is None:
+                return
+            future, function, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(function(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+def _is_element(value):
+    return hasattr(value, 'click') and hasattr(value, 'find_element') and not isinstance(value, GuardedDriver)
+
+
+class _Guarded:
+    """Proxy whose attribute reads and method calls run on the guard's command thread"""
+
+    def __init__(self, target, guard):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_guard', guard)
+
+    def __getattr__(self, name):
+        guard = self._guard
+        if callable(getattr(type(self._target), name, None)):
+            # A method: looking it up does not talk to the browser
+            value = getattr(self._target, name)
+        else:
+            # Properties such as current_url or text are browser commands themselves
+            value = guard.run(f'.{name}', getattr, self._target, name)
+        if not callable(value):
+            return guard.wrap(value)
+
+        def command(*args, **kwargs):
+            timeout = guard.navigation_timeout if name in NAVIGATION_COMMANDS else None
+            args = [getattr(arg, '_target', arg) if isinstance(arg, _Guarded) else arg for arg in args]
+            return guard.wrap(guard.run(f'{name}()', value, *args, timeout=timeout, **kwargs))
+        return command
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+
+class GuardedElement(_Guarded):
+    """An element of a GuardedDriver; its commands have the same deadline"""
+
+
+class GuardedDriver(_Guarded):
+    """Wraps a WebDriver (or cdp_driver.CDPDriver, or the simulation's fake) so that no
+    command can block the caller for longer than `timeout` seconds (`navigation_timeout`
+    for page loads).
+
+    Commands run on a separate thread. When one misses its deadline it raises
+    CommandTimeout, the driver is marked `hung`, and every further command fails at once
+    with CommandTimeout instead of queueing behind the stuck one, until probe() finds the
+    tab answering again. JoinGoogleMeet checks `hung` in its lobby and monitor loops and
+    recovers the session (see JoinGoogleMeet._recover_session).
+    """
+
+    def __init__(self, driver, timeout=30, navigation_timeout=90):
+        super().__init__(driver, self)
+        object.__setattr__(self, 'timeout', timeout)
+        object.__setattr__(self, 'navigation_timeout', navigation_timeout)
+        object.__setattr__(self, 'hung', False)
+        object.__setattr__(self, 'hung_command', None)
+        object.__setattr__(self, 'hung_since', None)
+        object.__setattr__(self, '_thread', _CommandThread())
+
+    @property
+    def driver(self):
+        """The wrapped driver"""
+        return self._target
+
+    def wrap(self, value):
+        if _is_element(value):
+            return GuardedElement(value, self)
+        if isinstance(value, list) and value and all(_is_element(item) for item in value):
+            return [GuardedElement(item, self) for item in value]
+        return value
+
+    def run(self, description, function, *args, timeout=None, **kwargs):
+        """Run function(*args) on the command thread and wait at most `timeout` seconds"""
+        if self.hung:
+            raise CommandTimeout(f"Browser is not responding (no answer to {self.hung_command})")
+        timeout = timeout or self.timeout
+        future = Future()
+        started = time.monotonic()
+        self._thread.commands.put((future, function, args, kwargs))
+        deadline = started + timeout
+        while True:
+            try:
+                return future.result(timeout=_POLL_SLICE)
+            except FutureTimeout:
+                # The command itself may have raised a TimeoutError
+                if future.done():
+                    return future.result()
+                if time.monotonic() < deadline:
+                    continue
+            future.cancel()
+            object.__setattr__(self, 'hung', True)
+            object.__setattr__(self, 'hung_command', description)
+            object.__setattr__(self, 'hung_since', started)
+            # Leave the stuck thread behind (it exits if the command ever returns)
+            self._thread.commands.put(None)
+            object.__setattr__(self, '_thread', _CommandThread())
+            raise CommandTimeout(f"{description} did not finish within {timeout:.0f} seconds")
+
+    def probe(self, timeout=5):
+        """Clear the hung state if the page answers a trivial script within `timeout` seconds"""
+        object.__setattr__(self, 'hung', False)
+        try:
+            self.run('probe', self._target.execute_script, "return 1;", timeout=timeout)
+            return True
+        except CommandTimeout:
+            return False
+        except Exception:
+            # Answered, even if with an error: the browser is alive
+            return True
+
+    def abandon(self):
+        """Quit the wrapped driver in the background (it may never return) and stop its thread"""
+        self._thread.commands.put(None)
+        threading.Thread(target=self._quit_quietly, daemon=True).start()
+
+    def _quit_quietly(self):
+        try:
+            self._target.quit()
+        except Exception:
+            pass
+
+
+def reopen_meeting_tab(debug_port, url_fragment='meet.google.com', timeout=5):
+    """Open a blank tab and close the tabs showing `url_fragment` through Chrome's DevTools
+    HTTP endpoints. The browser process serves these, so they work while a renderer is hung.
+    Returns the number of tabs closed."""
+    base = f"http://localhost:{debug_port}/json"
+    with urllib.request.urlopen(f"{base}/list", timeout=timeout) as response:
+        targets = json.load(response)
+    # Chrome wants PUT for /json/new; older versions accept GET
+    urllib.request.urlopen(urllib.request.Request(f"{base}/new?about:blank", method='PUT'), timeout=timeout).close()
+    closed = 0
+    for target in targets:
+        if target.get('type') == 'page' and url_fragment in target.get('url', ''):
+            urllib.request.urlopen(f"{base}/close/{target['id']}", timeout=timeout).close()
+            closed += 1
+    return closed
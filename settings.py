@@ -0,0 +1,236 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+
+def _env_str(name, default=None):
+    value = os.getenv(name)
+    return value if value not in (None, '') else default
+
+
+def _env_int(name, default):
+    return int(_env_str(name, default))
+
+
+def _env_float(name, default):
+    return float(_env_str(name, default))
+
+
+def _env_bool(name, default):
+    return str(_env_str(name, default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+@dataclass(frozen=True)
+class Settings:
+    """All configuration, read once from the environment (and .env) by get_settings()"""
+
+    # Google account
+    email_id: Optional[str] = None
+    email_password: Optional[str] = None
+
+    # Meeting
+    meet_link: Optional[str] = None
+    recording_duration: int = 60
+    transcript_source: str = 'whisper'
+    # Do not receive or render participant video (see audio_only.py)
+    audio_only: bool = False
+    live_minutes: bool = False
+    minutes_update_interval: float = 5
+    lobby_timeout: float = 600
+    lobby_max_retries: int = 2
+    monitor_min_interval: float = 2
+    monitor_max_interval: float = 30
+    # Save the distinct slides of a shared screen (see slide_capture.py)
+    slide_capture: bool = False
+    slide_capture_interval: float = 5
+    slide_hash_threshold: int = 6
+
+    # Audio
+    sample_rate: int = 44100
+    audio_input_device: Optional[str] = None
+    max_audio_size_bytes: int = 20 * 1024 * 1024
+    # Leave after this many seconds of silence, whatever the page shows; 0 to disable
+    silence_timeout: float = 600
+    silence_threshold_db: float = -50
+
+    # Recordings, transcripts and minutes files (see artifact_store.py)
+    artifact_root: Optional[str] = None
+    artifact_budget_mb: int = 10240
+    artifact_retention_days: str = 'raw_audio=7,compressed_audio=2,transcripts=90,json=90'
+    min_free_disk_mb: int = 1024
+
+    # OpenAI
+    openai_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None
+    gpt_model: str = 'gpt-4'
+    whisper_model: str = 'whisper-1'
+    # Minutes from the OpenAI API, or on this host's CPU with llama.cpp (see local_llm.py)
+    minutes_backend: str = 'openai'
+    local_model_path: Optional[str] = None
+    local_model_context: int = 8192
+    local_model_threads: int = 0
+
+    # Token budget for GPT calls (see token_budget.py)
+    token_policy: str = 'chunk'
+    max_cost_per_meeting: float = 0
+    fallback_models: str = 'gpt-4o-mini,gpt-4o,gpt-4-turbo'
+    max_output_tokens: int = 1024
+    model_info: Optional[str] = None
+    # Model tiers per analysis (see model_routing.py), off without a table
+    model_routes: Optional[str] = None
+    routing_stats_path: Optional[str] = None
+    stream_minutes: bool = False
+    minutes_stream_path: Optional[str] = None
+    # Batch API submissions (see minutes_batch.py)
+    batch_dir: Optional[str] = None
+    batch_poll_interval: float = 60
+    batch_completion_window: str = '24h'
+
+    # Meeting archive
+    archive_meetings: bool = True
+    archive_path: Optional[str] = None
+
+    # Columnar export for analytics (see meeting_export.py), off without a directory
+    export_dir: Optional[str] = None
+    export_format: str = 'parquet'
+    export_batch_size: int = 500
+
+    # Vector index for questions across meetings
+    vector_index: bool = False
+    vector_index_dir: Optional[str] = None
+    embedder: str = 'hashing'
+    embedding_model: Optional[str] = None
+
+    # Lease per meeting code, so duplicate calendar entries are joined once (see meeting_lock.py)
+    meeting_lock: str = 'none'
+    meeting_lock_path: Optional[str] = None
+    meeting_lock_url: str = 'redis://localhost:6379/0'
+    meeting_lock_ttl: float = 60
+    meeting_lock_wait: float = 0
+
+    # Coordinator and workers on several hosts (see fleet.py)
+    fleet_coordinator_url: str = 'http://localhost:8700'
+    fleet_db_path: Optional[str] = None
+    fleet_token: Optional[str] = None
+    worker_capacity: int = 2
+    fleet_heartbeat_interval: float = 5
+    fleet_heartbeat_timeout: float = 20
+    fleet_max_attempts: int = 3
+    fleet_min_free_memory_mb: int = 500
+
+    # On-demand profiling by signal or local HTTP port (see profiling.py)
+    profiling: bool = False
+    profiling_port: int = 0
+    profiling_seconds: float = 10
+    profiling_interval: float = 0.005
+
+    # Chrome
+    chrome_debug_port: str = '9222'
+    chrome_user_data_dir: Optional[str] = None
+    chrome_path: Optional[str] = None
+    runtime_profile: str = 'desktop'
+    # 'selenium' (through chromedriver) or 'cdp' (DevTools protocol directly, see cdp_driver.py)
+    driver_backend: str = 'selenium'
+    chrome_headless: bool = True
+    use_xvfb: bool = False
+    chrome_extra_flags: str = ''
+    # Deadline per browser command, 0 to disable (see session_watchdog.py)
+    watchdog_command_timeout: float = 30
+    watchdog_navigation_timeout: float = 90
+    watchdog_max_recoveries: int = 3
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            email_id=_env_str('EMAIL_ID'),
+            email_password=_env_str('EMAIL_PASSWORD'),
+            meet_link=_env_str('MEET_LINK'),
+            recording_duration=_env_int('RECORDING_DURATION', cls.recording_duration),
+            transcript_source=_env_str('TRANSCRIPT_SOURCE', cls.transcript_source),
+            audio_only=_env_bool('AUDIO_ONLY', cls.audio_only),
+            live_minutes=_env_bool('LIVE_MINUTES', cls.live_minutes),
+            minutes_update_interval=_env_float('MINUTES_UPDATE_INTERVAL', cls.minutes_update_interval),
+            lobby_timeout=_env_float('LOBBY_TIMEOUT', cls.lobby_timeout),
+            lobby_max_retries=_env_int('LOBBY_MAX_RETRIES', cls.lobby_max_retries),
+            monitor_min_interval=_env_float('MONITOR_MIN_INTERVAL', cls.monitor_min_interval),
+            monitor_max_interval=_env_float('MONITOR_MAX_INTERVAL', cls.monitor_max_interval),
+            slide_capture=_env_bool('SLIDE_CAPTURE', cls.slide_capture),
+            slide_capture_interval=_env_float('SLIDE_CAPTURE_INTERVAL', cls.slide_capture_interval),
+            slide_hash_threshold=_env_int('SLIDE_HASH_THRESHOLD', cls.slide_hash_threshold),
+            sample_rate=_env_int('SAMPLE_RATE', cls.sample_rate),
+            audio_input_device=_env_str('AUDIO_INPUT_DEVICE'),
+            max_audio_size_bytes=_env_int('MAX_AUDIO_SIZE_BYTES', cls.max_audio_size_bytes),
+            silence_timeout=_env_float('SILENCE_TIMEOUT', cls.silence_timeout),
+            silence_threshold_db=_env_float('SILENCE_THRESHOLD_DB', cls.silence_threshold_db),
+            artifact_root=_env_str('ARTIFACT_ROOT'),
+            artifact_budget_mb=_env_int('ARTIFACT_BUDGET_MB', cls.artifact_budget_mb),
+            artifact_retention_days=_env_str('ARTIFACT_RETENTION_DAYS', cls.artifact_retention_days),
+            min_free_disk_mb=_env_int('MIN_FREE_DISK_MB', cls.min_free_disk_mb),
+            openai_api_key=_env_str('OPENAI_API_KEY'),
+            openai_base_url=_env_str('OPENAI_BASE_URL'),
+            gpt_model=_env_str('GPT_MODEL', cls.gpt_model),
+            whisper_model=_env_str('WHISPER_MODEL', cls.whisper_model),
+            minutes_backend=_env_str('MINUTES_BACKEND', cls.minutes_backend),
+            local_model_path=_env_str('LOCAL_MODEL_PATH'),
+            local_model_context=_env_int('LOCAL_MODEL_CONTEXT', cls.local_model_context),
+            local_model_threads=_env_int('LOCAL_MODEL_THREADS', cls.local_model_threads),
+            token_policy=_env_str('TOKEN_POLICY', cls.token_policy),
+            max_cost_per_meeting=_env_float('MAX_COST_PER_MEETING', cls.max_cost_per_meeting),
+            fallback_models=_env_str('FALLBACK_MODELS', cls.fallback_models),
+            max_output_tokens=_env_int('MAX_OUTPUT_TOKENS', cls.max_output_tokens),
+            model_info=_env_str('MODEL_INFO'),
+            model_routes=_env_str('MODEL_ROUTES'),
+            routing_stats_path=_env_str('ROUTING_STATS_PATH'),
+            stream_minutes=_env_bool('STREAM_MINUTES', cls.stream_minutes),
+            minutes_stream_path=_env_str('MINUTES_STREAM_PATH'),
+            batch_dir=_env_str('BATCH_DIR'),
+            batch_poll_interval=_env_float('BATCH_POLL_INTERVAL', cls.batch_poll_interval),
+            batch_completion_window=_env_str('BATCH_COMPLETION_WINDOW', cls.batch_completion_window),
+            archive_meetings=_env_bool('ARCHIVE_MEETINGS', cls.archive_meetings),
+            archive_path=_env_str('ARCHIVE_PATH'),
+            export_dir=_env_str('EXPORT_DIR'),
+            export_format=_env_str('EXPORT_FORMAT', cls.export_format),
+            export_batch_size=_env_int('EXPORT_BATCH_SIZE', cls.export_batch_size),
+            vector_index=_env_bool('VECTOR_INDEX', cls.vector_index),
+            vector_index_dir=_env_str('VECTOR_INDEX_DIR'),
+            embedder=_env_str('EMBEDDER', cls.embedder),
+            embedding_model=_env_str('EMBEDDING_MODEL'),
+            meeting_lock=_env_str('MEETING_LOCK', cls.meeting_lock),
+            meeting_lock_path=_env_str('MEETING_LOCK_PATH'),
+            meeting_lock_url=_env_str('MEETING_LOCK_URL', cls.meeting_lock_url),
+            meeting_lock_ttl=_env_float('MEETING_LOCK_TTL', cls.meeting_lock_ttl),
+            meeting_lock_wait=_env_float('MEETING_LOCK_WAIT', cls.meeting_lock_wait),
+            fleet_coordinator_url=_env_str('FLEET_COORDINATOR_URL', cls.fleet_coordinator_url),
+            fleet_db_path=_env_str('FLEET_DB_PATH'),
+            fleet_token=_env_str('FLEET_TOKEN'),
+            worker_capacity=_env_int('WORKER_CAPACITY', cls.worker_capacity),
+            fleet_heartbeat_interval=_env_float('FLEET_HEARTBEAT_INTERVAL', cls.fleet_heartbeat_interval),
+            fleet_heartbeat_timeout=_env_float('FLEET_HEARTBEAT_TIMEOUT', cls.fleet_heartbeat_timeout),
+            fleet_max_attempts=_env_int('FLEET_MAX_ATTEMPTS', cls.fleet_max_attempts),
+            fleet_min_free_memory_mb=_env_int('FLEET_MIN_FREE_MEMORY_MB', cls.fleet_min_free_memory_mb),
+            profiling=_env_bool('PROFILING', cls.profiling),
+            profiling_port=_env_int('PROFILING_PORT', cls.profiling_port),
+            profiling_seconds=_env_float('PROFILING_SECONDS', cls.profiling_seconds),
+            profiling_interval=_env_float('PROFILING_INTERVAL', cls.profiling_interval),
+            chrome_debug_port=_env_str('CHROME_DEBUG_PORT', cls.chrome_debug_port),
+            chrome_user_data_dir=_env_str('CHROME_USER_DATA_DIR'),
+            chrome_path=_env_str('CHROME_PATH'),
+            runtime_profile=_env_str('RUNTIME_PROFILE', cls.runtime_profile),
+            driver_backend=_env_str('DRIVER_BACKEND', cls.driver_backend),
+            chrome_headless=_env_bool('CHROME_HEADLESS', cls.chrome_headless),
+            use_xvfb=_env_bool('USE_XVFB', cls.use_xvfb),
+            chrome_extra_flags=_env_str('CHROME_EXTRA_FLAGS', cls.chrome_extra_flags),
+            watchdog_command_timeout=_env_float('WATCHDOG_COMMAND_TIMEOUT', cls.watchdog_command_timeout),
+            watchdog_navigation_timeout=_env_float('WATCHDOG_NAVIGATION_TIMEOUT', cls.watchdog_navigation_timeout),
+            watchdog_max_recoveries=_env_int('WATCHDOG_MAX_RECOVERIES', cls.watchdog_max_recoveries),
+        )
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    """Load .env once and return the shared Settings"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Settings.from_env()
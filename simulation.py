@@ -0,0 +1,1010 @@
+"""
+Offline end-to-end simulation harness.
+
+Runs complete bot sessions without Chrome, a microphone or OpenAI:
+
+- FakeMeetDriver replays scripted Meet states (pre-join, lobby, admitted, participants
+  leaving, call ended) behind the WebDriver calls JoinGoogleMeet makes.
+- SyntheticSoundDevice feeds generated audio to AudioRecorder in place of sounddevice.
+- StubOpenAIServer answers the Whisper, chat completion, embeddings, file and batch
+  endpoints locally with configurable latency and error rate.
+
+Meeting time runs on a ScaledClock, so a 10 minute meeting takes 10 s at --time-scale 60.
+
+Usage: python simulation.py --meetings 20 --concurrency 5 --duration 300 --time-scale 60
+"""
+import argparse
+import collections
+import contextlib
+import email.parser
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium.common.exceptions import NoSuchElementException
+
+import audio_only
+import join_google_meet
+import meeting_lock
+import record_audio
+import session_watchdog
+from artifact_store import ArtifactStore
+from join_google_meet import JoinGoogleMeet
+from meeting_lock import FileLeaseBackend, MeetingLease, SQLiteLeaseBackend, meeting_code
+from model_routing import ModelRouter, format_summary, summarize
+from record_audio import AudioRecorder
+from settings import get_settings
+from speech_to_text import SpeechToText
+
+
+class ScaledClock:
+    """Stands in for the time module of the simulated modules; virtual time runs `scale` times faster"""
+
+    def __init__(self, scale=60.0):
+        self.scale = scale
+        self._real_start = time.monotonic()
+        self._epoch = time.time()
+
+    def monotonic(self):
+        return (time.monotonic() - self._real_start) * self.scale
+
+    def time(self):
+        return self._epoch + self.monotonic()
+
+    def perf_counter(self):
+        return self.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(max(0.0, seconds) / self.scale)
+
+
+@contextlib.contextmanager
+def patched_time(clock):
+    """Run JoinGoogleMeet, AudioOnlyMode, MeetingLease, AudioRecorder and the command
+    deadlines of GuardedDriver on the simulation clock"""
+    modules = [join_google_meet, audio_only, meeting_lock, record_audio, session_watchdog]
+    originals = [module.time for module in modules]
+    for module in modules:
+        module.time = clock
+    try:
+        yield clock
+    finally:
+        for module, original in zip(modules, originals):
+            module.time = original
+
+
+# ---------------------------------------------------------------------------
+# Fake Meet page
+# ---------------------------------------------------------------------------
+
+class MeetScript:
+    """What happens in one simulated meeting. Times are virtual seconds after admission.
+
+    Args:
+        lobby_seconds: Time spent in the lobby before the host admits the bot
+        denials: Number of join requests the host denies first
+        participants: [(t, count)] participant count changes (count includes the bot)
+        end: Optional (t, state) with state "ended" or "removed"
+        captions: [(t, speaker, text)] caption lines shown while admitted
+        hang: Optional (t, seconds): the tab stops answering commands at t for `seconds`
+            (float("inf"): until the bot abandons the tab)
+        rejoin_lobby_seconds: Lobby time when the bot rejoins from a new tab
+        silent_after: Optional t (after the recording started) from which the meeting audio is silent
+    """
+
+    def __init__(self, lobby_seconds=5, denials=0, participants=None, end=None, captions=None, hang=None,
+                 rejoin_lobby_seconds=5, silent_after=None):
+        self.lobby_seconds = lobby_seconds
+        self.silent_after = silent_after
+        self.hang = hang
+        self.rejoin_lobby_seconds = rejoin_lobby_seconds
+        self.denials = denials
+        self.participants = participants or [(0, 3)]
+        self.end = end
+        self.captions = captions or []
+
+    @classmethod
+    def random(cls, rng, duration):
+        """A plausible meeting: people join, most leave before the end, sometimes the host ends it"""
+        count = rng.randint(2, 8)
+        participants = [(0, count)]
+        t = 0.0
+        leave_at = rng.uniform(0.3, 1.2) * duration
+        while count > 1:
+            t += rng.uniform(0.02, 0.1) * duration
+            if t >= leave_at:
+                count -= 1
+                participants.append((t, count))
+        end = (rng.uniform(0.3, 1.1) * duration, rng.choice(["ended", "ended", "removed"])) if rng.random() < 0.3 else None
+        return cls(lobby_seconds=rng.uniform(0, 30), denials=1 if rng.random() < 0.05 else 0,
+                   participants=participants, end=end)
+
+
+PAGE_TEXT = {
+    "prejoin": "Ready to join?",
+    "lobby": "Asking to be let in...",
+    "admitted": "",
+    "denied": "Someone in the call denied your request to join",
+    "ended": "The meeting has ended\nReturn to home screen",
+    "removed": "You've been removed from the meeting",
+    "left": "You left the meeting",
+}
+
+
+class FakeElement:
+    def __init__(self, driver, kind, aria_label=""):
+        self.driver = driver
+        self.kind = kind
+        self.aria_label = aria_label
+        self.text = ""
+
+    def click(self):
+        self.driver._command()
+        self.driver._on_click(self.kind)
+
+    def send_keys(self, *keys):
+        self.driver._command()
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def get_attribute(self, name):
+        return self.aria_label if name == "aria-label" else None
+
+    def find_element(self, by, value):
+        raise NoSuchElementException(f"No element for {value}")
+
+
+class FakeMeetDriver:
+    """Replays a MeetScript behind the subset of the WebDriver API that JoinGoogleMeet uses.
+
+    Elements are matched by keywords in the selector (join, leave, participant, ...)
+    rather than by evaluating XPath, so selector tweaks in JoinGoogleMeet keep working.
+    """
+
+    def __init__(self, script, clock, command_latency=0.02):
+        self.script = script
+        self.clock = clock
+        self.command_latency = command_latency
+        self.commands = 0
+        self.current_url = "about:blank"
+        self.title = ""
+        self._phase = "prejoin"
+        self._phase_since = 0.0
+        self._lobby_seconds = script.lobby_seconds
+        self._admitted_at = None
+        # Hang injection (MeetScript.hang): start time, and released when the bot abandons the tab
+        self._hang_started = None
+        self._released = threading.Event()
+        self.reattached = False
+        self._denials_left = script.denials
+        self._caption_index = 0
+        self._lock = threading.Lock()
+        # Audio-only mode (see audio_only.py): script applied, receive resolution chosen
+        self.video_hidden = False
+        self.receive_audio_only = False
+
+    def _command(self):
+        self.commands += 1
+        self._stall()
+        if self.command_latency:
+            self.clock.sleep(self.command_latency)
+
+    def _stall(self):
+        """Block like a hung renderer while the scripted hang lasts"""
+        if not self.script.hang or self.reattached or self._admitted_at is None:
+            return
+        at, seconds = self.script.hang
+        now = self.clock.monotonic()
+        if self._hang_started is None:
+            if now - self._admitted_at < at:
+                return
+            self._hang_started = now
+        if seconds == float("inf"):
+            self._released.wait()
+        elif self._hang_started + seconds > now:
+            self.clock.sleep(self._hang_started + seconds - now)
+
+    def reattach(self):
+        """A new tab in the same meeting, as after JoinGoogleMeet recovers a hung session"""
+        driver = FakeMeetDriver(self.script, self.clock, self.command_latency)
+        driver.reattached = True
+        driver._lobby_seconds = self.script.rejoin_lobby_seconds
+        driver._denials_left = 0
+        # The meeting goes on: participants and captions keep their timeline
+        driver._admitted_at = self._admitted_at
+        driver._caption_index = self._caption_index
+        return driver
+
+    def _set_phase(self, phase):
+        self._phase = phase
+        self._phase_since = self.clock.monotonic()
+        if phase == "admitted" and self._admitted_at is None:
+            self._admitted_at = self._phase_since
+
+    def phase(self):
+        """Advance the script to the current virtual time and return the page phase"""
+        with self._lock:
+            now = self.clock.monotonic()
+            if self._phase == "lobby" and now - self._phase_since >= self._lobby_seconds:
+                if self._denials_left > 0:
+                    self._denials_left -= 1
+                    self._set_phase("denied")
+                else:
+                    self._set_phase("admitted")
+            if self._phase == "admitted" and self.script.end and now - self._admitted_at >= self.script.end[0]:
+                self._set_phase(self.script.end[1])
+            return self._phase
+
+    def participant_count(self):
+        if self.phase() != "admitted":
+            return None
+        elapsed = self.clock.monotonic() - self._admitted_at
+        count = self.script.participants[0][1]
+        for at, value in self.script.participants:
+            if at <= elapsed:
+                count = value
+        return count
+
+    def _on_click(self, kind):
+        phase = self.phase()
+        if kind == "join" and phase == "prejoin":
+            self._set_phase("lobby")
+        elif kind == "leave" and phase == "admitted":
+            self._set_phase("left")
+        elif kind == "audio-only" and phase == "admitted":
+            self.receive_audio_only = True
+
+    def _match(self, by, value):
+        value = value.lower()
+        phase = self.phase()
+        if by == "tag name" and value == "body":
+            return [FakeElement(self, "body")]
+        if "audio only" in value:
+            return [FakeElement(self, "audio-only", "Audio only")] if phase == "admitted" else []
+        if any(step in value for step in ("more options", "settings", "video", "receive resolution", "close dialog")):
+            return [FakeElement(self, "menu", "")] if phase == "admitted" else []
+        if "captions" in value:
+            return [FakeElement(self, "captions", "Turn on captions")] if phase == "admitted" else []
+        if "participant" in value:
+            count = self.participant_count()
+            if count is None:
+                return []
+            return [FakeElement(self, "participants", f"Show everyone ({count} participants)")]
+        if "leave" in value or "end call" in value:
+            return [FakeElement(self, "leave", "Leave call")] if phase == "admitted" else []
+        if "join" in value:
+            return [FakeElement(self, "join", "Ask to join")] if phase == "prejoin" else []
+        if "camera" in value or "mic" in value:
+            return [FakeElement(self, "toggle", "Turn off")] if phase == "prejoin" else []
+        return []
+
+    # --- WebDriver API -----------------------------------------------------
+
+    def get(self, url):
+        self._command()
+        self.current_url = url
+        if self.phase() in ("denied", "left", "ended", "removed"):
+            self._set_phase("prejoin")
+
+    def find_elements(self, by, value):
+        self._command()
+        return self._match(by, value)
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element for {value}")
+        return elements[0]
+
+    def execute_script(self, script, *args):
+        self._command()
+        if "__meetBotSlideCanvas" in script:
+            # Nobody shares their screen in the simulated meetings
+            return None
+        if "readyState" in script:
+            return "complete"
+        if "arguments[0].click()" in script and args:
+            self._on_click(args[0].kind)
+            return None
+        if "scrollIntoView" in script:
+            return None
+        if "__meetBotAudioOnly" in script:
+            self.video_hidden = True
+            return True
+        if "__meetBotVideoOff = false" in script:
+            self.video_hidden = False
+            return True
+        if "inCall" in script:
+            phase = self.phase()
+            return {"inCall": phase == "admitted", "text": PAGE_TEXT[phase]}
+        if "__meetBotCaptions" in script:
+            if "pending.clear" in script:
+                return self._drain_captions()
+            return "disconnect" not in script
+        if "innerText" in script:
+            return PAGE_TEXT[self.phase()]
+        return None
+
+    def _drain_captions(self):
+        if self._admitted_at is None:
+            return []
+        elapsed = self.clock.monotonic() - self._admitted_at
+        entries = []
+        while self._caption_index < len(self.script.captions) and self.script.captions[self._caption_index][0] <= elapsed:
+            at, speaker, text = self.script.captions[self._caption_index]
+            entries.append({"block": self._caption_index + 1, "speaker": speaker, "text": text,
+                            "ts": self.clock.time() - (elapsed - at)})
+            self._caption_index += 1
+        return entries
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def quit(self):
+        self._released.set()
+
+
+# ---------------------------------------------------------------------------
+# Synthetic audio input
+# ---------------------------------------------------------------------------
+
+class SyntheticInputStream:
+    """Calls the AudioRecorder callback with generated blocks at (scaled) real-time pace"""
+
+    def __init__(self, device_module, samplerate, callback, channels=1, dtype="float32",
+                 blocksize=None, device=None):
+        import numpy as np
+
+        self.device_module = device_module
+        self.samplerate = int(samplerate)
+        self.callback = callback
+        self.channels = channels
+        # 100 ms of audio per callback
+        self.blocksize = blocksize or self.samplerate // 10
+        t = np.arange(self.samplerate, dtype=np.float32) / self.samplerate
+        tone = 0.2 * np.sin(2 * np.pi * 220 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 0.5 * t))
+        noise = np.random.default_rng(0).normal(0, 0.01, self.samplerate).astype(np.float32)
+        self._second = (tone + noise).astype(dtype).reshape(-1, 1).repeat(channels, axis=1)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        clock = self.device_module.clock
+        position = 0
+        block_seconds = self.blocksize / self.samplerate
+        # Paced against the clock rather than sleeping a block per callback, so the
+        # stream does not fall behind when the callback or the scheduler is slow
+        next_block = clock.monotonic()
+        while not self._stop.is_set():
+            if self.device_module.is_silent():
+                block = self._second[:self.blocksize] * 0
+            else:
+                end = position + self.blocksize
+                block = self._second.take(range(position, end), axis=0, mode="wrap")
+                position = end % self.samplerate
+            try:
+                self.callback(block, self.blocksize, None, None)
+            except self.device_module.CallbackStop:
+                break
+            next_block += block_seconds
+            clock.sleep(max(0.0, next_block - clock.monotonic()))
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        return False
+
+
+class SyntheticSoundDevice:
+    """Drop-in for the parts of the sounddevice module that AudioRecorder uses"""
+
+    class CallbackStop(Exception):
+        pass
+
+    def __init__(self, clock, silent=False, silent_from=None):
+        self.clock = clock
+        self.silent = silent
+        # Clock time from which the generated audio is silent
+        self.silent_from = silent_from
+
+    def is_silent(self):
+        return self.silent or (self.silent_from is not None and self.clock.monotonic() >= self.silent_from)
+
+    def InputStream(self, samplerate, callback, **kwargs):
+        return SyntheticInputStream(self, samplerate, callback, **kwargs)
+
+
+class TimedRecorder(AudioRecorder):
+    """AudioRecorder that notes how long it was recording on the simulation clock"""
+
+    def __init__(self, clock, **kwargs):
+        super().__init__(**kwargs)
+        self.clock = clock
+        self.recorded_seconds = 0.0
+
+    def start_recording(self, filename):
+        self._started_at = self.clock.monotonic()
+        return super().start_recording(filename)
+
+    def stop_recording(self):
+        self.recorded_seconds = self.clock.monotonic() - self._started_at
+        return super().stop_recording()
+
+
+# ---------------------------------------------------------------------------
+# Stub OpenAI server
+# ---------------------------------------------------------------------------
+
+STUB_TRANSCRIPT = (
+    "Alice: Let's review the launch plan. Bob: The release is on track for next week. "
+    "Carol: I will update the pricing page by Friday. Alice: Great, Dan please follow up with the customer."
+)
+STUB_ANSWER = (
+    "The team reviewed the launch plan and confirmed that the release is on track for next week. Carol will "
+    "update the pricing page by Friday, and Dan will follow up with the customer about the rollout. Overall the "
+    "discussion was positive and focused on keeping the schedule, with no open blockers raised by anyone present."
+)
+
+
+class StubOpenAIServer:
+    """Local HTTP server emulating the OpenAI endpoints the bot calls.
+
+    Args:
+        latency: Mean seconds per request (uniformly jittered by +/-50%); with
+            stream=True this is the time to the first token
+        error_rate: Fraction of requests answered with HTTP 500
+        token_interval: Seconds per generated chat token (word), streamed or not
+        batch_seconds: Seconds a submitted batch stays in progress before completing
+        models: Per chat model overrides, {model: {"latency": s, "token_interval": s,
+            "bad_answer_rate": fraction}}; a bad answer is empty, as from a model that
+            could not handle the prompt (see model_routing.validate_answer)
+    """
+
+    def __init__(self, latency=0.2, error_rate=0.0, host="127.0.0.1", port=0, seed=0, token_interval=0.0,
+                 batch_seconds=1.0, models=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.token_interval = token_interval
+        self.batch_seconds = batch_seconds
+        self.models = models or {}
+        # Chat completions per model
+        self.model_requests = collections.Counter()
+        self.files = {}
+        self.batches = {}
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._respond(*server.handle_get(self.path))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._respond(*server.handle(self.path, self.headers, body))
+
+            def _respond(self, status, payload):
+                if isinstance(payload, bytes):
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                if not isinstance(payload, dict):
+                    # Server-sent events, ended by closing the connection
+                    self.send_response(status)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                    for event in payload:
+                        self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                        self.wfile.flush()
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.close_connection = True
+                    return
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _model(self, request, name):
+        """A speed or quality setting of the request's model, or the server's own"""
+        default = {"latency": self.latency, "token_interval": self.token_interval, "bad_answer_rate": 0.0}[name]
+        return self.models.get(request.get("model"), {}).get(name, default)
+
+    def _delay_and_fail(self, latency=None):
+        with self._lock:
+            self.requests += 1
+            delay = (self.latency if latency is None else latency) * self._rng.uniform(0.5, 1.5)
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        time.sleep(delay)
+        return fail
+
+    def handle(self, path, headers, body):
+        """Return (status, JSON payload) for a request"""
+        request = json.loads(body or b"{}") if path.endswith("/chat/completions") else {}
+        if self._delay_and_fail(self._model(request, "latency") if request else None):
+            return 500, {"error": {"message": "Simulated server error", "type": "server_error"}}
+        if path.endswith("/audio/translations") or path.endswith("/audio/transcriptions"):
+            return 200, {"text": STUB_TRANSCRIPT}
+        if path.endswith("/chat/completions"):
+            if request.get("stream"):
+                return 200, self.chat_completion_stream(request)
+            completion = self.chat_completion(request)
+            token_interval = self._model(request, "token_interval")
+            if token_interval:
+                time.sleep(token_interval * len(completion["choices"][0]["message"]["content"].split()))
+            return 200, completion
+        if path.endswith("/embeddings"):
+            request = json.loads(body or b"{}")
+            return 200, self.embeddings(request)
+        if path.endswith("/files"):
+            return self.upload_file(headers, body)
+        if path.endswith("/batches"):
+            return self.create_batch(json.loads(body or b"{}"))
+        if path.endswith("/cancel") and "/batches/" in path:
+            return self.cancel_batch(path.split("/")[-2])
+        return 404, {"error": {"message": f"Unknown endpoint {path}", "type": "invalid_request_error"}}
+
+    def handle_get(self, path):
+        """Return (status, payload) for a GET: batch status or file content (bytes)"""
+        with self._lock:
+            self.requests += 1
+        path = path.split("?")[0]
+        parts = path.rstrip("/").split("/")
+        if "/batches/" in path and parts[-1] in self.batches:
+            return 200, self.batch_status(parts[-1])
+        if path.endswith("/content") and parts[-2] in self.files:
+            return 200, self.files[parts[-2]]["content"]
+        if "/files/" in path and parts[-1] in self.files:
+            return 200, self.files[parts[-1]]["object"]
+        return 404, {"error": {"message": f"Unknown endpoint {path}", "type": "invalid_request_error"}}
+
+    def _store_file(self, content, filename, purpose):
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        obj = {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+               "filename": filename, "purpose": purpose}
+        self.files[file_id] = {"object": obj, "content": content}
+        return obj
+
+    def upload_file(self, headers, body):
+        """multipart/form-data upload, as sent by client.files.create"""
+        message = email.parser.BytesParser().parsebytes(
+            f"Content-Type: {headers.get('Content-Type')}\r\n\r\n".encode() + body)
+        content, filename, purpose = b"", "upload", ""
+        for part in message.get_payload():
+            name = part.get_param("name", header="content-disposition")
+            if name == "file":
+                content = part.get_payload(decode=True)
+                filename = part.get_filename() or filename
+            elif name == "purpose":
+                purpose = part.get_payload(decode=True).decode()
+        return 200, self._store_file(content, filename, purpose)
+
+    def create_batch(self, request):
+        input_file = self.files.get(request.get("input_file_id"))
+        if input_file is None:
+            return 404, {"error": {"message": "No such file", "type": "invalid_request_error"}}
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        self.batches[batch_id] = {
+            "id": batch_id, "object": "batch", "endpoint": request.get("endpoint"), "errors": None,
+            "input_file_id": request["input_file_id"], "completion_window": request.get("completion_window"),
+            "status": "validating", "output_file_id": None, "error_file_id": None,
+            "created_at": int(time.time()), "completed_at": None, "metadata": request.get("metadata"),
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+        }
+        threading.Thread(target=self._run_batch, args=(batch_id, input_file["content"], self.error_rate),
+                         daemon=True).start()
+        return 200, self.batch_status(batch_id)
+
+    def _run_batch(self, batch_id, content, error_rate):
+        """Answer every request of the input file, then publish output and error files"""
+        batch = self.batches[batch_id]
+        lines = [json.loads(line) for line in content.decode().splitlines() if line.strip()]
+        batch["request_counts"]["total"] = len(lines)
+        batch["status"] = "in_progress"
+        time.sleep(self.batch_seconds)
+        if batch["status"] != "in_progress":
+            return
+        output, errors = [], []
+        for line in lines:
+            result = {"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": line["custom_id"]}
+            if self._rng.random() < error_rate:
+                result.update(response={"status_code": 500, "request_id": uuid.uuid4().hex,
+                                        "body": {"error": {"message": "Simulated server error"}}}, error=None)
+                errors.append(result)
+                batch["request_counts"]["failed"] += 1
+            else:
+                result.update(response={"status_code": 200, "request_id": uuid.uuid4().hex,
+                                        "body": self.chat_completion(line["body"])}, error=None)
+                output.append(result)
+                batch["request_counts"]["completed"] += 1
+        to_bytes = lambda rows: "".join(json.dumps(row) + "\n" for row in rows).encode()
+        if output:
+            batch["output_file_id"] = self._store_file(to_bytes(output), "output.jsonl", "batch_output")["id"]
+        if errors:
+            batch["error_file_id"] = self._store_file(to_bytes(errors), "errors.jsonl", "batch_output")["id"]
+        batch["completed_at"] = int(time.time())
+        batch["status"] = "completed"
+
+    def batch_status(self, batch_id):
+        return dict(self.batches[batch_id], request_counts=dict(self.batches[batch_id]["request_counts"]))
+
+    def cancel_batch(self, batch_id):
+        if batch_id not in self.batches:
+            return 404, {"error": {"message": "No such batch", "type": "invalid_request_error"}}
+        if self.batches[batch_id]["status"] in ("validating", "in_progress"):
+            self.batches[batch_id]["status"] = "cancelled"
+        return 200, self.batch_status(batch_id)
+
+    def chat_completion(self, request):
+        system = next((m["content"] for m in request.get("messages", []) if m["role"] == "system"), "")
+        prompt_tokens = sum(len(m["content"]) for m in request.get("messages", [])) // 4
+        with self._lock:
+            self.model_requests[request.get("model", "stub")] += 1
+            bad_answer = self._rng.random() < self._model(request, "bad_answer_rate")
+        if bad_answer:
+            content = ""
+        elif "JSON" in system:
+            content = json.dumps({"abstract_summary": "Simulated summary.", "key_points": ["Launch plan"],
+                                  "action_items": ["Carol updates pricing"], "sentiment": "positive"})
+        else:
+            content = f"Simulated answer ({prompt_tokens} prompt tokens). {STUB_ANSWER}"
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def chat_completion_stream(self, request):
+        """Yield chat.completion.chunk events: the content word by word, then usage if asked for"""
+        completion = self.chat_completion(request)
+        content = completion["choices"][0]["message"]["content"]
+        base = {"id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"],
+                "model": completion["model"]}
+        words = content.split(" ")
+        token_interval = self._model(request, "token_interval")
+        for index, word in enumerate(words):
+            if token_interval:
+                time.sleep(token_interval)
+            text = word if index == len(words) - 1 else word + " "
+            yield dict(base, choices=[{"index": 0, "delta": {"content": text}, "finish_reason": None}])
+        yield dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (request.get("stream_options") or {}).get("include_usage"):
+            yield dict(base, choices=[], usage=completion["usage"])
+
+    def embeddings(self, request):
+        # Deterministic lexical vectors, so retrieval through the stub still finds related text
+        from meeting_index import HashingEmbedder
+
+        texts = request.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        vectors = HashingEmbedder(request.get("dimensions") or 1536).embed(texts)
+        return {
+            "object": "list",
+            "model": request.get("model", "stub"),
+            "data": [{"object": "embedding", "index": index, "embedding": vector.tolist()}
+                     for index, vector in enumerate(vectors)],
+            "usage": {"prompt_tokens": sum(len(text) for text in texts) // 4,
+                      "total_tokens": sum(len(text) for text in texts) // 4},
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+
+# ---------------------------------------------------------------------------
+# End-to-end driver
+# ---------------------------------------------------------------------------
+
+def percentile(values, fraction):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_meeting(index, script, clock, server, args, archive_path=None, meeting=None, lease_backend=None,
+                router=None):
+    """One full session: join, record, analyse. Returns a result dict (times in real seconds).
+    Sessions with the same `meeting` number join the same link (a meeting on several calendars)."""
+    from openai import OpenAI
+
+    result = {"meeting": index, "ok": False, "recorded": False, "duplicate": False, "error": None,
+              "latency": 0.0, "analysis_latency": 0.0, "driver_commands": 0}
+    meet_link = f"https://meet.google.com/sim-{index if meeting is None else meeting:04d}-run"
+    work_dir = tempfile.mkdtemp(prefix=f"meetbot_sim_{index}_")
+    audio_path = os.path.join(work_dir, "output.wav")
+    artifacts = ArtifactStore(os.path.join(work_dir, "artifacts"))
+    started = time.perf_counter()
+    driver = FakeMeetDriver(script, clock, command_latency=args.command_latency)
+    drivers = [driver]
+
+    def driver_factory():
+        drivers.append(drivers[-1].reattach())
+        return drivers[-1]
+
+    recorders = []
+
+    def recorder_factory(**kwargs):
+        silent_from = clock.monotonic() + script.silent_after if script.silent_after is not None else None
+        recorder = TimedRecorder(clock, audio_backend=SyntheticSoundDevice(clock, silent_from=silent_from), **kwargs)
+        recorder.sample_rate = args.sample_rate
+        recorders.append(recorder)
+        return recorder
+
+    lease = MeetingLease(lease_backend, meeting_code(meet_link), ttl=args.lock_ttl) if lease_backend else None
+    try:
+        if lease and not lease.acquire(wait=args.lock_wait):
+            result["duplicate"] = True
+            result["ok"] = True
+            return result
+        if lease:
+            lease.start_renewal()
+        bot = JoinGoogleMeet(driver=driver, recorder_factory=recorder_factory, driver_factory=driver_factory,
+                             artifact_store=artifacts)
+        bot.turnOffMicCam(meet_link, audio_only=args.audio_only)
+        result["recorded"] = bot.AskToJoin(audio_path, args.duration, lease=lease)
+        result["audio_only"] = drivers[-1].video_hidden and drivers[-1].receive_audio_only
+        result["hung"] = driver._hang_started is not None
+        result["exit_reason"] = bot.exit_reason
+        if script.silent_after is not None and result["recorded"]:
+            result["silent_seconds"] = max(0.0, recorders[-1].recorded_seconds - script.silent_after)
+        result["recoveries"] = bot.recoveries
+        if result["recorded"] and os.path.exists(audio_path):
+            # Share of the recording time that is in the file: 1.0 means no gap
+            with wave.open(audio_path) as wav:
+                audio_seconds = wav.getnframes() / wav.getframerate()
+            result["audio_coverage"] = audio_seconds / recorders[-1].recorded_seconds
+        if result["recorded"] and not args.no_analysis:
+            analysis_started = time.perf_counter()
+            client = OpenAI(api_key="simulation", base_url=server.base_url, max_retries=args.max_retries)
+            SpeechToText(client=client, archive_path=archive_path, artifact_store=artifacts,
+                         router=router).transcribe(audio_path, bot.meeting_info)
+            result["analysis_latency"] = time.perf_counter() - analysis_started
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if lease:
+            lease.release(handled=bool(result.get("recorded")))
+        result["latency"] = time.perf_counter() - started
+        result["driver_commands"] = sum(d.commands for d in drivers)
+        for d in drivers:
+            d.quit()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+
+def run_simulation(args):
+    """Run args.meetings sessions with args.concurrency in parallel and return a report dict"""
+    rng = random.Random(args.seed)
+    scripts = [MeetScript.random(rng, args.duration) for _ in range(args.meetings)]
+    # Every meeting is on args.calendars calendars, so that many bot sessions try to join it
+    sessions = [(meeting, script) for meeting, script in enumerate(scripts) for _ in range(args.calendars)]
+    # Hangs and silences come from their own generators, so the meetings stay the same for a given seed
+    hang_rng = random.Random(args.seed + 1)
+    silence_rng = random.Random(args.seed + 2)
+    for script in scripts:
+        if hang_rng.random() < args.hang_rate:
+            # Half are long stalls the tab recovers from, half freeze it for good
+            script.hang = (hang_rng.uniform(0.1, 0.5) * args.duration,
+                           hang_rng.choice([args.stall_seconds, float("inf")]))
+        if silence_rng.random() < args.silence_rate:
+            # Everyone stops talking, and the page shows neither the participants leaving
+            # nor the call ending, as when Meet's DOM changed under the selectors
+            script.silent_after = silence_rng.uniform(0.05, 0.3) * args.duration
+            script.participants = [(0, script.participants[0][1])]
+            script.end = None
+    clock = ScaledClock(args.time_scale)
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    output = io.StringIO() if not args.verbose else None
+    # Simulated meetings go to a throwaway archive, never the real one
+    archive_dir = tempfile.mkdtemp(prefix="meetbot_sim_archive_")
+    archive_path = os.path.join(archive_dir, "meetings.db")
+    lease_backend = None
+    if args.meeting_lock == "file":
+        lease_backend = FileLeaseBackend(os.path.join(archive_dir, "locks"))
+    elif args.meeting_lock == "sqlite":
+        lease_backend = SQLiteLeaseBackend(os.path.join(archive_dir, "locks.db"))
+    # One router for all sessions, so the report shows every routed call (MODEL_ROUTES)
+    router = ModelRouter(stats_path=False) if get_settings().model_routes else None
+    models = json.loads(args.model_speeds) if args.model_speeds else None
+    with StubOpenAIServer(latency=args.latency, error_rate=args.error_rate, seed=args.seed, models=models) as server, \
+            patched_time(clock), \
+            (contextlib.redirect_stdout(output) if output is not None else contextlib.nullcontext()):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(
+                lambda item: run_meeting(item[0], item[1][1], clock, server, args, archive_path,
+                                         meeting=item[1][0], lease_backend=lease_backend, router=router),
+                enumerate(sessions)))
+        wall = time.perf_counter() - started
+        requests, server_errors = server.requests, server.errors
+    shutil.rmtree(archive_dir, ignore_errors=True)
+
+    report = {
+        "meetings": args.meetings,
+        "sessions": len(sessions),
+        "duplicates_skipped": sum(1 for r in results if r["duplicate"]),
+        "recorded": sum(1 for r in results if r["recorded"]),
+        "concurrency": args.concurrency,
+        "wall_seconds": wall,
+        "throughput_per_minute": 60 * args.meetings / wall,
+        "failures": [r for r in results if not r["ok"]],
+        "not_admitted": sum(1 for r in results if r["ok"] and not r["recorded"] and not r["duplicate"]),
+        "latency": [r["latency"] for r in results if r["ok"] and not r["duplicate"]],
+        "analysis_latency": [r["analysis_latency"] for r in results if r["ok"] and r["recorded"] and not args.no_analysis],
+        "driver_commands": statistics.mean(r["driver_commands"] for r in results),
+        "audio_only": sum(1 for r in results if r.get("audio_only")),
+        "hung": sum(1 for r in results if r.get("hung")),
+        "silent": [r for r in results if "silent_seconds" in r],
+        "recoveries": [recovery for r in results for recovery in r.get("recoveries", [])],
+        "hung_audio_coverage": [r["audio_coverage"] for r in results if r.get("hung") and "audio_coverage" in r],
+        "api_requests": requests,
+        "api_errors": server_errors,
+        "model_requests": dict(server.model_requests),
+        "routes": summarize(router.calls) if router else [],
+    }
+    if args.tracemalloc:
+        report["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    try:
+        import resource
+        # ru_maxrss is in kilobytes on Linux
+        report["peak_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        pass
+    return report
+
+
+def print_report(report, time_scale):
+    print("=" * 60)
+    print("Simulation report")
+    print("=" * 60)
+    print(f"Meetings: {report['meetings']} (concurrency {report['concurrency']}, time scale x{time_scale:g})")
+    print(f"Wall time: {report['wall_seconds']:.1f} s, throughput: {report['throughput_per_minute']:.1f} meetings/min")
+    if report["sessions"] != report["meetings"]:
+        print(f"Bot sessions: {report['sessions']}, recorded: {report['recorded']}, "
+              f"duplicates skipped: {report['duplicates_skipped']}")
+    print(f"Failures: {len(report['failures'])}, not admitted: {report['not_admitted']}")
+    for failure in report["failures"][:5]:
+        print(f"  meeting {failure['meeting']}: {failure['error']}")
+    for label, key in (("End-to-end latency", "latency"), ("Analysis latency", "analysis_latency")):
+        values = report[key]
+        if values:
+            print(f"{label} (real s): p50 {percentile(values, 0.5):.2f}  p95 {percentile(values, 0.95):.2f}  "
+                  f"p99 {percentile(values, 0.99):.2f}  max {max(values):.2f}")
+    print(f"Driver commands per meeting: {report['driver_commands']:.0f}")
+    if report["hung"]:
+        recoveries = report["recoveries"]
+        seconds = [recovery["seconds"] for recovery in recoveries]
+        outcomes = collections.Counter(recovery["result"] for recovery in recoveries)
+        print(f"Hung sessions: {report['hung']}, recoveries: "
+              + ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items())))
+        if seconds:
+            print(f"Recovery time (virtual s, hang to back in call): p50 {percentile(seconds, 0.5):.1f}  "
+                  f"p95 {percentile(seconds, 0.95):.1f}  p99 {percentile(seconds, 0.99):.1f}  max {max(seconds):.1f}")
+        if report["hung_audio_coverage"]:
+            print(f"Audio coverage of hung sessions: min {min(report['hung_audio_coverage']):.1%}")
+    if report["silent"]:
+        stopped = [r for r in report["silent"] if r["exit_reason"] == "silence"]
+        silent_seconds = [r["silent_seconds"] for r in report["silent"]]
+        print(f"Silent meetings: {len(report['silent'])}, stopped on silence: {len(stopped)}, "
+              f"silence recorded (virtual s): mean {statistics.mean(silent_seconds):.0f}  max {max(silent_seconds):.0f}")
+    if report["audio_only"]:
+        print(f"Audio-only receive: {report['audio_only']} meeting(s)")
+    print(f"API requests: {report['api_requests']} ({report['api_errors']} simulated errors)")
+    if report["routes"]:
+        print("Chat requests per model: " + ", ".join(f"{model} {count}" for model, count
+                                                      in sorted(report["model_requests"].items())))
+        print("Routes:\n" + format_summary(report["routes"]))
+    if "peak_traced_bytes" in report:
+        print(f"Peak traced Python memory: {report['peak_traced_bytes'] / 2**20:.1f} MB")
+    if "peak_rss_bytes" in report:
+        print(f"Peak RSS: {report['peak_rss_bytes'] / 2**20:.1f} MB")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run simulated meetings end to end and report scaling metrics.")
+    parser.add_argument("--meetings", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=300, help="Max recording duration per meeting (virtual s)")
+    parser.add_argument("--time-scale", type=float, default=60, help="Virtual seconds per real second")
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--command-latency", type=float, default=0.02, help="Virtual seconds per driver command")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub OpenAI latency per request (real s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub OpenAI requests that fail")
+    parser.add_argument("--max-retries", type=int, default=2, help="OpenAI client retries")
+    parser.add_argument("--model-speeds",
+                        help='Stub speed and quality per model, JSON: {"gpt-4o-mini": {"latency": 0.05, '
+                             '"token_interval": 0.002, "bad_answer_rate": 0.1}}')
+    parser.add_argument("--no-analysis", action="store_true", help="Skip the Whisper/GPT phase")
+    parser.add_argument("--audio-only", action="store_true", help="Join in audio-only receive mode")
+    parser.add_argument("--silence-rate", type=float, default=0.0,
+                        help="Fraction of meetings that go silent while the page still shows the call")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of meetings whose tab hangs")
+    parser.add_argument("--stall-seconds", type=float, default=45,
+                        help="Length of the recoverable stalls (virtual s); the other hangs are permanent")
+    parser.add_argument("--calendars", type=int, default=1, help="Bot sessions started for every meeting")
+    parser.add_argument("--meeting-lock", choices=("none", "file", "sqlite"), default="none",
+                        help="Lease backend that lets only one session per meeting join")
+    parser.add_argument("--lock-ttl", type=float, default=60, help="Meeting lease TTL (virtual s)")
+    parser.add_argument("--lock-wait", type=float, default=0, help="Seconds duplicates stand by to take over")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report peak traced Python memory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Show the bots' own output")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    print_report(run_simulation(args), args.time_scale)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import base64
+import json
+import os
+import time
+
+from settings import get_settings
+
+# Finds the presentation tile (a video whose tile is labelled as a presentation) and
+# draws it into a small grayscale thumbnail for hashing. With arguments[0] set, returns
+# the full-resolution frame as a PNG data URL instead. Returns null when nobody shares
+# their screen: a pinned or spotlighted camera is as large as a presentation, and its
+# frames would be stored as slides.
+_FRAME_SCRIPT = """
+const full = arguments[0];
+const isPresentation = v => {
+    // Labels from the video up to its participant tile
+    for (let node = v; node && node !== document.body; node = node.parentElement) {
+        const label = (node.getAttribute('aria-label') || '').toLowerCase();
+        if (label.includes('present') || label.includes('screen')) return true;
+        if (node.hasAttribute('data-participant-id') || node.hasAttribute('data-requested-participant-id')) return false;
+    }
+    return false;
+};
+const video = [...document.querySelectorAll('video')].find(
+    v => v.videoWidth > 0 && v.readyState >= 2 && isPresentation(v));
+if (!video) return null;
+const canvas = window.__meetBotSlideCanvas || (window.__meetBotSlideCanvas = document.createElement('canvas'));
+const context = canvas.getContext('2d', {willReadFrequently: true});
+if (full) {
+    canvas.width = video.videoWidth;
+    canvas.height = video.videoHeight;
+    context.drawImage(video, 0, 0);
+    return canvas.toDataURL('image/png');
+}
+const size = arguments[1];
+canvas.width = size;
+canvas.height = size;
+context.imageSmoothingQuality = 'high';
+context.drawImage(video, 0, 0, size, size);
+const rgba = context.getImageData(0, 0, size, size).data;
+const gray = new Array(size * size);
+for (let i = 0; i < gray.length; i++) {
+    gray[i] = (rgba[4 * i] * 299 + rgba[4 * i + 1] * 587 + rgba[4 * i + 2] * 114) / 1000 | 0;
+}
+return {gray: gray, width: video.videoWidth, height: video.videoHeight};
+"""
+
+# Thumbnail side for the hash, and the low-frequency DCT block the hash is built from
+HASH_IMAGE_SIZE = 32
+HASH_SIZE = 8
+_dct_matrix = None
+
+
+def _dct(size):
+    """Orthonormal DCT-II matrix, so the 2-D DCT of an image is C @ image @ C.T"""
+    global _dct_matrix
+    if _dct_matrix is None or _dct_matrix.shape[0] != size:
+        import numpy as np
+
+        n = np.arange(size)
+        matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size)) * np.sqrt(2 / size)
+        matrix[0] /= np.sqrt(2)
+        _dct_matrix = matrix
+    return _dct_matrix
+
+
+def perceptual_hash(gray):
+    """64-bit pHash of a square grayscale image (any numeric array or nested list).
+
+    The 8x8 lowest frequencies of the DCT, each compared with their median: small
+    changes (video compression noise, a moving cursor) leave it unchanged, a new slide
+    flips many bits. Returns an int.
+    """
+    import numpy as np
+
+    image = np.asarray(gray, dtype=np.float64)
+    if image.ndim == 1:
+        side = int(round(image.size ** 0.5))
+        image = image.reshape(side, side)
+    matrix = _dct(image.shape[0])
+    low = (matrix @ image @ matrix.T)[:HASH_SIZE, :HASH_SIZE].reshape(-1)
+    # The DC term is the mean brightness, left out so a fade does not count as a change
+    bits = low > np.median(low[1:])
+    bits[0] = False
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hash_distance(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count('1')
+
+
+class SlideCapture:
+    """Periodically grab the shared screen and keep one image per distinct slide.
+
+    A frame is stored only when its hash stayed the same for two polls in a row (so
+    slide transitions and animations are skipped) and differs from every slide seen
+    so far by more than `threshold` bits. Going back to an earlier slide only adds
+    a timestamp to it. Times are seconds from `started_at` (time.monotonic() when the
+    recording started), so they line up with the audio.
+    """
+
+    def __init__(self, driver, output_dir, started_at=None, interval=None, threshold=None):
+        settings = get_settings()
+        self.driver = driver
+        self.output_dir = output_dir
+        self.started_at = time.monotonic() if started_at is None else started_at
+        self.interval = settings.slide_capture_interval if interval is None else interval
+        self.threshold = settings.slide_hash_threshold if threshold is None else threshold
+        self.slides = []
+        self.frames = 0
+        self._pending = None
+        self._current = None
+        self._next_poll = 0
+
+    def _offset(self):
+        return time.monotonic() - self.started_at
+
+    def poll_if_due(self):
+        """poll() when `interval` seconds passed since the last one"""
+        if self._offset() >= self._next_poll:
+            self._next_poll = self._offset() + self.interval
+            return self.poll()
+        return None
+
+    def poll(self):
+        """Hash the current frame; returns the slide dict when a new slide was stored"""
+        try:
+            frame = self.driver.execute_script(_FRAME_SCRIPT, False, HASH_IMAGE_SIZE)
+        except Exception as e:
+            print(f"  Error reading the presentation: {str(e)}")
+            return None
+        if not frame:
+            self._pending = self._current = None
+            return None
+        self.frames += 1
+        offset = self._offset()
+        frame_hash = perceptual_hash(frame['gray'])
+        if self._pending is None or hash_distance(self._pending[0], frame_hash) > self.threshold:
+            # Still changing (or first sight): wait for it to settle
+            self._pending = (frame_hash, offset)
+            return None
+        # On screen since the poll that first saw it
+        since = self._pending[1]
+        for slide in self.slides:
+            if hash_distance(slide['hash'], frame_hash) <= self.threshold:
+                if slide is not self._current:
+                    slide['shown_at'].append([since, offset])
+                    self._current = slide
+                slide['shown_at'][-1][1] = offset
+                return None
+        return self._store(frame_hash, since, offset, frame)
+
+    def _store(self, frame_hash, since, offset, frame):
+        try:
+            data_url = self.driver.execute_script(_FRAME_SCRIPT, True)
+        except Exception as e:
+            print(f"  Error capturing slide: {str(e)}")
+            return None
+        if not data_url:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"slide_{len(self.slides) + 1:03d}.png")
+        with open(path, 'wb') as f:
+            f.write(base64.b64decode(data_url.split(',', 1)[1]))
+        slide = {'index': len(self.slides) + 1, 'path': path, 'hash': frame_hash,
+                 'width': frame.get('width'), 'height': frame.get('height'),
+                 # [first, last] seconds into the recording of each time it was on screen
+                 'shown_at': [[since, offset]]}
+        self.slides.append(slide)
+        self._current = slide
+        print(f"  [{since:.0f}s] Slide {slide['index']} captured")
+        return slide
+
+    def manifest(self):
+        """The slides as JSON-ready dicts (hash as hex), in order of first appearance"""
+        return [dict(slide, hash=f"{slide['hash']:016x}", start=slide['shown_at'][0][0])
+                for slide in self.slides]
+
+    def save(self):
+        """Write slides.json next to the images. Returns its path, None without slides."""
+        if not self.slides:
+            return None
+        path = os.path.join(self.output_dir, 'slides.json')
+        with open(path, 'w') as f:
+            json.dump(self.manifest(), f, indent=2)
+        print(f"Slides saved in {self.output_dir} ({len(self.slides)} slides from {self.frames} frames)")
+        return path
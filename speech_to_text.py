@@ -1,21 +1,87 @@
-from openai import OpenAI
 import json
 import os
 import subprocess
-import tempfile
 import datetime
-from dotenv import load_dotenv
-
-load_dotenv()
+import time
+from dataclasses import replace
+from types import SimpleNamespace
+from settings import get_settings
+from artifact_store import ArtifactStore
+from minutes_stream import MinutesStream
+from model_routing import ModelRouter, validate_answer
+from token_budget import MERGE_INSTRUCTION, TokenBudget, UsageTracker, count_tokens
 
 class SpeechToText:
-    def __init__(self):
-        self.client = OpenAI(
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
-        self.MAX_AUDIO_SIZE_BYTES = int(os.getenv('MAX_AUDIO_SIZE_BYTES', 20 * 1024 * 1024))
-        self.GPT_MODEL = os.getenv('GPT_MODEL', 'gpt-4')
-        self.WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'whisper-1')
+    SUMMARY_PROMPT = "You are a highly skilled AI trained in language comprehension and summarization. I would like you to read the following text and summarize it into a concise abstract paragraph. Aim to retain the most important points, providing a coherent and readable summary that could help a person understand the main points of the discussion without needing to read the entire text. Please avoid unnecessary details or tangential points."
+    KEY_POINTS_PROMPT = "You are a proficient AI with a specialty in distilling information into key points. Based on the following text, identify and list the main points that were discussed or brought up. These should be the most important ideas, findings, or topics that are crucial to the essence of the discussion. Your goal is to provide a list that someone could read to quickly understand what was talked about."
+    ACTION_ITEMS_PROMPT = "You are an AI expert in analyzing conversations and extracting action items. Please review the text and identify any tasks, assignments, or actions that were agreed upon or mentioned as needing to be done. These could be tasks assigned to specific individuals, or general actions that the group has decided to take. Please list these action items clearly and concisely."
+    SENTIMENT_PROMPT = "As an AI with expertise in language and emotion analysis, your task is to analyze the sentiment of the following text. Please consider the overall tone of the discussion, the emotion conveyed by the language used, and the context in which words and phrases are used. Indicate whether the sentiment is generally positive, negative, or neutral, and provide brief explanations for your analysis where possible."
+
+    # Field of the minutes, label and prompt of each analysis, in meeting_minutes order
+    ANALYSES = (
+        ('abstract_summary', 'Summary', SUMMARY_PROMPT),
+        ('key_points', 'Key Points', KEY_POINTS_PROMPT),
+        ('action_items', 'Action Items', ACTION_ITEMS_PROMPT),
+        ('sentiment', 'Sentiment', SENTIMENT_PROMPT),
+    )
+    BACKENDS = ('openai', 'llama-cpp')
+
+    def __init__(self, client=None, archive_path=None, on_event=None, artifact_store=None, backend=None,
+                 router=None):
+        """
+        Args:
+            client: OpenAI client (defaults to one built from the settings)
+            archive_path: Meeting archive database, defaults to ARCHIVE_PATH
+            on_event: Callback receiving every minutes_stream.MinutesStream event while
+                the minutes are generated; enables streamed GPT responses
+            artifact_store: artifact_store.ArtifactStore for compressed audio, transcripts
+                and minutes files, defaults to one under ARTIFACT_ROOT
+            backend: Where the minutes are generated, "openai" or "llama-cpp" (a local
+                model, see local_llm.py); defaults to MINUTES_BACKEND. Whisper
+                transcription always uses the OpenAI client
+            router: model_routing.ModelRouter choosing the model of each analysis, defaults
+                to one built from MODEL_ROUTES when that is set (OpenAI backend only)
+        """
+        settings = get_settings()
+        backend = backend or settings.minutes_backend
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown MINUTES_BACKEND {backend!r}, expected one of {', '.join(self.BACKENDS)}")
+        # Built on first use: with a local backend it is only needed for Whisper
+        self._client = client
+        # None means the configured archive (ARCHIVE_PATH)
+        self.archive_path = archive_path
+        self.MAX_AUDIO_SIZE_BYTES = settings.max_audio_size_bytes
+        self.GPT_MODEL = settings.gpt_model
+        self.WHISPER_MODEL = settings.whisper_model
+        self.local_llm = None
+        if backend == 'llama-cpp':
+            from local_llm import get_local_llm
+
+            self.local_llm = get_local_llm()
+            self.GPT_MODEL = self.local_llm.model
+        # A local model has no bigger sibling to switch to: TOKEN_POLICY=switch chunks instead
+        self.budget = TokenBudget(fallback_models=[] if self.local_llm else None)
+        if router is None and settings.model_routes and not self.local_llm:
+            router = ModelRouter()
+        self.router = router
+        self.usage = UsageTracker()
+        self.on_event = on_event
+        self.stream_minutes = settings.stream_minutes
+        self.minutes_stream_path = settings.minutes_stream_path
+        self.stream = None
+        self.artifacts = artifact_store or ArtifactStore()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI
+
+            settings = get_settings()
+            self._client = OpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url
+            )
+        return self._client
 
     def get_file_size(self, file_path):
         return os.path.getsize(file_path)
@@ -30,10 +96,8 @@ class SpeechToText:
             current_duration = self.get_audio_duration(audio_file_path)
             target_duration = current_duration * self.MAX_AUDIO_SIZE_BYTES / audio_size
             
-            temp_dir = tempfile.mkdtemp()
-            print(f"Compressed audio will be stored in {temp_dir}")
-            
-            compressed_audio_path = os.path.join(temp_dir, f'compressed_audio_{datetime.datetime.now().strftime("%Y%m%d%H%M%S")}.wav')
+            compressed_audio_path = self.artifacts.new_path('compressed_audio', f'compressed_audio_{datetime.datetime.now().strftime("%Y%m%d%H%M%S")}.wav')
+            print(f"Compressed audio will be stored in {compressed_audio_path}")
             
             subprocess.run(['ffmpeg', '-i', audio_file_path, '-ss', '0', '-t', str(target_duration), compressed_audio_path])
             
@@ -49,105 +113,498 @@ class SpeechToText:
             print("Transcribe: Done")
             return transcript.text
 
-    def abstract_summary_extraction(self, transcription):
+    def _chat(self, system_prompt, content, label, model=None, estimated_prompt_tokens=None, field=None,
+              max_tokens=None):
+        """One chat completion; the usage the API reports is recorded in self.usage.
+        With a field and an open minutes stream the answer is streamed into it. max_tokens
+        caps the answer; only answers that are merged again are capped, the ones that end
+        up in the minutes are as long as the model makes them."""
+        model = model or self.GPT_MODEL
+        messages = [
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user",
+                "content": content
+            }
+        ]
+        started = time.perf_counter()
+        if self.local_llm:
+            on_text = (lambda text: self.stream.emit('delta', field=field, text=text)) if field and self.stream else None
+            answer = self.local_llm.chat(system_prompt, content, on_text)
+            self.usage.record(label, self.local_llm.model, answer, started, estimated_prompt_tokens,
+                              answer.first_token_seconds)
+            return answer.text
+        # max_tokens is only sent with a cap
+        limit = {'max_tokens': max_tokens} if max_tokens else {}
+        if field and self.stream:
+            return self._chat_streamed(messages, label, model, estimated_prompt_tokens, field, started, limit)
         response = self.client.chat.completions.create(
-            model=self.GPT_MODEL,
+            model=model,
             temperature=0,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a highly skilled AI trained in language comprehension and summarization. I would like you to read the following text and summarize it into a concise abstract paragraph. Aim to retain the most important points, providing a coherent and readable summary that could help a person understand the main points of the discussion without needing to read the entire text. Please avoid unnecessary details or tangential points."
-                },
-                {
-                    "role": "user",
-                    "content": transcription
-                }
-            ]
+            messages=messages,
+            **limit
         )
-        print("Summary: Done")
+        self.usage.record(label, model, response, started, estimated_prompt_tokens)
         return response.choices[0].message.content
 
-    def key_points_extraction(self, transcription):
+    def _chat_streamed(self, messages, label, model, estimated_prompt_tokens, field, started, limit):
         response = self.client.chat.completions.create(
-            model=self.GPT_MODEL,
+            model=model,
             temperature=0,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a proficient AI with a specialty in distilling information into key points. Based on the following text, identify and list the main points that were discussed or brought up. These should be the most important ideas, findings, or topics that are crucial to the essence of the discussion. Your goal is to provide a list that someone could read to quickly understand what was talked about."
-                },
-                {
-                    "role": "user",
-                    "content": transcription
-                }
-            ]
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **limit
         )
+        pieces = []
+        usage = None
+        first_token_seconds = None
+        for chunk in response:
+            if getattr(chunk, 'usage', None):
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                if first_token_seconds is None:
+                    first_token_seconds = time.perf_counter() - started
+                pieces.append(text)
+                self.stream.emit('delta', field=field, text=text)
+        self.usage.record(label, model, SimpleNamespace(usage=usage), started, estimated_prompt_tokens,
+                          first_token_seconds)
+        return ''.join(pieces)
+
+    def _analyze(self, system_prompt, transcription, label, plan=None, field=None):
+        """Run one analysis as planned by the token budget (single call, or parts plus a merge)"""
+        if plan is None:
+            plan = self.budget.plan(system_prompt, transcription, self.GPT_MODEL)
+        if self.router and field:
+            return self._analyze_routed(system_prompt, transcription, label, plan, field)
+        return self._run_plan(system_prompt, label, plan, field)
+
+    def _analyze_routed(self, system_prompt, transcription, label, plan, field, answer=None):
+        """Run a routed analysis and validate the answer; on failure (or an API error), analyse
+        again on the next bigger model of the route. With answer, plan.model already gave it
+        (see minutes_batch.py) and only the validation and fallbacks run."""
+        transcript_tokens = count_tokens(transcription, self.GPT_MODEL)
+        fallback = False
+        while True:
+            error = None
+            if answer is None:
+                calls = len(self.usage.records)
+                started = time.perf_counter()
+                try:
+                    answer = self._run_plan(system_prompt, label, plan, field)
+                    reason = validate_answer(field, answer)
+                except Exception as e:
+                    error, reason = e, f"error: {str(e)}"
+                self.router.record(field, plan.model, transcript_tokens, self.usage.records[calls:],
+                                   time.perf_counter() - started, reason, fallback)
+            else:
+                reason = validate_answer(field, answer)
+            if reason is None:
+                return answer
+            model = self.router.fallback(field, plan.model)
+            if model is None:
+                if error is not None:
+                    raise error
+                print(f"⚠ Warning: {label} from {plan.model} failed validation ({reason}), no bigger model to try")
+                # The API may answer without content (None); the minutes keep an empty field
+                return answer or ''
+            print(f"⚠ Warning: {label} from {plan.model} failed ({reason}), analysing again with {model}")
+            plan = self.budget.plan(system_prompt, transcription, model)
+            answer, fallback = None, True
+
+    def _run_plan(self, system_prompt, label, plan, field=None):
+        if self.stream and field:
+            self.stream.emit('start', field=field, model=plan.model, action=plan.action)
+        if not plan.merge:
+            estimate = self.budget.prompt_tokens(system_prompt, plan.contents[0], plan.model)
+            result = self._chat(system_prompt, plan.contents[0], label, plan.model, estimate, field)
+        else:
+            partials = []
+            for number, part in enumerate(plan.contents, 1):
+                estimate = self.budget.prompt_tokens(system_prompt, part, plan.model)
+                # The token budget plans the merges on answers of at most output_tokens
+                partials.append(self._chat(system_prompt, part, f"{label} {number}/{len(plan.contents)}",
+                                           plan.model, estimate, max_tokens=self.budget.output_tokens))
+                if self.stream and field:
+                    self.stream.emit('part', field=field, part=number, of=len(plan.contents))
+            result = self._merge_parts(system_prompt, partials, label, plan.model, field)
+        if self.stream and field:
+            self.stream.emit('done', field=field, text=result)
+        return result
+
+    def _analyze_together(self, plan):
+        """Local backend: the four analyses of each transcript part as one batch, so the part
+        is evaluated once and stays in the KV cache for all four instructions (see
+        local_llm.LocalLLM.analyze). Returns the four answers in ANALYSES order."""
+        if self.stream:
+            for field, _, _ in self.ANALYSES:
+                self.stream.emit('start', field=field, model=plan.model, action=plan.action)
+        on_text = None
+        if self.stream and not plan.merge:
+            on_text = lambda index, text: self.stream.emit('delta', field=self.ANALYSES[index][0], text=text)
+        partials = [[] for _ in self.ANALYSES]
+        for number, part in enumerate(plan.contents, 1):
+            answers = self.local_llm.analyze(part, [prompt for _, _, prompt in self.ANALYSES], on_text)
+            for (field, label, prompt), answer, answered in zip(self.ANALYSES, answers, partials):
+                if plan.merge:
+                    label = f"{label} {number}/{len(plan.contents)}"
+                # Answers of a batch run one after another; each is timed on its own
+                self.usage.record(label, self.local_llm.model, answer, time.perf_counter() - answer.seconds,
+                                  self.budget.prompt_tokens(prompt, part, plan.model), answer.first_token_seconds)
+                answered.append(answer.text)
+                if self.stream and plan.merge:
+                    self.stream.emit('part', field=field, part=number, of=len(plan.contents))
+        results = []
+        for (field, label, prompt), answered in zip(self.ANALYSES, partials):
+            result = self._merge_parts(prompt, answered, label, plan.model, field) if plan.merge else answered[0]
+            if self.stream:
+                self.stream.emit('done', field=field, text=result)
+            print(f"{label}: Done")
+            results.append(result)
+        return results
+
+    def _merge_parts(self, system_prompt, partials, label, model, field=None, max_tokens=None):
+        """Combine the answers for the parts of a chunked transcript into one. When they do not
+        fit one merge prompt, groups of them are merged first (into answers capped like the
+        parts, as they are merged again) and then their answers."""
+        groups = self.budget.merge_groups(system_prompt, partials, model)
+        if len(groups) > 1:
+            # A group of one answer goes on to the next round as it is
+            partials = [self._merge_parts(system_prompt, group, f"{label} {number}/{len(groups)}", model,
+                                          max_tokens=self.budget.output_tokens)
+                        if len(group) > 1 else group[0] for number, group in enumerate(groups, 1)]
+            return self._merge_parts(system_prompt, partials, label, model, field, max_tokens)
+        merged = "\n\n".join(f"Part {number}:\n{partial}" for number, partial in enumerate(partials, 1))
+        merge_content = f"{MERGE_INSTRUCTION}\n\n{merged}"
+        return self._chat(system_prompt, merge_content, f"{label} merge", model,
+                          self.budget.prompt_tokens(system_prompt, merge_content, model), field, max_tokens)
+
+    def plan_minutes(self, transcription):
+        """Pre-flight for meeting_minutes: count tokens and apply TOKEN_POLICY and
+        MAX_COST_PER_MEETING to all four analyses before any request is sent.
+        Raises token_budget.TokenBudgetError when the meeting is over budget."""
+        prompts = [self.SUMMARY_PROMPT, self.KEY_POINTS_PROMPT, self.ACTION_ITEMS_PROMPT, self.SENTIMENT_PROMPT]
+        if self.local_llm:
+            # The analyses share the transcript part of the prompt, so they share its split too
+            plan = self.budget.plan(max(prompts, key=len), transcription, self.GPT_MODEL)
+            plans = [replace(plan) for _ in prompts]
+        elif self.router:
+            tokens = count_tokens(transcription, self.GPT_MODEL)
+            plans = [self.budget.plan(prompt, transcription, self.router.route(field, tokens))
+                     for field, _, prompt in self.ANALYSES]
+        else:
+            plans = [self.budget.plan(prompt, transcription, self.GPT_MODEL) for prompt in prompts]
+        plans = self.budget.enforce(plans, prompts, transcription)
+        total_cost = sum(plan.cost for plan in plans)
+        if len({plan.model for plan in plans}) > 1:
+            for (_, label, _), plan in zip(self.ANALYSES, plans):
+                print(f"Analysis estimate, {label}: {plan.describe()}")
+            print(f"Analysis estimate: ~${total_cost:.4f} in total")
+        else:
+            print(f"Analysis estimate: {plans[0].describe()} per analysis, ~${total_cost:.4f} in total")
+        return plans
+
+    def abstract_summary_extraction(self, transcription, plan=None):
+        content = self._analyze(self.SUMMARY_PROMPT, transcription, "Summary", plan, 'abstract_summary')
+        print("Summary: Done")
+        return content
+
+    def key_points_extraction(self, transcription, plan=None):
+        content = self._analyze(self.KEY_POINTS_PROMPT, transcription, "Key Points", plan, 'key_points')
         print("Key Points: Done")
-        return response.choices[0].message.content
+        return content
 
-    def action_item_extraction(self, transcription):
-        response = self.client.chat.completions.create(
-            model=self.GPT_MODEL,
-            temperature=0,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an AI expert in analyzing conversations and extracting action items. Please review the text and identify any tasks, assignments, or actions that were agreed upon or mentioned as needing to be done. These could be tasks assigned to specific individuals, or general actions that the group has decided to take. Please list these action items clearly and concisely."
-                },
-                {
-                    "role": "user",
-                    "content": transcription
-                }
-            ]
-        )
+    def action_item_extraction(self, transcription, plan=None):
+        content = self._analyze(self.ACTION_ITEMS_PROMPT, transcription, "Action Items", plan, 'action_items')
         print("Action Items: Done")
-        return response.choices[0].message.content
+        return content
 
-    def sentiment_analysis(self, transcription):
-        response = self.client.chat.completions.create(
-            model=self.GPT_MODEL,
-            temperature=0,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "As an AI with expertise in language and emotion analysis, your task is to analyze the sentiment of the following text. Please consider the overall tone of the discussion, the emotion conveyed by the language used, and the context in which words and phrases are used. Indicate whether the sentiment is generally positive, negative, or neutral, and provide brief explanations for your analysis where possible."
-                },
-                {
-                    "role": "user",
-                    "content": transcription
-                }
-            ]
-        )
+    def sentiment_analysis(self, transcription, plan=None):
+        content = self._analyze(self.SENTIMENT_PROMPT, transcription, "Sentiment", plan, 'sentiment')
         print("Sentiment: Done")
-        return response.choices[0].message.content
+        return content
 
     def meeting_minutes(self, transcription):
-        abstract_summary = self.abstract_summary_extraction(transcription)
-        key_points = self.key_points_extraction(transcription)
-        action_items = self.action_item_extraction(transcription)
-        sentiment = self.sentiment_analysis(transcription)
-        return {
-            'abstract_summary': abstract_summary,
-            'key_points': key_points,
-            'action_items': action_items,
-            'sentiment': sentiment
-        }
+        summary_plan, key_points_plan, action_items_plan, sentiment_plan = self.plan_minutes(transcription)
+        self.stream = self._open_minutes_stream()
+        try:
+            if self.local_llm:
+                abstract_summary, key_points, action_items, sentiment = self._analyze_together(summary_plan)
+            else:
+                abstract_summary = self.abstract_summary_extraction(transcription, summary_plan)
+                key_points = self.key_points_extraction(transcription, key_points_plan)
+                action_items = self.action_item_extraction(transcription, action_items_plan)
+                sentiment = self.sentiment_analysis(transcription, sentiment_plan)
+            minutes = {
+                'abstract_summary': abstract_summary,
+                'key_points': key_points,
+                'action_items': action_items,
+                'sentiment': sentiment
+            }
+            if self.stream:
+                self.stream.emit('minutes', data=minutes)
+        finally:
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+        print("Token usage:\n" + self.usage.report())
+        return minutes
+
+    def _open_minutes_stream(self):
+        """NDJSON stream for this meeting when STREAM_MINUTES is on or a callback is set"""
+        if not (self.stream_minutes or self.on_event):
+            return None
+        path = None
+        if self.stream_minutes:
+            path = self.minutes_stream_path
+            if not path:
+                path = self.artifacts.new_path('json', f'meeting_stream_{datetime.datetime.now().strftime("%Y%m%d%H%M%S")}.ndjson')
+            print(f"Streaming minutes to {path}")
+        return MinutesStream(path, self.on_event)
+
+    def answer_question(self, question, context):
+        """Answer a question from retrieved transcript passages (see meeting_index.py),
+        so only the relevant parts of past meetings are sent to GPT"""
+        return self._chat(
+            "You answer questions about past meetings using only the transcript excerpts provided. Each excerpt is labelled with its meeting and date. Cite the meetings and dates your answer relies on, say when decisions changed over time, and say so plainly if the excerpts do not contain the answer.",
+            f"Transcript excerpts:\n{context}\n\nQuestion: {question}",
+            "Question")
+
+    def incremental_minutes(self, interval_minutes=None):
+        """Start a rolling meeting-minutes session that is updated while the call runs"""
+        return IncrementalMinutes(self, interval_minutes)
+
+    def batch_minutes(self, batch_id=None):
+        """Start (or, with batch_id, resume) a Batch API submission for many meetings;
+        see minutes_batch.MinutesBatch. Raises ValueError with MINUTES_BACKEND=llama-cpp."""
+        from minutes_batch import MinutesBatch
+
+        if self.local_llm:
+            raise ValueError("MINUTES_BACKEND=llama-cpp cannot use the OpenAI Batch API; "
+                             "analyse the meetings one by one with the local model instead")
+        if batch_id:
+            return MinutesBatch.load(self, batch_id)
+        return MinutesBatch(self)
 
     def store_in_json_file(self, data):
-        temp_dir = tempfile.mkdtemp()
-        file_path = os.path.join(temp_dir, f'meeting_data_{datetime.datetime.now().strftime("%Y%m%d%H%M%S")}.json')
+        file_path = self.artifacts.new_path('json', f'meeting_data_{datetime.datetime.now().strftime("%Y%m%d%H%M%S")}.json')
         print(f"JSON file path: {file_path}")
         with open(file_path, 'w') as f:
             json.dump(data, f)
         print("JSON file created successfully.")
+        return file_path
+
+    def store_transcript(self, transcription):
+        file_path = self.artifacts.new_path('transcripts', f'transcript_{datetime.datetime.now().strftime("%Y%m%d%H%M%S")}.txt')
+        with open(file_path, 'w') as f:
+            f.write(transcription)
+        print(f"Transcript file path: {file_path}")
+        return file_path
 
-    def transcribe(self, audio_file_path):
+    def transcribe(self, audio_file_path, metadata=None):
         audio_file_path = self.resize_audio_if_needed(audio_file_path)
         transcription = self.transcribe_audio(audio_file_path)
+        self.store_transcript(transcription)
+        self.analyze_transcript(transcription, metadata)
+
+    def analyze_transcript(self, transcription, metadata=None):
+        """Generate, store and print meeting minutes for an existing transcript
+        (e.g. collected from live captions)"""
         summary = self.meeting_minutes(transcription)
+        self.publish_minutes(summary, transcription, metadata)
+
+    def archive_minutes(self, summary, transcription=None, metadata=None):
+        """Add the meeting to the searchable archive (see meeting_archive.py)"""
+        if not get_settings().archive_meetings:
+            return None
+        from meeting_archive import archive_meeting
+
+        try:
+            meeting_id = archive_meeting(summary, transcription, metadata, self.archive_path)
+            print(f"Meeting archived (id {meeting_id})")
+        except Exception as e:
+            print(f"⚠ Warning: Could not archive meeting: {str(e)}")
+            return None
+        if transcription and get_settings().vector_index:
+            from meeting_index import index_meeting
+
+            try:
+                chunks = index_meeting(meeting_id, transcription, metadata)
+                print(f"Meeting added to the vector index ({chunks} chunks)")
+            except Exception as e:
+                print(f"⚠ Warning: Could not index meeting: {str(e)}")
+        return meeting_id
+
+    def export_minutes(self, summary, transcription=None, metadata=None):
+        """Append the meeting to the columnar export when EXPORT_DIR is set (see meeting_export.py)"""
+        if not get_settings().export_dir:
+            return None
+        from meeting_export import export_meeting
+
+        try:
+            meeting_id = export_meeting(summary, transcription, metadata)
+            print(f"Meeting exported (id {meeting_id})")
+            return meeting_id
+        except Exception as e:
+            print(f"⚠ Warning: Could not export meeting: {str(e)}")
+            return None
+
+    def publish_minutes(self, summary, transcription=None, metadata=None):
+        """Store meeting minutes as JSON and in the archive, and print them
+
+        Args:
+            summary: Dict with the four analysis fields
+            transcription: Transcript the minutes were generated from, indexed for search
+            metadata: Optional dict with meet_link, started_at, duration and participants,
+                and slides (slide_capture.SlideCapture.manifest()) to attach to the minutes
+        """
+        if metadata and metadata.get('slides'):
+            summary = dict(summary, slides=metadata['slides'])
         self.store_in_json_file(summary)
-    
+        self.archive_minutes(summary, transcription, metadata)
+        self.export_minutes(summary, transcription, metadata)
+
         print(f"Abstract Summary: {summary['abstract_summary']}")
         print(f"Key Points: {summary['key_points']}")
         print(f"Action Items: {summary['action_items']}")
         print(f"Sentiment: {summary['sentiment']}")
+
+
+class IncrementalMinutes:
+    """Rolling meeting minutes kept up to date from transcript deltas.
+
+    Every update sends only the previous state plus the transcript added since the
+    last update, so token usage grows linearly with meeting length and the final
+    minutes are ready right after the call ends.
+    """
+
+    SYSTEM_PROMPT = (
+        "You maintain live minutes of an ongoing meeting. You receive the current minutes as JSON and "
+        "the newest part of the transcript. Return the updated minutes as a single JSON object with the keys "
+        "\"abstract_summary\" (a concise abstract paragraph covering the whole meeting so far), "
+        "\"key_points\" (list of the main points discussed so far), "
+        "\"action_items\" (list of tasks, assignments or agreed actions so far, keeping earlier ones unless they were cancelled) and "
+        "\"sentiment\" (overall tone so far: positive, negative or neutral, with a brief explanation). "
+        "Return only the JSON object."
+    )
+    # Unparseable answers in a row after which live updates stop (each resends a longer delta)
+    MAX_FAILED_UPDATES = 3
+
+    def __init__(self, speech_to_text, interval_minutes=None):
+        self.speech_to_text = speech_to_text
+        if interval_minutes is None:
+            interval_minutes = get_settings().minutes_update_interval
+        self.interval_seconds = interval_minutes * 60
+        self.state = {
+            'abstract_summary': '',
+            'key_points': [],
+            'action_items': [],
+            'sentiment': '',
+        }
+        self.updates = 0
+        self.prompt_characters = 0
+        self._pending = []
+        self._pending_since = None
+        self._failed_updates = 0
+        # Everything added, for the full analysis when live updates gave up
+        self._transcript = []
+
+    @property
+    def failed(self):
+        """True once MAX_FAILED_UPDATES answers in a row could not be parsed"""
+        return self._failed_updates >= self.MAX_FAILED_UPDATES
+
+    def add_transcript(self, text, timestamp=None):
+        """Queue new transcript text; timestamp is when it was spoken (defaults to now)"""
+        text = (text or '').strip()
+        if not text:
+            return
+        if timestamp is None:
+            timestamp = time.time()
+        if self._pending_since is None:
+            self._pending_since = timestamp
+        self._pending.append((text, timestamp))
+        self._transcript.append(text)
+
+    def add_segments(self, segments):
+        """Queue caption segments (see live_captions.CaptionTranscript)"""
+        for segment in segments:
+            self.add_transcript(f"{segment['speaker']}: {segment['text']}", segment.get('start'))
+
+    def update_if_due(self):
+        """Update the minutes once the queued transcript covers the update interval"""
+        if not self._pending or self.failed:
+            return False
+        if self._pending[-1][1] - self._pending_since < self.interval_seconds:
+            return False
+        self.update()
+        return True
+
+    def update(self):
+        """Send the previous state and the queued delta, and replace the state with the answer"""
+        if not self._pending or self.failed:
+            return self.state
+        delta = "\n".join(text for text, _ in self._pending)
+        user_content = (
+            f"Current minutes:\n{json.dumps(self.state)}\n\n"
+            f"New transcript:\n{delta}"
+        )
+        self.prompt_characters += len(self.SYSTEM_PROMPT) + len(user_content)
+        content = self.speech_to_text._chat(self.SYSTEM_PROMPT, user_content, "Live minutes")
+        if not self._merge(content):
+            # Keep the delta queued, so the next update sends it again
+            self._failed_updates += 1
+            if self.failed:
+                print(f"⚠ Warning: Live minutes: {self._failed_updates} updates in a row could not be parsed, "
+                      f"no more live updates; the minutes will be made from the whole transcript")
+            return self.state
+        self._failed_updates = 0
+        self._pending = []
+        self._pending_since = None
+        self.updates += 1
+        print(f"Live minutes: update {self.updates} done")
+        return self.state
+
+    def _merge(self, content):
+        """Apply an answer to the state; False when it could not be parsed"""
+        text = (content or '').strip()
+        # Tolerate answers wrapped in a markdown code fence
+        start, end = text.find('{'), text.rfind('}')
+        try:
+            updated = json.loads(text[start:end + 1])
+        except ValueError:
+            updated = None
+        if not isinstance(updated, dict):
+            print("Live minutes: could not parse update, keeping previous state and retrying the transcript")
+            return False
+        for key in self.state:
+            if key in updated and updated[key]:
+                self.state[key] = updated[key]
+        return True
+
+    @staticmethod
+    def _as_text(value):
+        if isinstance(value, list):
+            return "\n".join(f"- {item}" for item in value)
+        return value or ''
+
+    def finalize(self):
+        """Flush the remaining transcript and return minutes in the meeting_minutes format.
+        When the rest cannot be merged into the state, the whole transcript is analysed
+        with meeting_minutes() instead, so the minutes never miss the end of the meeting."""
+        while self._pending and not self.failed:
+            self.update()
+        if self._pending:
+            return self.speech_to_text.meeting_minutes("\n".join(self._transcript))
+        return {
+            'abstract_summary': self._as_text(self.state['abstract_summary']),
+            'key_points': self._as_text(self.state['key_points']),
+            'action_items': self._as_text(self.state['action_items']),
+            'sentiment': self._as_text(self.state['sentiment'])
+        }
@@ -3,14 +3,33 @@
 Automate joining Google Meet, record audio, transcribe with Whisper, and summarize using GPT.
 """
 
-from .record_audio import AudioRecorder
-from .speech_to_text import SpeechToText
-from .join_google_meet import JoinGoogleMeet
+import importlib
+
+# The public classes pull in selenium, sounddevice (PortAudio), scipy and openai, so
+# they are only imported on first attribute access (PEP 562).
+_LAZY_ATTRIBUTES = {
+    "AudioRecorder": ".record_audio",
+    "SpeechToText": ".speech_to_text",
+    "JoinGoogleMeet": ".join_google_meet",
+    "MeetingArchive": ".meeting_archive",
+}
 
 __all__ = [
     "AudioRecorder",
     "SpeechToText",
     "JoinGoogleMeet",
+    "MeetingArchive",
 ]
 
 
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
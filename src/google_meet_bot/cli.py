@@ -1,30 +1,52 @@
 import argparse
 import os
-import tempfile
+import sys
 
-from .join_google_meet import JoinGoogleMeet
-from .speech_to_text import SpeechToText
+from .artifact_store import ArtifactStore, recording_bytes
+from .settings import get_settings
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Join a Google Meet, record audio, and summarize it.")
-    parser.add_argument("--meet-link", dest="meet_link", default=os.getenv("MEET_LINK"), help="Google Meet link")
-    parser.add_argument("--duration", dest="duration", type=int, default=int(os.getenv("RECORDING_DURATION", 60)), help="Recording duration in seconds")
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "search":
+        from .meeting_archive import search_main
+
+        return search_main(argv[1:], prog="google-meet-bot search")
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description="Join a Google Meet, record audio, and summarize it.",
+        epilog="Run 'google-meet-bot search --help' to search archived meetings.")
+    parser.add_argument("--meet-link", dest="meet_link", default=settings.meet_link, help="Google Meet link")
+    parser.add_argument("--duration", dest="duration", type=int, default=settings.recording_duration, help="Recording duration in seconds")
     parser.add_argument("--no-analysis", dest="no_analysis", action="store_true", help="Skip analysis phase")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if not args.meet_link:
         raise SystemExit("--meet-link (or MEET_LINK env) is required")
 
-    temp_dir = tempfile.mkdtemp()
-    audio_path = os.path.join(temp_dir, "output.wav")
+    # Imported here so --help and argument errors don't load selenium/sounddevice/openai
+    from .join_google_meet import JoinGoogleMeet
+
+    artifacts = ArtifactStore()
+    # The recording is written when it stops; make room for all of it first
+    if not artifacts.ensure_space(recording_bytes(args.duration)):
+        raise SystemExit(f"Not enough disk space for a {args.duration} second recording in {artifacts.root}")
+    session_dir = artifacts.new_dir('raw_audio')
+    audio_path = os.path.join(session_dir, "output.wav")
+
+    try:
+        bot = JoinGoogleMeet()
+        bot.Glogin()
+        bot.turnOffMicCam(args.meet_link)
+        bot.AskToJoin(audio_path, args.duration)
 
-    bot = JoinGoogleMeet()
-    bot.Glogin()
-    bot.turnOffMicCam(args.meet_link)
-    bot.AskToJoin(audio_path, args.duration)
+        if not args.no_analysis:
+            from .speech_to_text import SpeechToText
 
-    if not args.no_analysis:
-        SpeechToText().transcribe(audio_path)
+            SpeechToText(artifact_store=artifacts).transcribe(audio_path)
+    finally:
+        artifacts.release(session_dir)
 
 
@@ -7,20 +7,17 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import time
 import os
-import tempfile
-from dotenv import load_dotenv
 
 from .record_audio import AudioRecorder
-from .speech_to_text import SpeechToText
-
-
-load_dotenv()
+from .artifact_store import ArtifactStore
+from .settings import get_settings
 
 
 class JoinGoogleMeet:
     def __init__(self):
-        self.mail_address = os.getenv('EMAIL_ID')
-        self.password = os.getenv('EMAIL_PASSWORD')
+        settings = get_settings()
+        self.mail_address = settings.email_id
+        self.password = settings.email_password
         # create chrome instance
         opt = Options()
         opt.add_argument('--disable-blink-features=AutomationControlled')
@@ -92,17 +89,22 @@ class JoinGoogleMeet:
 
 def _main():
     DO_ANALYSIS = True
-    temp_dir = tempfile.mkdtemp()
-    audio_path = os.path.join(temp_dir, "output.wav")
+    artifacts = ArtifactStore()
+    session_dir = artifacts.new_dir('raw_audio')
+    audio_path = os.path.join(session_dir, "output.wav")
     # Get configuration from environment variables
-    meet_link = os.getenv('MEET_LINK')
-    duration = int(os.getenv('RECORDING_DURATION', 60))
+    settings = get_settings()
+    meet_link = settings.meet_link
+    duration = settings.recording_duration
 
     obj = JoinGoogleMeet()
     obj.Glogin()
     obj.turnOffMicCam(meet_link)
     obj.AskToJoin(audio_path, duration)
     if DO_ANALYSIS:
-        SpeechToText().transcribe(audio_path)
+        from .speech_to_text import SpeechToText
+
+        SpeechToText(artifact_store=artifacts).transcribe(audio_path)
+    artifacts.release(session_dir)
 
 
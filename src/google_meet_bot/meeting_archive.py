@@ -0,0 +1,321 @@
+import json
+import os
+import sqlite3
+import time
+
+from .settings import get_settings
+
+
+ANALYSIS_FIELDS = ('abstract_summary', 'key_points', 'action_items', 'sentiment')
+# Columns indexed for full-text search, in FTS column order
+SEARCH_FIELDS = ('transcript',) + ANALYSIS_FIELDS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id INTEGER PRIMARY KEY,
+    meet_link TEXT,
+    started_at REAL,
+    duration REAL,
+    participants TEXT NOT NULL DEFAULT '[]',
+    transcript TEXT NOT NULL DEFAULT '',
+    abstract_summary TEXT NOT NULL DEFAULT '',
+    key_points TEXT NOT NULL DEFAULT '',
+    action_items TEXT NOT NULL DEFAULT '',
+    sentiment TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS meetings_started_at ON meetings (started_at);
+CREATE INDEX IF NOT EXISTS meetings_meet_link ON meetings (meet_link);
+
+-- External-content index: the text is stored once, in meetings, and the triggers
+-- keep the index in step with it
+CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5 (
+    transcript, abstract_summary, key_points, action_items, sentiment,
+    content='meetings', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS meetings_ai AFTER INSERT ON meetings BEGIN
+    INSERT INTO meetings_fts (rowid, transcript, abstract_summary, key_points, action_items, sentiment)
+    VALUES (new.id, new.transcript, new.abstract_summary, new.key_points, new.action_items, new.sentiment);
+END;
+CREATE TRIGGER IF NOT EXISTS meetings_ad AFTER DELETE ON meetings BEGIN
+    INSERT INTO meetings_fts (meetings_fts, rowid, transcript, abstract_summary, key_points, action_items, sentiment)
+    VALUES ('delete', old.id, old.transcript, old.abstract_summary, old.key_points, old.action_items, old.sentiment);
+END;
+CREATE TRIGGER IF NOT EXISTS meetings_au AFTER UPDATE ON meetings BEGIN
+    INSERT INTO meetings_fts (meetings_fts, rowid, transcript, abstract_summary, key_points, action_items, sentiment)
+    VALUES ('delete', old.id, old.transcript, old.abstract_summary, old.key_points, old.action_items, old.sentiment);
+    INSERT INTO meetings_fts (rowid, transcript, abstract_summary, key_points, action_items, sentiment)
+    VALUES (new.id, new.transcript, new.abstract_summary, new.key_points, new.action_items, new.sentiment);
+END;
+"""
+
+_COLUMNS = ('meet_link', 'started_at', 'duration', 'participants', 'transcript') + ANALYSIS_FIELDS + ('created_at',)
+_INSERT = f"INSERT INTO meetings ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)})"
+
+
+def default_archive_path():
+    configured = get_settings().archive_path
+    if configured:
+        return os.path.expanduser(configured)
+    return os.path.join(os.path.expanduser('~'), '.google_meet_bot', 'meetings.db')
+
+
+def _as_text(value):
+    """Analysis fields may be strings or lists (incremental minutes)"""
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return "\n".join(str(item) for item in value)
+    return str(value)
+
+
+def quote_query(query):
+    """Turn free text into an FTS5 query that matches all words, in any order.
+
+    Every word is quoted, so input like "Q3 -budget" or "what's next?" never raises
+    an FTS5 syntax error; a trailing * keeps prefix matching ("deploy*").
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+class MeetingArchive:
+    """Persistent SQLite archive of meetings with an FTS5 index over transcript and minutes."""
+
+    def __init__(self, path=None):
+        self.path = path or default_archive_path()
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        if self.path != ':memory:':
+            # WAL lets the search CLI read while a bot is writing
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _row_values(meeting):
+        participants = meeting.get('participants') or []
+        return (
+            meeting.get('meet_link'),
+            meeting.get('started_at'),
+            meeting.get('duration'),
+            json.dumps(list(participants)),
+            _as_text(meeting.get('transcript')),
+        ) + tuple(_as_text(meeting.get(field)) for field in ANALYSIS_FIELDS) + (
+            meeting.get('created_at') or time.time(),
+        )
+
+    def add(self, meeting):
+        """Store one meeting and return its id.
+
+        meeting is a dict with any of: meet_link, started_at (epoch seconds), duration
+        (seconds), participants (list of names), transcript and the analysis fields.
+        """
+        with self.conn:
+            return self.conn.execute(_INSERT, self._row_values(meeting)).lastrowid
+
+    def add_many(self, meetings):
+        """Store many meetings in a single transaction. Returns the number stored."""
+        with self.conn:
+            cursor = self.conn.executemany(_INSERT, (self._row_values(meeting) for meeting in meetings))
+        return cursor.rowcount
+
+    @staticmethod
+    def _to_dict(row):
+        meeting = dict(row)
+        if 'participants' in meeting:
+            meeting['participants'] = json.loads(meeting['participants'] or '[]')
+        return meeting
+
+    def get(self, meeting_id):
+        row = self.conn.execute('SELECT * FROM meetings WHERE id = ?', (meeting_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def delete(self, meeting_id):
+        with self.conn:
+            self.conn.execute('DELETE FROM meetings WHERE id = ?', (meeting_id,))
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM meetings').fetchone()[0]
+
+    @staticmethod
+    def _filters(since, until, meet_link):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append('m.started_at >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('m.started_at < ?')
+            params.append(until)
+        if meet_link:
+            clauses.append('m.meet_link = ?')
+            params.append(meet_link)
+        return clauses, params
+
+    def search(self, query, limit=20, since=None, until=None, meet_link=None, field=None, raw=False):
+        """Meetings matching query, best match first.
+
+        Args:
+            query: Words to search for (all must match); with raw=True, an FTS5 query
+                (phrases, OR/NOT, NEAR, column filters)
+            limit: Maximum number of results
+            since, until: Only meetings started in [since, until) (epoch seconds)
+            meet_link: Only meetings of this link
+            field: Only search one of SEARCH_FIELDS
+            raw: Pass query to FTS5 unchanged
+
+        Returns:
+            List of dicts with id, meet_link, started_at, duration, participants, a
+            highlighted snippet and the bm25 rank (lower is better)
+        """
+        match = query if raw else quote_query(query)
+        if not match:
+            return []
+        if field:
+            if field not in SEARCH_FIELDS:
+                raise ValueError(f"Unknown search field {field!r}, expected one of {', '.join(SEARCH_FIELDS)}")
+            match = f'{field} : ({match})'
+        clauses, params = self._filters(since, until, meet_link)
+        where = ''.join(f' AND {clause}' for clause in clauses)
+        join = ' JOIN meetings m ON m.id = meetings_fts.rowid' if clauses else ''
+        # Rank first, then build snippets for the top rows only: SQLite evaluates the
+        # select list of every match before sorting, and snippet() is the costly part
+        ranked = self.conn.execute(
+            f"SELECT meetings_fts.rowid, meetings_fts.rank FROM meetings_fts{join} "
+            f"WHERE meetings_fts MATCH ?{where} ORDER BY meetings_fts.rank LIMIT ?",
+            [match] + params + [limit]).fetchall()
+        if not ranked:
+            return []
+        ranks = {row[0]: row[1] for row in ranked}
+        # Column -1 lets FTS5 pick the column with the best matching fragment
+        rows = self.conn.execute(
+            "SELECT m.id, m.meet_link, m.started_at, m.duration, m.participants, "
+            "snippet(meetings_fts, -1, '[', ']', '…', 12) AS snippet "
+            "FROM meetings_fts JOIN meetings m ON m.id = meetings_fts.rowid "
+            f"WHERE meetings_fts MATCH ? AND meetings_fts.rowid IN ({', '.join('?' for _ in ranks)})",
+            [match] + list(ranks)).fetchall()
+        results = []
+        for row in rows:
+            meeting = self._to_dict(row)
+            meeting['rank'] = ranks[meeting['id']]
+            results.append(meeting)
+        return sorted(results, key=lambda meeting: meeting['rank'])
+
+    def recent(self, limit=20, since=None, until=None, meet_link=None):
+        """Latest meetings without full text, newest first"""
+        clauses, params = self._filters(since, until, meet_link)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        sql = (
+            "SELECT m.id, m.meet_link, m.started_at, m.duration, m.participants, m.abstract_summary "
+            f"FROM meetings m{where} ORDER BY m.started_at DESC LIMIT ?"
+        )
+        return [self._to_dict(row) for row in self.conn.execute(sql, params + [limit]).fetchall()]
+
+    def optimize(self):
+        """Merge the FTS index segments (worth running after large bulk imports)"""
+        with self.conn:
+            self.conn.execute("INSERT INTO meetings_fts (meetings_fts) VALUES ('optimize')")
+
+
+def archive_meeting(summary, transcript=None, metadata=None, path=None):
+    """Store one analysed meeting in the archive. Returns the meeting id."""
+    meeting = dict(metadata or {})
+    meeting['transcript'] = transcript
+    for field in ANALYSIS_FIELDS:
+        meeting[field] = summary.get(field)
+    with MeetingArchive(path) as archive:
+        return archive.add(meeting)
+
+
+def _parse_date(value):
+    """YYYY-MM-DD (local time) or epoch seconds"""
+    import datetime
+
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').timestamp()
+
+
+def _format_result(meeting):
+    import datetime
+
+    started = (datetime.datetime.fromtimestamp(meeting['started_at']).strftime('%Y-%m-%d %H:%M')
+               if meeting.get('started_at') else 'unknown date')
+    duration = f"{meeting['duration'] / 60:.0f} min" if meeting.get('duration') else ''
+    header = f"#{meeting['id']:<6} {started}  {duration:>7}  {meeting.get('meet_link') or ''}".rstrip()
+    lines = [header]
+    if meeting.get('participants'):
+        lines.append(f"        with {', '.join(meeting['participants'])}")
+    text = meeting.get('snippet') or meeting.get('abstract_summary') or ''
+    if text:
+        lines.append('        ' + ' '.join(text.split())[:200])
+    return "\n".join(lines)
+
+
+def build_search_parser(prog=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="Search archived meetings (transcripts and minutes).")
+    parser.add_argument("query", nargs="*", help="Words to search for; all must match. Without a query, list recent meetings")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--since", type=_parse_date, help="Only meetings started on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=_parse_date, help="Only meetings started before this date (YYYY-MM-DD)")
+    parser.add_argument("--link", dest="meet_link", help="Only meetings of this Meet link")
+    parser.add_argument("--field", choices=SEARCH_FIELDS, help="Only search this field")
+    parser.add_argument("--raw", action="store_true", help="Treat the query as FTS5 syntax (phrases, OR, NOT, NEAR)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--show", type=int, metavar="ID", help="Print one archived meeting in full")
+    parser.add_argument("--db", help="Archive database (default: ARCHIVE_PATH or ~/.google_meet_bot/meetings.db)")
+    return parser
+
+
+def search_main(argv=None, prog=None):
+    args = build_search_parser(prog).parse_args(argv)
+    with MeetingArchive(args.db) as archive:
+        if args.show is not None:
+            meeting = archive.get(args.show)
+            if meeting is None:
+                raise SystemExit(f"No archived meeting with id {args.show}")
+            print(json.dumps(meeting, indent=2))
+            return
+
+        started = time.perf_counter()
+        query = ' '.join(args.query)
+        try:
+            if query:
+                results = archive.search(query, limit=args.limit, since=args.since, until=args.until,
+                                         meet_link=args.meet_link, field=args.field, raw=args.raw)
+            else:
+                results = archive.recent(limit=args.limit, since=args.since, until=args.until,
+                                         meet_link=args.meet_link)
+        except sqlite3.OperationalError as e:
+            raise SystemExit(f"Invalid search query: {str(e)}")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for meeting in results:
+        print(_format_result(meeting))
+    print(f"{len(results)} meeting(s) in {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    search_main()
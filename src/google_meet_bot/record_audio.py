@@ -1,17 +1,14 @@
-import sounddevice as sd
-from scipy.io.wavfile import write
-import os
-from dotenv import load_dotenv
-
-
-load_dotenv()
+from .settings import get_settings
 
 
 class AudioRecorder:
     def __init__(self):
-        self.sample_rate = int(os.getenv('SAMPLE_RATE', 44100))
+        self.sample_rate = get_settings().sample_rate
 
     def get_audio(self, filename, duration):
+        import sounddevice as sd
+        from scipy.io.wavfile import write
+
         print("Recording...")
         recording = sd.rec(int(duration * self.sample_rate), samplerate=self.sample_rate, channels=2, dtype='int16')
         sd.wait()  # Wait until the recording is finished
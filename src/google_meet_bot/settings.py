@@ -0,0 +1,59 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+
+def _env_str(name, default=None):
+    value = os.getenv(name)
+    return value if value not in (None, '') else default
+
+
+@dataclass(frozen=True)
+class Settings:
+    """All configuration, read once from the environment (and .env) by get_settings()"""
+
+    email_id: Optional[str] = None
+    email_password: Optional[str] = None
+    meet_link: Optional[str] = None
+    recording_duration: int = 60
+    sample_rate: int = 44100
+    max_audio_size_bytes: int = 20 * 1024 * 1024
+    artifact_root: Optional[str] = None
+    artifact_budget_mb: int = 10240
+    artifact_retention_days: str = 'raw_audio=7,compressed_audio=2,transcripts=90,json=90'
+    min_free_disk_mb: int = 1024
+    openai_api_key: Optional[str] = None
+    gpt_model: str = 'gpt-4'
+    whisper_model: str = 'whisper-1'
+    archive_meetings: bool = True
+    archive_path: Optional[str] = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            email_id=_env_str('EMAIL_ID'),
+            email_password=_env_str('EMAIL_PASSWORD'),
+            meet_link=_env_str('MEET_LINK'),
+            recording_duration=int(_env_str('RECORDING_DURATION', cls.recording_duration)),
+            sample_rate=int(_env_str('SAMPLE_RATE', cls.sample_rate)),
+            max_audio_size_bytes=int(_env_str('MAX_AUDIO_SIZE_BYTES', cls.max_audio_size_bytes)),
+            artifact_root=_env_str('ARTIFACT_ROOT'),
+            artifact_budget_mb=int(_env_str('ARTIFACT_BUDGET_MB', cls.artifact_budget_mb)),
+            artifact_retention_days=_env_str('ARTIFACT_RETENTION_DAYS', cls.artifact_retention_days),
+            min_free_disk_mb=int(_env_str('MIN_FREE_DISK_MB', cls.min_free_disk_mb)),
+            openai_api_key=_env_str('OPENAI_API_KEY'),
+            gpt_model=_env_str('GPT_MODEL', cls.gpt_model),
+            whisper_model=_env_str('WHISPER_MODEL', cls.whisper_model),
+            archive_meetings=_env_str('ARCHIVE_MEETINGS', 'true').lower() in ('1', 'true', 'yes', 'on'),
+            archive_path=_env_str('ARCHIVE_PATH'),
+        )
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    """Load .env once and return the shared Settings"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Settings.from_env()
@@ -1,23 +1,24 @@
-from openai import OpenAI
 import json
 import os
 import subprocess
-import tempfile
 import datetime
-from dotenv import load_dotenv
 
-
-load_dotenv()
+from .settings import get_settings
+from .artifact_store import ArtifactStore
 
 
 class SpeechToText:
-    def __init__(self):
+    def __init__(self, artifact_store=None):
+        from openai import OpenAI
+
+        settings = get_settings()
         self.client = OpenAI(
-            api_key=os.getenv("OPENAI_API_KEY")
+            api_key=settings.openai_api_key
         )
-        self.MAX_AUDIO_SIZE_BYTES = int(os.getenv('MAX_AUDIO_SIZE_BYTES', 20 * 1024 * 1024))
-        self.GPT_MODEL = os.getenv('GPT_MODEL', 'gpt-4')
-        self.WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'whisper-1')
+        self.MAX_AUDIO_SIZE_BYTES = settings.max_audio_size_bytes
+        self.GPT_MODEL = settings.gpt_model
+        self.WHISPER_MODEL = settings.whisper_model
+        self.artifacts = artifact_store or ArtifactStore()
 
     def get_file_size(self, file_path):
         return os.path.getsize(file_path)
@@ -32,10 +33,8 @@ class SpeechToText:
             current_duration = self.get_audio_duration(audio_file_path)
             target_duration = current_duration * self.MAX_AUDIO_SIZE_BYTES / audio_size
 
-            temp_dir = tempfile.mkdtemp()
-            print(f"Compressed audio will be stored in {temp_dir}")
-
-            compressed_audio_path = os.path.join(temp_dir, f'compressed_audio_{datetime.datetime.now().strftime("%Y%m%d%H%M%S")}.wav')
+            compressed_audio_path = self.artifacts.new_path('compressed_audio', f'compressed_audio_{datetime.datetime.now().strftime("%Y%m%d%H%M%S")}.wav')
+            print(f"Compressed audio will be stored in {compressed_audio_path}")
 
             subprocess.run(['ffmpeg', '-i', audio_file_path, '-ss', '0', '-t', str(target_duration), compressed_audio_path])
 
@@ -136,18 +135,32 @@ class SpeechToText:
         }
 
     def store_in_json_file(self, data):
-        temp_dir = tempfile.mkdtemp()
-        file_path = os.path.join(temp_dir, f'meeting_data_{datetime.datetime.now().strftime("%Y%m%d%H%M%S")}.json')
+        file_path = self.artifacts.new_path('json', f'meeting_data_{datetime.datetime.now().strftime("%Y%m%d%H%M%S")}.json')
         print(f"JSON file path: {file_path}")
         with open(file_path, 'w') as f:
             json.dump(data, f)
         print("JSON file created successfully.")
 
-    def transcribe(self, audio_file_path):
+    def archive_minutes(self, summary, transcription=None, metadata=None):
+        """Add the meeting to the searchable archive (see meeting_archive.py)"""
+        if not get_settings().archive_meetings:
+            return None
+        from .meeting_archive import archive_meeting
+
+        try:
+            meeting_id = archive_meeting(summary, transcription, metadata)
+            print(f"Meeting archived (id {meeting_id})")
+            return meeting_id
+        except Exception as e:
+            print(f"⚠ Warning: Could not archive meeting: {str(e)}")
+            return None
+
+    def transcribe(self, audio_file_path, metadata=None):
         audio_file_path = self.resize_audio_if_needed(audio_file_path)
         transcription = self.transcribe_audio(audio_file_path)
         summary = self.meeting_minutes(transcription)
         self.store_in_json_file(summary)
+        self.archive_minutes(summary, transcription, metadata)
 
         print(f"Abstract Summary: {summary['abstract_summary']}")
         print(f"Key Points: {summary['key_points']}")
@@ -0,0 +1,334 @@
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional
+
+from settings import get_settings
+
+
+@dataclass(frozen=True)
+class ModelInfo:
+    context: int
+    # USD per million tokens
+    input_price: float
+    output_price: float
+    # Generation speed, for latency estimates
+    output_tokens_per_second: float = 40.0
+    prompt_tokens_per_second: float = 4000.0
+    first_token_seconds: float = 0.5
+
+
+# List prices at the time of writing; extend or override with MODEL_INFO (JSON)
+MODELS = {
+    'gpt-4': ModelInfo(8192, 30.0, 60.0, 25),
+    'gpt-4-32k': ModelInfo(32768, 60.0, 120.0, 25),
+    'gpt-4-turbo': ModelInfo(128000, 10.0, 30.0, 35),
+    'gpt-4o': ModelInfo(128000, 2.5, 10.0, 80),
+    'gpt-4o-mini': ModelInfo(128000, 0.15, 0.6, 90),
+    'gpt-3.5-turbo': ModelInfo(16385, 0.5, 1.5, 90),
+}
+UNKNOWN_MODEL = ModelInfo(8192, 0.0, 0.0)
+# Batch API requests are billed at half the list price
+BATCH_PRICE_FACTOR = 0.5
+
+# Chat format overhead (OpenAI cookbook): per message, plus the primed reply
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+POLICIES = ('chunk', 'truncate', 'switch', 'off')
+
+MERGE_INSTRUCTION = ("The transcript was too long to analyse at once, so it was split into parts and each part "
+                     "was analysed separately. Combine the partial results below into one answer for the whole "
+                     "meeting, following the original instructions.")
+# "Part N:" header and separator of each partial answer in a merge prompt
+MERGE_PART_TOKENS = 8
+
+
+class TokenBudgetError(RuntimeError):
+    """Raised before any request when a meeting's analysis would exceed the budget"""
+
+
+def model_info(model):
+    overrides = get_settings().model_info
+    if overrides:
+        custom = json.loads(overrides).get(model)
+        if custom:
+            return ModelInfo(**custom)
+    if model in MODELS:
+        return MODELS[model]
+    # Dated snapshots, e.g. gpt-4o-2024-08-06
+    for name in sorted(MODELS, key=len, reverse=True):
+        if model.startswith(name + '-'):
+            return MODELS[name]
+    return UNKNOWN_MODEL
+
+
+@lru_cache(maxsize=None)
+def _encoding(model):
+    """tiktoken encoding for model, or None when tiktoken is not installed"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+
+
+def count_tokens(text, model):
+    """Exact count with tiktoken; otherwise ~4 characters per token (English average)"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_to_tokens(text, model, max_tokens):
+    """Split text into pieces of at most max_tokens, preferring line and then word boundaries"""
+    pieces = []
+    current = []
+    current_tokens = 0
+    for line in text.splitlines(keepends=True):
+        line_tokens = count_tokens(line, model)
+        if line_tokens > max_tokens:
+            # A single huge line (Whisper output is one paragraph): split it on words
+            line_pieces, piece, piece_tokens = [], [], 0
+            for word in line.split(' '):
+                word_tokens = count_tokens(' ' + word, model)
+                if piece and piece_tokens + word_tokens > max_tokens:
+                    line_pieces.append(' '.join(piece))
+                    piece, piece_tokens = [], 0
+                piece.append(word)
+                piece_tokens += word_tokens
+            line_pieces.append(' '.join(piece))
+        else:
+            line_pieces = [line]
+        for part in line_pieces:
+            part_tokens = count_tokens(part, model)
+            if current and current_tokens + part_tokens > max_tokens:
+                pieces.append(''.join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        pieces.append(''.join(current))
+    return pieces
+
+
+def truncate_to_tokens(text, model, max_tokens):
+    """Keep the beginning and the end of text (where agendas and wrap-ups are) within max_tokens"""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    marker = "\n[... middle of the transcript omitted ...]\n"
+    budget = max_tokens - count_tokens(marker, model)
+    encoding = _encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        head = budget * 2 // 3
+        return encoding.decode(tokens[:head]) + marker + encoding.decode(tokens[-(budget - head):])
+    head = budget * 2 // 3 * 4
+    return text[:head] + marker + text[-((budget * 4) - head):]
+
+
+@dataclass
+class CallPlan:
+    """How one analysis will be sent: model, user contents (several when chunked) and estimates"""
+    model: str
+    action: str
+    contents: List[str]
+    prompt_tokens: int
+    output_tokens: int
+    cost: float
+    seconds: float
+    merge: bool = False
+    # Merge calls: more than one when the partial answers do not fit one merge prompt
+    merge_calls: int = 0
+
+    def describe(self):
+        parts = ''
+        if self.merge:
+            merges = 'merge' if self.merge_calls <= 1 else f'{self.merge_calls} merges'
+            parts = f", {len(self.contents)} parts + {merges}"
+        return (f"{self.model} ({self.action}{parts}): ~{self.prompt_tokens} prompt tokens, "
+                f"~${self.cost:.4f}, ~{self.seconds:.0f}s")
+
+
+class TokenBudget:
+    """Pre-flight token counting and policy for GPT calls.
+
+    Before a request is made the prompt is counted. If it does not fit the model's
+    context (leaving room for the answer) the policy decides: "chunk" analyses the
+    transcript in parts and merges the results, "truncate" keeps its beginning and
+    end, "switch" moves to the first of FALLBACK_MODELS with a large enough context,
+    and "off" sends it unchanged. MAX_COST_PER_MEETING is enforced on the estimate
+    of all analysis calls of a meeting, before the first one is sent.
+    """
+
+    def __init__(self, policy=None, max_cost=None, fallback_models=None, output_tokens=None):
+        settings = get_settings()
+        self.policy = policy or settings.token_policy
+        if self.policy not in POLICIES:
+            raise ValueError(f"Unknown TOKEN_POLICY {self.policy!r}, expected one of {', '.join(POLICIES)}")
+        self.max_cost = settings.max_cost_per_meeting if max_cost is None else max_cost
+        if fallback_models is None:
+            fallback_models = [name.strip() for name in settings.fallback_models.split(',') if name.strip()]
+        self.fallback_models = fallback_models
+        self.output_tokens = output_tokens or settings.max_output_tokens
+
+    def prompt_tokens(self, system_prompt, content, model):
+        return (count_tokens(system_prompt, model) + count_tokens(content, model)
+                + 2 * TOKENS_PER_MESSAGE + TOKENS_PER_REPLY)
+
+    def _estimate(self, model, action, contents, prompt_tokens, merge_calls=0, merge_prompt_tokens=0):
+        info = model_info(model)
+        calls = len(contents) + merge_calls
+        output_tokens = self.output_tokens * calls
+        prompt_tokens += merge_prompt_tokens
+        cost = (prompt_tokens * info.input_price + output_tokens * info.output_price) / 1e6
+        seconds = (calls * info.first_token_seconds + prompt_tokens / info.prompt_tokens_per_second
+                   + output_tokens / info.output_tokens_per_second)
+        return CallPlan(model, action, contents, prompt_tokens, output_tokens, cost, seconds, merge_calls > 0,
+                        merge_calls)
+
+    def _merge_room(self, system_prompt, model):
+        """Tokens left for partial answers in one merge prompt"""
+        return (model_info(model).context - self.output_tokens
+                - self.prompt_tokens(system_prompt, MERGE_INSTRUCTION, model))
+
+    def merge_groups(self, system_prompt, partials, model):
+        """Split partial answers into groups whose merge prompts each fit the model's context.
+        One group when they all fit; otherwise the groups are merged and their answers merged
+        again (see SpeechToText._merge_parts). Every group but the last holds at least two
+        answers, so each round of merges leaves fewer."""
+        room = self._merge_room(system_prompt, model)
+        groups, group, group_tokens = [], [], 0
+        for partial in partials:
+            tokens = count_tokens(partial, model) + MERGE_PART_TOKENS
+            if len(group) >= 2 and group_tokens + tokens > room:
+                groups.append(group)
+                group, group_tokens = [], 0
+            group.append(partial)
+            group_tokens += tokens
+        if group:
+            groups.append(group)
+        return groups
+
+    def _chunked(self, system_prompt, content, model):
+        limit = model_info(model).context - self.output_tokens
+        overhead = self.prompt_tokens(system_prompt, '', model)
+        pieces = split_to_tokens(content, model, max(256, limit - overhead))
+        tokens = sum(self.prompt_tokens(system_prompt, piece, model) for piece in pieces)
+        if len(pieces) == 1:
+            return self._estimate(model, 'chunk', pieces, tokens)
+        # Each answer is at most output_tokens (max_tokens of the call): merge as many per call as fit,
+        # then merge those merges, until one answer is left
+        fan_in = self._merge_room(system_prompt, model) // (self.output_tokens + MERGE_PART_TOKENS)
+        if fan_in < 2:
+            raise TokenBudgetError(
+                f"MAX_OUTPUT_TOKENS {self.output_tokens} leaves no room on {model} to merge the answers of a "
+                f"chunked transcript; lower it or use a model with a larger context")
+        merge_calls = merge_prompt_tokens = 0
+        answers = len(pieces)
+        while answers > 1:
+            groups = math.ceil(answers / fan_in)
+            merge_calls += groups
+            merge_prompt_tokens += (answers * (self.output_tokens + MERGE_PART_TOKENS)
+                                    + groups * self.prompt_tokens(system_prompt, MERGE_INSTRUCTION, model))
+            answers = groups
+        return self._estimate(model, 'chunk', pieces, tokens, merge_calls, merge_prompt_tokens)
+
+    def plan(self, system_prompt, content, model, policy=None):
+        """Decide how to send one analysis request; nothing is sent"""
+        policy = policy or self.policy
+        tokens = self.prompt_tokens(system_prompt, content, model)
+        if policy == 'off' or tokens + self.output_tokens <= model_info(model).context:
+            return self._estimate(model, 'single', [content], tokens)
+        if policy == 'truncate':
+            limit = model_info(model).context - self.output_tokens - self.prompt_tokens(system_prompt, '', model)
+            truncated = truncate_to_tokens(content, model, limit)
+            return self._estimate(model, 'truncate', [truncated], self.prompt_tokens(system_prompt, truncated, model))
+        if policy == 'switch':
+            for candidate in self.fallback_models:
+                if tokens + self.output_tokens <= model_info(candidate).context:
+                    return self._estimate(candidate, 'switch', [content], self.prompt_tokens(system_prompt, content, candidate))
+            # Nothing fits: chunk with the largest-context candidate
+            largest = max([model] + self.fallback_models, key=lambda name: model_info(name).context)
+            return self._chunked(system_prompt, content, largest)
+        return self._chunked(system_prompt, content, model)
+
+    def enforce(self, plans, system_prompts, content):
+        """Check the meeting's total estimate against MAX_COST_PER_MEETING.
+
+        With the "switch" policy, over-budget analyses are re-planned on the cheapest
+        fallback model that fits the budget. Returns the (possibly changed) plans or
+        raises TokenBudgetError.
+        """
+        total = sum(plan.cost for plan in plans)
+        if not self.max_cost or total <= self.max_cost:
+            return plans
+        if self.policy == 'switch':
+            for candidate in sorted(self.fallback_models, key=lambda name: model_info(name).input_price):
+                replanned = [self.plan(prompt, content, candidate, policy='chunk') for prompt in system_prompts]
+                if sum(plan.cost for plan in replanned) <= self.max_cost:
+                    for plan in replanned:
+                        plan.action = f'switch/{plan.action}'
+                    return replanned
+        raise TokenBudgetError(
+            f"Estimated analysis cost ${total:.4f} exceeds MAX_COST_PER_MEETING ${self.max_cost:.4f} "
+            f"(~{sum(plan.prompt_tokens for plan in plans)} prompt tokens)")
+
+
+@dataclass
+class UsageRecord:
+    label: str
+    model: str
+    estimated_prompt_tokens: Optional[int]
+    prompt_tokens: Optional[int]
+    completion_tokens: Optional[int]
+    cost: float
+    seconds: float
+    # Time to the first streamed token (None when not streamed)
+    first_token_seconds: Optional[float] = None
+
+
+@dataclass
+class UsageTracker:
+    """Actual token usage reported by the API, per call"""
+    records: List[UsageRecord] = field(default_factory=list)
+
+    def record(self, label, model, response, started, estimated_prompt_tokens=None, first_token_seconds=None,
+               price_factor=1.0):
+        usage = getattr(response, 'usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', None)
+        completion_tokens = getattr(usage, 'completion_tokens', None)
+        info = model_info(model)
+        cost = ((prompt_tokens or 0) * info.input_price
+                + (completion_tokens or 0) * info.output_price) * price_factor / 1e6
+        self.records.append(UsageRecord(label, model, estimated_prompt_tokens, prompt_tokens, completion_tokens,
+                                        cost, time.perf_counter() - started, first_token_seconds))
+
+    def totals(self):
+        return {
+            'calls': len(self.records),
+            'prompt_tokens': sum(r.prompt_tokens or 0 for r in self.records),
+            'completion_tokens': sum(r.completion_tokens or 0 for r in self.records),
+            'cost': sum(r.cost for r in self.records),
+            'seconds': sum(r.seconds for r in self.records),
+        }
+
+    def report(self):
+        lines = [f"{'call':<16} {'model':<14} {'est. prompt':>11} {'prompt':>8} {'output':>8} {'cost $':>9} "
+                 f"{'time s':>7} {'ttft s':>7}"]
+        for r in self.records:
+            lines.append(f"{r.label:<16} {r.model:<14} {r.estimated_prompt_tokens if r.estimated_prompt_tokens is not None else '-':>11} "
+                         f"{r.prompt_tokens if r.prompt_tokens is not None else '-':>8} "
+                         f"{r.completion_tokens if r.completion_tokens is not None else '-':>8} "
+                         f"{r.cost:>9.4f} {r.seconds:>7.1f} "
+                         f"{format(r.first_token_seconds, '.2f') if r.first_token_seconds is not None else '-':>7}")
+        totals = self.totals()
+        lines.append(f"{'total':<16} {'':<14} {'':>11} {totals['prompt_tokens']:>8} {totals['completion_tokens']:>8} "
+                     f"{totals['cost']:>9.4f} {totals['seconds']:>7.1f}")
+        return "\n".join(lines)